@@ -0,0 +1,34 @@
+"""
+APIテスト共通のフィクスチャ
+"""
+
+import time
+
+import pytest
+from app.dependencies import get_current_tenant_id, get_token_claims
+from app.main import app
+from app.utils.auth import TokenClaims
+from fastapi import Header
+
+
+def _tenant_id_from_header(x_tenant_id: str = Header(...)) -> str:
+    """トークンの検証とテナント所属の確認を省き、ヘッダーのテナントIDをそのまま使う"""
+    return x_tenant_id
+
+
+def _test_claims() -> TokenClaims:
+    """トークンを検証せずに、テスト用のユーザーのクレームを返す"""
+    return TokenClaims(user_id="test-user", expires_at=time.time() + 3600)
+
+
+@pytest.fixture(autouse=True)
+def skip_tenant_membership():
+    """
+    APIテストではJWTの検証とテナント所属の確認を行わない
+    （これらは単体テストで確認する）。
+    """
+    app.dependency_overrides[get_current_tenant_id] = _tenant_id_from_header
+    app.dependency_overrides[get_token_claims] = _test_claims
+    yield
+    app.dependency_overrides.pop(get_current_tenant_id, None)
+    app.dependency_overrides.pop(get_token_claims, None)
@@ -0,0 +1,79 @@
+# __tests__/api/routers/analytics/test_analytics.py
+from unittest.mock import MagicMock
+
+import pytest
+from app.dependencies import (
+    get_equipment_repo,
+    get_schedule_repo,
+    get_tenant_calendar,
+)
+
+# テスト対象のAPIインスタンス
+from app.main import app
+from app.utils.calendar import DEFAULT_CALENDAR
+from fastapi.testclient import TestClient
+
+# テストクライアントの作成
+client = TestClient(app)
+
+
+@pytest.mark.api
+class TestEquipmentLoadRouter:
+    """analytics/equipment-load エンドポイントのテスト"""
+
+    @pytest.fixture
+    def mock_repos(self):
+        """スケジュール・設備リポジトリのモック"""
+        schedule_repo = MagicMock()
+        schedule_repo.get_window_intervals.return_value = [
+            {
+                "id": 1,
+                "equipment_id": 1,
+                "start_datetime": "2025-01-06T09:00:00+00:00",
+                "end_datetime": "2025-01-06T13:00:00+00:00",
+            }
+        ]
+        equipment_repo = MagicMock()
+        equipment_repo.get_tenant_equipment_ids.return_value = [1, 2]
+        equipment_repo.get_tenant_group_members.return_value = {100: [1, 2]}
+        return {"schedule": schedule_repo, "equipment": equipment_repo}
+
+    @pytest.fixture(autouse=True)
+    def override_dependency(self, mock_repos):
+        """テスト実行中だけ依存関係をモックに差し替える。"""
+        app.dependency_overrides[get_schedule_repo] = lambda: mock_repos["schedule"]
+        app.dependency_overrides[get_equipment_repo] = lambda: mock_repos["equipment"]
+        app.dependency_overrides[get_tenant_calendar] = lambda: DEFAULT_CALENDAR
+        yield
+        app.dependency_overrides = {}
+
+    def test_get_equipment_load(self, headers, mock_repos):
+        """GET /analytics/equipment-load: 設備・設備グループごとに日別の稼働率を返す"""
+        response = client.get(
+            "/analytics/equipment-load",
+            params={"start_time": "2025-01-06T00:00:00+00:00", "horizon_days": 2},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["buckets"]) == 2
+        assert body["equipments"][0] == {
+            "equipment_id": 1,
+            "busy_minutes": [240.0, 0.0],
+            "available_minutes": [480.0, 480.0],
+            "utilization_percent": [50.0, 0.0],
+        }
+        assert body["groups"][0]["utilization_percent"] == [25.0, 0.0]
+        # 期間と重なるスケジュールだけをテナントで絞り込んで読み込む
+        args = mock_repos["schedule"].get_window_intervals.call_args[0]
+        assert args[0] == headers["x-tenant-id"]
+        assert args[2].isoformat() == "2025-01-08T00:00:00+00:00"
+
+    def test_rejects_unknown_bucket(self, headers):
+        """GET /analytics/equipment-load: 集計の単位は day / week のみ"""
+        response = client.get(
+            "/analytics/equipment-load", params={"bucket": "month"}, headers=headers
+        )
+
+        assert response.status_code == 422
@@ -0,0 +1,120 @@
+# __tests__/api/routers/master/test_calendars.py
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.dependencies import get_async_calendar_repo
+
+# テスト対象のAPIインスタンス
+from app.main import app
+from fastapi.testclient import TestClient
+
+# テストクライアントの作成
+client = TestClient(app)
+
+
+@pytest.mark.api
+class TestCalendarRouter:
+    """calendarsルーターのユニットテスト"""
+
+    @pytest.fixture
+    def mock_repo(self):
+        """リポジトリのモックを作成するフィクスチャ"""
+        return AsyncMock()
+
+    @pytest.fixture(autouse=True)
+    def override_dependency(self, mock_repo):
+        """
+        テスト実行中だけ get_async_calendar_repo を mock_repo に差し替える。
+        """
+        app.dependency_overrides[get_async_calendar_repo] = lambda: mock_repo
+        yield
+        app.dependency_overrides = {}
+
+    @pytest.fixture
+    def mock_invalidate(self):
+        """キャッシュ破棄関数のモック"""
+        with patch(
+            "app.routers.master.calendars.invalidate_tenant_calendar"
+        ) as mock_invalidate:
+            yield mock_invalidate
+
+    def test_get_shifts(self, headers, mock_repo):
+        """GET /shifts: テナントの稼働シフトを取得するテスト"""
+        expected_data = [{"id": 1, "weekdays": [0, 1, 2, 3, 4]}]
+        mock_repo.get_shifts.return_value = expected_data
+
+        response = client.get("/calendars/shifts", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json() == expected_data
+        mock_repo.get_shifts.assert_called_once_with(headers["x-tenant-id"])
+
+    def test_create_shift(self, headers, mock_repo, mock_invalidate):
+        """POST /shifts: 作成後にテナントのカレンダーキャッシュを破棄するテスト"""
+        payload = {"weekdays": [0, 1, 2], "start_time": "08:00", "end_time": "17:00"}
+        mock_repo.create.return_value = [{"id": 1, **payload}]
+
+        response = client.post("/calendars/shifts", json=payload, headers=headers)
+
+        assert response.status_code == 200
+        created = mock_repo.create.call_args.args[0]
+        assert created["tenant_id"] == headers["x-tenant-id"]
+        assert created["start_time"] == "08:00:00"
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"])
+
+    def test_create_shift_invalid_weekday(self, headers, mock_repo, mock_invalidate):
+        """POST /shifts: 曜日が範囲外の場合は422"""
+        payload = {"weekdays": [7], "start_time": "08:00", "end_time": "17:00"}
+
+        response = client.post("/calendars/shifts", json=payload, headers=headers)
+
+        assert response.status_code == 422
+        mock_repo.create.assert_not_called()
+        mock_invalidate.assert_not_called()
+
+    def test_update_shift_not_found(self, headers, mock_repo, mock_invalidate):
+        """PATCH /shifts/{id}: 対象がない場合は404でキャッシュも破棄しない"""
+        mock_repo.update_shift.return_value = []
+
+        response = client.patch(
+            "/calendars/shifts/999", json={"end_time": "18:00"}, headers=headers
+        )
+
+        assert response.status_code == 404
+        mock_repo.update_shift.assert_called_once_with(
+            headers["x-tenant-id"], 999, {"end_time": "18:00:00"}
+        )
+        mock_invalidate.assert_not_called()
+
+    def test_create_holiday(self, headers, mock_repo, mock_invalidate):
+        """POST /holidays: 休日を作成するテスト"""
+        payload = {"holiday_date": "2025-01-01", "name": "元日"}
+        mock_repo.create_holiday.return_value = [{"id": 1, **payload}]
+
+        response = client.post("/calendars/holidays", json=payload, headers=headers)
+
+        assert response.status_code == 200
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"])
+
+    def test_create_shutdown_invalid_period(self, headers, mock_repo, mock_invalidate):
+        """POST /shutdowns: 終了日時が開始日時以前の場合は422"""
+        payload = {
+            "start_datetime": "2025-08-16T00:00:00",
+            "end_datetime": "2025-08-10T00:00:00",
+        }
+
+        response = client.post("/calendars/shutdowns", json=payload, headers=headers)
+
+        assert response.status_code == 422
+        mock_repo.create_shutdown.assert_not_called()
+
+    def test_delete_shutdown(self, headers, mock_repo, mock_invalidate):
+        """DELETE /shutdowns/{id}: 工場停止期間を削除するテスト"""
+        mock_repo.delete_shutdown.return_value = True
+
+        response = client.delete("/calendars/shutdowns/1", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "deleted"}
+        mock_repo.delete_shutdown.assert_called_once_with(headers["x-tenant-id"], 1)
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"])
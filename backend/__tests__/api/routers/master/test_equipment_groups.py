@@ -1,11 +1,10 @@
 # backend/__tests__/api/routers/master/test_equipment_groups.py
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
-from fastapi.testclient import TestClient
-
-from app.dependencies import get_equipment_repo
+from app.dependencies import get_async_equipment_repo
 from app.main import app
+from fastapi.testclient import TestClient
 
 # テストクライアントの作成
 client = TestClient(app)
@@ -18,15 +17,15 @@ class TestEquipmentGroupRouter:
     @pytest.fixture
     def mock_repo(self):
         """リポジトリのモックを作成するフィクスチャ"""
-        mock = MagicMock()
+        mock = AsyncMock()
         return mock
 
     @pytest.fixture(autouse=True)
     def override_dependency(self, mock_repo):
         """
-        テスト実行中だけ get_equipment_repo を mock_repo に差し替える。
+        テスト実行中だけ get_async_equipment_repo を mock_repo に差し替える。
         """
-        app.dependency_overrides[get_equipment_repo] = lambda: mock_repo
+        app.dependency_overrides[get_async_equipment_repo] = lambda: mock_repo
         yield
         app.dependency_overrides = {}
 
@@ -130,13 +129,17 @@ class TestEquipmentGroupRouter:
 
         mock_repo.add_machine_to_group.return_value = expected_data
 
-        response = client.post(
-            f"/equipment-groups/{group_id}/members", json=payload, headers=headers
-        )
+        with patch(
+            "app.routers.master.equipment_groups.invalidate_groups"
+        ) as mock_invalidate:
+            response = client.post(
+                f"/equipment-groups/{group_id}/members", json=payload, headers=headers
+            )
 
         assert response.status_code == 200
         assert response.json() == expected_data
         mock_repo.add_machine_to_group.assert_called_with(group_id, equipment_id)
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"], [group_id])
 
     def test_add_equipment_to_group_duplicate(self, headers, mock_repo):
         """POST /{group_id}/members: 重複追加時の409エラーテスト"""
@@ -160,26 +163,26 @@ class TestEquipmentGroupRouter:
         group_id = 1
         equipment_id = 10
 
-        mock_result = MagicMock()
-        mock_result.count = 1
-        mock_repo.remove_machine_from_group.return_value = mock_result
+        mock_repo.remove_machine_from_group.return_value = True
 
-        response = client.delete(
-            f"/equipment-groups/{group_id}/members/{equipment_id}", headers=headers
-        )
+        with patch(
+            "app.routers.master.equipment_groups.invalidate_groups"
+        ) as mock_invalidate:
+            response = client.delete(
+                f"/equipment-groups/{group_id}/members/{equipment_id}", headers=headers
+            )
 
         assert response.status_code == 200
         assert response.json() == {"status": "deleted"}
         mock_repo.remove_machine_from_group.assert_called_with(group_id, equipment_id)
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"], [group_id])
 
     def test_remove_equipment_from_group_not_found(self, headers, mock_repo):
         """DELETE /{group_id}/members/{equipment_id}: 存在しない紐付け削除時の404エラーテスト"""
         group_id = 1
         equipment_id = 999
 
-        mock_result = MagicMock()
-        mock_result.count = 0
-        mock_repo.remove_machine_from_group.return_value = mock_result
+        mock_repo.remove_machine_from_group.return_value = False
 
         response = client.delete(
             f"/equipment-groups/{group_id}/members/{equipment_id}", headers=headers
@@ -1,8 +1,8 @@
 # __tests__/api/routers/master/test_equipments.py
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
-from app.dependencies import get_equipment_repo
+from app.dependencies import get_async_equipment_repo
 
 # テスト対象のAPIインスタンス
 from app.main import app
@@ -19,15 +19,15 @@ class TestEquipmentRouter:
     @pytest.fixture
     def mock_repo(self):
         """リポジトリのモックを作成するフィクスチャ"""
-        mock = MagicMock()
+        mock = AsyncMock()
         return mock
 
     @pytest.fixture(autouse=True)
     def override_dependency(self, mock_repo):
         """
-        テスト実行中だけ get_equipment_repo を mock_repo に差し替える。
+        テスト実行中だけ get_async_equipment_repo を mock_repo に差し替える。
         """
-        app.dependency_overrides[get_equipment_repo] = lambda: mock_repo
+        app.dependency_overrides[get_async_equipment_repo] = lambda: mock_repo
         yield
         app.dependency_overrides = {}
 
@@ -106,15 +106,19 @@ class TestEquipmentRouter:
         assert called_data == payload
 
     def test_delete_equipment_success(self, headers, mock_repo):
-        """DELETE /{id}: 削除成功時のテスト"""
+        """DELETE /{id}: 削除成功時のテスト（設備が所属するグループのキャッシュを破棄する）"""
         equipment_id = 1
         mock_repo.delete.return_value = True
 
-        response = client.delete(f"/equipments/{equipment_id}", headers=headers)
+        with patch(
+            "app.routers.master.equipments.invalidate_equipment"
+        ) as mock_invalidate:
+            response = client.delete(f"/equipments/{equipment_id}", headers=headers)
 
         assert response.status_code == 200
         assert response.json() == {"status": "deleted"}
         mock_repo.delete.assert_called_with(equipment_id)
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"], equipment_id)
 
     def test_delete_equipment_not_found(self, headers, mock_repo):
         """DELETE /{id}: 存在しないID削除時の404エラーテスト"""
@@ -125,3 +129,40 @@ class TestEquipmentRouter:
 
         assert response.status_code == 404
         assert response.json()["detail"] == "Not found"
+
+    def test_create_equipment_downtime(self, headers, mock_repo):
+        """POST /{id}/downtime: 設備停止期間の登録テスト"""
+        payload = {
+            "start_datetime": "2025-01-06T09:00:00+00:00",
+            "end_datetime": "2025-01-06T12:00:00+00:00",
+            "reason": "定期保全",
+        }
+        mock_repo.create_downtime.return_value = [{"id": 1, **payload}]
+
+        response = client.post("/equipments/5/downtime", json=payload, headers=headers)
+
+        assert response.status_code == 200
+        created = mock_repo.create_downtime.call_args.args[0]
+        assert created["equipment_id"] == 5
+        assert created["tenant_id"] == headers["x-tenant-id"]
+
+    def test_create_equipment_downtime_invalid_period(self, headers, mock_repo):
+        """POST /{id}/downtime: 終了日時が開始日時以前の場合は422"""
+        payload = {
+            "start_datetime": "2025-01-06T12:00:00+00:00",
+            "end_datetime": "2025-01-06T09:00:00+00:00",
+        }
+
+        response = client.post("/equipments/5/downtime", json=payload, headers=headers)
+
+        assert response.status_code == 422
+        mock_repo.create_downtime.assert_not_called()
+
+    def test_delete_equipment_downtime_not_found(self, headers, mock_repo):
+        """DELETE /{id}/downtime/{downtime_id}: 対象がない場合は404"""
+        mock_repo.delete_downtime.return_value = False
+
+        response = client.delete("/equipments/5/downtime/999", headers=headers)
+
+        assert response.status_code == 404
+        mock_repo.delete_downtime.assert_called_once_with(5, 999)
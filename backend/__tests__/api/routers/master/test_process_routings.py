@@ -1,8 +1,8 @@
 # __tests__/api/routers/master/test_process_routings.py
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
-from app.dependencies import get_product_repo
+from app.dependencies import get_async_product_repo
 
 # テスト対象のAPIインスタンス
 from app.main import app
@@ -19,15 +19,15 @@ class TestProcessRoutingRouter:
     @pytest.fixture
     def mock_repo(self):
         """リポジトリのモックを作成するフィクスチャ"""
-        mock = MagicMock()
+        mock = AsyncMock()
         return mock
 
     @pytest.fixture(autouse=True)
     def override_dependency(self, mock_repo):
         """
-        テスト実行中だけ get_product_repo を mock_repo に差し替える。
+        テスト実行中だけ get_async_product_repo を mock_repo に差し替える。
         """
-        app.dependency_overrides[get_product_repo] = lambda: mock_repo
+        app.dependency_overrides[get_async_product_repo] = lambda: mock_repo
         yield
         app.dependency_overrides = {}
 
@@ -100,22 +100,94 @@ class TestProcessRoutingRouter:
         assert called_data == payload
 
     def test_delete_process_routing_success(self, headers, mock_repo):
-        """DELETE /{id}: 削除成功時のテスト"""
+        """DELETE /{id}: 削除成功時のテスト（工程順序を含む製品のキャッシュを破棄する）"""
         routing_id = 1
         mock_repo.delete_routing.return_value = True
 
-        response = client.delete(f"/process-routings/{routing_id}", headers=headers)
+        with patch(
+            "app.routers.master.process_routings.invalidate_routing"
+        ) as mock_invalidate:
+            response = client.delete(f"/process-routings/{routing_id}", headers=headers)
 
         assert response.status_code == 200
         assert response.json() == {"status": "deleted"}
         mock_repo.delete_routing.assert_called_with(routing_id)
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"], routing_id)
+
+    def test_create_process_routing_invalidates_product(self, headers, mock_repo):
+        """POST /: 作成した工程順序の製品のキャッシュを破棄する"""
+        payload = {
+            "product_id": 7,
+            "sequence_order": 1,
+            "process_name": "Process A",
+            "equipment_group_id": 1,
+            "setup_time_seconds": 60,
+            "unit_time_seconds": 1.5,
+        }
+        mock_repo.create_routing.return_value = {"id": 1, **payload}
+
+        with patch(
+            "app.routers.master.process_routings.invalidate_products"
+        ) as mock_invalidate:
+            response = client.post("/process-routings/", json=payload, headers=headers)
+
+        assert response.status_code == 200
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"], [7])
 
     def test_delete_process_routing_not_found(self, headers, mock_repo):
         """DELETE /{id}: 存在しないID削除時の404エラーテスト"""
         routing_id = 999
         mock_repo.delete_routing.return_value = False
 
-        response = client.delete(f"/process-routings/{routing_id}", headers=headers)
+        with patch(
+            "app.routers.master.process_routings.invalidate_routing"
+        ) as mock_invalidate:
+            response = client.delete(f"/process-routings/{routing_id}", headers=headers)
 
         assert response.status_code == 404
+        mock_invalidate.assert_not_called()
         assert response.json()["detail"] == "Not found"
+
+    def test_put_setup_changeover(self, headers, mock_repo):
+        """PUT /setup-changeovers: 段取り替え時間の登録のテスト"""
+        payload = {
+            "from_setup_method_id": 1,
+            "to_setup_method_id": 2,
+            "setup_time_seconds": 900,
+        }
+        mock_repo.upsert_setup_changeover.return_value = {**payload, "id": 1}
+
+        response = client.put(
+            "/process-routings/setup-changeovers", json=payload, headers=headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["id"] == 1
+        called_data = mock_repo.upsert_setup_changeover.call_args[0][0]
+        assert called_data["setup_time_seconds"] == 900
+        assert "tenant_id" in called_data
+
+    def test_put_setup_changeover_rejects_negative_time(self, headers, mock_repo):
+        """PUT /setup-changeovers: 負の段取り時間は422エラー"""
+        payload = {
+            "from_setup_method_id": 1,
+            "to_setup_method_id": 2,
+            "setup_time_seconds": -1,
+        }
+
+        response = client.put(
+            "/process-routings/setup-changeovers", json=payload, headers=headers
+        )
+
+        assert response.status_code == 422
+        mock_repo.upsert_setup_changeover.assert_not_called()
+
+    def test_delete_setup_changeover_not_found(self, headers, mock_repo):
+        """DELETE /setup-changeovers/{id}: 存在しないID削除時の404エラーテスト"""
+        mock_repo.delete_setup_changeover.return_value = False
+
+        response = client.delete(
+            "/process-routings/setup-changeovers/999", headers=headers
+        )
+
+        assert response.status_code == 404
@@ -1,9 +1,9 @@
 # __tests__/unit/routers/master/test_products_router.py
 import uuid
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
-from app.dependencies import get_product_repo
+from app.dependencies import get_async_product_repo
 
 # テスト対象のAPIインスタンス
 from app.main import app
@@ -20,16 +20,16 @@ class TestProductRouter:
     @pytest.fixture
     def mock_repo(self):
         """リポジトリのモックを作成するフィクスチャ"""
-        mock = MagicMock()
+        mock = AsyncMock()
         return mock
 
     @pytest.fixture(autouse=True)
     def override_dependency(self, mock_repo):
         """
-        テスト実行中だけ get_product_repo を mock_repo に差し替える。
+        テスト実行中だけ get_async_product_repo を mock_repo に差し替える。
         autouse=True なので、このクラスの全テストで自動的に適用される。
         """
-        app.dependency_overrides[get_product_repo] = lambda: mock_repo
+        app.dependency_overrides[get_async_product_repo] = lambda: mock_repo
         yield
         # テスト終了後に元に戻す（重要）
         app.dependency_overrides = {}
@@ -111,23 +111,27 @@ class TestProductRouter:
         assert called_id == product_id
         assert called_data == payload
 
-    def test_delete_product_success(self, mock_repo):
-        """DELETE /{id}: 削除成功時のテスト"""
+    def test_delete_product_success(self, headers, mock_repo):
+        """DELETE /{id}: 削除成功時のテスト（製品の工程順序のキャッシュを破棄する）"""
         product_id = 1
         mock_repo.delete.return_value = True  # 削除成功
 
-        response = client.delete(f"/products/{product_id}")
+        with patch(
+            "app.routers.master.products.invalidate_products"
+        ) as mock_invalidate:
+            response = client.delete(f"/products/{product_id}", headers=headers)
 
         assert response.status_code == 200
         assert response.json() == {"status": "deleted"}
         mock_repo.delete.assert_called_with(product_id)
+        mock_invalidate.assert_called_once_with(headers["x-tenant-id"], [product_id])
 
-    def test_delete_product_not_found(self, mock_repo):
+    def test_delete_product_not_found(self, headers, mock_repo):
         """DELETE /{id}: 存在しないID削除時の404エラーテスト"""
         product_id = 999
         mock_repo.delete.return_value = False  # 削除失敗（見つからない）
 
-        response = client.delete(f"/products/{product_id}")
+        response = client.delete(f"/products/{product_id}", headers=headers)
 
         assert response.status_code == 404
         assert response.json()["detail"] == "Not found"
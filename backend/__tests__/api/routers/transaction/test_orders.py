@@ -1,11 +1,18 @@
 # __tests__/api/routers/transaction/test_orders.py
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from app.dependencies import get_order_repo
+from app.dependencies import (
+    get_async_order_repo,
+    get_order_repo,
+    get_product_repo,
+    get_schedule_repo,
+    get_tenant_calendar,
+)
 
 # テスト対象のAPIインスタンス
 from app.main import app
+from app.utils.calendar import DEFAULT_CALENDAR
 from fastapi.testclient import TestClient
 
 # テストクライアントの作成
@@ -22,42 +29,68 @@ class TestOrderRouter:
         mock = MagicMock()
         return mock
 
+    @pytest.fixture
+    def async_repo(self):
+        """非同期リポジトリのモック（注文の読み書きだけを行うエンドポイント用）"""
+        return AsyncMock()
+
+    product_repo = MagicMock()
+    schedule_repo = MagicMock()
+
     @pytest.fixture(autouse=True)
-    def override_dependency(self, mock_repo):
+    def reschedule(self):
+        """スケジュールの再計画をモックに差し替える（既定では変更なし）"""
+        with (
+            patch(
+                "app.routers.transaction.orders.reschedule_order",
+                return_value={"removed_schedule_ids": [], "updated_schedules": []},
+            ) as mock_reschedule,
+            patch(
+                "app.routers.transaction.orders.apply_schedule_changes"
+            ) as mock_apply,
+        ):
+            yield mock_reschedule, mock_apply
+
+    @pytest.fixture(autouse=True)
+    def override_dependency(self, mock_repo, async_repo):
         """
         テスト実行中だけ get_order_repo を mock_repo に差し替える。
         """
         app.dependency_overrides[get_order_repo] = lambda: mock_repo
+        app.dependency_overrides[get_async_order_repo] = lambda: async_repo
+        app.dependency_overrides[get_product_repo] = lambda: self.product_repo
+        app.dependency_overrides[get_schedule_repo] = lambda: self.schedule_repo
+        app.dependency_overrides[get_tenant_calendar] = lambda: DEFAULT_CALENDAR
         yield
         app.dependency_overrides = {}
 
-    def test_get_orders(self, mock_repo):
+    def test_get_orders(self, async_repo):
         """GET /: 全件取得のテスト"""
         expected_data = [
             {"id": 1, "order_number": "ORD-001", "product_id": 1, "quantity": 100},
             {"id": 2, "order_number": "ORD-002", "product_id": 2, "quantity": 200},
         ]
-        mock_repo.get_all.return_value = expected_data
+        async_repo.get_all.return_value = expected_data
 
         response = client.get("/orders/")
 
         assert response.status_code == 200
         assert response.json() == expected_data
-        mock_repo.get_all.assert_called_once()
+        async_repo.get_all.assert_called_once()
 
-    def test_get_order_by_id(self, mock_repo):
+    def test_get_order_by_id(self, async_repo):
         """GET /{id}: 1件取得のテスト"""
         order_id = 1
         expected_data = {"id": order_id, "order_number": "ORD-001"}
-        mock_repo.get_by_id.return_value = expected_data
+        async_repo.get_by_id.return_value = expected_data
 
         response = client.get(f"/orders/{order_id}")
 
         assert response.status_code == 200
         assert response.json() == expected_data
-        mock_repo.get_by_id.assert_called_with(order_id)
+        async_repo.get_by_id.assert_called_with(order_id)
 
-    def test_create_order(self, headers, mock_repo):
+    def test_create_order(self, headers, async_repo):
         """POST /: 新規作成のテスト"""
         payload = {
             "order_number": "NEW-ORD",
@@ -67,14 +100,14 @@ class TestOrderRouter:
         }
         created_data = {**payload, "id": 100}
 
-        mock_repo.create.return_value = created_data
+        async_repo.create.return_value = created_data
 
         response = client.post("/orders/", json=payload, headers=headers)
 
         assert response.status_code == 200
         assert response.json() == created_data
 
-        mock_repo.create.assert_called_once()
+        async_repo.create.assert_called_once()
 
     def test_update_order(self, headers, mock_repo):
         """PATCH /{id}: 更新のテスト"""
@@ -105,7 +138,7 @@ class TestOrderRouter:
         assert response.json() == {"status": "deleted"}
         mock_repo.delete.assert_called_with(order_id)
 
-    def test_delete_order_not_found(self, headers, mock_repo):
+    def test_delete_order_not_found(self, headers, mock_repo, reschedule):
         """DELETE /{id}: 存在しないID削除時の404エラーテスト"""
         order_id = 999
         mock_repo.delete.return_value = False
@@ -114,3 +147,151 @@ class TestOrderRouter:
 
         assert response.status_code == 404
         assert response.json()["detail"] == "Not found"
+        reschedule[1].assert_not_called()
+
+    def test_update_quantity_reschedules_order(self, headers, mock_repo, reschedule):
+        """PATCH /{id}: 数量を変更すると、その注文のスケジュールを計画し直す"""
+        mock_reschedule, mock_apply = reschedule
+        mock_repo.update.return_value = [{"id": 1, "quantity": 60}]
+        changes = {
+            "removed_schedule_ids": [],
+            "updated_schedules": [{"id": 501}, {"id": 502}],
+        }
+        mock_reschedule.return_value = changes
+
+        response = client.patch("/orders/1", json={"quantity": 60}, headers=headers)
+
+        assert response.status_code == 200
+        args, kwargs = mock_reschedule.call_args
+        assert args[2:] == (headers["x-tenant-id"], 1)
+        assert kwargs["quantity"] == 60
+        assert kwargs["calendar"] is DEFAULT_CALENDAR
+        mock_apply.assert_called_once_with(self.schedule_repo, changes)
+
+    def test_update_product_unschedules_order(self, headers, mock_repo, reschedule):
+        """PATCH /{id}: 製品を変更すると、スケジュールを取り除いて未スケジュールに戻す"""
+        mock_reschedule, mock_apply = reschedule
+        mock_repo.update.return_value = [{"id": 1, "product_id": 2}]
+        changes = {"removed_schedule_ids": [501], "updated_schedules": [{"id": 601}]}
+        mock_reschedule.return_value = changes
+
+        response = client.patch("/orders/1", json={"product_id": 2}, headers=headers)
+
+        assert response.status_code == 200
+        assert mock_reschedule.call_args.kwargs["remove"] is True
+        mock_apply.assert_called_once_with(self.schedule_repo, changes)
+        mock_repo.update.assert_called_once_with(
+            1, {"product_id": 2, "is_scheduled": False}
+        )
+
+    def test_update_keeps_order_when_reschedule_fails(
+        self, headers, mock_repo, reschedule
+    ):
+        """PATCH /{id}: 計画し直せない場合は400を返し、注文もスケジュールも変更しない"""
+        mock_reschedule, mock_apply = reschedule
+        mock_reschedule.side_effect = ValueError(
+            "所要時間が1回の稼働時間を超えています"
+        )
+
+        response = client.patch("/orders/1", json={"quantity": 600}, headers=headers)
+
+        assert response.status_code == 400
+        mock_apply.assert_not_called()
+        mock_repo.update.assert_not_called()
+
+    def test_update_keeps_order_when_schedule_save_fails(
+        self, headers, mock_repo, reschedule
+    ):
+        """PATCH /{id}: スケジュールの保存に失敗した場合は注文を変更しない"""
+        reschedule[1].side_effect = RuntimeError("スケジュールの保存に失敗しました")
+
+        with pytest.raises(RuntimeError):
+            client.patch("/orders/1", json={"quantity": 60}, headers=headers)
+
+        mock_repo.update.assert_not_called()
+
+    def test_update_quantity_of_missing_order(self, headers, mock_repo, reschedule):
+        """PATCH /{id}: 存在しない注文は計画し直さずに404を返す"""
+        mock_repo.get_by_id.return_value = None
+
+        response = client.patch("/orders/999", json={"quantity": 60}, headers=headers)
+
+        assert response.status_code == 404
+        reschedule[0].assert_not_called()
+
+    def test_update_other_fields_keeps_schedule(self, headers, mock_repo, reschedule):
+        """PATCH /{id}: 数量・製品以外の変更ではスケジュールに触れない"""
+        mock_reschedule, mock_apply = reschedule
+        mock_repo.update.return_value = [{"id": 1}]
+
+        response = client.patch(
+            "/orders/1", json={"deadline_date": "2025-02-01"}, headers=headers
+        )
+
+        assert response.status_code == 200
+        mock_reschedule.assert_not_called()
+        mock_apply.assert_not_called()
+
+    def test_delete_order_shifts_following_schedules(
+        self, headers, mock_repo, reschedule
+    ):
+        """DELETE /{id}: 削除前に計画し直し、削除後に前詰めした行だけを保存する"""
+        mock_reschedule, mock_apply = reschedule
+        mock_repo.delete.return_value = True
+        mock_reschedule.return_value = {
+            "removed_schedule_ids": [501],
+            "updated_schedules": [{"id": 601}],
+        }
+
+        response = client.delete("/orders/1", headers=headers)
+
+        assert response.status_code == 200
+        assert mock_reschedule.call_args.kwargs["remove"] is True
+        # 注文のスケジュールは削除時に連鎖して消えるため、ここでは削除しない
+        mock_apply.assert_called_once_with(
+            self.schedule_repo,
+            {"removed_schedule_ids": [], "updated_schedules": [{"id": 601}]},
+        )
+
+    def test_promise_order(self, headers):
+        """POST /promise: 明細ごとの最短完了日時を回答する"""
+        engine_result = {
+            "lines": [
+                {
+                    "index": 0,
+                    "product_id": 10,
+                    "quantity": 5,
+                    "completion_datetime": "2025-01-07T10:00:00+00:00",
+                    "equipment_ids": [1, 3],
+                }
+            ],
+            "failed_lines": [],
+            "completion_datetime": "2025-01-07T10:00:00+00:00",
+        }
+
+        with patch(
+            "app.routers.transaction.orders.promise_orders",
+            return_value=engine_result,
+        ) as mock_promise:
+            response = client.post(
+                "/orders/promise",
+                json={"lines": [{"product_id": 10, "quantity": 5}]},
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        assert response.json() == engine_result
+        kwargs = mock_promise.call_args.kwargs
+        assert kwargs["lines"] == [{"product_id": 10, "quantity": 5}]
+        assert kwargs["tenant_id"] == headers["x-tenant-id"]
+        assert kwargs["calendar"] is DEFAULT_CALENDAR
+
+    def test_promise_order_rejects_invalid_quantity(self, headers):
+        """POST /promise: 数量が0以下の場合は422"""
+        response = client.post(
+            "/orders/promise",
+            json={"lines": [{"product_id": 10, "quantity": 0}]},
+            headers=headers,
+        )
+
+        assert response.status_code == 422
@@ -0,0 +1,532 @@
+# __tests__/api/routers/transaction/test_production_schedules.py
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.dependencies import (
+    get_async_order_repo,
+    get_async_product_repo,
+    get_async_schedule_repo,
+    get_equipment_repo,
+    get_job_queue,
+    get_order_repo,
+    get_product_repo,
+    get_schedule_repo,
+    get_tenant_calendar,
+)
+
+# テスト対象のAPIインスタンス
+from app.main import app
+from app.utils.calendar import DEFAULT_CALENDAR
+from app.utils.job_queue import JobQueue
+from app.utils.pagination import decode_cursor, encode_cursor
+from fastapi.testclient import TestClient
+
+# テストクライアントの作成
+client = TestClient(app)
+
+
+@pytest.mark.api
+class TestProductionScheduleRouter:
+    """production-schedulesルーターのユニットテスト"""
+
+    @pytest.fixture
+    def mock_repos(self):
+        """各リポジトリのモックを作成するフィクスチャ"""
+        return {
+            "order": MagicMock(),
+            "product": MagicMock(),
+            "equipment": MagicMock(),
+            "schedule": MagicMock(),
+            "async_order": MagicMock(),
+            "async_product": MagicMock(),
+            "async_schedule": MagicMock(),
+        }
+
+    @pytest.fixture(autouse=True)
+    def override_dependency(self, mock_repos):
+        """
+        テスト実行中だけ各リポジトリの依存関係をモックに差し替える。
+        """
+        app.dependency_overrides[get_order_repo] = lambda: mock_repos["order"]
+        app.dependency_overrides[get_product_repo] = lambda: mock_repos["product"]
+        app.dependency_overrides[get_equipment_repo] = lambda: mock_repos["equipment"]
+        app.dependency_overrides[get_schedule_repo] = lambda: mock_repos["schedule"]
+        app.dependency_overrides[get_tenant_calendar] = lambda: DEFAULT_CALENDAR
+        app.dependency_overrides[get_async_order_repo] = lambda: mock_repos[
+            "async_order"
+        ]
+        app.dependency_overrides[get_async_product_repo] = lambda: mock_repos[
+            "async_product"
+        ]
+        app.dependency_overrides[get_async_schedule_repo] = lambda: mock_repos[
+            "async_schedule"
+        ]
+        app.dependency_overrides[get_job_queue] = lambda: self.jobs
+        yield
+        app.dependency_overrides = {}
+
+    @pytest.fixture(autouse=True)
+    def jobs(self):
+        """テストごとのジョブキュー"""
+        self.jobs = JobQueue(max_workers=1)
+        yield self.jobs
+        self.jobs.shutdown()
+
+    def test_get_schedules_returns_next_cursor(self, headers, mock_repos):
+        """GET /: 1ページ分読み込んだ場合は最後の行のキーで next_cursor を返す"""
+        rows = [
+            {"id": 10, "start_datetime": "2025-01-06T09:00:00+00:00"},
+            {"id": 11, "start_datetime": "2025-01-06T10:00:00+00:00"},
+        ]
+        mock_repos["schedule"].get_timeline_page.return_value = rows
+
+        response = client.get(
+            "/production-schedules/",
+            params={
+                "start": "2025-01-06T00:00:00+00:00",
+                "end": "2025-01-13T00:00:00+00:00",
+                "order_id": 5,
+                "limit": 2,
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["items"] == rows
+        assert decode_cursor(body["next_cursor"], 2) == [
+            "2025-01-06T10:00:00+00:00",
+            11,
+        ]
+        args, kwargs = mock_repos["schedule"].get_timeline_page.call_args
+        assert args[0] == headers["x-tenant-id"]
+        assert args[3] == 2
+        assert kwargs == {"equipment_ids": None, "order_id": 5, "after": None}
+
+    def test_get_schedules_last_page(self, headers, mock_repos):
+        """GET /: カーソルから続きを読み込み、件数が limit 未満なら最後のページ"""
+        mock_repos["schedule"].get_timeline_page.return_value = [{"id": 1}]
+        cursor = encode_cursor("2025-01-06T10:00:00Z", 11)
+
+        response = client.get(
+            "/production-schedules/",
+            params={
+                "start": "2025-01-06T00:00:00+00:00",
+                "end": "2025-01-13T00:00:00+00:00",
+                "cursor": cursor,
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] is None
+        kwargs = mock_repos["schedule"].get_timeline_page.call_args.kwargs
+        assert kwargs["after"] == ("2025-01-06T10:00:00+00:00", 11)
+
+    def test_get_schedules_filters_by_equipment_group(self, headers, mock_repos):
+        """GET /: 設備グループは所属する設備で絞り込み、設備の指定とは両方を満たすものに絞る"""
+        mock_repos["equipment"].get_members_by_group_id.return_value = [
+            {"equipment_id": 1},
+            {"equipment_id": 2},
+        ]
+        params = {
+            "start": "2025-01-06T00:00:00+00:00",
+            "end": "2025-01-13T00:00:00+00:00",
+            "equipment_group_id": 100,
+        }
+
+        client.get("/production-schedules/", params=params, headers=headers)
+        response = client.get(
+            "/production-schedules/",
+            params={**params, "equipment_id": 3},
+            headers=headers,
+        )
+
+        kwargs = mock_repos["schedule"].get_timeline_page.call_args.kwargs
+        assert kwargs["equipment_ids"] == {1, 2}
+        # グループに属さない設備を指定した場合は読み込まずに空のページを返す
+        assert response.json() == {"items": [], "next_cursor": None}
+        mock_repos["schedule"].get_timeline_page.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"end": "2025-01-06T00:00:00+00:00"},
+            {"cursor": "not-a-cursor"},
+            {"cursor": encode_cursor('2025-01-06",id.gt.0', 1)},
+        ],
+    )
+    def test_get_schedules_rejects_invalid_params(self, headers, mock_repos, params):
+        """GET /: 期間が逆転している場合・カーソルが不正な場合は400エラー"""
+        response = client.get(
+            "/production-schedules/",
+            params={
+                "start": "2025-01-06T00:00:00+00:00",
+                "end": "2025-01-13T00:00:00+00:00",
+                **params,
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+        mock_repos["schedule"].get_timeline_page.assert_not_called()
+
+    def test_schedule_batch(self, headers, mock_repos):
+        """POST /batch: 未スケジュールの注文を一括スケジュールするテスト"""
+        engine_result = {
+            "scheduled_order_ids": [1, 2],
+            "failed_orders": [{"order_id": 3, "reason": "工程が見つかりません"}],
+            "schedule_count": 4,
+            "tardiness": [
+                {
+                    "order_id": 1,
+                    "deadline_date": "2025-01-06",
+                    "completion_datetime": "2025-01-06T12:00:00+00:00",
+                    "tardiness_minutes": 0.0,
+                }
+            ],
+            "schedules": [{"order_id": 1}],
+        }
+
+        with patch(
+            "app.routers.transaction.production_schedules.schedule_orders",
+            return_value=engine_result,
+        ) as mock_schedule_orders:
+            response = client.post(
+                "/production-schedules/batch",
+                json={
+                    "start_time": "2025-01-06T09:00:00+00:00",
+                    "mode": "insertion",
+                    "policy": "least_loaded",
+                    "rule": "cr",
+                    "parallel": True,
+                    "setup_window": 20,
+                },
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        # スケジュール本体はレスポンスに含めない
+        assert response.json() == {
+            "scheduled_order_ids": [1, 2],
+            "failed_orders": [{"order_id": 3, "reason": "工程が見つかりません"}],
+            "schedule_count": 4,
+            "tardiness": engine_result["tardiness"],
+        }
+
+        kwargs = mock_schedule_orders.call_args.kwargs
+        assert kwargs["tenant_id"] == headers["x-tenant-id"]
+        assert kwargs["order_repo"] is mock_repos["order"]
+        assert kwargs["start_time"].isoformat() == "2025-01-06T09:00:00+00:00"
+        assert kwargs["mode"] == "insertion"
+        assert kwargs["policy"] == "least_loaded"
+        assert kwargs["rule"] == "cr"
+        assert kwargs["workers"] == 0
+        assert kwargs["setup_window"] == 20
+        assert kwargs["calendar"] is DEFAULT_CALENDAR
+
+    def test_schedule_batch_without_body(self, headers):
+        """POST /batch: リクエストボディ省略時は現在時刻を基準にする"""
+        with patch(
+            "app.routers.transaction.production_schedules.schedule_orders",
+            return_value={
+                "scheduled_order_ids": [],
+                "failed_orders": [],
+                "schedule_count": 0,
+                "tardiness": [],
+                "schedules": [],
+            },
+        ) as mock_schedule_orders:
+            response = client.post("/production-schedules/batch", headers=headers)
+
+        assert response.status_code == 200
+        assert mock_schedule_orders.call_args.kwargs["start_time"] is None
+        assert mock_schedule_orders.call_args.kwargs["mode"] == "append"
+        assert mock_schedule_orders.call_args.kwargs["policy"] == "earliest_start"
+        assert mock_schedule_orders.call_args.kwargs["rule"] == "fifo"
+        assert mock_schedule_orders.call_args.kwargs["workers"] == 1
+        assert mock_schedule_orders.call_args.kwargs["setup_window"] == 0
+
+    def test_enqueue_batch_job(self, headers, jobs):
+        """POST /batch/jobs: ジョブを登録してすぐに返し、結果を問い合わせられる"""
+        engine_result = {
+            "scheduled_order_ids": [1],
+            "failed_orders": [],
+            "schedule_count": 2,
+            "tardiness": [],
+            "schedules": [{"order_id": 1}, {"order_id": 1}],
+        }
+
+        with patch(
+            "app.routers.transaction.production_schedules.schedule_orders",
+            return_value=engine_result,
+        ) as mock_schedule_orders:
+            response = client.post(
+                "/production-schedules/batch/jobs",
+                json={"rule": "edd"},
+                headers=headers,
+            )
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+            jobs.shutdown()  # 登録したジョブの終了を待つ
+
+        response = client.get(f"/production-schedules/jobs/{job_id}", headers=headers)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["kind"] == "batch"
+        assert body["status"] == "succeeded"
+        assert body["result"] == {
+            "scheduled_order_ids": [1],
+            "failed_orders": [],
+            "schedule_count": 2,
+            "tardiness": [],
+        }
+        kwargs = mock_schedule_orders.call_args.kwargs
+        assert kwargs["rule"] == "edd"
+        assert kwargs["progress"] is not None
+
+    def test_enqueue_optimize_job(self, headers, jobs):
+        """POST /optimize/jobs: スケジュールの改善をジョブとして実行する"""
+        with patch(
+            "app.routers.transaction.production_schedules.optimize_schedules",
+            return_value={
+                "before": 10,
+                "after": 5,
+                "changed_schedules": [],
+                "applied": False,
+            },
+        ):
+            response = client.post(
+                "/production-schedules/optimize/jobs",
+                json={"time_limit_seconds": 1},
+                headers=headers,
+            )
+            jobs.shutdown()
+
+        assert response.status_code == 202
+        job = jobs.get(response.json()["id"], headers["x-tenant-id"])
+        assert job.kind == "optimize"
+        assert job.status == "succeeded"
+        assert job.result["after"] == 5
+
+    def test_get_job_of_other_tenant(self, headers, jobs):
+        """GET /jobs/{id}: 他のテナントのジョブは404"""
+        job = jobs.submit("other-tenant", "batch", lambda job: {})
+
+        response = client.get(f"/production-schedules/jobs/{job.id}", headers=headers)
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Job not found"
+
+    def test_schedule_single_order(self, headers, mock_repos):
+        """POST /: 注文を1件スケジュールし、スケジュール済みにするテスト"""
+        order_repo = mock_repos["async_order"]
+        order_repo.get_by_id = AsyncMock(
+            return_value={"id": 1, "product_id": 5, "quantity": 10}
+        )
+        order_repo.mark_as_scheduled = AsyncMock()
+
+        with patch(
+            "app.routers.transaction.production_schedules.schedule_order_async",
+            new=AsyncMock(return_value=[{"order_id": 1}, {"order_id": 1}]),
+        ) as mock_schedule_order:
+            response = client.post(
+                "/production-schedules/",
+                json={"order_id": 1, "policy": "earliest_finish"},
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "scheduled_order_ids": [1],
+            "failed_orders": [],
+            "schedule_count": 2,
+        }
+        kwargs = mock_schedule_order.call_args.kwargs
+        assert kwargs["product_id"] == 5
+        assert kwargs["quantity"] == 10
+        assert kwargs["tenant_id"] == headers["x-tenant-id"]
+        assert kwargs["product_repo"] is mock_repos["async_product"]
+        assert kwargs["mode"] == "append"
+        assert kwargs["policy"] == "earliest_finish"
+        assert kwargs["calendar"] is DEFAULT_CALENDAR
+        order_repo.mark_as_scheduled.assert_awaited_once_with(1)
+
+    def test_schedule_single_order_not_found(self, headers, mock_repos):
+        """POST /: 注文が存在しない場合は404"""
+        mock_repos["async_order"].get_by_id = AsyncMock(return_value=None)
+
+        response = client.post(
+            "/production-schedules/", json={"order_id": 99}, headers=headers
+        )
+
+        assert response.status_code == 404
+
+    def test_schedule_single_order_already_scheduled(self, headers, mock_repos):
+        """POST /: スケジュール済みの注文は409"""
+        mock_repos["async_order"].get_by_id = AsyncMock(
+            return_value={
+                "id": 1,
+                "product_id": 5,
+                "quantity": 10,
+                "is_scheduled": True,
+            }
+        )
+
+        response = client.post(
+            "/production-schedules/", json={"order_id": 1}, headers=headers
+        )
+
+        assert response.status_code == 409
+
+    def test_schedule_single_order_invalid_routings(self, headers, mock_repos):
+        """POST /: 工程や設備の不備でスケジュールできない場合は400"""
+        mock_repos["async_order"].get_by_id = AsyncMock(
+            return_value={"id": 1, "product_id": 5, "quantity": 10}
+        )
+        mock_repos["async_order"].mark_as_scheduled = AsyncMock()
+
+        with patch(
+            "app.routers.transaction.production_schedules.schedule_order_async",
+            new=AsyncMock(side_effect=ValueError("工程が見つかりません")),
+        ):
+            response = client.post(
+                "/production-schedules/", json={"order_id": 1}, headers=headers
+            )
+
+        assert response.status_code == 400
+        mock_repos["async_order"].mark_as_scheduled.assert_not_awaited()
+
+    def test_optimize_schedules(self, headers, mock_repos):
+        """POST /optimize: 保存済みのスケジュールを改善するテスト"""
+        engine_result = {
+            "objective": "total_tardiness",
+            "before": 600.0,
+            "after": 120.0,
+            "delta": -480.0,
+            "iterations": 1000,
+            "changed_schedules": [{"id": 1, "equipment_id": 2}],
+            "applied": True,
+        }
+
+        with patch(
+            "app.routers.transaction.production_schedules.optimize_schedules",
+            return_value=engine_result,
+        ) as mock_optimize:
+            response = client.post(
+                "/production-schedules/optimize",
+                json={
+                    "objective": "total_tardiness",
+                    "time_limit_seconds": 2,
+                    "parallel": True,
+                    "apply": True,
+                    "seed": 42,
+                },
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        assert response.json() == engine_result
+        kwargs = mock_optimize.call_args.kwargs
+        assert kwargs["objective"] == "total_tardiness"
+        assert kwargs["time_limit_seconds"] == 2
+        # 並行探索ではCPUのすべてのコアを使う
+        assert kwargs["workers"] == 0
+        assert kwargs["apply"] is True
+        assert kwargs["seed"] == 42
+        assert kwargs["calendar"] is DEFAULT_CALENDAR
+
+    def test_get_capacity(self, headers, mock_repos):
+        """GET /capacity: 期間を指定して負荷山積みを取得するテスト"""
+        engine_result = {
+            "start_datetime": "2025-01-06T09:00:00+00:00",
+            "end_datetime": "2025-01-13T09:00:00+00:00",
+            "order_count": 3,
+            "groups": [],
+        }
+
+        with patch(
+            "app.routers.transaction.production_schedules.check_capacity",
+            return_value=engine_result,
+        ) as mock_check:
+            response = client.get(
+                "/production-schedules/capacity",
+                params={"start_time": "2025-01-06T09:00:00+00:00", "horizon_days": 7},
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        assert response.json() == engine_result
+        kwargs = mock_check.call_args.kwargs
+        assert kwargs["horizon_days"] == 7
+        assert kwargs["order_repo"] is mock_repos["order"]
+        assert kwargs["calendar"] is DEFAULT_CALENDAR
+
+    def test_get_capacity_rejects_invalid_horizon(self, headers):
+        """GET /capacity: 期間が0日以下の場合は422"""
+        response = client.get(
+            "/production-schedules/capacity",
+            params={"horizon_days": 0},
+            headers=headers,
+        )
+
+        assert response.status_code == 422
+
+    def test_simulate_schedules(self, headers, mock_repos):
+        """POST /simulate: 仮の注文をDBに書き込まずに計画するテスト"""
+        engine_result = {
+            "results": [
+                {
+                    "index": 0,
+                    "schedules": [],
+                    "completion_datetime": "2025-01-07T10:00:00+00:00",
+                    "lead_time_minutes": 1500.0,
+                    "tardiness_minutes": 0.0,
+                }
+            ],
+            "failed_orders": [],
+        }
+
+        with patch(
+            "app.routers.transaction.production_schedules.simulate_orders",
+            return_value=engine_result,
+        ) as mock_simulate:
+            response = client.post(
+                "/production-schedules/simulate",
+                json={
+                    "orders": [
+                        {"product_id": 10, "quantity": 5, "deadline_date": "2025-01-08"}
+                    ],
+                    "cumulative": True,
+                },
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        assert response.json() == engine_result
+        kwargs = mock_simulate.call_args.kwargs
+        assert kwargs["orders"] == [
+            {"product_id": 10, "quantity": 5, "deadline_date": "2025-01-08"}
+        ]
+        assert kwargs["cumulative"] is True
+        assert kwargs["calendar"] is DEFAULT_CALENDAR
+        mock_repos["schedule"].create_many.assert_not_called()
+
+    def test_simulate_schedules_requires_orders(self, headers):
+        """POST /simulate: 注文が空の場合は422"""
+        response = client.post(
+            "/production-schedules/simulate", json={"orders": []}, headers=headers
+        )
+
+        assert response.status_code == 422
+
+    def test_optimize_schedules_rejects_invalid_time_limit(self, headers):
+        """POST /optimize: 探索時間が0以下の場合は422"""
+        response = client.post(
+            "/production-schedules/optimize",
+            json={"time_limit_seconds": 0},
+            headers=headers,
+        )
+
+        assert response.status_code == 422
@@ -1,6 +1,8 @@
 import uuid
 
 import pytest
+from app.utils.auth import clear_memberships
+from app.utils.master_data_cache import clear_master_data
 
 
 def pytest_addoption(parser):
@@ -30,3 +32,25 @@ def pytest_collection_modifyitems(config, items):
 def headers():
     """共通のヘッダーフィクスチャ"""
     return {"x-tenant-id": str(uuid.uuid4())}
+
+
+@pytest.fixture
+def anyio_backend():
+    """非同期テスト（@pytest.mark.anyio）は asyncio で実行する"""
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def clear_master_data_cache():
+    """テスト間でマスタデータのキャッシュが共有されないよう、テストごとに破棄する"""
+    clear_master_data()
+    yield
+    clear_master_data()
+
+
+@pytest.fixture(autouse=True)
+def clear_membership_cache():
+    """テスト間でテナント所属のキャッシュが共有されないよう、テストごとに破棄する"""
+    clear_memberships()
+    yield
+    clear_memberships()
@@ -0,0 +1,133 @@
+# __tests__/repositories/supabase/common/test_async_base_repo.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.repositories.supa_async.common import (
+    AsyncBaseRepository,
+    fetch_all_pages_async,
+    gather_with_limit,
+)
+from postgrest.exceptions import APIError
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestAsyncBaseRepository:
+    @pytest.fixture
+    def mock_client(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def base_repo(self, mock_client):
+        """汎用的なリポジトリとしてインスタンス化"""
+        return AsyncBaseRepository(mock_client, "test_table")
+
+    async def test_get_by_id(self, base_repo, mock_client):
+        """ID指定取得のテスト: 正しいチェーンでクエリが呼ばれるか"""
+        expected = {"id": 1, "name": "Test"}
+        query = mock_client.table.return_value.select.return_value.eq.return_value
+        query.maybe_single.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=expected)
+        )
+
+        result = await base_repo.get_by_id(1)
+
+        assert result == expected
+        mock_client.table.assert_called_with("test_table")
+        mock_client.table.return_value.select.return_value.eq.assert_called_with(
+            "id", 1
+        )
+
+    async def test_get_by_id_not_found(self, base_repo, mock_client):
+        """ID指定取得: 該当行がない場合はNoneを返す"""
+        query = mock_client.table.return_value.select.return_value.eq.return_value
+        query.maybe_single.return_value.execute = AsyncMock(return_value=None)
+
+        assert await base_repo.get_by_id(1) is None
+
+    async def test_create_many_chunks_and_returns_ids_in_order(
+        self, base_repo, mock_client
+    ):
+        """一括作成: チャンクを並行に送信し、IDを入力順に返す"""
+        rows = [{"name": f"item-{i}"} for i in range(5)]
+        mock_client.table.return_value.insert.return_value.execute = AsyncMock(
+            side_effect=[
+                MagicMock(data=[{"id": 10}, {"id": 11}]),
+                MagicMock(data=[{"id": 12}, {"id": 13}]),
+                MagicMock(data=[{"id": 14}]),
+            ]
+        )
+
+        result = await base_repo.create_many(rows, chunk_size=2)
+
+        assert result.succeeded
+        assert result.ids == [10, 11, 12, 13, 14]
+        inserted = [
+            c.args[0] for c in mock_client.table.return_value.insert.call_args_list
+        ]
+        assert inserted == [rows[0:2], rows[2:4], rows[4:5]]
+
+    async def test_create_many_reports_failed_chunk(self, base_repo, mock_client):
+        """一括作成: 失敗したチャンクを報告し、残りのチャンクは書き込みを続ける"""
+        rows = [{"name": f"item-{i}"} for i in range(4)]
+        mock_client.table.return_value.insert.return_value.execute = AsyncMock(
+            side_effect=[
+                APIError({"message": "duplicate key", "code": "23505"}),
+                MagicMock(data=[{"id": 12}, {"id": 13}]),
+            ]
+        )
+
+        result = await base_repo.create_many(rows, chunk_size=2)
+
+        assert not result.succeeded
+        assert result.ids == [None, None, 12, 13]
+        assert result.failed_indexes == [0, 1]
+        assert result.errors[0].message == "duplicate key"
+
+    async def test_delete_many(self, base_repo, mock_client):
+        """複数削除: in_()でまとめて削除し、削除件数を返す"""
+        query = mock_client.table.return_value.delete.return_value.in_.return_value
+        query.execute = AsyncMock(return_value=MagicMock(data=[{"id": 1}, {"id": 2}]))
+
+        assert await base_repo.delete_many([1, 2]) == 2
+        mock_client.table.return_value.delete.return_value.in_.assert_called_once_with(
+            "id", [1, 2]
+        )
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestAsyncHelpers:
+    async def test_fetch_all_pages_async(self):
+        """max_rowsを超える結果をrange指定で全件取得する"""
+        query = MagicMock()
+        query.range.return_value.execute = AsyncMock(
+            side_effect=[
+                MagicMock(data=[{"id": 1}, {"id": 2}]),
+                MagicMock(data=[{"id": 3}]),
+            ]
+        )
+
+        result = await fetch_all_pages_async(lambda: query, page_size=2)
+
+        assert result == [{"id": 1}, {"id": 2}, {"id": 3}]
+        assert [c.args for c in query.range.call_args_list] == [(0, 1), (2, 3)]
+
+    async def test_gather_with_limit_bounds_concurrency(self):
+        """同時実行数を上限以下に抑え、結果を入力順に返す"""
+        running = 0
+        peak = 0
+
+        async def task(value: int) -> int:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return value
+
+        result = await gather_with_limit((task(i) for i in range(10)), limit=3)
+
+        assert result == list(range(10))
+        assert peak == 3
@@ -1,8 +1,11 @@
 # __tests__/repositories/supabase/common/test_base_repo.py
 from unittest.mock import MagicMock
 
+import httpx
 import pytest
-from app.repositories.supa_infra.common import BaseRepository
+from app.repositories.supa_infra.common import BaseRepository, fetch_all_pages
+from postgrest import SyncPostgrestClient
+from postgrest.exceptions import APIError
 
 
 @pytest.mark.unit
@@ -70,28 +73,99 @@ class TestBaseRepository:
         # --- 検証 ---
         mock_client.table.return_value.update.assert_called_with(update_data)
 
-    def test_delete_success(self, base_repo, mock_client):
-        """削除成功時のテスト"""
+    @pytest.mark.parametrize(
+        ("deleted_rows", "expected"),
+        [([{"id": 1, "name": "Test"}], True), ([], False)],
+    )
+    def test_delete(self, deleted_rows, expected):
+        """削除: PostgREST が返却した削除済みの行の有無で成否を判定する"""
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=deleted_rows)
+
+        client = SyncPostgrestClient(
+            "http://supabase.test/rest/v1",
+            http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        )
 
-        # --- モックのセットアップ ---
-        mock_res = MagicMock()
-        mock_res.count = 1  # count=1 が返ってくる想定
-        (
-            mock_client.table.return_value.delete.return_value.eq.return_value.execute.return_value
-        ) = mock_res
+        assert BaseRepository(client, "test_table").delete(1) is expected
+        assert requests[0].method == "DELETE"
+        assert requests[0].url.params["id"] == "eq.1"
+
+    def test_create_many_chunks_and_returns_ids_in_order(self, base_repo, mock_client):
+        """一括作成: チャンクごとに複数行INSERTし、IDを入力順に返す"""
+        rows = [{"name": f"item-{i}"} for i in range(5)]
+        mock_client.table.return_value.insert.return_value.execute.side_effect = [
+            MagicMock(data=[{"id": 10}, {"id": 11}]),
+            MagicMock(data=[{"id": 12}, {"id": 13}]),
+            MagicMock(data=[{"id": 14}]),
+        ]
+
+        result = base_repo.create_many(rows, chunk_size=2)
+
+        assert result.succeeded
+        assert result.ids == [10, 11, 12, 13, 14]
+        # 3チャンクに分割して送信される
+        inserted = [
+            c.args[0] for c in mock_client.table.return_value.insert.call_args_list
+        ]
+        assert inserted == [rows[0:2], rows[2:4], rows[4:5]]
+
+    def test_create_many_reports_failed_chunk(self, base_repo, mock_client):
+        """一括作成: 失敗したチャンクを報告し、残りのチャンクは書き込みを続ける"""
+        rows = [{"name": f"item-{i}"} for i in range(4)]
+        mock_client.table.return_value.insert.return_value.execute.side_effect = [
+            APIError({"message": "duplicate key", "code": "23505"}),
+            MagicMock(data=[{"id": 12}, {"id": 13}]),
+        ]
+
+        result = base_repo.create_many(rows, chunk_size=2)
+
+        assert not result.succeeded
+        assert result.ids == [None, None, 12, 13]
+        assert result.failed_indexes == [0, 1]
+        assert result.errors[0].chunk_index == 0
+        assert result.errors[0].message == "duplicate key"
+
+    def test_upsert_many(self, base_repo, mock_client):
+        """一括作成・更新: on_conflictを指定してupsertする"""
+        rows = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+        mock_client.table.return_value.upsert.return_value.execute.return_value.data = (
+            rows
+        )
 
-        # --- 実行, 検証 ---
-        assert base_repo.delete(1) is True
+        result = base_repo.upsert_many(rows)
 
-    def test_delete_failure(self, base_repo, mock_client):
-        """存在しないID削除時のテスト"""
+        assert result.ids == [1, 2]
+        mock_client.table.return_value.upsert.assert_called_once_with(
+            rows, on_conflict="id"
+        )
 
-        # --- モックのセットアップ ---
-        mock_res = MagicMock()
-        mock_res.count = 0  # 削除数0
+    def test_delete_many(self, base_repo, mock_client):
+        """複数削除: in_()でまとめて削除し、削除件数を返す"""
         (
-            mock_client.table.return_value.delete.return_value.eq.return_value.execute.return_value
-        ) = mock_res
+            mock_client.table.return_value.delete.return_value.in_.return_value.execute.return_value.data
+        ) = [{"id": 1}, {"id": 2}]
+
+        assert base_repo.delete_many([1, 2]) == 2
+        mock_client.table.return_value.delete.return_value.in_.assert_called_once_with(
+            "id", [1, 2]
+        )
 
-        # --- 実行, 検証 ---
-        assert base_repo.delete(999) is False
+
+@pytest.mark.unit
+class TestFetchAllPages:
+    def test_fetch_all_pages(self):
+        """max_rowsを超える結果をrange指定で全件取得する"""
+        query = MagicMock()
+        query.range.return_value.execute.side_effect = [
+            MagicMock(data=[{"id": 1}, {"id": 2}]),
+            MagicMock(data=[{"id": 3}]),
+        ]
+
+        result = fetch_all_pages(lambda: query, page_size=2)
+
+        assert result == [{"id": 1}, {"id": 2}, {"id": 3}]
+        assert [c.args for c in query.range.call_args_list] == [(0, 1), (2, 3)]
@@ -0,0 +1,40 @@
+# __tests__/repositories/supabase/master/test_async_calendar_repo.py
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.repositories.supa_async.master import AsyncCalendarRepository
+from app.repositories.supa_infra import SupabaseTableName
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestAsyncCalendarRepository:
+    @pytest.fixture
+    def mock_client(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def repo(self, mock_client):
+        return AsyncCalendarRepository(mock_client)
+
+    async def test_get_holidays_filters_by_tenant(self, repo, mock_client):
+        """休日はテナントで絞り込み、日付順に取得する"""
+        query = mock_client.table.return_value.select.return_value.eq.return_value
+        query.order.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"id": 1}])
+        )
+
+        assert await repo.get_holidays("tenant-1") == [{"id": 1}]
+        mock_client.table.assert_called_with(SupabaseTableName.CALENDAR_HOLIDAYS.value)
+        mock_client.table.return_value.select.return_value.eq.assert_called_with(
+            "tenant_id", "tenant-1"
+        )
+        query.order.assert_called_with("holiday_date")
+
+    async def test_delete_shutdown_not_found(self, repo, mock_client):
+        """削除された行がない場合はFalse"""
+        query = mock_client.table.return_value.delete.return_value.eq.return_value
+        query.eq.return_value.execute = AsyncMock(return_value=MagicMock(data=[]))
+
+        assert await repo.delete_shutdown("tenant-1", 1) is False
+        query.eq.assert_called_with("tenant_id", "tenant-1")
@@ -0,0 +1,47 @@
+# __tests__/repositories/supabase/master/test_async_equipment_repo.py
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.repositories.supa_async.master import AsyncEquipmentRepository
+from app.repositories.supa_infra import SupabaseTableName
+from postgrest.exceptions import APIError
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestAsyncEquipmentRepository:
+    @pytest.fixture
+    def mock_client(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def repo(self, mock_client):
+        return AsyncEquipmentRepository(mock_client)
+
+    async def test_get_group_by_id_not_found(self, repo, mock_client):
+        """設備グループが見つからない場合はNoneを返す"""
+        query = mock_client.table.return_value.select.return_value.eq.return_value
+        query.maybe_single.return_value.execute = AsyncMock(return_value=None)
+
+        assert await repo.get_group_by_id(1) is None
+        mock_client.table.assert_called_with(SupabaseTableName.EQUIPMENT_GROUPS.value)
+
+    async def test_add_machine_to_group_duplicate(self, repo, mock_client):
+        """登録済みの設備を追加した場合はNoneを返す"""
+        mock_client.table.return_value.insert.return_value.execute = AsyncMock(
+            side_effect=APIError({"code": "23505", "message": "duplicate key"})
+        )
+
+        assert await repo.add_machine_to_group(1, 10) is None
+
+    @pytest.mark.parametrize("data, expected", [([{"id": 1}], True), ([], False)])
+    async def test_remove_machine_from_group(self, repo, mock_client, data, expected):
+        """削除された行が返却された場合に削除できたとみなす"""
+        query = mock_client.table.return_value.delete.return_value.eq.return_value
+        query.eq.return_value.execute = AsyncMock(return_value=MagicMock(data=data))
+
+        assert await repo.remove_machine_from_group(1, 10) is expected
+        mock_client.table.return_value.delete.return_value.eq.assert_called_with(
+            "equipment_group_id", 1
+        )
+        query.eq.assert_called_with("equipment_id", 10)
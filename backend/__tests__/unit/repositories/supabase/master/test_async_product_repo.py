@@ -0,0 +1,69 @@
+# __tests__/repositories/supabase/master/test_async_product_repo.py
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.repositories.supa_async.master import AsyncProductRepository
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestAsyncProductRepository:
+    @pytest.fixture
+    def mock_client(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def repo(self, mock_client):
+        return AsyncProductRepository(mock_client)
+
+    async def test_get_equipment_ids_by_groups(self, repo, mock_client):
+        """設備グループごとの設備IDを取得し、メンバーのいないグループは空にする"""
+        query = mock_client.table.return_value.select.return_value.in_.return_value
+        query.order.return_value.range.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[
+                    {"equipment_group_id": 100, "equipment_id": 1},
+                    {"equipment_group_id": 100, "equipment_id": 2},
+                ]
+            )
+        )
+
+        result = await repo.get_equipment_ids_by_groups({200, 100})
+
+        assert result == {100: [1, 2], 200: []}
+        mock_client.table.assert_called_with("equipment_group_members")
+        mock_client.table.return_value.select.return_value.in_.assert_called_once_with(
+            "equipment_group_id", [100, 200]
+        )
+
+    async def test_get_equipment_ids_by_groups_empty(self, repo, mock_client):
+        """設備グループが指定されない場合はクエリを発行しない"""
+        assert await repo.get_equipment_ids_by_groups([]) == {}
+        mock_client.table.assert_not_called()
+
+    async def test_get_routings_by_products(self, repo, mock_client):
+        """製品ごとに工程順序をまとめ、工程のない製品は空にする"""
+        query = mock_client.table.return_value.select.return_value.in_.return_value
+        ordered = query.order.return_value.order.return_value.order.return_value
+        ordered.range.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[
+                    {"id": 11, "product_id": 1, "sequence_order": 1},
+                    {"id": 12, "product_id": 1, "sequence_order": 2},
+                ]
+            )
+        )
+
+        result = await repo.get_routings_by_products([2, 1])
+
+        assert [r["id"] for r in result[1]] == [11, 12]
+        assert result[2] == []
+        mock_client.table.assert_called_with("process_routings")
+
+    @pytest.mark.parametrize("data, expected", [([{"id": 1}], True), ([], False)])
+    async def test_delete_routing(self, repo, mock_client, data, expected):
+        """削除された行が返却された場合に削除できたとみなす"""
+        query = mock_client.table.return_value.delete.return_value.eq.return_value
+        query.execute = AsyncMock(return_value=MagicMock(data=data))
+
+        assert await repo.delete_routing(1) is expected
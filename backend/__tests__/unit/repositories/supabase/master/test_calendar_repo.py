@@ -0,0 +1,53 @@
+# __tests__/repositories/supabase/master/test_calendar_repo.py
+from unittest.mock import MagicMock
+
+import pytest
+from app.repositories.supa_infra import CalendarRepository, SupabaseTableName
+
+
+@pytest.mark.unit
+class TestCalendarRepository:
+    @pytest.fixture
+    def mock_client(self):
+        """モッククライアント"""
+        return MagicMock()
+
+    @pytest.fixture
+    def calendar_repo(self, mock_client):
+        """カレンダーリポジトリとしてインスタンス化"""
+        return CalendarRepository(mock_client)
+
+    def test_initialization(self, calendar_repo):
+        """親クラスがシフトのテーブル名で初期化されたかチェック"""
+        assert calendar_repo.table_name == SupabaseTableName.CALENDAR_SHIFTS.value
+
+    def test_is_tenant_visible(self, calendar_repo, mock_client):
+        """RLS上参照できるテナントかどうかを tenants テーブルで判定する"""
+        mock_client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+            {"id": "tenant-1"}
+        ]
+        assert calendar_repo.is_tenant_visible("tenant-1") is True
+        mock_client.table.assert_called_with(SupabaseTableName.TENANTS.value)
+
+        mock_client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = []
+        assert calendar_repo.is_tenant_visible("tenant-2") is False
+
+    def test_get_holidays_filters_by_tenant(self, calendar_repo, mock_client):
+        """休日はテナントIDで明示的に絞り込んで取得する"""
+        expected = [{"id": 1, "holiday_date": "2025-01-01"}]
+        mock_client.table.return_value.select.return_value.eq.return_value.order.return_value.execute.return_value.data = expected
+
+        assert calendar_repo.get_holidays("tenant-1") == expected
+        mock_client.table.assert_called_with(SupabaseTableName.CALENDAR_HOLIDAYS.value)
+        mock_client.table.return_value.select.return_value.eq.assert_called_with(
+            "tenant_id", "tenant-1"
+        )
+
+    def test_delete_shutdown(self, calendar_repo, mock_client):
+        """工場停止期間の削除は削除された行の有無で成否を返す"""
+        delete_query = mock_client.table.return_value.delete.return_value.eq.return_value.eq.return_value
+        delete_query.execute.return_value.data = [{"id": 1}]
+        assert calendar_repo.delete_shutdown("tenant-1", 1) is True
+
+        delete_query.execute.return_value.data = []
+        assert calendar_repo.delete_shutdown("tenant-1", 2) is False
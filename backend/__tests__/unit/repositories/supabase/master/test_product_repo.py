@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 
 import pytest
 from app.repositories.supa_infra import ProductRepository, SupabaseTableName
+from app.repositories.supa_infra.common.base_repo import IN_FILTER_CHUNK_SIZE
 
 
 @pytest.mark.unit
@@ -45,6 +46,39 @@ class TestProductRepository:
         # ここで重要なのは「テーブル名がPROCESS_ROUTINGSになっていること」
         mock_client.table.assert_called_with(SupabaseTableName.PROCESS_ROUTINGS.value)
 
+    def test_get_routings_by_products(self, product_repo, mock_client):
+        """複数製品の工程を1回のクエリで取得し、製品IDごとにまとめる"""
+        (
+            mock_client.table.return_value.select.return_value.in_.return_value.order.return_value.order.return_value.order.return_value.range.return_value.execute.return_value.data
+        ) = [
+            {"id": 100, "product_id": 10, "sequence_order": 1},
+            {"id": 101, "product_id": 10, "sequence_order": 2},
+            {"id": 200, "product_id": 20, "sequence_order": 1},
+        ]
+
+        result = product_repo.get_routings_by_products([20, 10, 30])
+
+        assert [r["id"] for r in result[10]] == [100, 101]
+        assert [r["id"] for r in result[20]] == [200]
+        # 工程のない製品は空リストになる
+        assert result[30] == []
+        mock_client.table.return_value.select.return_value.in_.assert_called_with(
+            "product_id", [10, 20, 30]
+        )
+
+    def test_get_routings_by_products_chunks_ids(self, product_repo, mock_client):
+        """製品IDは in_() フィルタの上限ごとに分割して取得する"""
+        query = mock_client.table.return_value.select.return_value
+        (
+            query.in_.return_value.order.return_value.order.return_value.order.return_value.range.return_value.execute.return_value.data
+        ) = []
+
+        result = product_repo.get_routings_by_products(range(IN_FILTER_CHUNK_SIZE + 1))
+
+        assert len(result) == IN_FILTER_CHUNK_SIZE + 1
+        assert query.in_.call_count == 2
+        query.in_.assert_called_with("product_id", [IN_FILTER_CHUNK_SIZE])
+
     @pytest.mark.parametrize(
         "data, expected",
         [
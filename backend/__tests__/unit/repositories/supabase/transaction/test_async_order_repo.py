@@ -0,0 +1,45 @@
+# __tests__/repositories/supabase/transaction/test_async_order_repo.py
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.repositories.supa_async.transaction import AsyncOrderRepository
+from app.repositories.supa_infra.common.base_repo import IN_FILTER_CHUNK_SIZE
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestAsyncOrderRepository:
+    @pytest.fixture
+    def mock_client(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def repo(self, mock_client):
+        return AsyncOrderRepository(mock_client)
+
+    async def test_mark_many_as_scheduled_chunks_ids(self, repo, mock_client):
+        """IDを in_() フィルタの上限ごとに分割して更新する"""
+        update = mock_client.table.return_value.update.return_value
+        update.in_.return_value.execute = AsyncMock()
+
+        await repo.mark_many_as_scheduled(list(range(IN_FILTER_CHUNK_SIZE + 1)))
+
+        assert update.in_.call_count == 2
+        mock_client.table.return_value.update.assert_called_with({"is_scheduled": True})
+
+    async def test_get_deadlines(self, repo, mock_client):
+        """注文IDをキーとした納期日を返す"""
+        query = mock_client.table.return_value.select.return_value.in_.return_value
+        query.order.return_value.range.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[
+                    {"id": 1, "deadline_date": "2025-01-10"},
+                    {"id": 2, "deadline_date": None},
+                ]
+            )
+        )
+
+        assert await repo.get_deadlines([2, 1, 1]) == {1: "2025-01-10", 2: None}
+        mock_client.table.return_value.select.return_value.in_.assert_called_once_with(
+            "id", [1, 2]
+        )
@@ -0,0 +1,68 @@
+# __tests__/repositories/supabase/transaction/test_async_schedule_repo.py
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.repositories.supa_async.transaction import AsyncScheduleRepository
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestAsyncScheduleRepository:
+    @pytest.fixture
+    def mock_client(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def repo(self, mock_client):
+        return AsyncScheduleRepository(mock_client)
+
+    async def test_get_last_end_times(self, repo, mock_client):
+        """RPCの結果を設備IDごとの終了日時に変換する"""
+        mock_client.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[{"equipment_id": 1, "last_end_datetime": "2025-01-06T14:00:00Z"}]
+            )
+        )
+
+        result = await repo.get_last_end_times([2, 1])
+
+        assert result == {1: datetime(2025, 1, 6, 14, 0, tzinfo=UTC), 2: None}
+        mock_client.rpc.assert_called_once_with(
+            "get_equipment_last_end_times", {"_equipment_ids": [1, 2]}
+        )
+
+    async def test_get_downtime_intervals(self, repo, mock_client):
+        """設備停止期間を設備ごとにまとめて取得する"""
+        query = mock_client.table.return_value.select.return_value.in_.return_value.gt.return_value.order.return_value
+        query.range.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[
+                    {
+                        "id": 1,
+                        "equipment_id": 1,
+                        "start_datetime": "2025-01-06T10:00:00+00:00",
+                        "end_datetime": "2025-01-06T12:00:00+00:00",
+                    }
+                ]
+            )
+        )
+
+        since = datetime(2025, 1, 6, 9, 0, tzinfo=UTC)
+        result = await repo.get_downtime_intervals([1, 2], since)
+
+        assert result == {
+            1: [
+                (
+                    datetime(2025, 1, 6, 10, 0, tzinfo=UTC),
+                    datetime(2025, 1, 6, 12, 0, tzinfo=UTC),
+                )
+            ],
+            2: [],
+        }
+        mock_client.table.assert_called_with("equipment_downtimes")
+
+    async def test_get_last_end_times_empty(self, repo, mock_client):
+        """設備が指定されない場合はクエリを発行しない"""
+        assert await repo.get_last_end_times([]) == {}
+        mock_client.rpc.assert_not_called()
@@ -0,0 +1,126 @@
+# __tests__/repositories/supabase/transaction/test_schedule_repo.py
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import pytest
+from app.repositories.supa_infra import ScheduleRepository
+
+
+@pytest.mark.unit
+class TestScheduleRepository:
+    @pytest.fixture
+    def mock_client(self):
+        """モッククライアント"""
+        return MagicMock()
+
+    @pytest.fixture
+    def schedule_repo(self, mock_client):
+        """スケジュールリポジトリとしてインスタンス化"""
+        return ScheduleRepository(mock_client)
+
+    def test_get_last_end_times(self, schedule_repo, mock_client):
+        """複数設備の最終終了時刻を1回のRPCで取得する"""
+        mock_client.rpc.return_value.execute.return_value.data = [
+            {"equipment_id": 1, "last_end_datetime": "2025-01-06T14:00:00Z"},
+        ]
+
+        result = schedule_repo.get_last_end_times([2, 1, 1])
+
+        # 予定がない設備はNoneになる
+        assert result == {1: datetime(2025, 1, 6, 14, 0, tzinfo=UTC), 2: None}
+        # 重複を除いた設備IDで1回だけ呼び出される
+        mock_client.rpc.assert_called_once_with(
+            "get_equipment_last_end_times", {"_equipment_ids": [1, 2]}
+        )
+
+    def test_get_last_end_times_empty(self, schedule_repo, mock_client):
+        """設備IDが空の場合はクエリを発行しない"""
+        assert schedule_repo.get_last_end_times([]) == {}
+        mock_client.rpc.assert_not_called()
+
+    def test_get_timeline_page(self, schedule_repo, mock_client):
+        """期間と重なるスケジュールを (start_datetime, id) のキーセットで1ページ読み込む"""
+        query = MagicMock()
+        for method in ("select", "eq", "lt", "gt", "in_", "or_", "order", "limit"):
+            getattr(query, method).return_value = query
+        query.execute.return_value.data = [{"id": 1}]
+        mock_client.table.return_value = query
+        start = datetime(2025, 1, 6, tzinfo=UTC)
+        end = datetime(2025, 1, 13, tzinfo=UTC)
+
+        result = schedule_repo.get_timeline_page(
+            "tenant-1",
+            start,
+            end,
+            500,
+            equipment_ids=[2, 1],
+            after=("2025-01-06T10:00:00+00:00", 11),
+        )
+
+        assert result == [{"id": 1}]
+        query.lt.assert_called_once_with("start_datetime", end.isoformat())
+        query.gt.assert_called_once_with("end_datetime", start.isoformat())
+        query.in_.assert_called_once_with("equipment_id", [1, 2])
+        query.or_.assert_called_once_with(
+            'start_datetime.gt."2025-01-06T10:00:00+00:00",'
+            'and(start_datetime.eq."2025-01-06T10:00:00+00:00",id.gt.11)'
+        )
+        query.limit.assert_called_once_with(500)
+        # ガントチャートに必要な列だけを読み込む
+        assert "*" not in query.select.call_args[0][0]
+
+    def test_get_booked_intervals(self, schedule_repo, mock_client):
+        """指定時刻より後に終わる予約済み区間を設備ごとにまとめて取得する"""
+        (
+            mock_client.table.return_value.select.return_value.in_.return_value.gt.return_value.order.return_value.range.return_value.execute.return_value.data
+        ) = [
+            {
+                "id": 1,
+                "equipment_id": 1,
+                "start_datetime": "2025-01-06T09:00:00Z",
+                "end_datetime": "2025-01-06T10:00:00Z",
+            },
+        ]
+        since = datetime(2025, 1, 6, 0, 0, tzinfo=UTC)
+
+        result = schedule_repo.get_booked_intervals([1, 2], since)
+
+        assert result == {
+            1: [
+                (
+                    datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+                    datetime(2025, 1, 6, 10, 0, tzinfo=UTC),
+                )
+            ],
+            2: [],
+        }
+        mock_client.table.return_value.select.return_value.in_.return_value.gt.assert_called_with(
+            "end_datetime", since.isoformat()
+        )
+
+    def test_get_downtime_intervals(self, schedule_repo, mock_client):
+        """指定時刻より後に終わる設備停止期間を設備ごとにまとめて取得する"""
+        (
+            mock_client.table.return_value.select.return_value.in_.return_value.gt.return_value.order.return_value.range.return_value.execute.return_value.data
+        ) = [
+            {
+                "id": 1,
+                "equipment_id": 2,
+                "start_datetime": "2025-01-06T12:00:00Z",
+                "end_datetime": "2025-01-06T15:00:00Z",
+            },
+        ]
+        since = datetime(2025, 1, 6, 0, 0, tzinfo=UTC)
+
+        result = schedule_repo.get_downtime_intervals([1, 2], since)
+
+        assert result == {
+            1: [],
+            2: [
+                (
+                    datetime(2025, 1, 6, 12, 0, tzinfo=UTC),
+                    datetime(2025, 1, 6, 15, 0, tzinfo=UTC),
+                )
+            ],
+        }
+        mock_client.table.assert_called_with("equipment_downtimes")
@@ -0,0 +1,120 @@
+"""
+認証・テナントの依存関係の単体テスト
+"""
+
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.dependencies import (
+    get_async_supabase_client,
+    get_current_tenant_id,
+    get_supabase_client,
+    get_token_claims,
+)
+from app.utils.auth import TokenClaims
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+CLAIMS = TokenClaims(user_id="user-1", expires_at=time.time() + 3600)
+
+
+@pytest.mark.unit
+class TestGetTokenClaims:
+    """get_token_claims関数のテスト"""
+
+    def test_invalid_token_is_unauthorized(self) -> None:
+        """検証できないトークンは401"""
+        with pytest.raises(HTTPException) as exc_info:
+            get_token_claims("not-a-jwt")
+
+        assert exc_info.value.status_code == 401
+
+
+@pytest.mark.unit
+class TestGetCurrentTenantId:
+    """get_current_tenant_id関数のテスト"""
+
+    @pytest.fixture
+    def member_repo(self):
+        """MemberRepository をモックに差し替える"""
+        repo = MagicMock()
+        with (
+            patch("app.dependencies.MemberRepository", return_value=repo),
+            patch("app.dependencies.get_client"),
+        ):
+            yield repo
+
+    def test_member_tenant(self, member_repo) -> None:
+        """所属しているテナントのIDを返し、2回目以降は問い合わせない"""
+        tenant_id = str(uuid.uuid4())
+        member_repo.is_member.return_value = True
+
+        assert get_current_tenant_id(tenant_id, "token", CLAIMS) == tenant_id
+        assert get_current_tenant_id(tenant_id, "token", CLAIMS) == tenant_id
+        member_repo.is_member.assert_called_once_with("user-1", tenant_id)
+
+    def test_non_member_tenant_is_forbidden(self, member_repo) -> None:
+        """所属していないテナントは403"""
+        member_repo.is_member.return_value = False
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_tenant_id(str(uuid.uuid4()), "token", CLAIMS)
+
+        assert exc_info.value.status_code == 403
+
+    def test_malformed_tenant_is_forbidden_without_query(self, member_repo) -> None:
+        """UUIDでないテナントIDは問い合わせずに403"""
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_tenant_id("not-a-uuid", "token", CLAIMS)
+
+        assert exc_info.value.status_code == 403
+        member_repo.is_member.assert_not_called()
+
+
+@pytest.mark.unit
+class TestSupabaseClientDependencies:
+    """get_supabase_client / get_async_supabase_client のテスト"""
+
+    @pytest.fixture
+    def client(self):
+        """Supabaseクライアントに依存するルートだけを持つアプリ"""
+        app = FastAPI()
+
+        @app.get("/sync")
+        def sync_route(client=Depends(get_supabase_client)):
+            return {}
+
+        @app.get("/async")
+        async def async_route(client=Depends(get_async_supabase_client)):
+            return {}
+
+        return TestClient(app)
+
+    @pytest.mark.parametrize("path", ["/sync", "/async"])
+    def test_invalid_token_is_unauthorized(self, client, path) -> None:
+        """検証できないトークンでは、クライアントを作らずに401を返す"""
+        with (
+            patch("app.dependencies.get_client") as get_client,
+            patch("app.dependencies.get_async_client") as get_async_client,
+        ):
+            response = client.get(path, headers={"Authorization": "Bearer not-a-jwt"})
+
+        assert response.status_code == 401
+        get_client.assert_not_called()
+        get_async_client.assert_not_called()
+
+    @pytest.mark.parametrize("path", ["/sync", "/async"])
+    def test_verified_token_gets_client(self, client, path) -> None:
+        """検証できたトークンのクライアントを返す"""
+        with (
+            patch("app.dependencies.verify_token", return_value=CLAIMS),
+            patch("app.dependencies.get_client") as get_client,
+            patch("app.dependencies.get_async_client") as get_async_client,
+        ):
+            response = client.get(path, headers={"Authorization": "Bearer token"})
+
+        assert response.status_code == 200
+        called = get_client if path == "/sync" else get_async_client
+        called.assert_called_once_with("token")
@@ -3,10 +3,32 @@
 """
 
 from datetime import UTC, datetime
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from app.scheduler_logic import schedule_order
+from app.repositories.supa_infra.common import BulkChunkError, BulkWriteResult
+from app.repositories.supa_infra.common.base_repo import IN_FILTER_CHUNK_SIZE
+from app.scheduler_logic import (
+    _get_equipment_ids_by_groups,
+    _PlanningContext,
+    apply_schedule_changes,
+    optimize_schedules,
+    promise_orders,
+    reschedule_order,
+    schedule_order,
+    schedule_order_async,
+    schedule_orders,
+    simulate_orders,
+)
+from app.utils.availability_cache import clear_machine_availability
+from app.utils.machine_availability import MachineAvailability
+from app.utils.setup_times import SetupTimes
+from app.utils.workload import build_operation_table
+
+
+def _setup_routing(method: int) -> dict:
+    """段取り方法と段取り時間（10分）だけを持つ工程"""
+    return {"setup_method_id": method, "setup_time_seconds": 600}
 
 
 @pytest.mark.unit
@@ -32,20 +54,16 @@ class TestScheduleOrder:
         mock_product_repo.get_routings_by_product.return_value = routings
 
         # 設備グループに属する設備
-        mock_product_repo.client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
-            {"equipment_id": 1},
-            {"equipment_id": 2},
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1},
+            {"equipment_group_id": 100, "equipment_id": 2},
         ]
 
-        # 設備の最終終了時刻（設備1は空き、設備2は使用中）
-        def get_last_end_time_side_effect(equipment_id: int):
-            if equipment_id == 1:
-                return None  # 空き
-            elif equipment_id == 2:
-                return datetime(2025, 1, 6, 14, 0, tzinfo=UTC)  # 月曜日 14:00に終了予定
-
-        mock_schedule_repo.get_last_end_time.side_effect = get_last_end_time_side_effect
-        mock_schedule_repo.create.return_value = None
+        # 設備の最終終了時刻（設備1は空き、設備2は月曜日 14:00に終了予定）
+        mock_schedule_repo.get_last_end_times.return_value = {
+            1: None,
+            2: datetime(2025, 1, 6, 14, 0, tzinfo=UTC),
+        }
 
         # テスト実行
         result = schedule_order(
@@ -61,7 +79,38 @@ class TestScheduleOrder:
         assert len(result) == 1
         assert result[0]["order_id"] == 1
         assert result[0]["equipment_id"] in [1, 2]  # どちらかの設備が選ばれる
-        mock_schedule_repo.create.assert_called_once()
+        mock_schedule_repo.create_many.assert_called_once()
+
+    def test_repeated_schedule_reuses_master_data(self) -> None:
+        """同じ製品を繰り返しスケジュールする場合、工程順序と設備グループを読み直さない"""
+        mock_product_repo = MagicMock()
+        mock_schedule_repo = MagicMock()
+        mock_product_repo.get_routings_by_product.return_value = [
+            {
+                "id": 1,
+                "equipment_group_id": 100,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 60,
+                "sequence_order": 1,
+            }
+        ]
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1},
+        ]
+        mock_schedule_repo.get_last_end_times.return_value = {1: None}
+
+        for order_id in (1, 2, 3):
+            schedule_order(
+                order_id=order_id,
+                product_id=1,
+                quantity=1,
+                product_repo=mock_product_repo,
+                schedule_repo=mock_schedule_repo,
+                tenant_id="test-tenant-id",
+            )
+
+        mock_product_repo.get_routings_by_product.assert_called_once_with(1)
+        mock_product_repo.client.table.assert_called_once()
 
     def test_schedule_multi_process_product(self) -> None:
         """複数工程の製品をスケジュールする"""
@@ -96,18 +145,14 @@ class TestScheduleOrder:
         mock_product_repo.get_routings_by_product.return_value = routings
 
         # 各設備グループに1台ずつ設備がある
-        def table_mock_side_effect(*args, **kwargs):
-            table_mock = MagicMock()
-            table_mock.select.return_value.eq.return_value.execute.return_value.data = [
-                {"equipment_id": 1}
-            ]
-            return table_mock
-
-        mock_product_repo.client.table.side_effect = table_mock_side_effect
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1},
+            {"equipment_group_id": 200, "equipment_id": 2},
+            {"equipment_group_id": 300, "equipment_id": 3},
+        ]
 
         # すべての設備が空き
-        mock_schedule_repo.get_last_end_time.return_value = None
-        mock_schedule_repo.create.return_value = None
+        mock_schedule_repo.get_last_end_times.return_value = {1: None, 2: None, 3: None}
 
         # テスト実行
         result = schedule_order(
@@ -124,7 +169,8 @@ class TestScheduleOrder:
         assert result[0]["process_routing_id"] == 1
         assert result[1]["process_routing_id"] == 2
         assert result[2]["process_routing_id"] == 3
-        assert mock_schedule_repo.create.call_count == 3
+        # 全工程が1回の一括INSERTで保存される
+        mock_schedule_repo.create_many.assert_called_once_with(result)
 
         # 各工程の開始時刻が前工程の終了時刻以降であることを確認
         for i in range(1, len(result)):
@@ -150,27 +196,21 @@ class TestScheduleOrder:
         mock_product_repo.get_routings_by_product.return_value = routings
 
         # 設備グループに2台の設備
-        mock_product_repo.client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
-            {"equipment_id": 1},
-            {"equipment_id": 2},
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1},
+            {"equipment_group_id": 100, "equipment_id": 2},
         ]
 
         # 設備1は遠い未来まで使用中、設備2は近い未来まで使用中
         # 設備2の方が早く開始できるべき
         now = datetime.now(tz=UTC)
 
-        def get_last_end_time_side_effect(equipment_id: int):
-            if equipment_id == 1:
-                return now.replace(
-                    hour=16, minute=0, second=0, microsecond=0
-                )  # 今日の16:00まで使用中
-            elif equipment_id == 2:
-                return now.replace(
-                    hour=10, minute=0, second=0, microsecond=0
-                )  # 今日の10:00まで使用中（より早く空く）
-
-        mock_schedule_repo.get_last_end_time.side_effect = get_last_end_time_side_effect
-        mock_schedule_repo.create.return_value = None
+        mock_schedule_repo.get_last_end_times.return_value = {
+            # 今日の16:00まで使用中
+            1: now.replace(hour=16, minute=0, second=0, microsecond=0),
+            # 今日の10:00まで使用中（より早く空く）
+            2: now.replace(hour=10, minute=0, second=0, microsecond=0),
+        }
 
         # テスト実行（数量1個 = 60分）
         result = schedule_order(
@@ -188,6 +228,141 @@ class TestScheduleOrder:
         assert len(result) == 1
         assert result[0]["order_id"] == 3
 
+    def test_schedule_insertion_mode_fills_gap(self) -> None:
+        """挿入モードでは、既存の予約の間に残った空き時間帯に作業を割り当てる"""
+        mock_product_repo = MagicMock()
+        mock_schedule_repo = MagicMock()
+
+        mock_product_repo.get_routings_by_product.return_value = [
+            {
+                "id": 1,
+                "equipment_group_id": 100,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 3600,  # 60分/個
+                "sequence_order": 1,
+            }
+        ]
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
+        ]
+        # 月曜日 9:00-10:00 と 12:00-17:00 が予約済み（10:00-12:00 が空いている）
+        mock_schedule_repo.get_booked_intervals.return_value = {
+            1: [
+                (
+                    datetime(2025, 1, 6, 12, 0, tzinfo=UTC),
+                    datetime(2025, 1, 6, 17, 0, tzinfo=UTC),
+                ),
+                (
+                    datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+                    datetime(2025, 1, 6, 10, 0, tzinfo=UTC),
+                ),
+            ]
+        }
+
+        result = schedule_order(
+            order_id=9,
+            product_id=9,
+            quantity=1,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+            mode="insertion",
+        )
+
+        # 最終終了時刻（17:00）の後ろではなく、10:00-12:00 の空き時間帯に入る
+        assert result[0]["start_datetime"] == "2025-01-06T10:00:00+00:00"
+        assert result[0]["end_datetime"] == "2025-01-06T11:00:00+00:00"
+        mock_schedule_repo.get_last_end_times.assert_not_called()
+
+    @pytest.mark.parametrize("mode", ["append", "insertion"])
+    def test_schedule_avoids_equipment_downtime(self, mode) -> None:
+        """設備停止期間と重なる時間帯には作業を割り当てない"""
+        mock_product_repo = MagicMock()
+        mock_schedule_repo = MagicMock()
+
+        mock_product_repo.get_routings_by_product.return_value = [
+            {
+                "id": 1,
+                "equipment_group_id": 100,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 3600,  # 60分/個
+                "sequence_order": 1,
+            }
+        ]
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
+        ]
+        mock_schedule_repo.get_last_end_times.return_value = {1: None}
+        mock_schedule_repo.get_booked_intervals.return_value = {1: []}
+        # 月曜日 9:30-12:00 は保全のため停止
+        mock_schedule_repo.get_downtime_intervals.return_value = {
+            1: [
+                (
+                    datetime(2025, 1, 6, 9, 30, tzinfo=UTC),
+                    datetime(2025, 1, 6, 12, 0, tzinfo=UTC),
+                )
+            ]
+        }
+
+        result = schedule_order(
+            order_id=9,
+            product_id=9,
+            quantity=2,  # 120分
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+            mode=mode,
+        )
+
+        # 停止期間の終了後から開始する
+        assert result[0]["start_datetime"] == "2025-01-06T12:00:00+00:00"
+        assert result[0]["end_datetime"] == "2025-01-06T14:00:00+00:00"
+        mock_schedule_repo.get_downtime_intervals.assert_called_once()
+
+    def test_schedule_rolls_back_on_write_failure(self) -> None:
+        """一括INSERTが一部失敗した場合、保存済みの工程を取り消して例外を投げる"""
+        mock_product_repo = MagicMock()
+        mock_schedule_repo = MagicMock()
+
+        mock_product_repo.get_routings_by_product.return_value = [
+            {
+                "id": 1,
+                "equipment_group_id": 100,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 600,
+                "sequence_order": 1,
+            },
+            {
+                "id": 2,
+                "equipment_group_id": 100,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 600,
+                "sequence_order": 2,
+            },
+        ]
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
+        ]
+        mock_schedule_repo.get_last_end_times.return_value = {1: None}
+        mock_schedule_repo.create_many.return_value = BulkWriteResult(
+            ids=[501, None],
+            errors=[BulkChunkError(chunk_index=1, start=1, size=1, message="boom")],
+        )
+
+        with pytest.raises(RuntimeError, match="スケジュール保存に失敗しました"):
+            schedule_order(
+                order_id=8,
+                product_id=8,
+                quantity=1,
+                product_repo=mock_product_repo,
+                schedule_repo=mock_schedule_repo,
+                tenant_id="test-tenant-id",
+            )
+
+        mock_schedule_repo.delete_many.assert_called_once_with([501])
+
     def test_schedule_with_no_routings(self) -> None:
         """工程が存在しない場合、ValueErrorを投げる"""
         mock_product_repo = MagicMock()
@@ -222,7 +397,7 @@ class TestScheduleOrder:
         mock_product_repo.get_routings_by_product.return_value = routings
 
         # 設備グループに設備が存在しない
-        mock_product_repo.client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = []
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = []
 
         with pytest.raises(ValueError, match="設備が見つかりません"):
             schedule_order(
@@ -246,21 +421,21 @@ class TestScheduleOrder:
                 "setup_time_seconds": 0,
                 "unit_time_seconds": 7200,  # 120分/個 = 2時間
                 "sequence_order": 1,
+                "allow_split": False,  # 作業を分割しない
             }
         ]
         mock_product_repo.get_routings_by_product.return_value = routings
 
-        mock_product_repo.client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
-            {"equipment_id": 1}
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
         ]
 
         # 設備の最終終了時刻を今日の 16:00 に設定
         # 2時間の作業を開始すると18:00になるため、翌営業日9:00にスケジュールされるべき
         now = datetime.now(tz=UTC)
-        mock_schedule_repo.get_last_end_time.return_value = now.replace(
-            hour=16, minute=0, second=0, microsecond=0
-        )
-        mock_schedule_repo.create.return_value = None
+        mock_schedule_repo.get_last_end_times.return_value = {
+            1: now.replace(hour=16, minute=0, second=0, microsecond=0)
+        }
 
         result = schedule_order(
             order_id=6,
@@ -278,3 +453,1019 @@ class TestScheduleOrder:
         # 16:00から2時間作業は17:00を超えるため、翌営業日に延期される
         # 土日の場合は月曜日、金曜日の場合も月曜日になる
         assert start_dt > now.replace(hour=16, minute=0, second=0, microsecond=0)
+
+    def test_schedule_splits_operation_across_working_periods(self) -> None:
+        """分割可能な工程は終業時刻をまたいで翌営業日に続き、8時間を超えても計画できる"""
+        mock_product_repo = MagicMock()
+        mock_schedule_repo = MagicMock()
+
+        mock_product_repo.get_routings_by_product.return_value = [
+            {
+                "id": 1,
+                "equipment_group_id": 100,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 3600,  # 60分/個
+                "sequence_order": 1,
+                "allow_split": True,
+            }
+        ]
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
+        ]
+        # 設備は金曜日 16:00 に空く
+        mock_schedule_repo.get_last_end_times.return_value = {
+            1: datetime(2025, 1, 10, 16, 0, tzinfo=UTC)
+        }
+
+        result = schedule_order(
+            order_id=8,
+            product_id=8,
+            quantity=10,  # 10時間 = 1日の稼働時間（8時間）を超える
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 10, 9, 0, tzinfo=UTC),
+        )
+
+        # 金曜日 16:00 から開始し、1時間 + 月曜日 8時間 + 火曜日 1時間で終わる
+        assert result[0]["start_datetime"] == "2025-01-10T16:00:00+00:00"
+        assert result[0]["end_datetime"] == "2025-01-14T10:00:00+00:00"
+
+    def test_schedule_fetches_availability_once(self) -> None:
+        """設備の最終終了時刻は工程数・設備数に関わらず1回だけ取得する"""
+        mock_product_repo = MagicMock()
+        mock_schedule_repo = MagicMock()
+
+        # 2工程とも同じ設備グループ（設備1台）を使用する
+        routings = [
+            {
+                "id": 1,
+                "equipment_group_id": 100,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 1800,  # 30分/個
+                "sequence_order": 1,
+            },
+            {
+                "id": 2,
+                "equipment_group_id": 100,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 1800,  # 30分/個
+                "sequence_order": 2,
+            },
+        ]
+        mock_product_repo.get_routings_by_product.return_value = routings
+        mock_product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
+        ]
+        mock_schedule_repo.get_last_end_times.return_value = {1: None}
+
+        result = schedule_order(
+            order_id=7,
+            product_id=7,
+            quantity=1,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),  # 月曜日 9:00
+        )
+
+        # 検証：最終終了時刻の取得は1回のみ、設備単位の取得は行わない
+        mock_schedule_repo.get_last_end_times.assert_called_once()
+        mock_schedule_repo.get_last_end_time.assert_not_called()
+
+        # 2工程目はスナップショット上で更新された設備の空き時刻から開始する
+        assert result[0]["start_datetime"] == "2025-01-06T09:00:00+00:00"
+        assert result[1]["start_datetime"] == "2025-01-06T09:30:00+00:00"
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestScheduleOrderAsync:
+    """schedule_order_async関数のテスト"""
+
+    @pytest.fixture
+    def mock_product_repo(self):
+        repo = MagicMock()
+        repo.get_routings_by_product = AsyncMock(
+            return_value=[
+                {
+                    "id": 1,
+                    "equipment_group_id": 100,
+                    "setup_time_seconds": 0,
+                    "unit_time_seconds": 600,  # 10分/個
+                    "sequence_order": 1,
+                },
+                {
+                    "id": 2,
+                    "equipment_group_id": 200,
+                    "setup_time_seconds": 0,
+                    "unit_time_seconds": 600,
+                    "sequence_order": 2,
+                },
+            ]
+        )
+        repo.get_equipment_ids_by_groups = AsyncMock(return_value={100: [1], 200: [2]})
+        return repo
+
+    @pytest.fixture
+    def mock_schedule_repo(self):
+        repo = MagicMock()
+        repo.get_last_end_times = AsyncMock(return_value={1: None, 2: None})
+        repo.get_booked_intervals = AsyncMock(return_value={1: [], 2: []})
+        repo.get_downtime_intervals = AsyncMock(return_value={1: [], 2: []})
+        repo.create_many = AsyncMock(return_value=BulkWriteResult(ids=[10, 11]))
+        repo.delete_many = AsyncMock()
+        return repo
+
+    async def test_schedule_matches_sync_result(
+        self, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """同期版と同じ形式のスケジュールを作成し、1回の一括INSERTで保存する"""
+        start = datetime(2025, 1, 6, 9, 0, tzinfo=UTC)
+
+        result = await schedule_order_async(
+            order_id=1,
+            product_id=1,
+            quantity=6,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=start,
+        )
+
+        assert [(s["equipment_id"], s["start_datetime"]) for s in result] == [
+            (1, "2025-01-06T09:00:00+00:00"),
+            (2, "2025-01-06T10:00:00+00:00"),
+        ]
+        mock_product_repo.get_equipment_ids_by_groups.assert_awaited_once_with(
+            {100, 200}
+        )
+        mock_schedule_repo.get_last_end_times.assert_awaited_once_with({1, 2})
+        mock_schedule_repo.get_downtime_intervals.assert_awaited_once_with(
+            {1, 2}, start
+        )
+        mock_schedule_repo.create_many.assert_awaited_once_with(result)
+
+    async def test_schedule_insertion_mode_loads_timelines(
+        self, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """insertionモードでは予約済み区間と設備停止期間を読み込む"""
+        start = datetime(2025, 1, 6, 9, 0, tzinfo=UTC)
+        mock_schedule_repo.get_booked_intervals.return_value = {
+            1: [
+                (
+                    datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+                    datetime(2025, 1, 6, 10, 0, tzinfo=UTC),
+                )
+            ],
+            2: [],
+        }
+
+        result = await schedule_order_async(
+            order_id=1,
+            product_id=1,
+            quantity=6,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=start,
+            mode="insertion",
+        )
+
+        assert result[0]["start_datetime"] == "2025-01-06T10:00:00+00:00"
+        mock_schedule_repo.get_last_end_times.assert_not_awaited()
+
+    async def test_schedule_rolls_back_on_write_failure(
+        self, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """保存に一部失敗した場合は保存済みの工程を取り消して例外を送出する"""
+        mock_schedule_repo.create_many.return_value = BulkWriteResult(
+            ids=[10, None],
+            errors=[BulkChunkError(chunk_index=1, start=1, size=1, message="timeout")],
+        )
+
+        with pytest.raises(RuntimeError, match="timeout"):
+            await schedule_order_async(
+                order_id=1,
+                product_id=1,
+                quantity=6,
+                product_repo=mock_product_repo,
+                schedule_repo=mock_schedule_repo,
+                tenant_id="test-tenant-id",
+            )
+
+        mock_schedule_repo.delete_many.assert_awaited_once_with([10])
+
+
+@pytest.mark.unit
+class TestScheduleOrders:
+    """schedule_orders関数のテスト"""
+
+    @pytest.fixture
+    def mock_order_repo(self):
+        """未スケジュールの注文を返す注文リポジトリのモック"""
+        mock = MagicMock()
+        mock.get_unscheduled.return_value = [
+            {"id": 1, "product_id": 10, "quantity": 1},
+            {"id": 2, "product_id": 10, "quantity": 1},
+            {"id": 3, "product_id": 99, "quantity": 1},  # 工程が存在しない製品
+        ]
+        return mock
+
+    @pytest.fixture
+    def mock_product_repo(self):
+        """工程と設備グループメンバーを返す製品リポジトリのモック"""
+        mock = MagicMock()
+        mock.get_routings_by_products.return_value = {
+            10: [
+                {
+                    "id": 1,
+                    "equipment_group_id": 100,
+                    "setup_time_seconds": 0,
+                    "unit_time_seconds": 3600,  # 60分/個
+                    "sequence_order": 1,
+                }
+            ],
+            99: [],
+        }
+        mock.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
+        ]
+        return mock
+
+    @pytest.fixture
+    def mock_schedule_repo(self):
+        """すべての設備が空いているスケジュールリポジトリのモック"""
+        mock = MagicMock()
+        mock.get_last_end_times.return_value = {1: None}
+        mock.create_many.side_effect = lambda rows: BulkWriteResult(
+            ids=list(range(1, len(rows) + 1))
+        )
+        return mock
+
+    def test_schedule_backlog_in_memory(
+        self, mock_order_repo, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """全注文を1つのタイムラインで計画し、まとめて保存する"""
+        result = schedule_orders(
+            order_repo=mock_order_repo,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),  # 月曜日 9:00
+        )
+
+        # 工程のない注文は失敗として報告され、他の注文は計画される
+        assert result["scheduled_order_ids"] == [1, 2]
+        assert result["failed_orders"][0]["order_id"] == 3
+        assert result["schedule_count"] == 2
+
+        # 同じ設備を使うため、2件目は1件目の終了後に開始する
+        schedules = result["schedules"]
+        assert schedules[0]["start_datetime"] == "2025-01-06T09:00:00+00:00"
+        assert schedules[1]["start_datetime"] == "2025-01-06T10:00:00+00:00"
+
+        # 読み込み・書き込みはそれぞれ一括で1回ずつ
+        mock_product_repo.get_routings_by_products.assert_called_once()
+        mock_schedule_repo.get_last_end_times.assert_called_once()
+        mock_schedule_repo.create_many.assert_called_once_with(schedules)
+        mock_schedule_repo.create.assert_not_called()
+        mock_order_repo.mark_many_as_scheduled.assert_called_once_with([1, 2])
+
+    def test_parallel_components_match_sequential(self) -> None:
+        """設備を共有しない注文のまとまりを別プロセスで計画しても、結果は同じになる"""
+        order_repo = MagicMock()
+        order_repo.get_unscheduled.return_value = [
+            {"id": i, "product_id": 10 + i % 2, "quantity": 1 + i % 3}
+            for i in range(1, 9)
+        ]
+        product_repo = MagicMock()
+        product_repo.get_routings_by_products.return_value = {
+            10 + line: [
+                {
+                    "id": line * 10 + step,
+                    "equipment_group_id": line * 100 + step,
+                    "setup_time_seconds": 600,
+                    "unit_time_seconds": 1800,
+                    "sequence_order": step,
+                }
+                for step in (1, 2)
+            ]
+            for line in (0, 1)
+        }
+        # 製品10は設備1・2、製品11は設備3・4だけを使う
+        product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 1, "equipment_id": 1},
+            {"equipment_group_id": 2, "equipment_id": 2},
+            {"equipment_group_id": 101, "equipment_id": 3},
+            {"equipment_group_id": 102, "equipment_id": 4},
+        ]
+        progress = MagicMock()
+
+        results = []
+        for workers in (1, 2):
+            schedule_repo = MagicMock()
+            schedule_repo.get_last_end_times.return_value = dict.fromkeys(range(1, 5))
+            schedule_repo.get_downtime_intervals.return_value = {}
+            schedule_repo.create_many.side_effect = lambda rows: BulkWriteResult(
+                ids=list(range(1, len(rows) + 1))
+            )
+            results.append(
+                schedule_orders(
+                    order_repo=order_repo,
+                    product_repo=product_repo,
+                    schedule_repo=schedule_repo,
+                    tenant_id="test-tenant-id",
+                    start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+                    workers=workers,
+                    progress=progress,
+                )
+            )
+
+        sequential, parallel = results
+        assert parallel["schedules"] == sequential["schedules"]
+        assert parallel["scheduled_order_ids"] == list(range(1, 9))
+        progress.assert_called_with(8, 8)
+
+    def test_component_context_holds_only_its_machines(self) -> None:
+        """別プロセスに渡す入力は、成分の製品の工程と、その設備の空き状況だけを持つ"""
+        start = datetime(2025, 1, 6, 9, 0, tzinfo=UTC)
+        routings_by_product = {
+            10: [{"id": 1, "equipment_group_id": 100, "unit_time_seconds": 60}],
+            11: [{"id": 2, "equipment_group_id": 101, "unit_time_seconds": 60}],
+        }
+        orders = [
+            {"id": 1, "product_id": 10, "quantity": 1},
+            {"id": 2, "product_id": 11, "quantity": 2},
+        ]
+        context = _PlanningContext(
+            routings_by_product,
+            {100: [1, 2], 101: [3]},
+            build_operation_table(orders, routings_by_product),
+            MachineAvailability(dict.fromkeys([1, 2, 3], start)),
+            SetupTimes({1: 5, 3: 6}),
+            "earliest_start",
+            "test-tenant-id",
+            start,
+        )
+
+        component = context.for_component([orders[1]])
+
+        assert component.routings_by_product == {11: routings_by_product[11]}
+        assert component.machine_ids_by_group == {101: [3]}
+        assert component.operations.minutes_for(2) == [2.0]
+        assert [component.bookings.start_lower_bound(m) for m in (1, 2, 3)] == [
+            None,
+            None,
+            start,
+        ]
+        # 成分の設備（3）の段取り方法だけが残る
+        assert component.setups.setup_minutes(3, _setup_routing(6)) == 0.0
+        assert component.setups.setup_minutes(1, _setup_routing(5)) == 10.0
+
+    @pytest.mark.parametrize(
+        ("setup_window", "expected"),
+        [
+            # 段取り方法が1→2→1と切り替わるため、2件目・3件目に段取り（60分）が入る
+            (0, [(1, "09:00", "10:00"), (2, "10:00", "12:00"), (3, "12:00", "14:00")]),
+            # 段取り方法1の注文をまとめるため、段取り替えは1回だけになる
+            (2, [(1, "09:00", "10:00"), (3, "10:00", "11:00"), (2, "11:00", "13:00")]),
+        ],
+    )
+    def test_schedule_skips_setup_for_same_setup_method(
+        self, mock_schedule_repo, setup_window, expected
+    ) -> None:
+        """直前の作業と段取り方法が同じ工程は段取りを省き、setup_window で同じ段取りをまとめる"""
+        order_repo = MagicMock()
+        order_repo.get_unscheduled.return_value = [
+            {"id": 1, "product_id": 10, "quantity": 1},
+            {"id": 2, "product_id": 11, "quantity": 1},
+            {"id": 3, "product_id": 10, "quantity": 1},
+        ]
+        product_repo = MagicMock()
+        product_repo.get_routings_by_products.return_value = {
+            product_id: [
+                {
+                    "id": product_id,
+                    "equipment_group_id": 100,
+                    "setup_time_seconds": 3600,
+                    "unit_time_seconds": 3600,
+                    "sequence_order": 1,
+                    "setup_method_id": method,
+                }
+            ]
+            for product_id, method in ((10, 1), (11, 2))
+        }
+        product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
+        ]
+        product_repo.get_setup_changeovers.return_value = {}
+        # 設備1の最後の作業は段取り方法1
+        mock_schedule_repo.get_last_setup_methods.return_value = {1: 1}
+
+        result = schedule_orders(
+            order_repo=order_repo,
+            product_repo=product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+            setup_window=setup_window,
+        )
+
+        assert [
+            (s["order_id"], s["start_datetime"][11:16], s["end_datetime"][11:16])
+            for s in result["schedules"]
+        ] == expected
+        product_repo.get_setup_changeovers.assert_called_once_with("test-tenant-id")
+
+    def test_schedule_backlog_by_due_date(
+        self, mock_order_repo, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """EDDルールでは納期の早い注文から割り当て、納期遅れを報告する"""
+        # 600分の作業を稼働時間の区切りで分割できるようにする
+        mock_product_repo.get_routings_by_products.return_value[10][0][
+            "allow_split"
+        ] = True
+        mock_order_repo.get_unscheduled.return_value = [
+            {"id": 1, "product_id": 10, "quantity": 1, "deadline_date": "2025-01-10"},
+            # 600分の作業のため、翌日 11:00 に完了して納期（1/6の終わり）を過ぎる
+            {"id": 2, "product_id": 10, "quantity": 10, "deadline_date": "2025-01-06"},
+            {"id": 3, "product_id": 10, "quantity": 1, "deadline_date": None},
+        ]
+
+        result = schedule_orders(
+            order_repo=mock_order_repo,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),  # 月曜日 9:00
+            rule="edd",
+        )
+
+        # 納期順（納期のない注文は最後）に割り当てる
+        assert [s["order_id"] for s in result["schedules"]] == [2, 1, 3]
+        assert result["scheduled_order_ids"] == [2, 1, 3]
+        assert result["tardiness"] == [
+            {
+                "order_id": 2,
+                "deadline_date": "2025-01-06",
+                "completion_datetime": "2025-01-07T11:00:00+00:00",
+                "tardiness_minutes": 660.0,
+            },
+            {
+                "order_id": 1,
+                "deadline_date": "2025-01-10",
+                "completion_datetime": "2025-01-07T12:00:00+00:00",
+                "tardiness_minutes": 0.0,
+            },
+        ]
+
+    def test_schedule_backlog_partial_write_failure(
+        self, mock_order_repo, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """一括INSERTが失敗した注文は取り消され、スケジュール済みにしない"""
+        mock_schedule_repo.create_many.side_effect = None
+        mock_schedule_repo.create_many.return_value = BulkWriteResult(
+            ids=[501, None],
+            errors=[BulkChunkError(chunk_index=1, start=1, size=1, message="boom")],
+        )
+
+        result = schedule_orders(
+            order_repo=mock_order_repo,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+        )
+
+        assert result["scheduled_order_ids"] == [1]
+        assert {f["order_id"] for f in result["failed_orders"]} == {2, 3}
+        assert result["schedule_count"] == 1
+        mock_order_repo.mark_many_as_scheduled.assert_called_once_with([1])
+
+    def test_schedule_backlog_reports_oversize_operation(
+        self, mock_order_repo, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """分割しない工程が稼働時間に収まらない注文だけを失敗にし、他の注文は保存する"""
+        mock_product_repo.get_routings_by_products.return_value[10][0][
+            "allow_split"
+        ] = False
+        mock_order_repo.get_unscheduled.return_value = [
+            {"id": 1, "product_id": 10, "quantity": 1},
+            # 540分の作業は1日の稼働時間（8時間）に収まらない
+            {"id": 2, "product_id": 10, "quantity": 9},
+            {"id": 3, "product_id": 10, "quantity": 1},
+        ]
+
+        result = schedule_orders(
+            order_repo=mock_order_repo,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+        )
+
+        assert result["scheduled_order_ids"] == [1, 3]
+        assert [f["order_id"] for f in result["failed_orders"]] == [2]
+        assert "1回の稼働時間" in result["failed_orders"][0]["reason"]
+        mock_order_repo.mark_many_as_scheduled.assert_called_once_with([1, 3])
+
+    def test_schedule_backlog_continues_after_planning_failure(
+        self, mock_order_repo, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """計画中に稼働区間に収まらなくなった注文も失敗として報告し、残りの注文は計画する"""
+        mock_product_repo.get_routings_by_products.return_value = {
+            10: [
+                {
+                    "id": 1,
+                    "equipment_group_id": 100,
+                    "setup_time_seconds": 0,
+                    "unit_time_seconds": 3600,
+                    "sequence_order": 1,
+                    "setup_method_id": 1,
+                    "allow_split": False,
+                }
+            ]
+        }
+        # 設備1の最後の作業は段取り方法2で、段取り替えに60分かかる
+        mock_schedule_repo.get_last_setup_methods.return_value = {1: 2}
+        mock_product_repo.get_setup_changeovers.return_value = {(2, 1): 3600}
+        mock_order_repo.get_unscheduled.return_value = [
+            # 480分の作業に段取り替えの60分が加わり、1日の稼働時間に収まらない
+            {"id": 1, "product_id": 10, "quantity": 8},
+            {"id": 2, "product_id": 10, "quantity": 1},
+        ]
+
+        result = schedule_orders(
+            order_repo=mock_order_repo,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+        )
+
+        assert result["scheduled_order_ids"] == [2]
+        assert [f["order_id"] for f in result["failed_orders"]] == [1]
+        mock_schedule_repo.create_many.assert_called_once()
+        mock_order_repo.mark_many_as_scheduled.assert_called_once_with([2])
+
+    def test_group_members_are_read_in_chunks(self, mock_product_repo) -> None:
+        """設備グループIDは in_() フィルタの上限ごとに分割して読み込む"""
+        query = mock_product_repo.client.table.return_value.select.return_value
+
+        result = _get_equipment_ids_by_groups(
+            mock_product_repo, range(IN_FILTER_CHUNK_SIZE + 1)
+        )
+
+        assert len(result) == IN_FILTER_CHUNK_SIZE + 1
+        assert query.in_.call_count == 2
+        query.in_.assert_called_with("equipment_group_id", [IN_FILTER_CHUNK_SIZE])
+
+    def test_schedule_empty_backlog(
+        self, mock_order_repo, mock_product_repo, mock_schedule_repo
+    ) -> None:
+        """未スケジュールの注文がない場合は何も保存しない"""
+        mock_order_repo.get_unscheduled.return_value = []
+
+        result = schedule_orders(
+            order_repo=mock_order_repo,
+            product_repo=mock_product_repo,
+            schedule_repo=mock_schedule_repo,
+            tenant_id="test-tenant-id",
+        )
+
+        assert result["scheduled_order_ids"] == []
+        mock_schedule_repo.create_many.assert_not_called()
+        mock_order_repo.mark_many_as_scheduled.assert_not_called()
+
+
+@pytest.mark.unit
+class TestSimulateOrders:
+    """simulate_orders関数のテスト"""
+
+    @pytest.fixture
+    def repos(self):
+        """設備1が月曜日 10:00 まで埋まっている製品10のモック"""
+        product_repo = MagicMock()
+        product_repo.get_routings_by_products.return_value = {
+            10: [
+                {
+                    "id": 1,
+                    "equipment_group_id": 100,
+                    "setup_time_seconds": 0,
+                    "unit_time_seconds": 3600,  # 60分/個
+                    "sequence_order": 1,
+                }
+            ],
+        }
+        product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1}
+        ]
+        schedule_repo = MagicMock()
+        schedule_repo.get_last_end_times.return_value = {
+            1: datetime(2025, 1, 6, 10, 0, tzinfo=UTC)
+        }
+        schedule_repo.get_downtime_intervals.return_value = {}
+        return product_repo, schedule_repo
+
+    @pytest.mark.parametrize(
+        ("cumulative", "second_end"),
+        [(False, "2025-01-06T12:00:00+00:00"), (True, "2025-01-06T14:00:00+00:00")],
+    )
+    def test_simulate_without_writes(self, repos, cumulative, second_end) -> None:
+        """1回の読み込みで複数の注文を計画し、DBには書き込まない"""
+        product_repo, schedule_repo = repos
+        orders = [
+            {"product_id": 10, "quantity": 2, "deadline_date": None},
+            {"product_id": 10, "quantity": 2, "deadline_date": None},
+            {"product_id": 99, "quantity": 1, "deadline_date": None},
+        ]
+
+        result = simulate_orders(
+            orders,
+            product_repo,
+            schedule_repo,
+            "test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+            cumulative=cumulative,
+        )
+
+        first, second = result["results"]
+        assert first["completion_datetime"] == "2025-01-06T12:00:00+00:00"
+        assert first["lead_time_minutes"] == 180
+        # 個別の場合は2件目も同じ空き状況から、積み上げる場合は1件目の後ろに計画する
+        assert second["completion_datetime"] == second_end
+        assert first["schedules"][0]["order_id"] is None
+        assert result["failed_orders"][0]["index"] == 2
+
+        product_repo.get_routings_by_products.assert_called_once()
+        schedule_repo.get_last_end_times.assert_called_once()
+        schedule_repo.create_many.assert_not_called()
+        schedule_repo.upsert_many.assert_not_called()
+
+    def test_simulate_reports_tardiness(self, repos) -> None:
+        """納期を指定した注文は、納期遅れ（分）を計算する"""
+        product_repo, schedule_repo = repos
+        schedule_repo.get_booked_intervals.return_value = {}
+
+        result = simulate_orders(
+            [
+                {"product_id": 10, "quantity": 8, "deadline_date": "2025-01-05"},
+                {"product_id": 10, "quantity": 1, "deadline_date": "2025-01-06"},
+            ],
+            product_repo,
+            schedule_repo,
+            "test-tenant-id",
+            mode="insertion",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+        )
+
+        late, on_time = result["results"]
+        # 8時間の作業は 17:00 に終わり、納期（1/5 の終わり = 1/6 0:00）から17時間遅れる
+        assert late["completion_datetime"] == "2025-01-06T17:00:00+00:00"
+        assert late["tardiness_minutes"] == 17 * 60
+        assert on_time["tardiness_minutes"] == 0
+
+    def test_simulate_reports_oversize_operation(self, repos) -> None:
+        """分割しない工程が1回の稼働時間に収まらない注文は、失敗として報告する"""
+        product_repo, schedule_repo = repos
+
+        result = simulate_orders(
+            [
+                {"product_id": 10, "quantity": 9, "deadline_date": None},
+                {"product_id": 10, "quantity": 1, "deadline_date": None},
+            ],
+            product_repo,
+            schedule_repo,
+            "test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+            cumulative=True,
+        )
+
+        assert [r["index"] for r in result["results"]] == [1]
+        assert result["failed_orders"][0]["index"] == 0
+        assert "1回の稼働時間" in result["failed_orders"][0]["reason"]
+
+
+@pytest.mark.unit
+class TestPromiseOrders:
+    """promise_orders関数のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """テストごとに設備空き状況のキャッシュを空にする"""
+        clear_machine_availability()
+        yield
+        clear_machine_availability()
+
+    @pytest.fixture
+    def repos(self):
+        """設備1が月曜日 12:00 まで埋まっていて、設備2が空いている製品10のモック"""
+        product_repo = MagicMock()
+        product_repo.get_routings_by_products.return_value = {
+            10: [
+                {
+                    "id": 1,
+                    "equipment_group_id": 100,
+                    "setup_time_seconds": 0,
+                    "unit_time_seconds": 3600,  # 60分/個
+                    "sequence_order": 1,
+                }
+            ],
+        }
+        product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1},
+            {"equipment_group_id": 100, "equipment_id": 2},
+        ]
+        schedule_repo = MagicMock()
+        schedule_repo.get_last_end_times.return_value = {
+            1: datetime(2025, 1, 6, 12, 0, tzinfo=UTC),
+            2: None,
+        }
+        schedule_repo.get_downtime_intervals.return_value = {}
+        return product_repo, schedule_repo
+
+    def test_promise_stacks_lines(self, repos) -> None:
+        """明細を順に積み上げ、最も早く終了できる設備で完了日時を回答する"""
+        product_repo, schedule_repo = repos
+        lines = [
+            {"product_id": 10, "quantity": 2},
+            {"product_id": 10, "quantity": 1},
+            {"product_id": 99, "quantity": 1},
+        ]
+
+        result = promise_orders(
+            lines,
+            product_repo,
+            schedule_repo,
+            "test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+        )
+
+        first, second = result["lines"]
+        # 1件目は空いている設備2で 11:00 に完了し、2件目は設備2の後ろで 12:00 に完了する
+        # （設備1では 13:00 になる）
+        assert first["equipment_ids"] == [2]
+        assert first["completion_datetime"] == "2025-01-06T11:00:00+00:00"
+        assert second["equipment_ids"] == [2]
+        assert second["completion_datetime"] == "2025-01-06T12:00:00+00:00"
+        assert result["completion_datetime"] == "2025-01-06T12:00:00+00:00"
+        assert result["failed_lines"][0]["index"] == 2
+        schedule_repo.create_many.assert_not_called()
+
+    def test_promise_uses_cached_availability(self, repos) -> None:
+        """2回目以降は設備の空き状況を読み直さず、前回の回答の割り当ても残らない"""
+        product_repo, schedule_repo = repos
+        lines = [{"product_id": 10, "quantity": 2}]
+        start = datetime(2025, 1, 6, 9, 0, tzinfo=UTC)
+
+        first = promise_orders(
+            lines, product_repo, schedule_repo, "test-tenant-id", start
+        )
+        second = promise_orders(
+            lines, product_repo, schedule_repo, "test-tenant-id", start
+        )
+
+        assert first == second
+        schedule_repo.get_last_end_times.assert_called_once()
+
+    def test_promise_reports_oversize_line(self, repos) -> None:
+        """分割しない工程が1回の稼働時間に収まらない明細は、失敗として報告する"""
+        product_repo, schedule_repo = repos
+
+        result = promise_orders(
+            [{"product_id": 10, "quantity": 9}, {"product_id": 10, "quantity": 1}],
+            product_repo,
+            schedule_repo,
+            "test-tenant-id",
+            start_time=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+        )
+
+        assert [line["index"] for line in result["lines"]] == [1]
+        assert result["failed_lines"][0]["index"] == 0
+
+
+@pytest.mark.unit
+class TestOptimizeSchedules:
+    """optimize_schedules関数のテスト"""
+
+    @pytest.fixture
+    def repos(self):
+        """設備1に2件の作業が偏っているスケジュールを返すモック"""
+        order_repo = MagicMock()
+        order_repo.get_deadlines.return_value = {1: "2025-01-06", 2: None}
+
+        product_repo = MagicMock()
+        product_repo.get_routings_by_ids.return_value = {
+            10: {"id": 10, "equipment_group_id": 100, "sequence_order": 1}
+        }
+        product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1},
+            {"equipment_group_id": 100, "equipment_id": 2},
+        ]
+
+        schedule_repo = MagicMock()
+        schedule_repo.get_tenant_schedules.return_value = [
+            {
+                "id": 501,
+                "tenant_id": "test-tenant-id",
+                "order_id": 1,
+                "process_routing_id": 10,
+                "equipment_id": 1,
+                "start_datetime": "2025-01-06T09:00:00+00:00",
+                "end_datetime": "2025-01-06T12:00:00+00:00",
+            },
+            {
+                "id": 502,
+                "tenant_id": "test-tenant-id",
+                "order_id": 2,
+                "process_routing_id": 10,
+                "equipment_id": 1,
+                "start_datetime": "2025-01-06T12:00:00+00:00",
+                "end_datetime": "2025-01-06T15:00:00+00:00",
+            },
+        ]
+        schedule_repo.get_downtime_intervals.return_value = {}
+        schedule_repo.upsert_many.return_value = BulkWriteResult(ids=[502])
+        return order_repo, product_repo, schedule_repo
+
+    def test_optimize_moves_operation_to_idle_machine(self, repos) -> None:
+        """空いている設備に作業を移して makespan を短縮し、変更を保存する"""
+        order_repo, product_repo, schedule_repo = repos
+
+        result = optimize_schedules(
+            order_repo=order_repo,
+            product_repo=product_repo,
+            schedule_repo=schedule_repo,
+            tenant_id="test-tenant-id",
+            time_limit_seconds=0.3,
+            since=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+            apply=True,
+            seed=0,
+        )
+
+        assert result["before"] == 360
+        assert result["after"] == 180
+        assert result["delta"] == -180
+        assert result["applied"] is True
+        changed = result["changed_schedules"]
+        assert len(changed) == 1
+        assert changed[0]["start_datetime"] == "2025-01-06T09:00:00+00:00"
+        assert changed[0]["tenant_id"] == "test-tenant-id"
+        schedule_repo.upsert_many.assert_called_once_with(changed)
+        schedule_repo.get_tenant_schedules.assert_called_once_with(
+            "test-tenant-id", datetime(2025, 1, 6, 9, 0, tzinfo=UTC)
+        )
+
+    def test_optimize_keeps_running_operations(self, repos) -> None:
+        """実行中の作業は動かさず、改善できない場合は何も保存しない"""
+        order_repo, product_repo, schedule_repo = repos
+
+        result = optimize_schedules(
+            order_repo=order_repo,
+            product_repo=product_repo,
+            schedule_repo=schedule_repo,
+            tenant_id="test-tenant-id",
+            objective="total_tardiness",
+            time_limit_seconds=0.2,
+            # 両方の作業が実行中
+            since=datetime(2025, 1, 6, 12, 30, tzinfo=UTC),
+            apply=True,
+        )
+
+        assert result["changed_schedules"] == []
+        assert result["delta"] == 0
+        assert result["applied"] is False
+        schedule_repo.upsert_many.assert_not_called()
+
+
+@pytest.mark.unit
+class TestRescheduleOrder:
+    """reschedule_order / apply_schedule_changes 関数のテスト"""
+
+    @pytest.fixture
+    def repos(self):
+        """設備1で注文1の後ろに注文2が並び、注文2には設備2の後工程があるモック"""
+        product_repo = MagicMock()
+        product_repo.get_routings_by_ids.return_value = {
+            10: {
+                "id": 10,
+                "equipment_group_id": 100,
+                "sequence_order": 1,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 600,
+            },
+            20: {
+                "id": 20,
+                "equipment_group_id": 200,
+                "sequence_order": 2,
+                "setup_time_seconds": 0,
+                "unit_time_seconds": 600,
+            },
+        }
+        product_repo.client.table.return_value.select.return_value.in_.return_value.order.return_value.range.return_value.execute.return_value.data = [
+            {"equipment_group_id": 100, "equipment_id": 1},
+            {"equipment_group_id": 200, "equipment_id": 2},
+        ]
+
+        def row(schedule_id, order_id, routing_id, equipment_id, start, end):
+            return {
+                "id": schedule_id,
+                "tenant_id": "test-tenant-id",
+                "order_id": order_id,
+                "process_routing_id": routing_id,
+                "equipment_id": equipment_id,
+                "start_datetime": f"2025-01-06T{start}:00+00:00",
+                "end_datetime": f"2025-01-06T{end}:00+00:00",
+            }
+
+        schedule_repo = MagicMock()
+        schedule_repo.get_tenant_schedules.return_value = [
+            row(501, 1, 10, 1, "09:00", "10:00"),
+            row(502, 2, 10, 1, "10:00", "11:00"),
+            row(503, 2, 20, 2, "11:00", "12:00"),
+            # 注文1・2とつながりのない作業
+            row(504, 3, 20, 2, "09:00", "10:00"),
+        ]
+        schedule_repo.get_downtime_intervals.return_value = {}
+        schedule_repo.upsert_many.return_value = BulkWriteResult(ids=[502, 503])
+        return product_repo, schedule_repo
+
+    def test_remove_shifts_following_schedules_left(self, repos) -> None:
+        """注文を取り除くと、後続のスケジュールだけが前に詰まる"""
+        product_repo, schedule_repo = repos
+
+        changes = reschedule_order(
+            product_repo,
+            schedule_repo,
+            "test-tenant-id",
+            order_id=1,
+            remove=True,
+            since=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+        )
+
+        assert changes["removed_schedule_ids"] == [501]
+        updated = {row["id"]: row for row in changes["updated_schedules"]}
+        assert set(updated) == {502, 503}
+        assert updated[502]["start_datetime"] == "2025-01-06T09:00:00+00:00"
+        assert updated[503]["start_datetime"] == "2025-01-06T10:00:00+00:00"
+
+    def test_quantity_change_shifts_following_schedules_right(self, repos) -> None:
+        """数量を増やすと、その注文の工程と後続のスケジュールが後ろにずれる"""
+        product_repo, schedule_repo = repos
+
+        changes = reschedule_order(
+            product_repo,
+            schedule_repo,
+            "test-tenant-id",
+            order_id=1,
+            quantity=12,  # 120分
+            since=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+        )
+
+        assert changes["removed_schedule_ids"] == []
+        updated = {row["id"]: row for row in changes["updated_schedules"]}
+        assert set(updated) == {501, 502, 503}
+        assert updated[501]["end_datetime"] == "2025-01-06T11:00:00+00:00"
+        assert updated[503]["end_datetime"] == "2025-01-06T13:00:00+00:00"
+
+    def test_unscheduled_order_changes_nothing(self, repos) -> None:
+        """スケジュールのない注文では何も変えず、工程も読み込まない"""
+        product_repo, schedule_repo = repos
+
+        changes = reschedule_order(
+            product_repo,
+            schedule_repo,
+            "test-tenant-id",
+            order_id=99,
+            remove=True,
+            since=datetime(2025, 1, 6, 9, 0, tzinfo=UTC),
+        )
+
+        assert changes == {"removed_schedule_ids": [], "updated_schedules": []}
+        product_repo.get_routings_by_ids.assert_not_called()
+
+    def test_apply_writes_only_changed_rows(self, repos) -> None:
+        """取り除くスケジュールを削除し、変わった行だけを保存する"""
+        _, schedule_repo = repos
+        updated = [{"id": 502}, {"id": 503}]
+
+        apply_schedule_changes(
+            schedule_repo,
+            {"removed_schedule_ids": [501], "updated_schedules": updated},
+        )
+
+        schedule_repo.delete_many.assert_called_once_with([501])
+        schedule_repo.upsert_many.assert_called_once_with(updated)
+
+    def test_apply_raises_on_failure(self, repos) -> None:
+        """保存に失敗した場合は RuntimeError を送出する"""
+        _, schedule_repo = repos
+        result = BulkWriteResult()
+        result.record_failure(0, 0, 1, "boom")
+        schedule_repo.upsert_many.return_value = result
+
+        with pytest.raises(RuntimeError, match="boom"):
+            apply_schedule_changes(
+                schedule_repo,
+                {"removed_schedule_ids": [], "updated_schedules": [{"id": 502}]},
+            )
@@ -0,0 +1,128 @@
+"""
+JWTの検証とテナント所属キャッシュの単体テスト
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pytest
+from app.utils.auth import TokenClaims, resolve_membership, verify_token
+from cryptography.hazmat.primitives.asymmetric import ec
+
+SECRET = "test-jwt-secret-with-at-least-32-bytes"
+USER_ID = "9b2f6a3e-1c0d-4e57-8a5b-2f7d1c3e4a6b"
+TENANT_ID = "4d1c2b3a-5e6f-4a7b-8c9d-0e1f2a3b4c5d"
+
+
+def make_token(key=SECRET, algorithm="HS256", **overrides) -> str:
+    """ログインユーザーのアクセストークンを作成する"""
+    payload = {
+        "sub": USER_ID,
+        "aud": "authenticated",
+        "role": "authenticated",
+        "exp": int(time.time()) + 3600,
+        **overrides,
+    }
+    return jwt.encode(payload, key, algorithm=algorithm)
+
+
+@pytest.mark.unit
+class TestVerifyToken:
+    """verify_token関数のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def settings(self, monkeypatch):
+        """JWT シークレットと Supabase の URL を設定する"""
+        monkeypatch.setenv("SUPABASE_JWT_SECRET", SECRET)
+        monkeypatch.setenv("SUPABASE_URL", "http://supabase.test")
+
+    def test_valid_hs256_token(self) -> None:
+        """JWT シークレットで署名されたトークンのクレームを返す"""
+        claims = verify_token(make_token())
+
+        assert claims.user_id == USER_ID
+        assert claims.role == "authenticated"
+        assert claims.expires_at > time.time()
+
+    @pytest.mark.parametrize(
+        "token",
+        [
+            make_token(key="another-secret-with-at-least-32-bytes"),
+            make_token(exp=int(time.time()) - 60),
+            make_token(aud="anon"),
+        ],
+        ids=["wrong-secret", "expired", "wrong-audience"],
+    )
+    def test_invalid_token(self, token) -> None:
+        """署名・有効期限・aud が不正なトークンは拒否する"""
+        with pytest.raises(jwt.PyJWTError):
+            verify_token(token)
+
+    def test_hs256_rejected_without_secret(self, monkeypatch) -> None:
+        """JWT シークレットが設定されていない場合、HS256 のトークンは拒否する"""
+        monkeypatch.delenv("SUPABASE_JWT_SECRET")
+
+        with pytest.raises(jwt.InvalidAlgorithmError):
+            verify_token(make_token())
+
+    def test_asymmetric_token_uses_jwks(self) -> None:
+        """ES256 のトークンは JWKS の公開鍵で検証する"""
+        private_key = ec.generate_private_key(ec.SECP256R1())
+        jwks_client = MagicMock()
+        jwks_client.get_signing_key_from_jwt.return_value = SimpleNamespace(
+            key=private_key.public_key()
+        )
+        token = make_token(key=private_key, algorithm="ES256")
+
+        with patch("app.utils.auth._jwks_client", return_value=jwks_client):
+            claims = verify_token(token)
+
+        assert claims.user_id == USER_ID
+        jwks_client.get_signing_key_from_jwt.assert_called_once_with(token)
+
+
+@pytest.mark.unit
+class TestResolveMembership:
+    """resolve_membership関数のテスト（キャッシュは conftest でテストごとに破棄する）"""
+
+    @pytest.fixture
+    def claims(self):
+        """1時間後に期限切れになるトークンのクレーム"""
+        return TokenClaims(user_id=USER_ID, expires_at=time.time() + 3600)
+
+    def test_member_cached_until_expiry(self, claims) -> None:
+        """所属している場合は、2回目以降は問い合わせない"""
+        loader = MagicMock(return_value=True)
+
+        assert resolve_membership(claims, TENANT_ID, loader)
+        assert resolve_membership(claims, TENANT_ID, loader)
+        loader.assert_called_once()
+
+    def test_non_member_not_cached(self, claims) -> None:
+        """所属していない場合はキャッシュせず、次のリクエストで問い合わせ直す"""
+        loader = MagicMock(side_effect=[False, True])
+
+        assert not resolve_membership(claims, TENANT_ID, loader)
+        assert resolve_membership(claims, TENANT_ID, loader)
+        assert loader.call_count == 2
+
+    def test_expired_entry_is_reloaded(self) -> None:
+        """トークンの有効期限を過ぎた確認結果は使わない"""
+        expired = TokenClaims(user_id=USER_ID, expires_at=time.time() - 1)
+        loader = MagicMock(return_value=True)
+
+        resolve_membership(expired, TENANT_ID, loader)
+        resolve_membership(expired, TENANT_ID, loader)
+
+        assert loader.call_count == 2
+
+    def test_cache_key_includes_tenant(self, claims) -> None:
+        """別のテナントは別に問い合わせる"""
+        loader = MagicMock(return_value=True)
+
+        resolve_membership(claims, TENANT_ID, loader)
+        resolve_membership(claims, "another-tenant", loader)
+
+        assert loader.call_count == 2
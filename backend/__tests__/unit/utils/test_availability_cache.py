@@ -0,0 +1,94 @@
+"""
+設備空き状況スナップショットキャッシュの単体テスト
+"""
+
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import pytest
+from app.utils import availability_cache
+from app.utils.availability_cache import (
+    clear_machine_availability,
+    invalidate_machine_availability,
+    load_machine_availability,
+)
+from app.utils.calendar import DEFAULT_CALENDAR, WorkCalendar
+
+# 月曜日
+MONDAY_10 = datetime(2025, 1, 6, 10, 0, tzinfo=UTC)
+
+
+@pytest.mark.unit
+class TestLoadMachineAvailability:
+    """load_machine_availability関数のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """テストごとにキャッシュを空にする"""
+        clear_machine_availability()
+        yield
+        clear_machine_availability()
+
+    @pytest.fixture
+    def mock_repo(self):
+        """設備1が月曜日 10:00 まで埋まっているスケジュールリポジトリのモック"""
+        repo = MagicMock()
+        repo.get_last_end_times.side_effect = lambda ids: {
+            id: MONDAY_10 if id == 1 else None for id in ids
+        }
+        repo.get_downtime_intervals.return_value = {}
+        return repo
+
+    def test_cached_after_first_load(self, mock_repo) -> None:
+        """2回目以降はDBを読まずにキャッシュから返す"""
+        load_machine_availability("tenant-1", mock_repo, [1, 2])
+        availability = load_machine_availability("tenant-1", mock_repo, [1])
+
+        assert availability.start_lower_bound(1) == MONDAY_10
+        mock_repo.get_last_end_times.assert_called_once()
+
+    def test_loads_only_missing_machines(self, mock_repo) -> None:
+        """キャッシュにない設備の分だけ読み込む"""
+        load_machine_availability("tenant-1", mock_repo, [1])
+        availability = load_machine_availability("tenant-1", mock_repo, [1, 2])
+
+        assert mock_repo.get_last_end_times.call_args_list[1].args[0] == {2}
+        assert availability.start_lower_bound(1) == MONDAY_10
+        assert availability.start_lower_bound(2) is None
+
+    def test_booking_does_not_change_cache(self, mock_repo) -> None:
+        """返された空き状況で割り当てても、キャッシュの内容は変わらない"""
+        availability = load_machine_availability("tenant-1", mock_repo, [1])
+        availability.book(1, MONDAY_10, datetime(2025, 1, 6, 12, 0, tzinfo=UTC))
+
+        fresh = load_machine_availability("tenant-1", mock_repo, [1])
+        assert fresh.start_lower_bound(1) == MONDAY_10
+
+    def test_invalidate_reloads(self, mock_repo) -> None:
+        """破棄した後は再読み込みする"""
+        load_machine_availability("tenant-1", mock_repo, [1])
+        invalidate_machine_availability("tenant-1")
+        load_machine_availability("tenant-1", mock_repo, [1])
+
+        assert mock_repo.get_last_end_times.call_count == 2
+
+    def test_other_calendar_reuses_loaded_rows(self, mock_repo) -> None:
+        """カレンダーが変わった場合は、DBを読み直さずに作り直す"""
+        load_machine_availability("tenant-1", mock_repo, [1])
+        calendar = WorkCalendar(shifts=DEFAULT_CALENDAR.shifts)
+        availability = load_machine_availability("tenant-1", mock_repo, [1], calendar)
+
+        assert availability.calendar is calendar
+        mock_repo.get_last_end_times.assert_called_once()
+
+    def test_invalidation_during_load_is_not_cached(self, mock_repo) -> None:
+        """読み込み中に破棄された場合、古い内容をキャッシュしない"""
+
+        def invalidate_while_loading(ids, since):
+            invalidate_machine_availability("tenant-1")
+            return {}
+
+        mock_repo.get_downtime_intervals.side_effect = invalidate_while_loading
+
+        load_machine_availability("tenant-1", mock_repo, [1])
+        assert "tenant-1" not in availability_cache._cache
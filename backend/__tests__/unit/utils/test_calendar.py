@@ -2,10 +2,14 @@
 稼働カレンダーユーティリティの単体テスト
 """
 
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, date, datetime, time, timedelta
 
 import pytest
 from app.utils.calendar import (
+    DEFAULT_CALENDAR,
+    Shift,
+    WorkCalendar,
     calculate_end_time,
     get_next_available_start_time,
     get_next_work_start,
@@ -161,6 +165,12 @@ class TestGetNextAvailableStartTime:
         result = get_next_available_start_time(current_dt, duration)
         assert result == current_dt  # 9:00から開始して17:00に終了
 
+    def test_allow_split_returns_next_working_instant(self) -> None:
+        """分割可能な場合は17:00をはみ出しても後ろ倒しせず、所要時間の上限もない"""
+        current_dt = datetime(2025, 1, 6, 16, 30)  # 月曜日 16:30
+        result = get_next_available_start_time(current_dt, 600, allow_split=True)
+        assert result == current_dt
+
 
 @pytest.mark.unit
 class TestCalculateEndTime:
@@ -222,9 +232,245 @@ class TestCalculateEndTime:
         with pytest.raises(ValueError, match="作業が稼働時間を超えます"):
             calculate_end_time(start_dt, duration)
 
+    def test_allow_split_carries_over_to_next_workday(self) -> None:
+        """分割可能な場合は17:00を超える分を翌営業日に繰り越す"""
+        start_dt = datetime(2025, 1, 10, 16, 0)  # 金曜日 16:00
+        duration = 600  # 10時間
+        result = calculate_end_time(start_dt, duration, allow_split=True)
+        assert result == datetime(2025, 1, 14, 10, 0)  # 火曜日 10:00
+
     def test_precise_minute_calculation(self) -> None:
         """分単位での精密な計算"""
         start_dt = datetime(2025, 1, 6, 13, 15)  # 月曜日 13:15
         duration = 45  # 45分
         result = calculate_end_time(start_dt, duration)
         assert result == datetime(2025, 1, 6, 14, 0)  # 月曜日 14:00
+
+
+@pytest.mark.unit
+class TestWorkCalendar:
+    """WorkCalendar（コンパイル済み稼働カレンダー）のテスト"""
+
+    @pytest.fixture
+    def two_shift_calendar(self) -> WorkCalendar:
+        """平日2交代（8:00-12:00, 13:00-17:00）、2025-01-08 を休日とするカレンダー"""
+        weekdays = frozenset(range(5))
+        return WorkCalendar(
+            shifts=[
+                Shift(weekdays=weekdays, start=time(8, 0), end=time(12, 0)),
+                Shift(weekdays=weekdays, start=time(13, 0), end=time(17, 0)),
+            ],
+            holidays=[date(2025, 1, 8)],
+        )
+
+    @pytest.mark.parametrize(
+        "current, expected",
+        [
+            (datetime(2025, 1, 6, 8, 30), datetime(2025, 1, 6, 9, 0)),  # 始業前
+            (datetime(2025, 1, 6, 10, 30), datetime(2025, 1, 6, 10, 30)),  # 稼働中
+            (datetime(2025, 1, 6, 17, 0), datetime(2025, 1, 7, 9, 0)),  # 終業時刻
+            (datetime(2025, 1, 10, 18, 0), datetime(2025, 1, 13, 9, 0)),  # 金曜夜
+        ],
+    )
+    def test_next_working_instant(self, current, expected) -> None:
+        """次の稼働時刻を返す（稼働中ならそのまま返す）"""
+        assert DEFAULT_CALENDAR.next_working_instant(current) == expected
+
+    def test_next_fitting_start_matches_legacy_function(self) -> None:
+        """既定カレンダーの結果は get_next_available_start_time と一致する"""
+        for day in range(6, 13):
+            for hour in range(0, 24):
+                for duration in (0, 30, 90, 480):
+                    current = datetime(2025, 1, day, hour, 15)
+                    assert DEFAULT_CALENDAR.next_fitting_start(
+                        current, duration
+                    ) == get_next_available_start_time(current, duration)
+
+    def test_next_fitting_start_exceeds_longest_shift_raises_error(self) -> None:
+        """所要時間が最長のシフトを超える場合はエラー"""
+        with pytest.raises(ValueError, match="所要時間が1回の稼働時間"):
+            DEFAULT_CALENDAR.next_fitting_start(datetime(2025, 1, 6, 9, 0), 481)
+
+    def test_add_working_minutes_skips_non_working_time(self) -> None:
+        """夜間・週末を読み飛ばして稼働時間だけを数える"""
+        start = datetime(2025, 1, 10, 16, 0)  # 金曜日 16:00
+        result = DEFAULT_CALENDAR.add_working_minutes(start, 120)
+        assert result == datetime(2025, 1, 13, 10, 0)  # 月曜日 10:00
+
+    def test_add_working_minutes_ends_at_period_end(self) -> None:
+        """稼働区間の終了ちょうどに終わる場合は翌日に繰り越さない"""
+        start = datetime(2025, 1, 6, 9, 0)
+        result = DEFAULT_CALENDAR.add_working_minutes(start, 480)
+        assert result == datetime(2025, 1, 6, 17, 0)
+
+    def test_multiple_shifts_and_holidays(self, two_shift_calendar) -> None:
+        """昼休み・休日を読み飛ばす"""
+        # 火曜日 11:00 から 6時間 → 昼休みを挟み、水曜日（休日）を飛ばして木曜日へ
+        start = datetime(2025, 1, 7, 11, 0)
+        result = two_shift_calendar.add_working_minutes(start, 360)
+        assert result == datetime(2025, 1, 9, 9, 0)
+
+        # 1時間の作業は昼休み前に収まらないため午後のシフトから開始する
+        assert two_shift_calendar.next_fitting_start(
+            datetime(2025, 1, 7, 11, 30), 60
+        ) == datetime(2025, 1, 7, 13, 0)
+
+    def test_working_minutes_between(self, two_shift_calendar) -> None:
+        """2つの日時の間の稼働時間を返す"""
+        start = datetime(2025, 1, 7, 11, 0)
+        end = datetime(2025, 1, 9, 9, 0)
+        # 火曜日 60分 + 240分、水曜日（休日）0分、木曜日 60分
+        assert two_shift_calendar.working_minutes_between(start, end) == 360
+        assert two_shift_calendar.working_minutes_between(end, start) == 0
+
+    def test_working_periods(self, two_shift_calendar) -> None:
+        """2つの日時の間の稼働区間を、両端を切り詰めて返す"""
+        start = datetime(2025, 1, 7, 11, 0)
+        end = datetime(2025, 1, 9, 10, 0)
+
+        assert two_shift_calendar.working_periods(start, end) == [
+            (datetime(2025, 1, 7, 11, 0), datetime(2025, 1, 7, 12, 0)),
+            (datetime(2025, 1, 7, 13, 0), datetime(2025, 1, 7, 17, 0)),
+            (datetime(2025, 1, 9, 8, 0), datetime(2025, 1, 9, 10, 0)),
+        ]
+        assert two_shift_calendar.working_periods(end, start) == []
+
+    def test_overnight_shift(self) -> None:
+        """終了時刻が開始時刻以前のシフトは翌日まで続く"""
+        calendar = WorkCalendar(
+            shifts=[
+                Shift(weekdays=frozenset(range(7)), start=time(22, 0), end=time(6, 0))
+            ]
+        )
+        start = datetime(2025, 1, 6, 23, 0)
+        assert calendar.add_working_minutes(start, 120) == datetime(2025, 1, 7, 1, 0)
+        assert calendar.is_working_time(datetime(2025, 1, 7, 5, 59))
+        assert not calendar.is_working_time(datetime(2025, 1, 7, 6, 0))
+
+    def test_extends_horizon_lazily(self) -> None:
+        """事前計算の範囲外の日時でも再コンパイルして計算する"""
+        calendar = WorkCalendar(
+            shifts=[Shift(weekdays=frozenset(range(5)), start=time(9), end=time(17))],
+            horizon_days=7,
+        )
+        start = datetime(2025, 1, 6, 9, 0)
+        # 8時間 × 20営業日 = 4週間後の金曜日 17:00
+        result = calendar.add_working_minutes(start, 480 * 20)
+        assert result == datetime(2025, 1, 31, 17, 0)
+        assert calendar.working_minutes_between(start, result) == 480 * 20
+
+    def test_concurrent_recompile(self) -> None:
+        """複数のスレッドが同時に範囲を広げても、1スレッドで計算した場合と同じ結果になる"""
+        shifts = [Shift(weekdays=frozenset(range(5)), start=time(9), end=time(17))]
+        starts = [datetime(2025, 1, 6, 9, 0) + timedelta(days=7 * i) for i in range(40)]
+        expected = [
+            WorkCalendar(shifts=shifts).add_working_minutes(start, 480 * 10)
+            for start in starts
+        ]
+        calendar = WorkCalendar(shifts=shifts, horizon_days=7)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda start: calendar.add_working_minutes(start, 480 * 10), starts
+                )
+            )
+
+        assert results == expected
+
+    def test_recompile_moving_range_start_earlier(self, monkeypatch) -> None:
+        """範囲を広げる間に別スレッドが範囲の先頭を早めても、終了日時は変わらない"""
+        calendar = WorkCalendar(
+            shifts=[Shift(weekdays=frozenset(range(5)), start=time(9), end=time(17))],
+            horizon_days=7,
+        )
+        range_for = calendar._range_for
+        calls: list[tuple[date, ...]] = []
+
+        def recompiled_concurrently(*days: date):
+            calls.append(days)
+            if len(calls) == 2:
+                # 範囲を広げる直前に、別スレッドがより前の日を含む範囲に再コンパイルする
+                range_for(date(2025, 1, 6))
+            return range_for(*days)
+
+        start = datetime(2025, 6, 2, 9, 0)
+        monkeypatch.setattr(calendar, "_range_for", recompiled_concurrently)
+
+        # 8時間 × 20営業日
+        assert calendar.add_working_minutes(start, 480 * 20) == datetime(
+            2025, 6, 27, 17, 0
+        )
+
+    def test_adjacent_shifts_form_one_period(self) -> None:
+        """隣接するシフトは1つの稼働区間として、シフト1回分より長い作業も収める"""
+        weekdays = frozenset(range(5))
+        calendar = WorkCalendar(
+            shifts=[
+                Shift(weekdays=weekdays, start=time(6), end=time(14)),
+                Shift(weekdays=weekdays, start=time(14), end=time(22)),
+            ]
+        )
+        start = datetime(2025, 1, 6, 6, 0)
+
+        assert calendar.max_period_minutes == 16 * 60
+        assert calendar.next_fitting_start(start, 600) == start
+        assert calendar.next_fitting_start(datetime(2025, 1, 6, 13, 0), 600) == (
+            datetime(2025, 1, 7, 6, 0)
+        )
+
+    def test_continuous_operation_has_no_period_limit(self) -> None:
+        """24時間稼働のカレンダーでは、休日までの区間に収まる作業を受け付ける"""
+        calendar = WorkCalendar(
+            shifts=[Shift(weekdays=frozenset(range(7)), start=time(0), end=time(0))],
+            holidays=[date(2025, 1, 12), date(2025, 1, 19)],
+        )
+
+        assert calendar.max_period_minutes == float("inf")
+        # 月曜 0:00 から日曜（休日）の前までの6日間に収まる
+        assert calendar.next_fitting_start(
+            datetime(2025, 1, 6, 0, 0), 6 * 24 * 60
+        ) == datetime(2025, 1, 6, 0, 0)
+        # 休日で区切られた区間に収まらない作業は、最後の休日の後に始める
+        assert calendar.next_fitting_start(
+            datetime(2025, 1, 6, 0, 0), 7 * 24 * 60
+        ) == datetime(2025, 1, 20, 0, 0)
+
+    def test_fitting_search_gives_up(self) -> None:
+        """毎週の休日で区切られ、いつまでも収まらない作業は探索を打ち切る"""
+        first_sunday = date(2025, 1, 5)
+        calendar = WorkCalendar(
+            shifts=[Shift(weekdays=frozenset(range(7)), start=time(0), end=time(0))],
+            holidays=[first_sunday + timedelta(weeks=i) for i in range(52 * 6)],
+        )
+
+        with pytest.raises(ValueError):
+            calendar.next_fitting_start(datetime(2025, 1, 6, 0, 0), 7 * 24 * 60)
+
+    def test_shutdowns_are_excluded(self) -> None:
+        """工場停止期間は稼働時間から除かれる"""
+        calendar = WorkCalendar(
+            shifts=DEFAULT_CALENDAR.shifts,
+            shutdowns=[
+                # 月曜日 12:00 から火曜日 10:00 まで停止
+                (datetime(2025, 1, 6, 12, 0), datetime(2025, 1, 7, 10, 0)),
+            ],
+        )
+        start = datetime(2025, 1, 6, 11, 0)
+        # 月曜日 11:00-12:00 の60分 + 火曜日 10:00 から60分
+        assert calendar.add_working_minutes(start, 120) == datetime(2025, 1, 7, 11, 0)
+        assert calendar.next_working_instant(datetime(2025, 1, 6, 13, 0)) == datetime(
+            2025, 1, 7, 10, 0
+        )
+
+    def test_timezone_is_preserved(self) -> None:
+        """タイムゾーン付きの日時は壁時計時刻で計算し、同じタイムゾーンで返す"""
+        start = datetime(2025, 1, 6, 16, 30, tzinfo=UTC)
+        result = DEFAULT_CALENDAR.add_working_minutes(start, 60)
+        assert result == datetime(2025, 1, 7, 9, 30, tzinfo=UTC)
+
+    def test_no_working_time_raises_error(self) -> None:
+        """稼働時間が定義されていない場合はエラー"""
+        calendar = WorkCalendar(shifts=[])
+        with pytest.raises(ValueError, match="稼働時間が見つかりません"):
+            calendar.next_working_instant(datetime(2025, 1, 6, 9, 0))
@@ -0,0 +1,158 @@
+"""
+ディスパッチングルールの単体テスト
+"""
+
+import time
+from datetime import UTC, datetime
+
+import numpy as np
+import pytest
+from app.utils.dispatching import (
+    priority_scores,
+    processing_minutes,
+    projected_tardiness,
+    rank_orders,
+)
+
+# 月曜日 9:00
+NOW = datetime(2025, 1, 6, 9, 0, tzinfo=UTC)
+
+
+def _routing(id: int, setup_seconds: int | None, unit_seconds: int) -> dict:
+    return {
+        "id": id,
+        "equipment_group_id": 100,
+        "setup_time_seconds": setup_seconds,
+        "unit_time_seconds": unit_seconds,
+    }
+
+
+ROUTINGS = {
+    # 段取り30分 + 10分/個
+    10: [_routing(1, 1200, 300), _routing(2, 600, 300)],
+    # 段取りなし + 60分/個
+    20: [_routing(3, 0, 3600)],
+}
+
+
+def _order(id: int, product_id: int, quantity: int, deadline: str | None) -> dict:
+    return {
+        "id": id,
+        "product_id": product_id,
+        "quantity": quantity,
+        "deadline_date": deadline,
+    }
+
+
+@pytest.mark.unit
+class TestDispatching:
+    """ディスパッチングルールのテスト"""
+
+    def test_processing_minutes(self) -> None:
+        """全工程の段取り時間と数量×単位時間を合計する"""
+        orders = [_order(1, 10, 3, None), _order(2, 20, 2, None)]
+
+        result = processing_minutes(orders, ROUTINGS)
+
+        np.testing.assert_allclose(result, [60.0, 120.0])
+
+    def test_processing_minutes_without_setup_time(self) -> None:
+        """段取り時間が未設定（NULL）の工程は段取りなしとして扱う"""
+        routings = {30: [_routing(4, None, 600), _routing(5, 300, 60)]}
+        orders = [_order(1, 30, 2, None), _order(2, 99, 1, None)]
+
+        result = processing_minutes(orders, routings)
+
+        np.testing.assert_allclose(result, [27.0, 0.0])
+
+    def test_edd_orders_by_deadline_and_keeps_fifo_for_ties(self) -> None:
+        """EDD: 納期の早い順。同じ納期は元の順序、納期なしは最後"""
+        orders = [
+            _order(1, 10, 1, None),
+            _order(2, 10, 1, "2025-01-09"),
+            _order(3, 10, 1, "2025-01-07"),
+            _order(4, 10, 1, "2025-01-09"),
+        ]
+
+        result = rank_orders(orders, ROUTINGS, "edd", NOW)
+
+        assert [o["id"] for o in result] == [3, 2, 4, 1]
+
+    def test_spt_orders_by_processing_time(self) -> None:
+        """SPT: 総加工時間の短い順"""
+        orders = [_order(1, 20, 2, None), _order(2, 10, 1, None)]
+
+        result = rank_orders(orders, ROUTINGS, "spt", NOW)
+
+        assert [o["id"] for o in result] == [2, 1]
+
+    def test_cr_uses_working_minutes_until_deadline(self) -> None:
+        """CR: 納期までの稼働時間 ÷ 総加工時間。納期超過は負の値で最優先になる"""
+        orders = [
+            # 納期まで 2日分 = 960分、加工 120分 -> 8.0
+            _order(1, 20, 2, "2025-01-07"),
+            # 納期まで 1日分 = 480分、加工 60分 -> 8.0（同値のため元の順序）
+            _order(2, 10, 3, "2025-01-06"),
+            # 納期超過（先週の金曜日）
+            _order(3, 10, 1, "2025-01-03"),
+            # 納期まで 480分、加工 240分 -> 2.0
+            _order(4, 20, 4, "2025-01-06"),
+        ]
+
+        scores = priority_scores(orders, ROUTINGS, "cr", NOW)
+        result = rank_orders(orders, ROUTINGS, "cr", NOW)
+
+        np.testing.assert_allclose(scores[[0, 1, 3]], [8.0, 8.0, 2.0])
+        assert scores[2] < 0
+        assert [o["id"] for o in result] == [3, 4, 1, 2]
+
+    def test_rules_without_deadlines_keep_original_order(self) -> None:
+        """納期のある注文がない場合、EDD/CRは元の順序のまま"""
+        orders = [_order(1, 20, 2, None), _order(2, 10, 1, None)]
+
+        assert [o["id"] for o in rank_orders(orders, ROUTINGS, "cr", NOW)] == [1, 2]
+
+    def test_projected_tardiness(self) -> None:
+        """最後の工程の終了時刻と納期日の終わりを比較する"""
+        orders = [
+            _order(1, 10, 1, "2025-01-06"),
+            _order(2, 10, 1, "2025-01-06"),
+            _order(3, 10, 1, None),
+        ]
+        schedules = [
+            {"order_id": 1, "end_datetime": "2025-01-06T10:00:00+00:00"},
+            {"order_id": 1, "end_datetime": "2025-01-06T12:00:00+00:00"},
+            {"order_id": 2, "end_datetime": "2025-01-07T10:30:00+00:00"},
+            {"order_id": 3, "end_datetime": "2025-01-09T10:00:00+00:00"},
+        ]
+
+        result = projected_tardiness(orders, schedules, UTC)
+
+        assert result == [
+            {
+                "order_id": 1,
+                "deadline_date": "2025-01-06",
+                "completion_datetime": "2025-01-06T12:00:00+00:00",
+                "tardiness_minutes": 0.0,
+            },
+            {
+                "order_id": 2,
+                "deadline_date": "2025-01-06",
+                "completion_datetime": "2025-01-07T10:30:00+00:00",
+                "tardiness_minutes": 630.0,
+            },
+        ]
+
+    def test_rank_thousands_of_orders_quickly(self) -> None:
+        """数千件の注文でも並べ替えは1秒を大きく下回る"""
+        orders = [
+            _order(i, 10 if i % 2 else 20, i % 7 + 1, f"2025-02-{i % 28 + 1:02d}")
+            for i in range(5000)
+        ]
+
+        started = time.perf_counter()
+        result = rank_orders(orders, ROUTINGS, "cr", NOW)
+        elapsed = time.perf_counter() - started
+
+        assert len(result) == 5000
+        assert elapsed < 0.5
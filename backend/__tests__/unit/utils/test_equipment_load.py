@@ -0,0 +1,95 @@
+"""
+設備負荷（稼働率）の集計の単体テスト
+"""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+from app.utils.calendar import DEFAULT_CALENDAR
+from app.utils.equipment_load import bucket_bounds, equipment_load, summarize_load
+
+MONDAY = datetime(2025, 1, 6, tzinfo=UTC)
+
+
+def _interval(equipment_id: int, start: datetime, end: datetime) -> dict:
+    return {"equipment_id": equipment_id, "start": start, "end": end}
+
+
+@pytest.mark.unit
+class TestEquipmentLoad:
+    """equipment_load / summarize_load 関数のテスト"""
+
+    def test_bucket_bounds(self) -> None:
+        """最後のバケットは期間の終了で打ち切る"""
+        bounds = bucket_bounds(MONDAY, MONDAY + timedelta(days=10), "week")
+
+        assert bounds == [
+            MONDAY,
+            MONDAY + timedelta(days=7),
+            MONDAY + timedelta(days=10),
+        ]
+
+    def test_counts_only_working_time(self) -> None:
+        """夜間・週末をまたぐ作業は稼働時間だけを数え、バケットに分けて集計する"""
+        intervals = [
+            # 金曜日 16:00 - 月曜日 10:00（稼働時間は 60分 + 60分）
+            _interval(
+                1,
+                MONDAY + timedelta(days=4, hours=16),
+                MONDAY + timedelta(days=7, hours=10),
+            ),
+            # 集計対象外の設備
+            _interval(9, MONDAY + timedelta(hours=9), MONDAY + timedelta(hours=17)),
+        ]
+        bounds = bucket_bounds(MONDAY, MONDAY + timedelta(days=14), "week")
+
+        busy, available = equipment_load([2, 1], intervals, bounds, DEFAULT_CALENDAR)
+
+        # 行は equipment_ids の順
+        assert busy.tolist() == [[0.0, 0.0], [60.0, 60.0]]
+        assert available.tolist() == [2400.0, 2400.0]
+
+    def test_matches_calendar_per_interval(self) -> None:
+        """配列演算の結果が、作業・バケットごとに稼働時間を数えた結果と一致する"""
+        rng = random.Random(0)
+        intervals = []
+        for _ in range(300):
+            start = MONDAY + timedelta(minutes=rng.randrange(0, 60 * 24 * 30))
+            end = start + timedelta(minutes=rng.randrange(1, 60 * 24 * 3))
+            intervals.append(_interval(rng.randint(1, 5), start, end))
+        bounds = bucket_bounds(
+            MONDAY + timedelta(days=3), MONDAY + timedelta(days=24), "day"
+        )
+
+        busy, _available = equipment_load(
+            [1, 2, 3, 4, 5], intervals, bounds, DEFAULT_CALENDAR
+        )
+
+        expected = np.zeros_like(busy)
+        for interval in intervals:
+            for b, (lower, upper) in enumerate(zip(bounds, bounds[1:], strict=False)):
+                expected[interval["equipment_id"] - 1, b] += (
+                    DEFAULT_CALENDAR.working_minutes_between(
+                        max(interval["start"], lower), min(interval["end"], upper)
+                    )
+                )
+        np.testing.assert_allclose(busy, expected, atol=1e-6)
+
+    def test_summarize_groups(self) -> None:
+        """設備グループは所属する設備の合計で稼働率を計算する"""
+        busy = np.array([[240.0, 0.0], [480.0, 0.0]])
+        available = np.array([480.0, 0.0])
+
+        summary = summarize_load([1, 2], {100: [1, 2], 200: []}, busy, available)
+
+        assert summary["equipments"][0]["utilization_percent"] == [50.0, None]
+        assert summary["groups"][0] == {
+            "equipment_group_id": 100,
+            "machine_count": 2,
+            "busy_minutes": [720.0, 0.0],
+            "available_minutes": [960.0, 0.0],
+            "utilization_percent": [75.0, None],
+        }
+        assert summary["groups"][1]["utilization_percent"] == [None, None]
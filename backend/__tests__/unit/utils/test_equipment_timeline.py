@@ -0,0 +1,128 @@
+"""
+設備タイムライン（区間インデックス）の単体テスト
+"""
+
+from datetime import datetime
+
+import pytest
+from app.utils.equipment_timeline import EquipmentTimelineIndex, SortedIntervals
+
+
+@pytest.mark.unit
+class TestSortedIntervals:
+    """SortedIntervalsクラスのテスト"""
+
+    def test_add_keeps_intervals_sorted(self) -> None:
+        """追加順に関わらず開始時刻順に保持する"""
+        intervals = SortedIntervals()
+        intervals.add(datetime(2025, 1, 6, 13, 0), datetime(2025, 1, 6, 14, 0))
+        intervals.add(datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 10, 0))
+
+        assert list(intervals) == [
+            (datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 10, 0)),
+            (datetime(2025, 1, 6, 13, 0), datetime(2025, 1, 6, 14, 0)),
+        ]
+
+    def test_add_merges_overlapping_and_adjacent(self) -> None:
+        """重なる・隣接する区間は1つに結合する"""
+        intervals = SortedIntervals()
+        intervals.add(datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 10, 0))
+        intervals.add(datetime(2025, 1, 6, 11, 0), datetime(2025, 1, 6, 12, 0))
+        # 9:00-10:00 と隣接し、11:00-12:00 と重なる
+        intervals.add(datetime(2025, 1, 6, 10, 0), datetime(2025, 1, 6, 11, 30))
+
+        assert list(intervals) == [
+            (datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 12, 0)),
+        ]
+
+    @pytest.mark.parametrize(
+        "start_hour, end_hour, expected",
+        [
+            (8, 9, None),  # 直前で終わる
+            (8, 10.5, (10, 12)),  # 途中まで重なる
+            (11, 11.5, (10, 12)),  # 内側に含まれる
+            (12, 13, None),  # 直後から始まる
+        ],
+    )
+    def test_first_overlap(self, start_hour, end_hour, expected) -> None:
+        """区間 [start, end) と重なる最初の区間を返す"""
+        intervals = SortedIntervals()
+        intervals.add(datetime(2025, 1, 6, 10, 0), datetime(2025, 1, 6, 12, 0))
+
+        def at(hour: float) -> datetime:
+            return datetime(2025, 1, 6, int(hour), int(hour % 1 * 60))
+
+        result = intervals.first_overlap(at(start_hour), at(end_hour))
+        assert result == (
+            None if expected is None else (at(expected[0]), at(expected[1]))
+        )
+
+
+@pytest.mark.unit
+class TestEquipmentTimelineIndex:
+    """EquipmentTimelineIndexクラスのテスト"""
+
+    @pytest.fixture
+    def index(self) -> EquipmentTimelineIndex:
+        """月曜日 9:00-10:00 と 10:30-17:00 が予約済みの設備1"""
+        return EquipmentTimelineIndex(
+            {
+                1: [
+                    (datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 10, 0)),
+                    (datetime(2025, 1, 6, 10, 30), datetime(2025, 1, 6, 17, 0)),
+                ]
+            }
+        )
+
+    def test_fills_gap_when_operation_fits(self, index) -> None:
+        """作業が収まる空き時間帯があればそこに入る"""
+        result = index.earliest_start(1, datetime(2025, 1, 6, 9, 0), 30)
+        assert result == datetime(2025, 1, 6, 10, 0)
+
+    def test_skips_gap_when_operation_does_not_fit(self, index) -> None:
+        """空き時間帯に収まらない場合は次の空き時間帯（翌営業日）を探す"""
+        result = index.earliest_start(1, datetime(2025, 1, 6, 9, 0), 60)
+        assert result == datetime(2025, 1, 7, 9, 0)
+
+    def test_unknown_machine_uses_calendar_only(self, index) -> None:
+        """予約のない設備はカレンダー上の開始時刻をそのまま返す"""
+        result = index.earliest_start(2, datetime(2025, 1, 6, 8, 0), 60)
+        assert result == datetime(2025, 1, 6, 9, 0)
+
+    def test_book_closes_gap(self, index) -> None:
+        """予約を追加すると、その空き時間帯は使われなくなる"""
+        index.book(1, datetime(2025, 1, 6, 10, 0), datetime(2025, 1, 6, 10, 30))
+        result = index.earliest_start(1, datetime(2025, 1, 6, 9, 0), 15)
+        assert result == datetime(2025, 1, 7, 9, 0)
+
+    def test_fork_does_not_change_original(self, index) -> None:
+        """複製で予約しても元のインデックスは変わらず、元で予約しても複製は変わらない"""
+        fork = index.fork()
+        fork.book(1, datetime(2025, 1, 6, 10, 0), datetime(2025, 1, 6, 10, 30))
+        index.book(2, datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 17, 0))
+
+        assert index.earliest_start(1, datetime(2025, 1, 6, 9, 0), 15) == datetime(
+            2025, 1, 6, 10, 0
+        )
+        assert fork.earliest_start(1, datetime(2025, 1, 6, 9, 0), 15) == datetime(
+            2025, 1, 7, 9, 0
+        )
+        assert fork.earliest_start(2, datetime(2025, 1, 6, 9, 0), 15) == datetime(
+            2025, 1, 6, 9, 0
+        )
+
+    def test_restrict_keeps_only_given_machines(self, index) -> None:
+        """指定した設備の予約だけを持つ複製を作成し、複製で予約しても元は変わらない"""
+        index.book(2, datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 17, 0))
+        restricted = index.restrict([1])
+        restricted.book(1, datetime(2025, 1, 6, 10, 0), datetime(2025, 1, 6, 10, 30))
+
+        assert restricted.earliest_start(2, datetime(2025, 1, 6, 9, 0), 15) == datetime(
+            2025, 1, 6, 9, 0
+        )
+        assert restricted.earliest_start(1, datetime(2025, 1, 6, 9, 0), 15) == datetime(
+            2025, 1, 7, 9, 0
+        )
+        assert index.earliest_start(1, datetime(2025, 1, 6, 9, 0), 15) == datetime(
+            2025, 1, 6, 10, 0
+        )
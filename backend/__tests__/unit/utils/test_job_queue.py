@@ -0,0 +1,142 @@
+"""
+スケジューリングジョブキューの単体テスト
+"""
+
+import asyncio
+import threading
+
+import pytest
+from app.utils.job_queue import Job, JobQueue, tenant_lock, tenant_lock_async
+
+
+def _wait(job: Job) -> Job:
+    """ジョブが終了するまで待つ"""
+    for _ in range(500):
+        if job.status in ("succeeded", "failed"):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job {job.id} did not finish")
+
+
+@pytest.mark.unit
+class TestJobQueue:
+    """JobQueueクラスのテスト"""
+
+    @pytest.fixture
+    def queue(self):
+        queue = JobQueue(max_workers=2)
+        yield queue
+        queue.shutdown()
+
+    def test_job_records_result_and_progress(self, queue) -> None:
+        """ジョブの結果と進捗を記録する"""
+
+        def task(job: Job) -> dict:
+            job.report_progress(1, 1)
+            return {"schedule_count": 3}
+
+        job = _wait(queue.submit("tenant-1", "batch", task))
+
+        assert job.status == "succeeded"
+        assert job.result == {"schedule_count": 3}
+        assert job.to_dict()["progress"] == {"done": 1, "total": 1}
+        assert job.started_at is not None and job.finished_at is not None
+
+    def test_failed_job_records_error(self, queue) -> None:
+        """例外が発生したジョブは失敗として記録し、次のジョブは実行する"""
+
+        def fail(job: Job) -> dict:
+            raise RuntimeError("boom")
+
+        failed = _wait(queue.submit("tenant-1", "batch", fail))
+        next_job = _wait(queue.submit("tenant-1", "batch", lambda job: {}))
+
+        assert failed.status == "failed"
+        assert failed.error == "boom"
+        assert next_job.status == "succeeded"
+
+    def test_same_tenant_jobs_run_one_at_a_time(self, queue) -> None:
+        """同じテナントのジョブは前のジョブが終わるまで待ち、他のテナントのジョブは待たない"""
+        release = threading.Event()
+        order: list[str] = []
+
+        def blocking(job: Job) -> dict:
+            release.wait(5)
+            order.append("first")
+            return {}
+
+        def record(job: Job) -> dict:
+            order.append("second")
+            return {}
+
+        first = queue.submit("tenant-1", "batch", blocking)
+        second = queue.submit("tenant-1", "batch", record)
+        other = _wait(queue.submit("tenant-2", "batch", lambda job: {}))
+
+        assert other.status == "succeeded"
+        assert second.status == "queued"
+
+        release.set()
+        _wait(first)
+        _wait(second)
+        assert order == ["first", "second"]
+
+    def test_get_hides_other_tenant_jobs(self, queue) -> None:
+        """他のテナントのジョブは取得できない"""
+        job = _wait(queue.submit("tenant-1", "batch", lambda job: {}))
+
+        assert queue.get(job.id, "tenant-1") is job
+        assert queue.get(job.id, "tenant-2") is None
+        assert queue.get("unknown", "tenant-1") is None
+
+    def test_finished_jobs_are_pruned(self) -> None:
+        """保持期間を過ぎた終了済みのジョブは破棄する"""
+        queue = JobQueue(max_workers=1, retention_seconds=0)
+        try:
+            job = _wait(queue.submit("tenant-1", "batch", lambda job: {}))
+            queue.submit("tenant-1", "batch", lambda job: {})
+
+            assert queue.get(job.id, "tenant-1") is None
+        finally:
+            queue.shutdown()
+
+    def test_job_waits_for_tenant_lock(self, queue) -> None:
+        """ジョブを経由しない書き込みがテナントのロックを取得している間、ジョブは待つ"""
+        with tenant_lock("tenant-1"):
+            job = queue.submit("tenant-1", "batch", lambda job: {})
+            other = _wait(queue.submit("tenant-2", "batch", lambda job: {}))
+            threading.Event().wait(0.05)
+
+            assert job.status == "running"
+            assert other.status == "succeeded"
+
+        assert _wait(job).status == "succeeded"
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+class TestTenantLockAsync:
+    """tenant_lock_async のテスト"""
+
+    async def test_waits_without_blocking_event_loop(self) -> None:
+        """ロックが空くまでイベントループを止めずに待つ"""
+        order: list[str] = []
+
+        async def write(name: str) -> None:
+            async with tenant_lock_async("tenant-1"):
+                order.append(f"{name}:start")
+                await asyncio.sleep(0.02)
+                order.append(f"{name}:end")
+
+        await asyncio.gather(write("first"), write("second"))
+
+        assert order == ["first:start", "first:end", "second:start", "second:end"]
+
+    async def test_released_after_error(self) -> None:
+        """処理が例外で終わってもロックを解放する"""
+        with pytest.raises(RuntimeError):
+            async with tenant_lock_async("tenant-1"):
+                raise RuntimeError("boom")
+
+        with tenant_lock("tenant-1"):
+            pass
@@ -0,0 +1,235 @@
+"""
+スケジュール改善（局所探索）の単体テスト
+"""
+
+import pickle
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from app.utils.calendar import DEFAULT_CALENDAR
+from app.utils.local_search import (
+    Operation,
+    OptimizationProblem,
+    ScheduleState,
+    _random_move,
+    anneal,
+)
+
+# 月曜日 9:00
+NOW = datetime(2025, 1, 6, 9, 0, tzinfo=UTC)
+
+
+def _problem(seed: int = 0, orders: int = 8) -> OptimizationProblem:
+    """3工程の注文を、設備1〜3にばらばらに割り当てた問題を作る"""
+    rng = random.Random(seed)
+    operations: list[Operation] = []
+    sequences: dict[int, list[int]] = {1: [], 2: [], 3: []}
+    for order_id in range(orders):
+        for step in range(3):
+            # 2工程目は設備2専用、それ以外は設備1〜3のどれでもよい
+            machine_ids = (2,) if step == 1 else (1, 2, 3)
+            operations.append(
+                Operation(
+                    schedule_id=len(operations),
+                    order_id=order_id,
+                    duration_minutes=rng.choice([30, 60, 120]),
+                    machine_ids=machine_ids,
+                    release=NOW,
+                )
+            )
+            sequences[rng.choice(machine_ids)].append(len(operations) - 1)
+    return OptimizationProblem(
+        operations=operations,
+        sequences=sequences,
+        calendar=DEFAULT_CALENDAR,
+        due={o: NOW + timedelta(days=rng.randint(0, 3)) for o in range(orders)},
+        origin=NOW,
+    )
+
+
+@pytest.mark.unit
+class TestScheduleState:
+    """差分評価のテスト"""
+
+    @pytest.mark.parametrize("objective", ["makespan", "total_tardiness"])
+    def test_incremental_matches_full_recompute(self, objective) -> None:
+        """近傍操作と取り消しを繰り返しても、最初から計算し直した結果と一致する"""
+        problem = _problem()
+        state = ScheduleState(problem, objective)
+        rng = random.Random(1)
+        for _ in range(300):
+            if _random_move(state, rng) and rng.random() < 0.3:
+                state.undo()
+
+        problem.sequences = state.sequences
+        fresh = ScheduleState(problem, objective)
+        assert state.start == fresh.start
+        assert state.end == fresh.end
+        assert state.value() == pytest.approx(fresh.value())
+
+    def test_moves_keep_machines_free_of_overlaps(self) -> None:
+        """実行できた近傍操作の後は、どの設備でも作業が並び順どおりに重ならず並ぶ"""
+        state = ScheduleState(_problem(seed=3), "makespan")
+        rng = random.Random(2)
+        for _ in range(300):
+            if not _random_move(state, rng):
+                continue
+            for seq in state.sequences.values():
+                for prev, op in zip(seq, seq[1:], strict=False):
+                    assert state.end[prev] <= state.start[op]
+
+    def test_swap_recomputes_operation_moved_back(self) -> None:
+        """前に移した作業の時刻が変わらなくても、後ろに移した作業は計算し直す"""
+        operations = [
+            Operation(
+                1, order_id=2, duration_minutes=60, machine_ids=(2,), release=NOW
+            ),
+            Operation(
+                2, order_id=1, duration_minutes=60, machine_ids=(1,), release=NOW
+            ),
+            # 注文2の後工程（前工程が 10:00 に終わるため 10:00 開始のまま）
+            Operation(
+                3, order_id=2, duration_minutes=60, machine_ids=(1,), release=NOW
+            ),
+        ]
+        problem = OptimizationProblem(
+            operations=operations,
+            sequences={1: [1, 2], 2: [0]},
+            calendar=DEFAULT_CALENDAR,
+        )
+        state = ScheduleState(problem, "makespan")
+
+        assert state.swap(1, 0, 1) is True
+        assert state.sequences[1] == [2, 1]
+        assert state.start[2] == NOW + timedelta(hours=1)
+        assert state.start[1] == NOW + timedelta(hours=2)
+        assert state.value() == 180
+
+    def test_left_shift_respects_machine_and_order(self) -> None:
+        """設備上の前の作業と注文内の前工程の両方が終わってから開始する"""
+        operations = [
+            Operation(
+                1, order_id=1, duration_minutes=60, machine_ids=(1,), release=NOW
+            ),
+            Operation(
+                2, order_id=1, duration_minutes=60, machine_ids=(2,), release=NOW
+            ),
+            Operation(
+                3, order_id=2, duration_minutes=90, machine_ids=(2,), release=NOW
+            ),
+        ]
+        problem = OptimizationProblem(
+            operations=operations,
+            sequences={1: [0], 2: [2, 1]},
+            calendar=DEFAULT_CALENDAR,
+        )
+
+        state = ScheduleState(problem, "makespan")
+
+        assert state.start[1] == NOW + timedelta(minutes=90)
+        assert state.value() == 150
+
+    def test_cyclic_move_is_rejected(self) -> None:
+        """工程順と矛盾する入れ替えは取り消され、元の状態に戻る"""
+        operations = [
+            Operation(
+                1, order_id=1, duration_minutes=60, machine_ids=(1,), release=NOW
+            ),
+            Operation(
+                2, order_id=1, duration_minutes=60, machine_ids=(2,), release=NOW
+            ),
+            Operation(
+                3, order_id=2, duration_minutes=60, machine_ids=(2,), release=NOW
+            ),
+            Operation(
+                4, order_id=2, duration_minutes=60, machine_ids=(1,), release=NOW
+            ),
+        ]
+        problem = OptimizationProblem(
+            operations=operations,
+            sequences={1: [0, 3], 2: [1, 2]},
+            calendar=DEFAULT_CALENDAR,
+        )
+        state = ScheduleState(problem, "makespan")
+        before = (list(state.start), state.value())
+
+        # 設備1で注文2の後工程を先にすると、設備2で注文1の後工程の後ろにある
+        # 注文2の前工程を待つことになり、順序関係が循環する
+        assert state.swap(1, 0, 1) is False
+        assert state.sequences == {1: [0, 3], 2: [1, 2]}
+        assert (state.start, state.value()) == before
+
+    def test_replan_shifts_only_following_operations(self) -> None:
+        """削除すると後続だけが前に詰まり、所要時間が延びると後ろにずれる"""
+        operations = [
+            Operation(
+                1, order_id=1, duration_minutes=60, machine_ids=(1,), release=NOW
+            ),
+            Operation(
+                2, order_id=2, duration_minutes=60, machine_ids=(1,), release=NOW
+            ),
+            Operation(
+                3, order_id=2, duration_minutes=60, machine_ids=(2,), release=NOW
+            ),
+            Operation(
+                4, order_id=3, duration_minutes=30, machine_ids=(2,), release=NOW
+            ),
+        ]
+        problem = OptimizationProblem(
+            operations=operations,
+            sequences={1: [0, 1], 2: [3, 2]},
+            calendar=DEFAULT_CALENDAR,
+        )
+        state = ScheduleState(problem, "makespan")
+        assert state.start[2] == NOW + timedelta(minutes=120)
+
+        # 注文1を取り除くと、設備1の後続と注文2の後工程だけが前に詰まる
+        changed = state.replan(removed=[0])
+        assert changed == {1, 2}
+        assert state.start[1] == NOW
+        assert state.start[2] == NOW + timedelta(minutes=60)
+        assert state.start[3] == NOW
+        assert state.value() == 120
+
+        # 注文2の前工程が延びると、後工程が後ろにずれる
+        changed = state.replan(durations={1: 90})
+        assert changed == {1, 2}
+        assert state.start[2] == NOW + timedelta(minutes=90)
+        assert state.value() == 150
+
+
+@pytest.mark.unit
+class TestAnneal:
+    """焼きなまし法のテスト"""
+
+    def test_anneal_improves_makespan(self) -> None:
+        """設備1に偏った作業を空いている設備に移して makespan を短縮する"""
+        operations = [
+            Operation(
+                i, order_id=i, duration_minutes=120, machine_ids=(1, 2), release=NOW
+            )
+            for i in range(4)
+        ]
+        problem = OptimizationProblem(
+            operations=operations,
+            sequences={1: [0, 1, 2, 3], 2: []},
+            calendar=DEFAULT_CALENDAR,
+            origin=NOW,
+        )
+
+        result = anneal(problem, "makespan", 10, seed=0, max_iterations=300)
+
+        assert result.initial_value == 480
+        assert result.best_value == 240
+        assert {machine_id for machine_id, _, _ in result.assignments} == {1, 2}
+
+    def test_problem_is_picklable(self) -> None:
+        """プロセスプールに渡せるよう、入力はpickleできる"""
+        problem = _problem()
+        restored = pickle.loads(pickle.dumps(problem))
+
+        assert (
+            ScheduleState(restored, "makespan").value()
+            == ScheduleState(problem, "makespan").value()
+        )
@@ -0,0 +1,122 @@
+"""
+設備選定（MachineSelector）の単体テスト
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from app.utils.equipment_timeline import EquipmentTimelineIndex
+from app.utils.machine_availability import MachineAvailability
+from app.utils.machine_selector import MachineSelector
+
+MONDAY_9 = datetime(2025, 1, 6, 9, 0)
+
+
+@pytest.mark.unit
+class TestMachineSelector:
+    """MachineSelectorクラスのテスト"""
+
+    def test_earliest_start_picks_first_free_machine(self) -> None:
+        """最も早く空く設備を選ぶ"""
+        availability = MachineAvailability(
+            {1: datetime(2025, 1, 6, 15, 0), 2: datetime(2025, 1, 6, 10, 0)}
+        )
+        selector = MachineSelector(availability, {100: [1, 2]})
+
+        choice = selector.select(100, MONDAY_9, 60)
+
+        assert choice.machine_id == 2
+        assert choice.start == datetime(2025, 1, 6, 10, 0)
+        assert choice.end == datetime(2025, 1, 6, 11, 0)
+
+    def test_ties_prefer_group_order(self) -> None:
+        """同じ時刻に開始できる場合は設備グループ内の並び順で選ぶ"""
+        availability = MachineAvailability({1: None, 2: None, 3: None})
+        selector = MachineSelector(availability, {100: [3, 1, 2]})
+
+        assert selector.select(100, MONDAY_9, 60).machine_id == 3
+
+    def test_prunes_machines_that_cannot_start_earlier(self) -> None:
+        """空き時刻が最良の開始時刻以降の設備は評価しない"""
+        availability = MachineAvailability(
+            {id: datetime(2025, 1, 6, 10 + id % 5, 0) for id in range(1, 101)}
+        )
+        availability.earliest_start = MagicMock(wraps=availability.earliest_start)
+        selector = MachineSelector(availability, {100: list(range(1, 101))})
+
+        choice = selector.select(100, MONDAY_9, 30)
+
+        assert choice.start == datetime(2025, 1, 6, 10, 0)
+        # 10:00 に空く設備のうち、最初の1台だけを評価する
+        assert availability.earliest_start.call_count == 1
+
+    def test_book_updates_heap_across_operations(self) -> None:
+        """割り当てた設備はヒープ上で後ろに回り、次の工程では別の設備が選ばれる"""
+        availability = MachineAvailability({1: None, 2: None})
+        selector = MachineSelector(availability, {100: [1, 2], 200: [1]})
+
+        first = selector.select(100, MONDAY_9, 60)
+        selector.book(first.machine_id, first.start, first.end)
+        second = selector.select(100, MONDAY_9, 60)
+        selector.book(second.machine_id, second.start, second.end)
+        # 設備1は別グループにも属しているため、そちらの空き時刻も更新される
+        third = selector.select(200, MONDAY_9, 60)
+
+        assert (first.machine_id, second.machine_id) == (1, 2)
+        assert second.start == MONDAY_9
+        assert third.start == datetime(2025, 1, 6, 10, 0)
+
+    def test_earliest_finish_with_split_operations(self) -> None:
+        """earliest_finish では終了時刻が最も早い設備を選ぶ"""
+        availability = MachineAvailability(
+            {1: datetime(2025, 1, 6, 16, 30), 2: datetime(2025, 1, 6, 16, 45)}
+        )
+        selector = MachineSelector(availability, {100: [2, 1]}, "earliest_finish")
+
+        choice = selector.select(100, MONDAY_9, 60, allow_split=True)
+
+        assert choice.machine_id == 1
+        assert choice.end == datetime(2025, 1, 7, 9, 30)
+
+    def test_earliest_finish_accounts_for_setup(self) -> None:
+        """設備ごとの段取り時間を含めて終了時刻を比べる"""
+        availability = MachineAvailability({1: None, 2: datetime(2025, 1, 6, 9, 30)})
+        selector = MachineSelector(availability, {100: [1, 2]}, "earliest_finish")
+
+        # 設備1は段取り替えが必要（60分）、設備2は段取りなし
+        choice = selector.select(
+            100, MONDAY_9, 30, setup_minutes=lambda machine_id: 60 * (machine_id == 1)
+        )
+
+        assert choice.machine_id == 2
+        assert choice.end == datetime(2025, 1, 6, 10, 0)
+
+    def test_least_loaded_balances_machines(self) -> None:
+        """least_loaded では割り当てた稼働時間が少ない設備を優先する"""
+        availability = MachineAvailability({1: None, 2: None})
+        selector = MachineSelector(availability, {100: [1, 2]}, "least_loaded")
+
+        # 設備1に長い作業を割り当てる
+        first = selector.select(100, MONDAY_9, 240)
+        selector.book(first.machine_id, first.start, first.end)
+        # 設備2は負荷が少ないため、設備1より遅く始まる場合でも選ばれる
+        second = selector.select(100, datetime(2025, 1, 6, 14, 0), 60)
+
+        assert first.machine_id == 1
+        assert second.machine_id == 2
+
+    def test_insertion_mode_scans_gaps(self) -> None:
+        """挿入モードでは下限がないため、途中の空き時間帯を持つ設備も評価する"""
+        index = EquipmentTimelineIndex(
+            {
+                1: [(datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 17, 0))],
+                2: [(datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 12, 0))],
+            }
+        )
+        selector = MachineSelector(index, {100: [1, 2]})
+
+        choice = selector.select(100, MONDAY_9, 60)
+
+        assert choice.machine_id == 2
+        assert choice.start == datetime(2025, 1, 6, 12, 0)
@@ -0,0 +1,124 @@
+"""
+マスタデータ（工程順序・設備グループのメンバー）キャッシュの単体テスト
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.utils import master_data_cache
+from app.utils.master_data_cache import (
+    invalidate_equipment,
+    invalidate_groups,
+    invalidate_products,
+    invalidate_routing,
+    load_machine_ids_by_groups,
+    load_machine_ids_by_groups_async,
+    load_routings_by_products,
+    load_routings_by_products_async,
+)
+
+ROUTINGS = {
+    1: [{"id": 11, "tenant_id": "tenant-1", "product_id": 1}],
+    2: [{"id": 21, "tenant_id": "tenant-1", "product_id": 2}],
+}
+MEMBERS = {1: [101, 102], 2: [201]}
+
+
+@pytest.mark.unit
+class TestMasterDataCache:
+    """マスタデータキャッシュのテスト（キャッシュは conftest でテストごとに破棄する）"""
+
+    @pytest.fixture
+    def routing_loader(self):
+        """製品IDの集合から工程順序を返すローダー"""
+        return MagicMock(side_effect=lambda ids: {id: ROUTINGS[id] for id in ids})
+
+    @pytest.fixture
+    def member_loader(self):
+        """設備グループIDの集合から所属設備を返すローダー"""
+        return MagicMock(side_effect=lambda ids: {id: MEMBERS[id] for id in ids})
+
+    def test_cached_after_first_load(self, routing_loader) -> None:
+        """2回目以降はローダーを呼ばずにキャッシュから返す"""
+        load_routings_by_products("tenant-1", [1, 2], routing_loader)
+        result = load_routings_by_products("tenant-1", [1, 2], routing_loader)
+
+        assert result == ROUTINGS
+        routing_loader.assert_called_once_with({1, 2})
+
+    def test_loads_only_missing_ids(self, member_loader) -> None:
+        """キャッシュにない設備グループの分だけ読み込む"""
+        load_machine_ids_by_groups("tenant-1", [1], member_loader)
+        result = load_machine_ids_by_groups("tenant-1", [1, 2], member_loader)
+
+        assert result == MEMBERS
+        assert member_loader.call_args_list[1].args[0] == {2}
+
+    def test_tenants_are_isolated(self, routing_loader) -> None:
+        """他テナントのキャッシュは使わず、他テナントの行はキャッシュしない"""
+        load_routings_by_products("tenant-1", [1], routing_loader)
+        result = load_routings_by_products("tenant-2", [1], routing_loader)
+
+        assert result == {1: []}
+        assert routing_loader.call_count == 2
+
+    def test_invalidate_products_only_touches_given_products(
+        self, routing_loader
+    ) -> None:
+        """指定した製品の工程順序だけを破棄する"""
+        load_routings_by_products("tenant-1", [1, 2], routing_loader)
+        invalidate_products("tenant-1", [1])
+        load_routings_by_products("tenant-1", [1, 2], routing_loader)
+
+        assert routing_loader.call_args_list[1].args[0] == {1}
+
+    def test_invalidate_routing_touches_owning_product(self, routing_loader) -> None:
+        """工程順序を含む製品の工程順序だけを破棄する"""
+        load_routings_by_products("tenant-1", [1, 2], routing_loader)
+        invalidate_routing("tenant-1", 21)
+        load_routings_by_products("tenant-1", [1, 2], routing_loader)
+
+        assert routing_loader.call_args_list[1].args[0] == {2}
+
+    def test_invalidate_other_tenant_keeps_entries(self, member_loader) -> None:
+        """他テナントの破棄ではキャッシュは残る"""
+        load_machine_ids_by_groups("tenant-1", [1, 2], member_loader)
+        invalidate_groups("tenant-2", [1, 2])
+        load_machine_ids_by_groups("tenant-1", [1, 2], member_loader)
+
+        member_loader.assert_called_once()
+
+    def test_invalidate_equipment_touches_its_groups(self, member_loader) -> None:
+        """設備が所属する設備グループだけを破棄する"""
+        load_machine_ids_by_groups("tenant-1", [1, 2], member_loader)
+        invalidate_equipment("tenant-1", 201)
+        load_machine_ids_by_groups("tenant-1", [1, 2], member_loader)
+
+        assert member_loader.call_args_list[1].args[0] == {2}
+
+    def test_invalidation_during_load_is_not_cached(self) -> None:
+        """読み込み中に破棄された場合、古い内容をキャッシュしない"""
+
+        def invalidate_while_loading(ids):
+            invalidate_groups("tenant-1", ids)
+            return {id: MEMBERS[id] for id in ids}
+
+        result = load_machine_ids_by_groups("tenant-1", [1], invalidate_while_loading)
+
+        assert result == {1: MEMBERS[1]}
+        assert ("members", "tenant-1", 1) not in master_data_cache._cache
+
+    @pytest.mark.anyio
+    async def test_async_loaders_share_cache(self, routing_loader) -> None:
+        """非同期版も同じキャッシュを使う"""
+        load_routings_by_products("tenant-1", [1], routing_loader)
+        async_loader = AsyncMock(return_value={2: ROUTINGS[2]})
+
+        result = await load_routings_by_products_async("tenant-1", [1, 2], async_loader)
+        members = await load_machine_ids_by_groups_async(
+            "tenant-1", [1], AsyncMock(return_value={1: MEMBERS[1]})
+        )
+
+        assert result == ROUTINGS
+        assert members == {1: MEMBERS[1]}
+        async_loader.assert_awaited_once_with({2})
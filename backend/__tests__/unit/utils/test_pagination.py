@@ -0,0 +1,24 @@
+"""
+キーセットページングのカーソルの単体テスト
+"""
+
+import pytest
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.unit
+class TestCursor:
+    """encode_cursor / decode_cursor のテスト"""
+
+    def test_round_trip(self) -> None:
+        """符号化したキーを復号すると元に戻る"""
+        cursor = encode_cursor("2025-01-06T09:00:00+00:00", 10000001)
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor, 2) == ["2025-01-06T09:00:00+00:00", 10000001]
+
+    @pytest.mark.parametrize("cursor", ["%%%", "bm90LWpzb24", encode_cursor(1, 2, 3)])
+    def test_rejects_malformed_cursor(self, cursor) -> None:
+        """base64・JSON として解釈できない、または要素数が違うカーソルは ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, 2)
@@ -0,0 +1,60 @@
+"""
+スケジューリング問題の分割の単体テスト
+"""
+
+import pytest
+from app.utils.partition import UnionFind, partition_orders
+
+
+def _routing(group_id: int) -> dict:
+    return {"equipment_group_id": group_id}
+
+
+@pytest.mark.unit
+class TestUnionFind:
+    """UnionFindクラスのテスト"""
+
+    def test_union_and_find(self) -> None:
+        """併合した要素は同じ代表元を持つ"""
+        sets = UnionFind()
+        sets.union(1, 2)
+        sets.union(3, 4)
+        sets.union(2, 4)
+
+        assert len({sets.find(x) for x in (1, 2, 3, 4)}) == 1
+        assert sets.find(5) == 5
+
+
+@pytest.mark.unit
+class TestPartitionOrders:
+    """partition_orders関数のテスト"""
+
+    def test_products_sharing_groups_are_merged(self) -> None:
+        """設備グループを共有する製品の注文は同じ成分、共有しない注文は別の成分になる"""
+        routings_by_product = {
+            1: [_routing(100), _routing(200)],
+            2: [_routing(200)],
+            3: [_routing(300)],
+        }
+        machine_ids_by_group = {100: [1], 200: [2], 300: [3]}
+        orders = [
+            {"id": 10, "product_id": 3},
+            {"id": 11, "product_id": 2},
+            {"id": 12, "product_id": 1},
+            {"id": 13, "product_id": 3},
+        ]
+
+        components = partition_orders(orders, routings_by_product, machine_ids_by_group)
+
+        # 成分内では元の順序を保ち、成分は最初の注文の位置順に並ぶ
+        assert [[o["id"] for o in c] for c in components] == [[10, 13], [11, 12]]
+
+    def test_groups_sharing_machines_are_merged(self) -> None:
+        """同じ設備が属する設備グループを使う注文は同じ成分になる"""
+        routings_by_product = {1: [_routing(100)], 2: [_routing(200)]}
+        machine_ids_by_group = {100: [1, 2], 200: [2, 3]}
+        orders = [{"id": 10, "product_id": 1}, {"id": 11, "product_id": 2}]
+
+        components = partition_orders(orders, routings_by_product, machine_ids_by_group)
+
+        assert len(components) == 1
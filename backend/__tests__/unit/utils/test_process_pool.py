@@ -0,0 +1,29 @@
+"""
+共有プロセスプールの単体テスト
+"""
+
+import pytest
+from app.utils.process_pool import get_process_pool, shutdown_process_pool
+
+
+@pytest.mark.unit
+class TestProcessPool:
+    """get_process_pool・shutdown_process_pool のテスト"""
+
+    def test_pool_is_shared_and_uses_spawn(self) -> None:
+        """同じプールを返し、プロセスは spawn で作成する"""
+        try:
+            pool = get_process_pool()
+            assert get_process_pool() is pool
+            assert pool._mp_context.get_start_method() == "spawn"
+        finally:
+            shutdown_process_pool()
+
+    def test_shutdown_creates_new_pool_next_time(self) -> None:
+        """停止後は新しいプールを作成する"""
+        try:
+            pool = get_process_pool()
+            shutdown_process_pool()
+            assert get_process_pool() is not pool
+        finally:
+            shutdown_process_pool()
@@ -0,0 +1,90 @@
+"""
+順序依存の段取り時間の単体テスト
+"""
+
+import pytest
+from app.utils.setup_times import SetupTimes, batch_by_setup
+
+
+def _routing(method: int | None, setup_seconds: int = 600) -> dict:
+    return {"setup_method_id": method, "setup_time_seconds": setup_seconds}
+
+
+@pytest.mark.unit
+class TestSetupTimes:
+    """SetupTimesのテスト"""
+
+    def test_same_method_skips_setup(self) -> None:
+        """直前の作業と段取り方法が同じ場合は段取りなし"""
+        setups = SetupTimes({1: 5})
+
+        assert setups.setup_minutes(1, _routing(5)) == 0.0
+        assert setups.setup_minutes(1, _routing(6)) == 10.0
+
+    def test_unknown_method_charges_full_setup(self) -> None:
+        """直前の作業または工程の段取り方法が不明な場合は工程の段取り時間"""
+        setups = SetupTimes({1: None, 2: 5})
+
+        assert setups.setup_minutes(1, _routing(5)) == 10.0
+        assert setups.setup_minutes(2, _routing(None)) == 10.0
+        assert setups.setup_minutes(3, _routing(5)) == 10.0
+
+    def test_changeover_matrix_overrides_default(self) -> None:
+        """段取り替え行列の値は、同じ段取り方法どうしの場合も優先する"""
+        setups = SetupTimes({1: 5, 2: 6}, {(5, 6): 120, (6, 6): 60})
+
+        assert setups.setup_minutes(1, _routing(6)) == 2.0
+        assert setups.setup_minutes(2, _routing(6)) == 1.0
+
+    def test_record_and_fork(self) -> None:
+        """割り当てた工程の段取り方法を記録し、複製には影響しない"""
+        setups = SetupTimes({1: 5})
+        forked = setups.fork()
+
+        forked.record(1, _routing(6))
+
+        assert forked.setup_minutes(1, _routing(6)) == 0.0
+        assert setups.setup_minutes(1, _routing(6)) == 10.0
+
+    def test_restrict_keeps_only_given_machines(self) -> None:
+        """指定した設備の最後の段取り方法だけを持つ複製を作成する"""
+        setups = SetupTimes({1: 5, 2: 6})
+        restricted = setups.restrict([1])
+
+        assert restricted.setup_minutes(1, _routing(5)) == 0.0
+        assert restricted.setup_minutes(2, _routing(6)) == 10.0
+
+
+@pytest.mark.unit
+class TestBatchBySetup:
+    """batch_by_setup関数のテスト"""
+
+    ROUTINGS = {
+        10: [_routing(1), _routing(2)],
+        11: [_routing(3)],
+        12: [_routing(1), _routing(2)],
+        13: [_routing(None)],
+    }
+
+    def _orders(self, product_ids: list[int]) -> list[dict]:
+        return [
+            {"id": i, "product_id": product_id}
+            for i, product_id in enumerate(product_ids, start=1)
+        ]
+
+    def test_pulls_same_setup_within_window(self) -> None:
+        """段取り方法の並びが同じ注文を window 件以内から引き寄せる"""
+        orders = self._orders([10, 11, 12, 11, 10])
+
+        batched = batch_by_setup(orders, self.ROUTINGS, window=2)
+
+        # 注文5は注文1から3件後ろのため引き寄せない
+        assert [o["id"] for o in batched] == [1, 3, 2, 4, 5]
+
+    def test_orders_without_setup_methods_keep_order(self) -> None:
+        """段取り方法が設定されていない注文は引き寄せない"""
+        orders = self._orders([13, 11, 13])
+
+        batched = batch_by_setup(orders, self.ROUTINGS, window=5)
+
+        assert [o["id"] for o in batched] == [1, 2, 3]
@@ -0,0 +1,108 @@
+"""
+Supabaseクライアントのプールの単体テスト
+"""
+
+import httpx
+import pytest
+from app.utils import supabase_clients
+from app.utils.supabase_clients import close_clients, get_async_client, get_client
+from cachetools import TTLCache
+
+
+@pytest.mark.unit
+class TestSupabaseClients:
+    """get_client / get_async_client のテスト"""
+
+    @pytest.fixture
+    def requests(self):
+        """共有のHTTPクライアントに届いたリクエスト"""
+        return []
+
+    @pytest.fixture(autouse=True)
+    def pool(self, monkeypatch, requests):
+        """環境変数とキャッシュを差し替え、共有のHTTPクライアントをモックの通信にする"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=[])
+
+        transport = httpx.MockTransport(handler)
+        monkeypatch.setenv("SUPABASE_URL", "http://supabase.test")
+        monkeypatch.setenv("SUPABASE_ANON_KEY", "anon-key")
+        monkeypatch.setattr(supabase_clients, "_bases", {})
+        monkeypatch.setattr(supabase_clients, "_clients", TTLCache(maxsize=2, ttl=60))
+        monkeypatch.setattr(
+            supabase_clients, "_async_clients", TTLCache(maxsize=2, ttl=60)
+        )
+        monkeypatch.setattr(
+            supabase_clients, "_http_client", httpx.Client(transport=transport)
+        )
+        monkeypatch.setattr(
+            supabase_clients,
+            "_async_http_client",
+            httpx.AsyncClient(transport=transport),
+        )
+
+    def test_reuses_client_for_same_token(self) -> None:
+        """同じトークンには同じクライアントを返す"""
+        assert get_client("token-a") is get_client("token-a")
+        assert get_client("token-a") is not get_client("token-b")
+
+    def test_tokens_share_http_connection_pool(self, requests) -> None:
+        """トークンごとのクライアントは共有の接続を使い、Authorization ヘッダーだけが異なる"""
+        get_client("token-a").table("orders").select("*").execute()
+        get_client("token-b").table("orders").select("*").execute()
+
+        assert [r.headers["authorization"] for r in requests] == [
+            "Bearer token-a",
+            "Bearer token-b",
+        ]
+        assert get_client("token-a").session is get_client("token-b").session
+        assert get_client("token-a").session is supabase_clients.shared_http_client()
+
+    def test_requests_carry_api_key(self, requests) -> None:
+        """PostgREST のURLに、公開キーとトークンをヘッダーにセットして問い合わせる"""
+        get_client("token-a").rpc("get_equipment_last_end_times", {}).execute()
+
+        request = requests[0]
+        assert str(request.url).startswith("http://supabase.test/rest/v1/rpc/")
+        assert request.headers["apikey"] == "anon-key"
+        assert request.headers["authorization"] == "Bearer token-a"
+
+    def test_cache_is_bounded(self) -> None:
+        """上限を超えると古いトークンのクライアントを破棄する"""
+        first = get_client("token-a")
+        get_client("token-b")
+        get_client("token-c")
+
+        assert len(supabase_clients._clients) == 2
+        assert get_client("token-a") is not first
+
+    def test_missing_settings(self, monkeypatch) -> None:
+        """環境変数がない場合は ValueError"""
+        monkeypatch.delenv("SUPABASE_URL")
+
+        with pytest.raises(ValueError):
+            get_client("token-a")
+
+    @pytest.mark.anyio
+    async def test_async_client(self, requests) -> None:
+        """非同期版も同じトークンには同じクライアントを返し、共有の接続を使う"""
+        client = await get_async_client("token-a")
+        await client.table("orders").select("*").execute()
+
+        assert await get_async_client("token-a") is client
+        assert requests[0].headers["authorization"] == "Bearer token-a"
+
+    @pytest.mark.anyio
+    async def test_close_clients(self) -> None:
+        """閉じた後は新しい接続とクライアントを作成する"""
+        http_client = supabase_clients.shared_http_client()
+        client = get_client("token-a")
+
+        await close_clients()
+
+        assert http_client.is_closed
+        assert supabase_clients.shared_http_client() is not http_client
+        assert get_client("token-a") is not client
+        await close_clients()
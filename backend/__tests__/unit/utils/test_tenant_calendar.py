@@ -0,0 +1,108 @@
+"""
+テナント別稼働カレンダーキャッシュの単体テスト
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from app.utils import tenant_calendar
+from app.utils.tenant_calendar import (
+    build_work_calendar,
+    clear_tenant_calendars,
+    invalidate_tenant_calendar,
+    load_tenant_calendar,
+)
+
+
+@pytest.mark.unit
+class TestBuildWorkCalendar:
+    """build_work_calendar関数のテスト"""
+
+    def test_build_from_rows(self) -> None:
+        """カレンダーマスタの行からカレンダーを組み立てる"""
+        calendar = build_work_calendar(
+            shifts=[
+                {
+                    "weekdays": [0, 1, 2, 3, 4],
+                    "start_time": "08:00:00",
+                    "end_time": "12:00:00",
+                }
+            ],
+            holidays=[{"holiday_date": "2025-01-07"}],
+            shutdowns=[
+                {
+                    "start_datetime": "2025-01-08T00:00:00",
+                    "end_datetime": "2025-01-09T00:00:00",
+                }
+            ],
+        )
+        # 月曜日 11:00 から2時間 → 火曜日（休日）・水曜日（停止）を飛ばして木曜日 9:00
+        result = calendar.add_working_minutes(datetime(2025, 1, 6, 11, 0), 120)
+        assert result == datetime(2025, 1, 9, 9, 0)
+
+    def test_default_shift_when_no_shifts(self) -> None:
+        """シフトが未登録の場合は既定の稼働時間（平日 9:00 - 17:00）になる"""
+        calendar = build_work_calendar(shifts=[])
+        assert calendar.next_working_instant(datetime(2025, 1, 6, 8, 0)) == datetime(
+            2025, 1, 6, 9, 0
+        )
+
+
+@pytest.mark.unit
+class TestLoadTenantCalendar:
+    """load_tenant_calendar関数のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """テストごとにキャッシュを空にする"""
+        clear_tenant_calendars()
+        yield
+        clear_tenant_calendars()
+
+    @pytest.fixture
+    def mock_repo(self):
+        """カレンダーリポジトリのモック"""
+        repo = MagicMock()
+        repo.is_tenant_visible.return_value = True
+        repo.get_shifts.return_value = []
+        repo.get_holidays.return_value = []
+        repo.get_shutdowns.return_value = []
+        return repo
+
+    def test_cached_after_first_load(self, mock_repo) -> None:
+        """2回目以降はDBを読まずにキャッシュを返す"""
+        first = load_tenant_calendar("tenant-1", mock_repo)
+        second = load_tenant_calendar("tenant-1", mock_repo)
+
+        assert first is second
+        mock_repo.get_shifts.assert_called_once_with("tenant-1")
+
+    def test_invalidate_reloads(self, mock_repo) -> None:
+        """破棄した後は再読み込みする"""
+        first = load_tenant_calendar("tenant-1", mock_repo)
+        invalidate_tenant_calendar("tenant-1")
+        second = load_tenant_calendar("tenant-1", mock_repo)
+
+        assert first is not second
+        assert mock_repo.get_shifts.call_count == 2
+
+    def test_invisible_tenant_is_not_cached(self, mock_repo) -> None:
+        """参照できないテナントはNoneを返し、キャッシュしない"""
+        mock_repo.is_tenant_visible.return_value = False
+
+        assert load_tenant_calendar("other-tenant", mock_repo) is None
+        mock_repo.get_shifts.assert_not_called()
+        assert "other-tenant" not in tenant_calendar._cache
+
+    def test_invalidation_during_load_is_not_cached(self, mock_repo) -> None:
+        """読み込み中に破棄された場合、古い内容をキャッシュしない"""
+
+        def invalidate_while_loading(tenant_id):
+            invalidate_tenant_calendar(tenant_id)
+            return []
+
+        mock_repo.get_shifts.side_effect = invalidate_while_loading
+
+        load_tenant_calendar("tenant-1", mock_repo)
+        assert "tenant-1" not in tenant_calendar._cache
@@ -0,0 +1,127 @@
+"""
+工程負荷の列指向計算の単体テスト
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+from app.utils.workload import (
+    build_operation_table,
+    rough_cut_capacity,
+    workload_by_group,
+    workload_by_order,
+)
+
+ROUTINGS_BY_PRODUCT = {
+    10: [
+        {
+            "id": 1,
+            "equipment_group_id": 100,
+            "setup_time_seconds": 600,
+            "unit_time_seconds": 60,
+        },
+        {
+            "id": 2,
+            "equipment_group_id": 200,
+            "setup_time_seconds": None,
+            "unit_time_seconds": 120,
+        },
+    ],
+    20: [
+        {
+            "id": 3,
+            "equipment_group_id": 200,
+            "setup_time_seconds": 0,
+            "unit_time_seconds": 300,
+        }
+    ],
+}
+
+ORDERS = [
+    {"id": 1, "product_id": 10, "quantity": 10},
+    {"id": 2, "product_id": 20, "quantity": 4},
+    {"id": 3, "product_id": 99, "quantity": 1},  # 工程が存在しない製品
+    {"id": 4, "product_id": 10, "quantity": 1},
+]
+
+
+@pytest.mark.unit
+class TestBuildOperationTable:
+    """build_operation_table関数のテスト"""
+
+    def test_expands_orders_by_routings(self) -> None:
+        """注文ごとに工程を sequence_order 順に展開し、所要時間を計算する"""
+        table = build_operation_table(ORDERS, ROUTINGS_BY_PRODUCT)
+
+        assert table.order_ids.tolist() == [1, 1, 2, 4, 4]
+        assert table.routing_ids.tolist() == [1, 2, 3, 1, 2]
+        assert table.group_ids.tolist() == [100, 200, 200, 100, 200]
+        np.testing.assert_allclose(table.duration_seconds, [1200, 1200, 1200, 660, 120])
+
+    def test_minutes_for_order(self) -> None:
+        """注文の工程ごとの所要時間（分）を返す。工程のない注文は空"""
+        table = build_operation_table(ORDERS, ROUTINGS_BY_PRODUCT)
+
+        assert table.minutes_for(1) == [20.0, 20.0]
+        assert table.minutes_for(3) == []
+        assert table.minutes_for(4) == [11.0, 2.0]
+
+    def test_take_orders(self) -> None:
+        """指定した注文の行だけを、指定した順に並べたテーブルを返す"""
+        table = build_operation_table(ORDERS, ROUTINGS_BY_PRODUCT).take([4, 3, 2])
+
+        assert table.order_ids.tolist() == [4, 4, 2]
+        assert table.routing_ids.tolist() == [1, 2, 3]
+        assert table.order_starts.tolist() == [0, 2, 2, 3]
+        assert table.minutes_for(4) == [11.0, 2.0]
+        assert table.minutes_for(3) == []
+        assert table.minutes_for(2) == [20.0]
+
+    def test_empty_orders(self) -> None:
+        """注文がない場合は空のテーブル"""
+        table = build_operation_table([], ROUTINGS_BY_PRODUCT)
+
+        assert len(table) == 0
+        assert workload_by_group(table) == {}
+
+
+@pytest.mark.unit
+class TestRoughCutCapacity:
+    """workload_by_group / rough_cut_capacity 関数のテスト"""
+
+    def test_workload_by_group(self) -> None:
+        """設備グループごとの負荷（分）を合計する"""
+        table = build_operation_table(ORDERS, ROUTINGS_BY_PRODUCT)
+
+        assert workload_by_group(table) == {100: 31.0, 200: 42.0}
+
+    def test_workload_by_order(self) -> None:
+        """注文ごとの総所要時間（分）を注文の順に返す。工程のない注文は0"""
+        table = build_operation_table(ORDERS, ROUTINGS_BY_PRODUCT)
+
+        np.testing.assert_allclose(workload_by_order(table), [40.0, 20.0, 0.0, 13.0])
+
+    def test_rough_cut_capacity(self) -> None:
+        """負荷と稼働可能時間（設備台数 × 稼働時間）を比べ、負荷率の高い順に並べる"""
+        table = build_operation_table(ORDERS, ROUTINGS_BY_PRODUCT)
+
+        # 月曜日 9:00 - 9:30 の30分間。設備グループ200には設備がない
+        rows = rough_cut_capacity(
+            table,
+            {100: [1, 2]},
+            datetime(2025, 1, 6, 9, 0),
+            datetime(2025, 1, 6, 9, 30),
+        )
+
+        assert rows[0]["equipment_group_id"] == 200
+        assert rows[0]["utilization"] is None
+        assert rows[0]["overloaded"] is True
+        assert rows[1] == {
+            "equipment_group_id": 100,
+            "machine_count": 2,
+            "required_minutes": 31.0,
+            "available_minutes": 60.0,
+            "utilization": pytest.approx(31 / 60),
+            "overloaded": False,
+        }
@@ -1,16 +1,31 @@
 # backend/app/dependencies.py
-import os
+from uuid import UUID
 
+import jwt
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+
+from app.repositories.supa_async import (
+    AsyncCalendarRepository,
+    AsyncEquipmentRepository,
+    AsyncOrderRepository,
+    AsyncProductRepository,
+    AsyncScheduleRepository,
+)
 from app.repositories.supa_infra import (
+    CalendarRepository,
     EquipmentRepository,
+    MemberRepository,
     OrderRepository,
     ProductRepository,
     ScheduleRepository,
 )
-from supabase import Client, ClientOptions, create_client  # type: ignore
+from app.utils.auth import TokenClaims, resolve_membership, verify_token
+from app.utils.calendar import WorkCalendar
+from app.utils.job_queue import JobQueue, scheduling_jobs
+from app.utils.supabase_clients import get_async_client, get_client
+from app.utils.tenant_calendar import load_tenant_calendar
 
 # Bearer Token (JWT) を取得するためのスキーム
 security = HTTPBearer()
@@ -23,32 +38,88 @@ def get_current_user_token(
     return credentials.credentials
 
 
-def get_current_tenant_id(x_tenant_id: str = Header(...)) -> str:
-    """テナントIDを取得する"""
+def get_token_claims(token: str = Depends(get_current_user_token)) -> TokenClaims:
+    """
+    アクセストークンをローカルで検証し、クレームを取得する。
+    検証済みのユーザーIDは、ユーザー単位のキャッシュのキーとして使える。
+    """
+    try:
+        return verify_token(token)
+    except jwt.PyJWTError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        ) from e
+
+
+def get_current_tenant_id(
+    x_tenant_id: str = Header(...),
+    token: str = Depends(get_current_user_token),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> str:
+    """
+    テナントIDを取得する。
+
+    ログインユーザーが所属していないテナントの場合は、データを読み書きする前に403を返す。
+    所属の確認結果はトークンの有効期限までキャッシュし、以降のリクエストでは問い合わせない。
+    """
+    try:
+        UUID(x_tenant_id)
+    except ValueError:
+        is_member = False
+    else:
+        is_member = resolve_membership(
+            claims,
+            x_tenant_id,
+            lambda: MemberRepository(get_client(token)).is_member(
+                claims.user_id, x_tenant_id
+            ),
+        )
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tenant not accessible",
+        )
     return x_tenant_id
 
 
-def get_supabase_client(token: str = Depends(get_current_user_token)) -> Client:
+def get_supabase_client(
+    token: str = Depends(get_current_user_token),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> SyncPostgrestClient:
     """
-    ユーザーのトークンを使ってSupabaseクライアントを初期化する。
+    ユーザーのトークンを使ったSupabaseクライアントを取得する。
     これによりDB側で auth.uid() が機能し、RLSが正しく動作する。
+
+    トークンは get_token_claims で検証し、検証できない場合はクライアントを作らずに401を返す
+    （クライアントはトークンごとにキャッシュするため、検証を経ないと不正なトークンでも
+    キャッシュ済みのクライアントを受け取れてしまう）。
+    HTTPコネクションはプロセス全体で共有し、最近使われたトークンのクライアントは再利用する。
     """
-    # Supabaseクライアントはアプリ全体で1つだけ作成（シングルトン）
-    sb_url = os.environ.get("SUPABASE_URL")
-    # 公開キー(anon key)を使用(service_role keyは絶対に使わない)
-    sb_anon_key = os.environ.get("SUPABASE_ANON_KEY")
+    try:
+        # headersにAuthorizationをセットしたクライアントで、ユーザーとして振る舞う
+        return get_client(token)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        ) from e
 
-    if not sb_url or not sb_anon_key:
-        raise ValueError("Supabase environment variables are not set.")
 
+async def get_async_supabase_client(
+    token: str = Depends(get_current_user_token),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> AsyncPostgrestClient:
+    """
+    ユーザーのトークンを使った非同期Supabaseクライアントを取得する。
+    認証とクライアントの再利用の扱いは get_supabase_client と同じ。
+    """
     try:
-        # headersにAuthorizationをセットすることで、ユーザーとして振る舞う
-        client = create_client(
-            sb_url,
-            sb_anon_key,
-            options=ClientOptions(headers={"Authorization": f"Bearer {token}"}),
-        )
-        return client
+        return await get_async_client(token)
+    except ValueError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,27 +130,93 @@ def get_supabase_client(token: str = Depends(get_current_user_token)) -> Client:
 # --- Dependency Injection用の関数 ---
 
 
-def get_order_repo(client: Client = Depends(get_supabase_client)) -> OrderRepository:
+def get_order_repo(
+    client: SyncPostgrestClient = Depends(get_supabase_client),
+) -> OrderRepository:
     """注文リポジトリを取得する。"""
     return OrderRepository(client)
 
 
 def get_schedule_repo(
-    client: Client = Depends(get_supabase_client),
+    client: SyncPostgrestClient = Depends(get_supabase_client),
 ) -> ScheduleRepository:
     """スケジュールリポジトリを取得する。"""
     return ScheduleRepository(client)
 
 
 def get_product_repo(
-    client: Client = Depends(get_supabase_client),
+    client: SyncPostgrestClient = Depends(get_supabase_client),
 ) -> ProductRepository:
     """プロダクトリポジトリを取得する。"""
     return ProductRepository(client)
 
 
 def get_equipment_repo(
-    client: Client = Depends(get_supabase_client),
+    client: SyncPostgrestClient = Depends(get_supabase_client),
 ) -> EquipmentRepository:
     """設備リポジトリを取得する。"""
     return EquipmentRepository(client)
+
+
+def get_calendar_repo(
+    client: SyncPostgrestClient = Depends(get_supabase_client),
+) -> CalendarRepository:
+    """カレンダーリポジトリを取得する。"""
+    return CalendarRepository(client)
+
+
+def get_tenant_calendar(
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: CalendarRepository = Depends(get_calendar_repo),
+) -> WorkCalendar:
+    """テナントのコンパイル済み稼働カレンダーを取得する（プロセス内キャッシュを使用）。"""
+    calendar = load_tenant_calendar(tenant_id, repo)
+    if calendar is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tenant not accessible",
+        )
+    return calendar
+
+
+def get_job_queue() -> JobQueue:
+    """スケジューリングジョブキューを取得する。"""
+    return scheduling_jobs
+
+
+# --- 非同期リポジトリ ---
+
+
+def get_async_order_repo(
+    client: AsyncPostgrestClient = Depends(get_async_supabase_client),
+) -> AsyncOrderRepository:
+    """非同期の注文リポジトリを取得する。"""
+    return AsyncOrderRepository(client)
+
+
+def get_async_schedule_repo(
+    client: AsyncPostgrestClient = Depends(get_async_supabase_client),
+) -> AsyncScheduleRepository:
+    """非同期のスケジュールリポジトリを取得する。"""
+    return AsyncScheduleRepository(client)
+
+
+def get_async_product_repo(
+    client: AsyncPostgrestClient = Depends(get_async_supabase_client),
+) -> AsyncProductRepository:
+    """非同期のプロダクトリポジトリを取得する。"""
+    return AsyncProductRepository(client)
+
+
+def get_async_equipment_repo(
+    client: AsyncPostgrestClient = Depends(get_async_supabase_client),
+) -> AsyncEquipmentRepository:
+    """非同期の設備リポジトリを取得する。"""
+    return AsyncEquipmentRepository(client)
+
+
+def get_async_calendar_repo(
+    client: AsyncPostgrestClient = Depends(get_async_supabase_client),
+) -> AsyncCalendarRepository:
+    """非同期のカレンダーリポジトリを取得する。"""
+    return AsyncCalendarRepository(client)
@@ -1,19 +1,40 @@
 # backend/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from app.routers.analytics import analytics_router
 from app.routers.master import (
+    calendar_router,
     equipment_group_router,
     equipment_router,
     process_routing_router,
     product_router,
 )
-from app.routers.transaction import orders_router
+from app.routers.transaction import orders_router, production_schedule_router
+from app.utils.job_queue import scheduling_jobs
+from app.utils.process_pool import shutdown_process_pool
+from app.utils.supabase_clients import close_clients
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    アプリの終了時に、スケジューリングジョブのワーカースレッド・計画用のプロセスと
+    共有のHTTP接続を閉じる
+    """
+    yield
+    scheduling_jobs.shutdown(wait=False)
+    shutdown_process_pool()
+    await close_clients()
+
 
 # FastAPIアプリの初期化
 app = FastAPI(
     title="Product Planner API",
     description="API on Render",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # ルーターの登録
@@ -21,7 +42,10 @@ app.include_router(product_router)
 app.include_router(equipment_router)
 app.include_router(equipment_group_router)
 app.include_router(process_routing_router)
+app.include_router(calendar_router)
 app.include_router(orders_router)
+app.include_router(production_schedule_router)
+app.include_router(analytics_router)
 
 
 @app.get("/health")
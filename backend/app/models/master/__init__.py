@@ -1,10 +1,21 @@
 # backend/app/models/master/__init__.py
-from .process_routings import RoutingCreate, RoutingUpdate
+from .calendar_schemas import (
+    CalendarHolidayCreate,
+    CalendarShiftCreate,
+    CalendarShiftUpdate,
+    PlantShutdownCreate,
+)
+from .process_routings import RoutingCreate, RoutingUpdate, SetupChangeoverCreate
 from .product_schemas import ProductCreateSchema, ProductUpdateSchema
 
 __all__ = [
+    "CalendarHolidayCreate",
+    "CalendarShiftCreate",
+    "CalendarShiftUpdate",
+    "PlantShutdownCreate",
     "ProductCreateSchema",
     "ProductUpdateSchema",
     "RoutingCreate",
     "RoutingUpdate",
+    "SetupChangeoverCreate",
 ]
@@ -0,0 +1,63 @@
+# models/master/calendar_schemas.py
+from datetime import date, datetime, time
+from typing import Annotated
+
+from pydantic import Field, model_validator
+
+from app.models.common.base_schema import BaseSchema
+
+# 曜日（0=月曜日 ... 6=日曜日）
+Weekday = Annotated[int, Field(ge=0, le=6)]
+
+
+# --- Calendar Shifts ---
+class CalendarShiftCreate(BaseSchema):
+    """稼働シフトを作成するためのスキーマ"""
+
+    name: str | None = Field(default=None, description="シフト名")
+    weekdays: list[Weekday] = Field(
+        default=..., min_length=1, description="稼働する曜日（0=月曜日 ... 6=日曜日）"
+    )
+    start_time: time = Field(default=..., description="シフト開始時刻")
+    end_time: time = Field(
+        default=..., description="シフト終了時刻（開始時刻以前の場合は翌日まで）"
+    )
+
+
+class CalendarShiftUpdate(BaseSchema):
+    """稼働シフトを更新するためのスキーマ"""
+
+    name: str | None = Field(default=None, description="シフト名")
+    weekdays: list[Weekday] | None = Field(
+        default=None, min_length=1, description="稼働する曜日（0=月曜日 ... 6=日曜日）"
+    )
+    start_time: time | None = Field(default=None, description="シフト開始時刻")
+    end_time: time | None = Field(default=None, description="シフト終了時刻")
+
+
+# --- Calendar Holidays ---
+class CalendarHolidayCreate(BaseSchema):
+    """休日を作成するためのスキーマ"""
+
+    holiday_date: date = Field(default=..., description="休日")
+    name: str | None = Field(default=None, description="休日名")
+
+
+# --- Plant Shutdowns ---
+class PlantShutdownCreate(BaseSchema):
+    """工場停止期間を作成するためのスキーマ"""
+
+    start_datetime: datetime = Field(
+        default=..., description="停止開始日時（工場の現地時刻）"
+    )
+    end_datetime: datetime = Field(
+        default=..., description="停止終了日時（工場の現地時刻）"
+    )
+    reason: str | None = Field(default=None, description="停止理由")
+
+    @model_validator(mode="after")
+    def check_period(self) -> "PlantShutdownCreate":
+        """終了日時が開始日時より後であることを確認する"""
+        if self.end_datetime <= self.start_datetime:
+            raise ValueError("end_datetime must be after start_datetime")
+        return self
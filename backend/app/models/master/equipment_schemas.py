@@ -1,6 +1,7 @@
 # models/master/equipment_schemas.py
+from datetime import datetime
 
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from app.models.common.base_schema import BaseSchema
 
@@ -71,3 +72,19 @@ class EquipmentGroupMembers(EquipmentGroupMembersBase):
 
 # 中間テーブルにおいてUpdateは定義しない
 # 古い紐付けを DELETE して新しい紐付けを INSERT する
+
+
+# --- Equipment Downtimes ---
+class EquipmentDowntimeCreate(BaseSchema):
+    """設備停止期間（保全・メンテナンス）を作成するためのスキーマ"""
+
+    start_datetime: datetime = Field(default=..., description="停止開始日時")
+    end_datetime: datetime = Field(default=..., description="停止終了日時")
+    reason: str | None = Field(default=None, description="停止理由")
+
+    @model_validator(mode="after")
+    def check_period(self) -> "EquipmentDowntimeCreate":
+        """終了日時が開始日時より後であることを確認する"""
+        if self.end_datetime <= self.start_datetime:
+            raise ValueError("end_datetime must be after start_datetime")
+        return self
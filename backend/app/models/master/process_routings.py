@@ -15,6 +15,9 @@ class RoutingCreate(BaseSchema):
     setup_time_seconds: int = Field(default=0, description="セットアップ時間")
     unit_time_seconds: float = Field(default=0, description="単位時間")
     setup_method_id: int | None = Field(default=None, description="段取り方法ID")
+    allow_split: bool = Field(
+        default=False, description="稼働時間の区切りをまたいで作業を分割できるか"
+    )
 
 
 class RoutingUpdate(BaseSchema):
@@ -26,3 +29,14 @@ class RoutingUpdate(BaseSchema):
     setup_time_seconds: int | None = Field(default=None, description="セットアップ時間")
     unit_time_seconds: float | None = Field(default=None, description="単位時間")
     setup_method_id: int | None = Field(default=None, description="段取り方法ID")
+    allow_split: bool | None = Field(
+        default=None, description="稼働時間の区切りをまたいで作業を分割できるか"
+    )
+
+
+class SetupChangeoverCreate(BaseSchema):
+    """段取り替え時間を登録するためのスキーマ"""
+
+    from_setup_method_id: int = Field(default=..., description="切替前の段取り方法ID")
+    to_setup_method_id: int = Field(default=..., description="切替後の段取り方法ID")
+    setup_time_seconds: int = Field(default=..., ge=0, description="段取り替え時間")
@@ -1,4 +1,16 @@
 # backend/app/models/transaction/__init__.py
-from .schedule import ScheduleRequest
+from .schedule import (
+    BatchScheduleRequest,
+    OptimizeScheduleRequest,
+    ScheduleRequest,
+    SimulatedOrder,
+    SimulateScheduleRequest,
+)
 
-__all__ = ["ScheduleRequest"]
+__all__ = [
+    "BatchScheduleRequest",
+    "OptimizeScheduleRequest",
+    "ScheduleRequest",
+    "SimulateScheduleRequest",
+    "SimulatedOrder",
+]
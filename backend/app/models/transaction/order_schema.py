@@ -1,4 +1,7 @@
 # models/transaction/order_schema.py
+from datetime import datetime
+
+from pydantic import Field
 
 from app.models.common.base_schema import BaseSchema
 
@@ -19,3 +22,19 @@ class OrderUpdate(BaseSchema):
     product_id: int | None = None
     quantity: int | None = None
     deadline_date: str | None = None
+
+
+class OrderPromiseLine(BaseSchema):
+    """納期回答を求める注文明細"""
+
+    product_id: int
+    quantity: int = Field(gt=0)
+
+
+class OrderPromiseRequest(BaseSchema):
+    """注文明細ごとの最短完了日時を求めるリクエスト"""
+
+    lines: list[OrderPromiseLine] = Field(min_length=1, max_length=100)
+    start_time: datetime | None = Field(
+        default=None, description="基準時刻（指定なしの場合は現在時刻）"
+    )
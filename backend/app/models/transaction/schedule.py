@@ -1,5 +1,8 @@
 # models/transaction/schedule.py
-from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
 
 
 class ScheduleRequest(BaseModel):
@@ -8,3 +11,118 @@ class ScheduleRequest(BaseModel):
     """
 
     order_id: int
+    start_time: datetime | None = Field(
+        default=None, description="スケジュール開始基準時刻（指定なしの場合は現在時刻）"
+    )
+    mode: Literal["append", "insertion"] = Field(
+        default="append",
+        description="append: 設備の最終終了時刻の後ろに追加 / insertion: 空き時間帯に挿入",
+    )
+    policy: Literal["earliest_start", "earliest_finish", "least_loaded"] = Field(
+        default="earliest_start",
+        description=(
+            "設備の選定方針 earliest_start: 最も早く開始 / earliest_finish: "
+            "最も早く終了 / least_loaded: 割り当てた稼働時間が最も少ない"
+        ),
+    )
+
+
+class BatchScheduleRequest(BaseModel):
+    """
+    未スケジュールの注文をまとめてスケジュールするリクエスト
+    """
+
+    start_time: datetime | None = Field(
+        default=None, description="スケジュール開始基準時刻（指定なしの場合は現在時刻）"
+    )
+    mode: Literal["append", "insertion"] = Field(
+        default="append",
+        description="append: 設備の最終終了時刻の後ろに追加 / insertion: 空き時間帯に挿入",
+    )
+    policy: Literal["earliest_start", "earliest_finish", "least_loaded"] = Field(
+        default="earliest_start",
+        description=(
+            "設備の選定方針 earliest_start: 最も早く開始 / earliest_finish: "
+            "最も早く終了 / least_loaded: 割り当てた稼働時間が最も少ない"
+        ),
+    )
+    rule: Literal["fifo", "edd", "spt", "cr"] = Field(
+        default="fifo",
+        description=(
+            "注文を割り当てる順序 fifo: 受注日時順 / edd: 納期順 / "
+            "spt: 総加工時間が短い順 / cr: 納期までの残り時間÷総加工時間が小さい順"
+        ),
+    )
+    parallel: bool = Field(
+        default=False,
+        description="設備を共有しない注文のまとまりごとに、CPUのすべてのコアで並行に計画する",
+    )
+    setup_window: int = Field(
+        default=0,
+        ge=0,
+        le=1000,
+        description=(
+            "段取り方法が同じ注文を続けて割り当てるため、後ろの何件以内の注文を"
+            "引き寄せるか（0 の場合は並べ替えない）"
+        ),
+    )
+
+
+class SimulatedOrder(BaseModel):
+    """
+    シミュレーションする仮の注文
+    """
+
+    product_id: int
+    quantity: int = Field(gt=0)
+    deadline_date: date | None = Field(
+        default=None, description="納期（指定した場合は納期遅れも計算する）"
+    )
+
+
+class SimulateScheduleRequest(BaseModel):
+    """
+    仮の注文をDBに書き込まずにスケジュールしてみるリクエスト
+    """
+
+    orders: list[SimulatedOrder] = Field(min_length=1, max_length=500)
+    start_time: datetime | None = Field(
+        default=None, description="スケジュール開始基準時刻（指定なしの場合は現在時刻）"
+    )
+    mode: Literal["append", "insertion"] = Field(
+        default="append",
+        description="append: 設備の最終終了時刻の後ろに追加 / insertion: 空き時間帯に挿入",
+    )
+    policy: Literal["earliest_start", "earliest_finish", "least_loaded"] = Field(
+        default="earliest_start",
+        description=(
+            "設備の選定方針 earliest_start: 最も早く開始 / earliest_finish: "
+            "最も早く終了 / least_loaded: 割り当てた稼働時間が最も少ない"
+        ),
+    )
+    cumulative: bool = Field(
+        default=False,
+        description=(
+            "false: 各注文を現在のスケジュールに対して個別に計画（見積もりの比較） / "
+            "true: 注文を順に積み上げて計画"
+        ),
+    )
+
+
+class OptimizeScheduleRequest(BaseModel):
+    """
+    保存済みのスケジュールを局所探索で改善するリクエスト
+    """
+
+    objective: Literal["makespan", "total_tardiness"] = Field(
+        default="makespan",
+        description="makespan: 最後の作業の終了時刻 / total_tardiness: 納期遅れの合計",
+    )
+    time_limit_seconds: float = Field(
+        default=5.0, gt=0, le=300, description="探索に使う最大の経過時間（秒）"
+    )
+    parallel: bool = Field(
+        default=False, description="CPUのすべてのコアで並行に探索する"
+    )
+    apply: bool = Field(default=False, description="改善したスケジュールを保存する")
+    seed: int | None = Field(default=None, description="乱数の種（再現用）")
@@ -0,0 +1,20 @@
+# backend/app/repositories/supa_async/__init__.py
+from app.repositories.supa_async.master import (
+    AsyncCalendarRepository,
+    AsyncEquipmentRepository,
+    AsyncProductRepository,
+)
+from app.repositories.supa_async.transaction import (
+    AsyncOrderRepository,
+    AsyncScheduleRepository,
+)
+
+__all__ = [
+    # master
+    "AsyncCalendarRepository",
+    "AsyncEquipmentRepository",
+    "AsyncProductRepository",
+    # transaction
+    "AsyncOrderRepository",
+    "AsyncScheduleRepository",
+]
@@ -0,0 +1,14 @@
+# repositories/supa_async/common/__init__.py
+from .base_repo import (
+    AsyncBaseRepository,
+    chunked,
+    fetch_all_pages_async,
+    gather_with_limit,
+)
+
+__all__ = [
+    "AsyncBaseRepository",
+    "chunked",
+    "fetch_all_pages_async",
+    "gather_with_limit",
+]
@@ -0,0 +1,180 @@
+# repositories/supa_async/common/base_repo.py
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import Any, Generic, TypeVar, cast
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.exceptions import APIError
+
+from app.repositories.supa_infra.common.base_repo import (
+    DEFAULT_BULK_CHUNK_SIZE,
+    IN_FILTER_CHUNK_SIZE,
+    MAX_ROWS_PER_REQUEST,
+)
+from app.repositories.supa_infra.common.bulk_result import BulkWriteResult
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T", bound=dict[str, Any])  # 型変数を定義
+R = TypeVar("R")
+
+# 1回の処理で同時に発行するPostgRESTリクエストの上限
+MAX_CONCURRENT_REQUESTS = 8
+
+
+async def gather_with_limit(
+    awaitables: Iterable[Awaitable[R]], limit: int = MAX_CONCURRENT_REQUESTS
+) -> list[R]:
+    """
+    複数のリクエストを同時実行数を limit に抑えて並行実行し、入力順に結果を返す。
+
+    Args:
+        awaitables: 実行するコルーチンの一覧
+        limit: 同時に実行する最大数
+
+    Returns:
+        入力と同じ順序に並んだ結果のリスト
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable: Awaitable[R]) -> R:
+        async with semaphore:
+            return await awaitable
+
+    return list(await asyncio.gather(*(run(a) for a in awaitables)))
+
+
+async def fetch_all_pages_async(
+    build_query: Callable[[], Any], page_size: int = MAX_ROWS_PER_REQUEST
+) -> list[Any]:
+    """
+    PostgRESTの max_rows を超える結果を、range指定のページングで全件取得する（非同期版）。
+
+    次のページが必要かどうかは前のページの件数で決まるため、ページは順番に取得する。
+    build_query では必ず order() を指定すること。
+
+    Args:
+        build_query: range() と execute() を呼ぶ前のクエリを返す関数
+        page_size: 1リクエストで取得する行数
+
+    Returns:
+        全ページの行を連結したリスト
+    """
+    rows: list[Any] = []
+    offset = 0
+    while True:
+        res = await build_query().range(offset, offset + page_size - 1).execute()
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
+
+
+def chunked(ids: Sequence[R], size: int = IN_FILTER_CHUNK_SIZE) -> list[list[R]]:
+    """in_() フィルタに渡せる件数ごとにIDを分割する。"""
+    return [list(ids[start : start + size]) for start in range(0, len(ids), size)]
+
+
+class AsyncBaseRepository(Generic[T]):
+    """非同期Supabaseクライアントで基本的なCRUD操作を行う抽象クラス。"""
+
+    def __init__(self, client: AsyncPostgrestClient, table_name: str):
+        """初期化"""
+        self.client = client
+        self.table_name = table_name
+
+    async def get_all(self) -> list[T]:
+        """全件取得"""
+        logger.info(f"Fetching all records from {self.table_name}")
+        res = await self.client.table(self.table_name).select("*").execute()
+        return cast(list[T], res.data or [])
+
+    async def get_by_id(self, id: int) -> T | None:
+        """ID指定で1件取得"""
+        logger.info(f"Fetching record {id} from {self.table_name}")
+        res = (
+            await self.client.table(self.table_name)
+            .select("*")
+            .eq("id", id)
+            .maybe_single()
+            .execute()
+        )
+        return cast(T, res.data) if res else None
+
+    async def create(self, data: dict[str, Any]) -> T:
+        """新規作成 (Create)"""
+        logger.info(f"Creating record in {self.table_name}")
+        res = await self.client.table(self.table_name).insert(data).execute()
+        return cast(T, res.data)
+
+    async def update(self, id: int, data: dict[str, Any]) -> T:
+        """更新 (Update / Patch) - 指定したフィールドのみ更新される"""
+        logger.info(f"Updating record {id} in {self.table_name}")
+        res = (
+            await self.client.table(self.table_name).update(data).eq("id", id).execute()
+        )
+        return cast(T, res.data)
+
+    async def delete(self, id: int) -> bool:
+        """削除 (Delete) - 削除された行が返却された場合に成功とみなす"""
+        logger.info(f"Deleting record {id} from {self.table_name}")
+        res = await self.client.table(self.table_name).delete().eq("id", id).execute()
+        return bool(res.data)
+
+    async def delete_many(self, ids: Sequence[int]) -> int:
+        """複数削除 (Delete) - IDを分割して並行に削除し、削除件数を返す"""
+        logger.info(f"Deleting {len(ids)} records from {self.table_name}")
+        results = await gather_with_limit(
+            self.client.table(self.table_name).delete().in_("id", chunk).execute()
+            for chunk in chunked(ids)
+        )
+        return sum(len(res.data or []) for res in results)
+
+    async def create_many(
+        self,
+        rows: Sequence[dict[str, Any]],
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> BulkWriteResult:
+        """
+        一括作成 (Bulk Create)
+
+        行を chunk_size 件ずつの複数行INSERTに分割し、チャンクを並行に送信する。
+        失敗の扱いは同期版の BaseRepository.create_many と同じ。
+
+        Args:
+            rows: 作成する行のリスト
+            chunk_size: 1リクエストに含める最大行数
+
+        Returns:
+            BulkWriteResult: 入力順の生成IDと、失敗したチャンクの一覧
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive: {chunk_size}")
+
+        logger.info(f"Creating {len(rows)} records in {self.table_name}")
+        result = BulkWriteResult(ids=[None] * len(rows))
+
+        async def write(chunk_index: int, start: int) -> None:
+            chunk = list(rows[start : start + chunk_size])
+            try:
+                res = await self.client.table(self.table_name).insert(chunk).execute()
+            except (APIError, httpx.HTTPError) as e:
+                message = e.message if isinstance(e, APIError) else str(e)
+                logger.warning(
+                    f"Bulk write chunk {chunk_index} to {self.table_name} failed: "
+                    f"{message}"
+                )
+                result.record_failure(chunk_index, start, len(chunk), str(message))
+                return
+            result.record_rows(chunk_index, start, len(chunk), res.data or [])
+
+        await gather_with_limit(
+            write(chunk_index, start)
+            for chunk_index, start in enumerate(range(0, len(rows), chunk_size))
+        )
+        # 並行実行のため、失敗したチャンクは入力順に並べ直す
+        result.errors.sort(key=lambda error: error.chunk_index)
+        return result
@@ -0,0 +1,10 @@
+# repositories/supa_async/master/__init__.py
+from .calendar_repo import AsyncCalendarRepository
+from .equipment_repo import AsyncEquipmentRepository
+from .product_repo import AsyncProductRepository
+
+__all__ = [
+    "AsyncCalendarRepository",
+    "AsyncEquipmentRepository",
+    "AsyncProductRepository",
+]
@@ -0,0 +1,118 @@
+# repositories/supa_async/master/calendar_repo.py
+from typing import Any, TypeVar, cast
+
+from app.repositories.supa_async.common import AsyncBaseRepository
+from app.repositories.supa_infra.common import SupabaseTableName
+
+T = TypeVar("T", bound=dict[str, Any])  # 型変数を定義
+
+
+class AsyncCalendarRepository(AsyncBaseRepository[T]):
+    """
+    テナントの稼働カレンダー（シフト・休日・工場停止期間）を管理する非同期リポジトリクラス。
+
+    同期版の CalendarRepository と同じく、RLSに加えてすべての操作を tenant_id で絞り込む。
+    """
+
+    def __init__(self, client):
+        super().__init__(client, SupabaseTableName.CALENDAR_SHIFTS.value)
+
+    # --- 共通処理 ---
+
+    async def _list(
+        self, table: SupabaseTableName, tenant_id: str, order: str
+    ) -> list[T]:
+        """テナントの行を一覧取得する。"""
+        res = (
+            await self.client.table(table.value)
+            .select("*")
+            .eq("tenant_id", tenant_id)
+            .order(order)
+            .execute()
+        )
+        return cast(list[T], res.data or [])
+
+    async def _create(self, table: SupabaseTableName, data: dict[str, Any]) -> T:
+        """行を1件登録する。"""
+        res = await self.client.table(table.value).insert(data).execute()
+        return cast(T, res.data)
+
+    async def _update(
+        self, table: SupabaseTableName, tenant_id: str, id: int, data: dict[str, Any]
+    ) -> list[T]:
+        """テナントの行を1件更新し、更新後の行を返す。"""
+        res = (
+            await self.client.table(table.value)
+            .update(data)
+            .eq("id", id)
+            .eq("tenant_id", tenant_id)
+            .execute()
+        )
+        return cast(list[T], res.data or [])
+
+    async def _delete(self, table: SupabaseTableName, tenant_id: str, id: int) -> bool:
+        """テナントの行を1件削除し、削除できたかどうかを返す。"""
+        res = (
+            await self.client.table(table.value)
+            .delete()
+            .eq("id", id)
+            .eq("tenant_id", tenant_id)
+            .execute()
+        )
+        return bool(res.data)
+
+    # --- Calendar Shifts ---
+
+    async def get_shifts(self, tenant_id: str) -> list[T]:
+        """テナントの稼働シフトを取得する。"""
+        return await self._list(SupabaseTableName.CALENDAR_SHIFTS, tenant_id, "id")
+
+    async def update_shift(
+        self, tenant_id: str, shift_id: int, data: dict[str, Any]
+    ) -> list[T]:
+        """稼働シフトを更新する。"""
+        return await self._update(
+            SupabaseTableName.CALENDAR_SHIFTS, tenant_id, shift_id, data
+        )
+
+    async def delete_shift(self, tenant_id: str, shift_id: int) -> bool:
+        """稼働シフトを削除する。"""
+        return await self._delete(
+            SupabaseTableName.CALENDAR_SHIFTS, tenant_id, shift_id
+        )
+
+    # --- Calendar Holidays ---
+
+    async def get_holidays(self, tenant_id: str) -> list[T]:
+        """テナントの休日を取得する。"""
+        return await self._list(
+            SupabaseTableName.CALENDAR_HOLIDAYS, tenant_id, "holiday_date"
+        )
+
+    async def create_holiday(self, data: dict[str, Any]) -> T:
+        """休日を登録する。"""
+        return await self._create(SupabaseTableName.CALENDAR_HOLIDAYS, data)
+
+    async def delete_holiday(self, tenant_id: str, holiday_id: int) -> bool:
+        """休日を削除する。"""
+        return await self._delete(
+            SupabaseTableName.CALENDAR_HOLIDAYS, tenant_id, holiday_id
+        )
+
+    # --- Plant Shutdowns ---
+
+    async def get_shutdowns(self, tenant_id: str) -> list[T]:
+        """テナントの工場停止期間を取得する。"""
+        return await self._list(
+            SupabaseTableName.PLANT_SHUTDOWNS, tenant_id, "start_datetime"
+        )
+
+    async def create_shutdown(self, data: dict[str, Any]) -> T:
+        """工場停止期間を登録する。"""
+        return await self._create(SupabaseTableName.PLANT_SHUTDOWNS, data)
+
+    async def delete_shutdown(self, tenant_id: str, shutdown_id: int) -> bool:
+        """工場停止期間を削除する。"""
+        return await self._delete(
+            SupabaseTableName.PLANT_SHUTDOWNS, tenant_id, shutdown_id
+        )
@@ -0,0 +1,180 @@
+# repositories/supa_async/master/equipment_repo.py
+from typing import Any, TypeVar, cast
+
+from postgrest.exceptions import APIError
+
+from app.repositories.supa_async.common import (
+    AsyncBaseRepository,
+    fetch_all_pages_async,
+)
+from app.repositories.supa_infra.common import SupabaseTableName
+
+T = TypeVar("T", bound=dict[str, Any])  # 型変数を定義
+
+
+class AsyncEquipmentRepository(AsyncBaseRepository[T]):
+    """設備・設備グループ・設備停止期間を扱う非同期リポジトリクラス。
+
+    読み込み結果の形式は同期版の EquipmentRepository と同じ。
+    削除系のメソッドは、削除された行が返却された場合に成功とみなす。
+    """
+
+    def __init__(self, client):
+        super().__init__(client, SupabaseTableName.EQUIPMENTS.value)
+
+    # --- Equipment Groups (別テーブル操作) ---
+
+    async def get_all_groups(self) -> list[T]:
+        """設備グループのリストを取得する。"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_GROUPS.value)
+            .select("*")
+            .execute()
+        )
+        return cast(list[T], res.data or [])
+
+    async def create_group(self, data: dict[str, Any]) -> T:
+        """設備グループを新規作成"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_GROUPS.value)
+            .insert(data)
+            .execute()
+        )
+        return cast(T, res.data)
+
+    async def get_group_by_id(self, group_id: int) -> T | None:
+        """設備グループID検索"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_GROUPS.value)
+            .select("*")
+            .eq("id", group_id)
+            .maybe_single()
+            .execute()
+        )
+        return cast(T, res.data) if res else None
+
+    async def update_group(self, group_id: int, data: dict[str, Any]) -> T:
+        """設備グループ更新"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_GROUPS.value)
+            .update(data)
+            .eq("id", group_id)
+            .execute()
+        )
+        return cast(T, res.data)
+
+    async def delete_group(self, group_id: int) -> bool:
+        """設備グループ削除"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_GROUPS.value)
+            .delete()
+            .eq("id", group_id)
+            .execute()
+        )
+        return bool(res.data)
+
+    # --- Group Members (交差テーブル操作) ---
+
+    async def add_machine_to_group(self, group_id: int, equipment_id: int):
+        """グループに機械を追加（登録済みの場合はNone）"""
+        try:
+            res = (
+                await self.client.table(SupabaseTableName.EQUIPMENT_GROUP_MEMBERS.value)
+                .insert(
+                    {
+                        "equipment_group_id": group_id,
+                        "equipment_id": equipment_id,
+                    }
+                )
+                .execute()
+            )
+            return res.data
+
+        except APIError as e:
+            # Postgresの重複エラーコードは "23505"
+            if e.code == "23505" or "duplicate key" in e.message:  # type: ignore
+                return None
+            raise e
+
+    async def remove_machine_from_group(self, group_id: int, equipment_id: int) -> bool:
+        """グループから機械を削除し、削除できたかどうかを返す"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_GROUP_MEMBERS.value)
+            .delete()
+            .eq("equipment_group_id", group_id)
+            .eq("equipment_id", equipment_id)
+            .execute()
+        )
+        return bool(res.data)
+
+    async def get_members_by_group_id(self, group_id: int) -> list[T]:
+        """設備グループに所属する設備一覧を取得"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_GROUP_MEMBERS.value)
+            .select("*")
+            .eq("equipment_group_id", group_id)
+            .execute()
+        )
+        return cast(list[T], res.data or [])
+
+    async def get_tenant_equipment_ids(self, tenant_id: str) -> list[int]:
+        """テナントの全設備のIDをID順に取得"""
+        rows = await fetch_all_pages_async(
+            lambda: (
+                self.client.table(self.table_name)
+                .select("id")
+                .eq("tenant_id", tenant_id)
+                .order("id")
+            )
+        )
+        return [row["id"] for row in rows]
+
+    async def get_tenant_group_members(self, tenant_id: str) -> dict[int, list[int]]:
+        """テナントの全設備グループについて、所属する設備IDを1回のクエリでまとめて取得"""
+        rows = await fetch_all_pages_async(
+            lambda: (
+                self.client.table(SupabaseTableName.EQUIPMENT_GROUP_MEMBERS.value)
+                .select("equipment_group_id, equipment_id")
+                .eq("tenant_id", tenant_id)
+                .order("id")
+            )
+        )
+        machine_ids_by_group: dict[int, list[int]] = {}
+        for row in rows:
+            machine_ids_by_group.setdefault(row["equipment_group_id"], []).append(
+                row["equipment_id"]
+            )
+        return machine_ids_by_group
+
+    # --- Equipment Downtimes (設備停止期間) ---
+
+    async def get_downtimes(self, equipment_id: int) -> list[T]:
+        """設備の停止期間一覧を開始日時順に取得"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_DOWNTIMES.value)
+            .select("*")
+            .eq("equipment_id", equipment_id)
+            .order("start_datetime")
+            .execute()
+        )
+        return cast(list[T], res.data or [])
+
+    async def create_downtime(self, data: dict[str, Any]) -> T:
+        """設備停止期間を登録"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_DOWNTIMES.value)
+            .insert(data)
+            .execute()
+        )
+        return cast(T, res.data)
+
+    async def delete_downtime(self, equipment_id: int, downtime_id: int) -> bool:
+        """設備停止期間を削除し、削除できたかどうかを返す"""
+        res = (
+            await self.client.table(SupabaseTableName.EQUIPMENT_DOWNTIMES.value)
+            .delete()
+            .eq("id", downtime_id)
+            .eq("equipment_id", equipment_id)
+            .execute()
+        )
+        return bool(res.data)
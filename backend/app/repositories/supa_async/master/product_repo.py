@@ -0,0 +1,190 @@
+# repositories/supa_async/master/product_repo.py
+from collections.abc import Iterable
+from typing import Any, TypeVar, cast
+
+from app.repositories.supa_async.common import (
+    AsyncBaseRepository,
+    chunked,
+    fetch_all_pages_async,
+    gather_with_limit,
+)
+from app.repositories.supa_infra.common import (
+    SupabaseTableName,
+    parse_setup_changeovers,
+)
+
+T = TypeVar("T", bound=dict[str, Any])  # 型変数を定義
+
+
+class AsyncProductRepository(AsyncBaseRepository[T]):
+    """製品・工程順序を扱う非同期リポジトリクラス。"""
+
+    def __init__(self, client):
+        super().__init__(client, SupabaseTableName.PRODUCTS.value)
+
+    async def get_routings_by_product(self, product_id: int) -> list[T]:
+        """製品IDに紐づく工程順序を取得"""
+        res = (
+            await self.client.table(SupabaseTableName.PROCESS_ROUTINGS.value)
+            .select("*")
+            .eq("product_id", product_id)
+            .order("sequence_order")
+            .execute()
+        )
+        return cast(list[T], res.data or [])
+
+    async def get_routings_by_products(
+        self, product_ids: Iterable[int]
+    ) -> dict[int, list[T]]:
+        """複数の製品IDに紐づく工程順序を、in_() フィルタの上限ごとに並行に取得"""
+        ids = sorted(set(product_ids))
+        if not ids:
+            return {}
+
+        def build_query(chunk: list[int]):
+            return lambda: (
+                self.client.table(SupabaseTableName.PROCESS_ROUTINGS.value)
+                .select("*")
+                .in_("product_id", chunk)
+                .order("product_id")
+                .order("sequence_order")
+                .order("id")
+            )
+
+        pages = await gather_with_limit(
+            fetch_all_pages_async(build_query(chunk)) for chunk in chunked(ids)
+        )
+
+        routings_by_product: dict[int, list[T]] = {product_id: [] for product_id in ids}
+        for rows in pages:
+            for row in rows:
+                routings_by_product[row["product_id"]].append(cast(T, row))
+        return routings_by_product
+
+    async def get_routing_by_id(self, routing_id: int) -> T | None:
+        """工程順序ID検索"""
+        res = (
+            await self.client.table(SupabaseTableName.PROCESS_ROUTINGS.value)
+            .select("*")
+            .eq("id", routing_id)
+            .maybe_single()
+            .execute()
+        )
+        return cast(T, res.data) if res else None
+
+    async def create_routing(self, data: dict[str, Any]) -> T:
+        """工程順序を新規作成"""
+        res = (
+            await self.client.table(SupabaseTableName.PROCESS_ROUTINGS.value)
+            .insert(data)
+            .execute()
+        )
+        return cast(T, res.data)
+
+    async def update_routing(self, routing_id: int, data: dict[str, Any]) -> T:
+        """工程順序を更新"""
+        res = (
+            await self.client.table(SupabaseTableName.PROCESS_ROUTINGS.value)
+            .update(data)
+            .eq("id", routing_id)
+            .execute()
+        )
+        return cast(T, res.data)
+
+    async def delete_routing(self, routing_id: int) -> bool:
+        """工程順序を削除（削除された行が返却された場合に成功とみなす）"""
+        res = (
+            await self.client.table(SupabaseTableName.PROCESS_ROUTINGS.value)
+            .delete()
+            .eq("id", routing_id)
+            .execute()
+        )
+        return bool(res.data)
+
+    async def get_equipment_ids_by_groups(
+        self, group_ids: Iterable[int]
+    ) -> dict[int, list[int]]:
+        """
+        複数の設備グループに所属する設備IDを取得する。
+
+        設備グループIDを in_() フィルタの上限ごとに分割し、並行に取得する。
+
+        Args:
+            group_ids: 設備グループIDの一覧
+
+        Returns:
+            設備グループIDをキーとした設備IDのリスト
+        """
+        ids = sorted(set(group_ids))
+        if not ids:
+            return {}
+
+        def build_query(chunk: list[int]):
+            return lambda: (
+                self.client.table(SupabaseTableName.EQUIPMENT_GROUP_MEMBERS.value)
+                .select("equipment_group_id, equipment_id")
+                .in_("equipment_group_id", chunk)
+                .order("id")
+            )
+
+        pages = await gather_with_limit(
+            fetch_all_pages_async(build_query(chunk)) for chunk in chunked(ids)
+        )
+
+        machine_ids_by_group: dict[int, list[int]] = {group_id: [] for group_id in ids}
+        for rows in pages:
+            for row in rows:
+                machine_ids_by_group[row["equipment_group_id"]].append(
+                    row["equipment_id"]
+                )
+        return machine_ids_by_group
+
+    # --- 段取り替え行列 ---
+
+    async def list_setup_changeovers(self, tenant_id: str) -> list[T]:
+        """テナントの段取り替え時間を一覧取得"""
+        return cast(
+            list[T],
+            await fetch_all_pages_async(
+                lambda: (
+                    self.client.table(SupabaseTableName.SETUP_CHANGEOVERS.value)
+                    .select("*")
+                    .eq("tenant_id", tenant_id)
+                    .order("id")
+                )
+            ),
+        )
+
+    async def get_setup_changeovers(self, tenant_id: str) -> dict[tuple[int, int], int]:
+        """テナントの段取り替え行列（(切替前, 切替後の段取り方法ID) をキーとした秒数）を取得"""
+        rows = await fetch_all_pages_async(
+            lambda: (
+                self.client.table(SupabaseTableName.SETUP_CHANGEOVERS.value)
+                .select("from_setup_method_id, to_setup_method_id, setup_time_seconds")
+                .eq("tenant_id", tenant_id)
+                .order("id")
+            )
+        )
+        return parse_setup_changeovers(rows)
+
+    async def upsert_setup_changeover(self, data: dict[str, Any]) -> T:
+        """段取り替え時間を登録（同じ組み合わせが登録済みの場合は更新）"""
+        res = (
+            await self.client.table(SupabaseTableName.SETUP_CHANGEOVERS.value)
+            .upsert(
+                data, on_conflict="tenant_id,from_setup_method_id,to_setup_method_id"
+            )
+            .execute()
+        )
+        return cast(T, res.data[0] if res.data else None)
+
+    async def delete_setup_changeover(self, tenant_id: str, changeover_id: int) -> bool:
+        """段取り替え時間を削除"""
+        res = (
+            await self.client.table(SupabaseTableName.SETUP_CHANGEOVERS.value)
+            .delete()
+            .eq("id", changeover_id)
+            .eq("tenant_id", tenant_id)
+            .execute()
+        )
+        return bool(res.data)
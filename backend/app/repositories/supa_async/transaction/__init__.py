@@ -0,0 +1,5 @@
+# repositories/supa_async/transaction/__init__.py
+from .order_repo import AsyncOrderRepository
+from .schedule_repo import AsyncScheduleRepository
+
+__all__ = ["AsyncOrderRepository", "AsyncScheduleRepository"]
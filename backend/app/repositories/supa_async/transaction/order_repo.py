@@ -0,0 +1,69 @@
+# repositories/supa_async/transaction/order_repo.py
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from app.repositories.supa_async.common import (
+    AsyncBaseRepository,
+    chunked,
+    fetch_all_pages_async,
+    gather_with_limit,
+)
+from app.repositories.supa_infra.common import SupabaseTableName
+
+
+class AsyncOrderRepository(AsyncBaseRepository):
+    """注文を管理する非同期リポジトリクラス。
+
+    読み込み結果の形式は同期版の OrderRepository と同じ。
+    """
+
+    def __init__(self, client):
+        super().__init__(client, SupabaseTableName.ORDERS.value)
+
+    async def get_unscheduled(self) -> list[dict[str, Any]]:
+        """未スケジュール（is_scheduled = false）の注文を受注日時順に全件取得する。"""
+        return await fetch_all_pages_async(
+            lambda: (
+                self.client.table(self.table_name)
+                .select("id, product_id, quantity, order_date, deadline_date")
+                .eq("is_scheduled", False)
+                .order("order_date")
+                .order("id")
+            )
+        )
+
+    async def mark_as_scheduled(self, order_id: int) -> None:
+        """注文をスケジュール済みにする"""
+        await (
+            self.client.table(self.table_name)
+            .update({"is_scheduled": True})
+            .eq("id", order_id)
+            .execute()
+        )
+
+    async def mark_many_as_scheduled(self, order_ids: Sequence[int]) -> None:
+        """複数の注文を、IDを分割して並行にスケジュール済みにする"""
+        await gather_with_limit(
+            self.client.table(self.table_name)
+            .update({"is_scheduled": True})
+            .in_("id", chunk)
+            .execute()
+            for chunk in chunked(order_ids)
+        )
+
+    async def get_deadlines(self, order_ids: Iterable[int]) -> dict[int, str | None]:
+        """複数の注文の納期日（ISO形式、納期がない場合はNone）を並行に取得する。"""
+
+        def build_query(chunk: list[int]):
+            return lambda: (
+                self.client.table(self.table_name)
+                .select("id, deadline_date")
+                .in_("id", chunk)
+                .order("id")
+            )
+
+        pages = await gather_with_limit(
+            fetch_all_pages_async(build_query(chunk))
+            for chunk in chunked(sorted(set(order_ids)))
+        )
+        return {row["id"]: row["deadline_date"] for rows in pages for row in rows}
@@ -0,0 +1,93 @@
+# repositories/supa_async/transaction/schedule_repo.py
+from collections.abc import Iterable
+from datetime import datetime
+
+from app.repositories.supa_async.common import (
+    AsyncBaseRepository,
+    fetch_all_pages_async,
+)
+from app.repositories.supa_infra.common import (
+    SupabaseTableName,
+    group_intervals_by_equipment,
+    parse_last_end_times,
+    parse_last_setup_methods,
+)
+
+
+class AsyncScheduleRepository(AsyncBaseRepository):
+    """スケジュールを管理する非同期リポジトリクラス。
+
+    読み込み結果の形式は同期版の ScheduleRepository と同じ。
+    """
+
+    def __init__(self, client):
+        super().__init__(client, SupabaseTableName.PRODUCTION_SCHEDULES.value)
+
+    async def get_last_end_times(
+        self, equipment_ids: Iterable[int]
+    ) -> dict[int, datetime | None]:
+        """複数の設備について、最後のスケジュールの終了日時を1回のRPCで取得する。
+
+        Args:
+            equipment_ids (Iterable[int]): 設備IDの一覧。
+
+        Returns:
+            dict[int, datetime | None]: 設備IDをキーとした最終終了日時。
+                スケジュールが存在しない設備はNone。
+        """
+        ids = sorted(set(equipment_ids))
+        if not ids:
+            return {}
+
+        res = await self.client.rpc(
+            "get_equipment_last_end_times", {"_equipment_ids": ids}
+        ).execute()
+        return parse_last_end_times(ids, res.data or [])
+
+    async def get_last_setup_methods(
+        self, equipment_ids: Iterable[int]
+    ) -> dict[int, int | None]:
+        """複数の設備について、最後のスケジュールの工程の段取り方法IDを1回のRPCで取得する。"""
+        ids = sorted(set(equipment_ids))
+        if not ids:
+            return {}
+
+        res = await self.client.rpc(
+            "get_equipment_last_setup_methods", {"_equipment_ids": ids}
+        ).execute()
+        return parse_last_setup_methods(ids, res.data or [])
+
+    async def _get_intervals(
+        self, table: SupabaseTableName, equipment_ids: Iterable[int], since: datetime
+    ) -> dict[int, list[tuple[datetime, datetime]]]:
+        """指定時刻より後に終わる区間を設備ごとにまとめて取得する。"""
+        ids = sorted(set(equipment_ids))
+        if not ids:
+            return {}
+
+        rows = await fetch_all_pages_async(
+            lambda: (
+                self.client.table(table.value)
+                .select("id, equipment_id, start_datetime, end_datetime")
+                .in_("equipment_id", ids)
+                .gt("end_datetime", since.isoformat())
+                .order("id")
+            )
+        )
+        return group_intervals_by_equipment(ids, rows)
+
+    async def get_booked_intervals(
+        self, equipment_ids: Iterable[int], since: datetime
+    ) -> dict[int, list[tuple[datetime, datetime]]]:
+        """複数の設備について、指定時刻より後に終わる予約済み区間をまとめて取得する。"""
+        return await self._get_intervals(
+            SupabaseTableName.PRODUCTION_SCHEDULES, equipment_ids, since
+        )
+
+    async def get_downtime_intervals(
+        self, equipment_ids: Iterable[int], since: datetime
+    ) -> dict[int, list[tuple[datetime, datetime]]]:
+        """複数の設備について、指定時刻より後に終わる設備停止期間をまとめて取得する。"""
+        return await self._get_intervals(
+            SupabaseTableName.EQUIPMENT_DOWNTIMES, equipment_ids, since
+        )
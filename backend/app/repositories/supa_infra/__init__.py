@@ -1,13 +1,20 @@
 # backend/app/repositories/supa_infra/__init__.py
 from app.repositories.supa_infra.common import SupabaseTableName
-from app.repositories.supa_infra.master import EquipmentRepository, ProductRepository
+from app.repositories.supa_infra.master import (
+    CalendarRepository,
+    EquipmentRepository,
+    MemberRepository,
+    ProductRepository,
+)
 from app.repositories.supa_infra.transaction import OrderRepository, ScheduleRepository
 
 __all__ = [
     # common
     "SupabaseTableName",
     # master
+    "CalendarRepository",
     "EquipmentRepository",
+    "MemberRepository",
     "ProductRepository",
     # transaction
     "ScheduleRepository",
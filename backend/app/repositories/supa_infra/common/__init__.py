@@ -1,5 +1,24 @@
 # repositories/supa_infra/common/__init__.py
-from .base_repo import BaseRepository
+from .base_repo import BaseRepository, fetch_all_pages
+from .bulk_result import BulkChunkError, BulkWriteResult
+from .row_parsers import (
+    group_intervals_by_equipment,
+    parse_datetime,
+    parse_last_end_times,
+    parse_last_setup_methods,
+    parse_setup_changeovers,
+)
 from .table_name import SupabaseTableName
 
-__all__ = ["SupabaseTableName", "BaseRepository"]
+__all__ = [
+    "SupabaseTableName",
+    "BaseRepository",
+    "BulkChunkError",
+    "BulkWriteResult",
+    "fetch_all_pages",
+    "group_intervals_by_equipment",
+    "parse_datetime",
+    "parse_last_end_times",
+    "parse_last_setup_methods",
+    "parse_setup_changeovers",
+]
@@ -1,18 +1,59 @@
 # repositories/supa_infra/common/base_repo.py
+from collections.abc import Callable, Sequence
 from typing import Any, Generic, TypeVar, cast
 
+import httpx
+from postgrest import SyncPostgrestClient
+from postgrest.exceptions import APIError
+
+from app.repositories.supa_infra.common.bulk_result import BulkWriteResult
 from app.utils.logger import get_logger
-from supabase import Client  # type: ignore
 
 logger = get_logger(__name__)
 
 T = TypeVar("T", bound=dict[str, Any])  # 型変数を定義
 
+# 1リクエストで取得する最大行数（supabase/config.toml の max_rows と揃える）
+MAX_ROWS_PER_REQUEST = 1000
+
+# 一括書き込みで1リクエストに含める最大行数
+DEFAULT_BULK_CHUNK_SIZE = 500
+
+# in_() フィルタに渡すIDの最大件数（URL長の上限を超えないようにする）
+IN_FILTER_CHUNK_SIZE = 500
+
+
+def fetch_all_pages(
+    build_query: Callable[[], Any], page_size: int = MAX_ROWS_PER_REQUEST
+) -> list[Any]:
+    """
+    PostgRESTの max_rows を超える結果を、range指定のページングで全件取得する。
+
+    クエリビルダーは execute() で使い切りになるため、ページごとに build_query で作り直す。
+    ページ境界がずれないよう、build_query では必ず order() を指定すること。
+
+    Args:
+        build_query: range() と execute() を呼ぶ前のクエリを返す関数
+        page_size: 1リクエストで取得する行数
+
+    Returns:
+        全ページの行を連結したリスト
+    """
+    rows: list[Any] = []
+    offset = 0
+    while True:
+        res = build_query().range(offset, offset + page_size - 1).execute()
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
+
 
 class BaseRepository(Generic[T]):
     """基本的なCRUD操作を共通化するための抽象クラス。"""
 
-    def __init__(self, client: Client, table_name: str):
+    def __init__(self, client: SyncPostgrestClient, table_name: str):
         """初期化"""
         self.client = client
         self.table_name = table_name
@@ -60,7 +101,99 @@ class BaseRepository(Generic[T]):
     def delete(self, id: int) -> bool:
         """削除 (Delete)"""
         logger.info(f"Deleting record {id} from {self.table_name}")
-        # count="exact" で削除された行数を確認できる
         res = self.client.table(self.table_name).delete().eq("id", id).execute()
-        # countが1以上なら削除成功とみなす
-        return res.count is not None and res.count > 0
+        # 削除された行が返却された場合に削除成功とみなす
+        return bool(res.data)
+
+    def delete_many(self, ids: Sequence[int]) -> int:
+        """複数削除 (Delete) - IDを分割して in_() でまとめて削除し、削除件数を返す"""
+        logger.info(f"Deleting {len(ids)} records from {self.table_name}")
+        deleted = 0
+        for start in range(0, len(ids), IN_FILTER_CHUNK_SIZE):
+            chunk = list(ids[start : start + IN_FILTER_CHUNK_SIZE])
+            res = self.client.table(self.table_name).delete().in_("id", chunk).execute()
+            deleted += len(res.data or [])
+        return deleted
+
+    def create_many(
+        self,
+        rows: Sequence[dict[str, Any]],
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> BulkWriteResult:
+        """
+        一括作成 (Bulk Create)
+
+        行を chunk_size 件ずつの複数行INSERTに分割して送信する。
+        あるチャンクが失敗しても残りのチャンクの書き込みは続行し、失敗はチャンク単位で報告する。
+
+        Args:
+            rows: 作成する行のリスト
+            chunk_size: 1リクエストに含める最大行数
+
+        Returns:
+            BulkWriteResult: 入力順の生成IDと、失敗したチャンクの一覧
+        """
+        logger.info(f"Creating {len(rows)} records in {self.table_name}")
+        return self._write_in_chunks(
+            rows,
+            chunk_size,
+            lambda chunk: self.client.table(self.table_name).insert(chunk).execute(),
+        )
+
+    def upsert_many(
+        self,
+        rows: Sequence[dict[str, Any]],
+        on_conflict: str = "id",
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> BulkWriteResult:
+        """
+        一括作成・更新 (Bulk Upsert)
+
+        on_conflict で指定した列が衝突した行は更新、それ以外は作成する。
+        チャンク分割と失敗の扱いは create_many と同じ。
+
+        Args:
+            rows: 作成・更新する行のリスト
+            on_conflict: 衝突判定に使う列（カンマ区切りで複数指定可）
+            chunk_size: 1リクエストに含める最大行数
+
+        Returns:
+            BulkWriteResult: 入力順のIDと、失敗したチャンクの一覧
+        """
+        logger.info(f"Upserting {len(rows)} records in {self.table_name}")
+        return self._write_in_chunks(
+            rows,
+            chunk_size,
+            lambda chunk: (
+                self.client.table(self.table_name)
+                .upsert(chunk, on_conflict=on_conflict)
+                .execute()
+            ),
+        )
+
+    def _write_in_chunks(
+        self,
+        rows: Sequence[dict[str, Any]],
+        chunk_size: int,
+        write: Callable[[list[dict[str, Any]]], Any],
+    ) -> BulkWriteResult:
+        """行をチャンクに分割して書き込み、返却された行のIDを入力順に並べる。"""
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive: {chunk_size}")
+
+        result = BulkWriteResult(ids=[None] * len(rows))
+        for chunk_index, start in enumerate(range(0, len(rows), chunk_size)):
+            chunk = list(rows[start : start + chunk_size])
+            try:
+                res = write(chunk)
+            except (APIError, httpx.HTTPError) as e:
+                message = e.message if isinstance(e, APIError) else str(e)
+                logger.warning(
+                    f"Bulk write chunk {chunk_index} to {self.table_name} failed: "
+                    f"{message}"
+                )
+                result.record_failure(chunk_index, start, len(chunk), str(message))
+                continue
+
+            result.record_rows(chunk_index, start, len(chunk), res.data or [])
+        return result
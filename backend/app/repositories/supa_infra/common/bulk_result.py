@@ -0,0 +1,65 @@
+# repositories/supa_infra/common/bulk_result.py
+from dataclasses import dataclass, field
+
+
+@dataclass
+class BulkChunkError:
+    """一括書き込みで失敗したチャンクの情報"""
+
+    chunk_index: int  # 何番目のチャンクか（0始まり）
+    start: int  # 入力リスト上でのチャンクの開始位置
+    size: int  # チャンクに含まれる行数
+    message: str  # エラーメッセージ
+
+    @property
+    def indexes(self) -> range:
+        """このチャンクに含まれる入力リスト上の位置"""
+        return range(self.start, self.start + self.size)
+
+
+@dataclass
+class BulkWriteResult:
+    """一括書き込み（create_many / upsert_many）の結果"""
+
+    # 入力順に並んだ生成ID。失敗したチャンクに含まれる行はNone
+    ids: list[int | None] = field(default_factory=list)
+    # 失敗したチャンクの一覧
+    errors: list[BulkChunkError] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> bool:
+        """すべてのチャンクが成功したかどうか"""
+        return not self.errors
+
+    @property
+    def failed_indexes(self) -> list[int]:
+        """失敗したチャンクに含まれる入力リスト上の位置"""
+        return [index for error in self.errors for index in error.indexes]
+
+    def record_failure(
+        self, chunk_index: int, start: int, size: int, message: str
+    ) -> None:
+        """チャンクの失敗を記録する。"""
+        self.errors.append(BulkChunkError(chunk_index, start, size, message))
+
+    def record_rows(
+        self, chunk_index: int, start: int, size: int, returned: list[dict]
+    ) -> None:
+        """
+        チャンクの書き込み結果（返却された行）を記録する。
+
+        PostgRESTは複数行INSERTの結果を入力と同じ順序で返すため、
+        チャンク内の位置をそのまま入力リスト上の位置に対応付ける。
+        RLSなどで一部の行が書き込まれなかった場合はチャンク単位の失敗とする。
+        """
+        if len(returned) != size:
+            self.record_failure(
+                chunk_index,
+                start,
+                size,
+                f"expected {size} rows but {len(returned)} were returned",
+            )
+            return
+
+        for offset, row in enumerate(returned):
+            self.ids[start + offset] = row.get("id")
@@ -0,0 +1,56 @@
+# repositories/supa_infra/common/row_parsers.py
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+
+def parse_datetime(value: str) -> datetime:
+    """PostgRESTが返すISO文字列をdatetimeオブジェクトに変換する。"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def group_intervals_by_equipment(
+    ids: Iterable[int], rows: Iterable[dict[str, Any]]
+) -> dict[int, list[tuple[datetime, datetime]]]:
+    """start_datetime / end_datetime を持つ行を、設備IDごとの区間のリストにまとめる。"""
+    intervals: dict[int, list[tuple[datetime, datetime]]] = {id: [] for id in ids}
+    for row in rows:
+        intervals[row["equipment_id"]].append(
+            (parse_datetime(row["start_datetime"]), parse_datetime(row["end_datetime"]))
+        )
+    return intervals
+
+
+def parse_last_end_times(
+    ids: Iterable[int], rows: Iterable[dict[str, Any]]
+) -> dict[int, datetime | None]:
+    """RPC get_equipment_last_end_times の結果を設備IDごとの最終終了日時にまとめる。"""
+    last_end_times: dict[int, datetime | None] = dict.fromkeys(ids)
+    for row in rows:
+        if row["last_end_datetime"]:
+            last_end_times[row["equipment_id"]] = parse_datetime(
+                row["last_end_datetime"]
+            )
+    return last_end_times
+
+
+def parse_last_setup_methods(
+    ids: Iterable[int], rows: Iterable[dict[str, Any]]
+) -> dict[int, int | None]:
+    """RPC get_equipment_last_setup_methods の結果を設備IDごとの最後の段取り方法にまとめる。"""
+    last_methods: dict[int, int | None] = dict.fromkeys(ids)
+    for row in rows:
+        last_methods[row["equipment_id"]] = row["setup_method_id"]
+    return last_methods
+
+
+def parse_setup_changeovers(
+    rows: Iterable[dict[str, Any]],
+) -> dict[tuple[int, int], int]:
+    """setup_changeovers の行を (切替前, 切替後の段取り方法ID) をキーとした段取り時間にまとめる。"""
+    return {
+        (row["from_setup_method_id"], row["to_setup_method_id"]): row[
+            "setup_time_seconds"
+        ]
+        for row in rows
+    }
@@ -13,4 +13,11 @@ class SupabaseTableName(Enum):
     EQUIPMENT_GROUPS = "equipment_groups"
     EQUIPMENT_GROUP_MEMBERS = "equipment_group_members"
     PRODUCTION_SCHEDULES = "production_schedules"
+    EQUIPMENT_DOWNTIMES = "equipment_downtimes"
+    TENANTS = "tenants"
+    ORGANIZATION_MEMBERS = "organization_members"
+    CALENDAR_SHIFTS = "calendar_shifts"
+    CALENDAR_HOLIDAYS = "calendar_holidays"
+    PLANT_SHUTDOWNS = "plant_shutdowns"
+    SETUP_CHANGEOVERS = "setup_changeovers"
     # Add more table names as needed
@@ -1,5 +1,12 @@
 # repositories/supabase/master/__init__.py
+from .calendar_repo import CalendarRepository
 from .equipment_repo import EquipmentRepository
+from .member_repo import MemberRepository
 from .product_repo import ProductRepository
 
-__all__ = ["EquipmentRepository", "ProductRepository"]
+__all__ = [
+    "CalendarRepository",
+    "EquipmentRepository",
+    "MemberRepository",
+    "ProductRepository",
+]
@@ -3,7 +3,11 @@ from typing import Any, TypeVar, cast
 
 from postgrest.exceptions import APIError
 
-from app.repositories.supa_infra.common import BaseRepository, SupabaseTableName
+from app.repositories.supa_infra.common import (
+    BaseRepository,
+    SupabaseTableName,
+    fetch_all_pages,
+)
 
 T = TypeVar("T", bound=dict[str, Any])  # 型変数を定義
 
@@ -108,3 +112,65 @@ class EquipmentRepository(BaseRepository[T]):
             .execute()
         )
         return cast(list[T], res.data)
+
+    def get_tenant_equipment_ids(self, tenant_id: str) -> list[int]:
+        """テナントの全設備のIDをID順に取得"""
+        rows = fetch_all_pages(
+            lambda: (
+                self.client.table(self.table_name)
+                .select("id")
+                .eq("tenant_id", tenant_id)
+                .order("id")
+            )
+        )
+        return [row["id"] for row in rows]
+
+    def get_tenant_group_members(self, tenant_id: str) -> dict[int, list[int]]:
+        """テナントの全設備グループについて、所属する設備IDを1回のクエリでまとめて取得"""
+        rows = fetch_all_pages(
+            lambda: (
+                self.client.table(SupabaseTableName.EQUIPMENT_GROUP_MEMBERS.value)
+                .select("equipment_group_id, equipment_id")
+                .eq("tenant_id", tenant_id)
+                .order("id")
+            )
+        )
+        machine_ids_by_group: dict[int, list[int]] = {}
+        for row in rows:
+            machine_ids_by_group.setdefault(row["equipment_group_id"], []).append(
+                row["equipment_id"]
+            )
+        return machine_ids_by_group
+
+    # --- Equipment Downtimes (設備停止期間) ---
+
+    def get_downtimes(self, equipment_id: int) -> list[T]:
+        """設備の停止期間一覧を開始日時順に取得"""
+        res = (
+            self.client.table(SupabaseTableName.EQUIPMENT_DOWNTIMES.value)
+            .select("*")
+            .eq("equipment_id", equipment_id)
+            .order("start_datetime")
+            .execute()
+        )
+        return cast(list[T], res.data or [])
+
+    def create_downtime(self, data: dict[str, Any]) -> T:
+        """設備停止期間を登録"""
+        res = (
+            self.client.table(SupabaseTableName.EQUIPMENT_DOWNTIMES.value)
+            .insert(data)
+            .execute()
+        )
+        return cast(T, res.data)
+
+    def delete_downtime(self, equipment_id: int, downtime_id: int) -> bool:
+        """設備停止期間を削除し、削除できたかどうかを返す"""
+        res = (
+            self.client.table(SupabaseTableName.EQUIPMENT_DOWNTIMES.value)
+            .delete()
+            .eq("id", downtime_id)
+            .eq("equipment_id", equipment_id)
+            .execute()
+        )
+        return bool(res.data)
@@ -0,0 +1,37 @@
+# repositories/supa_infra/master/member_repo.py
+from typing import Any, TypeVar
+
+from app.repositories.supa_infra.common import BaseRepository, SupabaseTableName
+
+T = TypeVar("T", bound=dict[str, Any])  # 型変数を定義
+
+
+class MemberRepository(BaseRepository[T]):
+    """テナントへのユーザーの所属（organization_members）を参照するリポジトリクラス。"""
+
+    def __init__(self, client):
+        super().__init__(client, SupabaseTableName.ORGANIZATION_MEMBERS.value)
+
+    def is_member(self, user_id: str, tenant_id: str) -> bool:
+        """
+        ユーザーがテナントに所属しているかどうかを返す。
+
+        RLSにより参照できるのはログインユーザー自身と同じテナントのメンバーの行だけのため、
+        ログインユーザー自身の所属の確認に使う。
+
+        Args:
+            user_id: ユーザーID（auth.users.id）
+            tenant_id: テナントID
+
+        Returns:
+            所属している場合はTrue
+        """
+        res = (
+            self.client.table(self.table_name)
+            .select("id")
+            .eq("user_id", user_id)
+            .eq("tenant_id", tenant_id)
+            .limit(1)
+            .execute()
+        )
+        return bool(res.data)
@@ -1,7 +1,14 @@
 # repositories/supa_infra/master/product_repo.py
+from collections.abc import Iterable
 from typing import Any, TypeVar, cast
 
-from app.repositories.supa_infra.common import BaseRepository, SupabaseTableName
+from app.repositories.supa_infra.common import (
+    BaseRepository,
+    SupabaseTableName,
+    fetch_all_pages,
+    parse_setup_changeovers,
+)
+from app.repositories.supa_infra.common.base_repo import IN_FILTER_CHUNK_SIZE
 
 T = TypeVar("T", bound=dict[str, Any])  # 型変数を定義
 
@@ -21,6 +28,45 @@ class ProductRepository(BaseRepository[T]):
         )
         return cast(list[T], res.data)
 
+    def get_routings_by_products(
+        self, product_ids: Iterable[int]
+    ) -> dict[int, list[T]]:
+        """複数の製品IDに紐づく工程順序を、in_() フィルタの上限ごとにまとめて取得"""
+        ids = sorted(set(product_ids))
+        routings_by_product: dict[int, list[T]] = {product_id: [] for product_id in ids}
+        for offset in range(0, len(ids), IN_FILTER_CHUNK_SIZE):
+            chunk = ids[offset : offset + IN_FILTER_CHUNK_SIZE]
+            rows = fetch_all_pages(
+                lambda chunk=chunk: (
+                    self.client.table(SupabaseTableName.PROCESS_ROUTINGS.value)
+                    .select("*")
+                    .in_("product_id", chunk)
+                    .order("product_id")
+                    .order("sequence_order")
+                    .order("id")
+                )
+            )
+            for row in rows:
+                routings_by_product[row["product_id"]].append(cast(T, row))
+        return routings_by_product
+
+    def get_routings_by_ids(self, routing_ids: Iterable[int]) -> dict[int, T]:
+        """複数の工程順序IDの工程をまとめて取得"""
+        ids = sorted(set(routing_ids))
+        routings: dict[int, T] = {}
+        for offset in range(0, len(ids), IN_FILTER_CHUNK_SIZE):
+            chunk = ids[offset : offset + IN_FILTER_CHUNK_SIZE]
+            rows = fetch_all_pages(
+                lambda chunk=chunk: (
+                    self.client.table(SupabaseTableName.PROCESS_ROUTINGS.value)
+                    .select("*")
+                    .in_("id", chunk)
+                    .order("id")
+                )
+            )
+            routings.update({row["id"]: cast(T, row) for row in rows})
+        return routings
+
     def get_routing_by_id(self, routing_id: int) -> T | None:
         """工程順序ID検索"""
         res = (
@@ -60,3 +106,45 @@ class ProductRepository(BaseRepository[T]):
             .execute()
         )
         return res.count is not None and res.count > 0
+
+    # --- 段取り替え行列 ---
+
+    def list_setup_changeovers(self, tenant_id: str) -> list[T]:
+        """テナントの段取り替え時間を一覧取得"""
+        return cast(
+            list[T],
+            fetch_all_pages(
+                lambda: (
+                    self.client.table(SupabaseTableName.SETUP_CHANGEOVERS.value)
+                    .select("*")
+                    .eq("tenant_id", tenant_id)
+                    .order("id")
+                )
+            ),
+        )
+
+    def get_setup_changeovers(self, tenant_id: str) -> dict[tuple[int, int], int]:
+        """テナントの段取り替え行列（(切替前, 切替後の段取り方法ID) をキーとした秒数）を取得"""
+        return parse_setup_changeovers(self.list_setup_changeovers(tenant_id))
+
+    def upsert_setup_changeover(self, data: dict[str, Any]) -> T:
+        """段取り替え時間を登録（同じ組み合わせが登録済みの場合は更新）"""
+        res = (
+            self.client.table(SupabaseTableName.SETUP_CHANGEOVERS.value)
+            .upsert(
+                data, on_conflict="tenant_id,from_setup_method_id,to_setup_method_id"
+            )
+            .execute()
+        )
+        return cast(T, res.data[0] if res.data else None)
+
+    def delete_setup_changeover(self, tenant_id: str, changeover_id: int) -> bool:
+        """段取り替え時間を削除"""
+        res = (
+            self.client.table(SupabaseTableName.SETUP_CHANGEOVERS.value)
+            .delete()
+            .eq("id", changeover_id)
+            .eq("tenant_id", tenant_id)
+            .execute()
+        )
+        return bool(res.data)
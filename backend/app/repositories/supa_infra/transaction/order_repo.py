@@ -1,11 +1,36 @@
 # repositories/supa_infra/transaction/order_repo.py
-from app.repositories.supa_infra.common import BaseRepository, SupabaseTableName
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from app.repositories.supa_infra.common import (
+    BaseRepository,
+    SupabaseTableName,
+    fetch_all_pages,
+)
+from app.repositories.supa_infra.common.base_repo import IN_FILTER_CHUNK_SIZE
 
 
 class OrderRepository(BaseRepository):
     def __init__(self, client):
         super().__init__(client, SupabaseTableName.ORDERS.value)
 
+    def get_unscheduled(self) -> list[dict[str, Any]]:
+        """
+        未スケジュール（is_scheduled = false）の注文を受注日時順に全件取得する。
+
+        Returns:
+            list[dict[str, Any]]: 未スケジュールの注文のリスト。
+        """
+        return fetch_all_pages(
+            lambda: (
+                self.client.table(self.table_name)
+                .select("id, product_id, quantity, order_date, deadline_date")
+                .eq("is_scheduled", False)
+                .order("order_date")
+                .order("id")
+            )
+        )
+
     def mark_as_scheduled(self, order_id: int) -> None:
         """
         注文をスケジュール済みとしてマークする。
@@ -19,3 +44,46 @@ class OrderRepository(BaseRepository):
         self.client.table(self.table_name).update({"is_scheduled": True}).eq(
             "id", order_id
         ).execute()
+
+    def mark_many_as_scheduled(self, order_ids: Sequence[int]) -> None:
+        """
+        複数の注文をまとめてスケジュール済みとしてマークする。
+
+        IDはURLのクエリ文字列に載るため、一定件数ごとに分割して更新する。
+
+        Args:
+            order_ids (Sequence[int]): スケジュール済みとしてマークする注文IDの一覧。
+
+        Raises:
+            APIError: Supabase APIリクエストが失敗した場合。
+        """
+        for offset in range(0, len(order_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = list(order_ids[offset : offset + IN_FILTER_CHUNK_SIZE])
+            self.client.table(self.table_name).update({"is_scheduled": True}).in_(
+                "id", chunk
+            ).execute()
+
+    def get_deadlines(self, order_ids: Iterable[int]) -> dict[int, str | None]:
+        """
+        複数の注文の納期日をまとめて取得する。
+
+        Args:
+            order_ids (Iterable[int]): 注文IDの一覧。
+
+        Returns:
+            dict[int, str | None]: 注文IDをキーとした納期日（ISO形式）。納期がない場合はNone。
+        """
+        ids = sorted(set(order_ids))
+        deadlines: dict[int, str | None] = {}
+        for offset in range(0, len(ids), IN_FILTER_CHUNK_SIZE):
+            chunk = ids[offset : offset + IN_FILTER_CHUNK_SIZE]
+            rows = fetch_all_pages(
+                lambda chunk=chunk: (
+                    self.client.table(self.table_name)
+                    .select("id, deadline_date")
+                    .in_("id", chunk)
+                    .order("id")
+                )
+            )
+            deadlines.update({row["id"]: row["deadline_date"] for row in rows})
+        return deadlines
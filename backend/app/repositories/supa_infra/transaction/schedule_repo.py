@@ -1,15 +1,34 @@
 # repositories/supabase_repo.py
+from collections.abc import Iterable
 from datetime import datetime
 from typing import Any
 
-from supabase import Client  # type: ignore
+from postgrest import SyncPostgrestClient
 
+from app.repositories.supa_infra.common import (
+    BaseRepository,
+    SupabaseTableName,
+    fetch_all_pages,
+    group_intervals_by_equipment,
+    parse_datetime,
+    parse_last_end_times,
+    parse_last_setup_methods,
+)
 
-class ScheduleRepository:
-    """スケジュールを管理するリポジトリクラス。"""
+# ガントチャートの表示に使う列（他の列は読み込まない）
+TIMELINE_COLUMNS = (
+    "id, order_id, process_routing_id, equipment_id, start_datetime, end_datetime"
+)
 
-    def __init__(self, client: Client):
-        self.client = client
+
+class ScheduleRepository(BaseRepository):
+    """スケジュールを管理するリポジトリクラス。
+
+    一括作成（create_many）・一括更新（upsert_many）は BaseRepository のものを使用する。
+    """
+
+    def __init__(self, client: SyncPostgrestClient):
+        super().__init__(client, SupabaseTableName.PRODUCTION_SCHEDULES.value)
 
     def get_last_end_time(self, equipment_id: int) -> datetime | None:
         """指定された設備IDに関連する最後のスケジュールの終了日時を取得する。
@@ -21,7 +40,7 @@ class ScheduleRepository:
             Optional[datetime]: 最後のスケジュールの終了日時。存在しない場合はNone。
         """
         res = (
-            self.client.table("production_schedules")
+            self.client.table(self.table_name)
             .select("end_datetime")
             .eq("equipment_id", equipment_id)
             .order("end_datetime", desc=True)
@@ -31,15 +50,209 @@ class ScheduleRepository:
 
         if res.data:
             # ISO文字列をdatetimeオブジェクトに変換して返す
-            return datetime.fromisoformat(
-                res.data[0]["end_datetime"].replace("Z", "+00:00")  # type: ignore
-            )
+            return parse_datetime(res.data[0]["end_datetime"])  # type: ignore
         return None
 
-    def create(self, schedule_data: dict[str, Any]) -> None:
-        """指定されたスケジュールデータをデータベースに挿入する。
+    def get_last_end_times(
+        self, equipment_ids: Iterable[int]
+    ) -> dict[int, datetime | None]:
+        """複数の設備について、最後のスケジュールの終了日時を1回のクエリで取得する。
+
+        RPC `get_equipment_last_end_times` を呼び出すため、設備の台数に関わらず
+        PostgRESTへのラウンドトリップは1回で済む。
+
+        Args:
+            equipment_ids (Iterable[int]): 設備IDの一覧。
+
+        Returns:
+            dict[int, datetime | None]: 設備IDをキーとした最終終了日時。
+                スケジュールが存在しない設備はNone。
+        """
+        ids = sorted(set(equipment_ids))
+        if not ids:
+            return {}
+
+        res = self.client.rpc(
+            "get_equipment_last_end_times", {"_equipment_ids": ids}
+        ).execute()
+
+        return parse_last_end_times(ids, res.data or [])  # type: ignore
+
+    def get_last_setup_methods(
+        self, equipment_ids: Iterable[int]
+    ) -> dict[int, int | None]:
+        """複数の設備について、最後のスケジュールの工程の段取り方法IDを1回のRPCで取得する。
+
+        Args:
+            equipment_ids (Iterable[int]): 設備IDの一覧。
+
+        Returns:
+            dict[int, int | None]: 設備IDをキーとした段取り方法ID。
+                スケジュールが存在しない、または段取り方法が設定されていない設備はNone。
+        """
+        ids = sorted(set(equipment_ids))
+        if not ids:
+            return {}
+
+        res = self.client.rpc(
+            "get_equipment_last_setup_methods", {"_equipment_ids": ids}
+        ).execute()
+
+        return parse_last_setup_methods(ids, res.data or [])  # type: ignore
+
+    def get_tenant_schedules(
+        self, tenant_id: str, since: datetime
+    ) -> list[dict[str, Any]]:
+        """テナントのスケジュールのうち、指定時刻より後に終わるものを全件取得する。
+
+        Args:
+            tenant_id (str): テナントID。
+            since (datetime): この時刻より後に終わるスケジュールのみを取得する。
+
+        Returns:
+            list[dict[str, Any]]: スケジュールの行のリスト（ID順）。
+        """
+        return fetch_all_pages(
+            lambda: (
+                self.client.table(self.table_name)
+                .select("*")
+                .eq("tenant_id", tenant_id)
+                .gt("end_datetime", since.isoformat())
+                .order("id")
+            )
+        )
+
+    def get_timeline_page(
+        self,
+        tenant_id: str,
+        window_start: datetime,
+        window_end: datetime,
+        limit: int,
+        equipment_ids: Iterable[int] | None = None,
+        order_id: int | None = None,
+        after: tuple[str, int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """期間と重なるスケジュールを (start_datetime, id) 順に1ページ分取得する。
+
+        キーセットページングのため、after には前のページの最後の行の
+        (start_datetime, id) を渡す。ページの位置に関わらず、読み込むのは
+        limit 件とインデックス上の範囲だけで済む。
+
+        Args:
+            tenant_id (str): テナントID。
+            window_start (datetime): 期間の開始日時（これより後に終わるスケジュールを含む）。
+            window_end (datetime): 期間の終了日時（これより前に始まるスケジュールを含む）。
+            limit (int): 1ページの件数。
+            equipment_ids (Iterable[int] | None): 指定した場合はこれらの設備のスケジュールのみ。
+            order_id (int | None): 指定した場合はこの注文のスケジュールのみ。
+            after (tuple[str, int] | None): 前のページの最後の行の (start_datetime, id)。
+
+        Returns:
+            list[dict[str, Any]]: TIMELINE_COLUMNS の列だけを持つ行のリスト。
+        """
+        query = (
+            self.client.table(self.table_name)
+            .select(TIMELINE_COLUMNS)
+            .eq("tenant_id", tenant_id)
+            .lt("start_datetime", window_end.isoformat())
+            .gt("end_datetime", window_start.isoformat())
+        )
+        if equipment_ids is not None:
+            query = query.in_("equipment_id", sorted(set(equipment_ids)))
+        if order_id is not None:
+            query = query.eq("order_id", order_id)
+        if after is not None:
+            # 日時の値は区切り文字（: . +）を含むため二重引用符で囲む
+            start, id = after
+            query = query.or_(
+                f'start_datetime.gt."{start}",'
+                f'and(start_datetime.eq."{start}",id.gt.{int(id)})'
+            )
+
+        res = query.order("start_datetime").order("id").limit(limit).execute()
+        return res.data or []  # type: ignore
+
+    def get_window_intervals(
+        self, tenant_id: str, window_start: datetime, window_end: datetime
+    ) -> list[dict[str, Any]]:
+        """テナントのスケジュールのうち、期間と重なるものの設備と開始・終了日時を全件取得する。
+
+        負荷の集計に使うため、equipment_id・start_datetime・end_datetime の列だけを読み込む。
+
+        Args:
+            tenant_id (str): テナントID。
+            window_start (datetime): 期間の開始日時。
+            window_end (datetime): 期間の終了日時。
+
+        Returns:
+            list[dict[str, Any]]: スケジュールの行のリスト（ID順）。
+        """
+        return fetch_all_pages(
+            lambda: (
+                self.client.table(self.table_name)
+                .select("id, equipment_id, start_datetime, end_datetime")
+                .eq("tenant_id", tenant_id)
+                .lt("start_datetime", window_end.isoformat())
+                .gt("end_datetime", window_start.isoformat())
+                .order("id")
+            )
+        )
+
+    def get_booked_intervals(
+        self, equipment_ids: Iterable[int], since: datetime
+    ) -> dict[int, list[tuple[datetime, datetime]]]:
+        """複数の設備について、指定時刻より後に終わる予約済み区間をまとめて取得する。
 
         Args:
-            schedule_data (Dict[str, Any]): 挿入するスケジュールデータ。
+            equipment_ids (Iterable[int]): 設備IDの一覧。
+            since (datetime): この時刻より後に終わるスケジュールのみを取得する。
+
+        Returns:
+            dict[int, list[tuple[datetime, datetime]]]: 設備IDをキーとした
+                (開始日時, 終了日時) のリスト。
+        """
+        ids = sorted(set(equipment_ids))
+        if not ids:
+            return {}
+
+        rows = fetch_all_pages(
+            lambda: (
+                self.client.table(self.table_name)
+                .select("id, equipment_id, start_datetime, end_datetime")
+                .in_("equipment_id", ids)
+                .gt("end_datetime", since.isoformat())
+                .order("id")
+            )
+        )
+
+        return group_intervals_by_equipment(ids, rows)
+
+    def get_downtime_intervals(
+        self, equipment_ids: Iterable[int], since: datetime
+    ) -> dict[int, list[tuple[datetime, datetime]]]:
+        """複数の設備について、指定時刻より後に終わる設備停止期間をまとめて取得する。
+
+        スケジューラは停止期間を予約済みの区間と同様に扱い、作業を割り当てない。
+
+        Args:
+            equipment_ids (Iterable[int]): 設備IDの一覧。
+            since (datetime): この時刻より後に終わる停止期間のみを取得する。
+
+        Returns:
+            dict[int, list[tuple[datetime, datetime]]]: 設備IDをキーとした
+                (開始日時, 終了日時) のリスト。
         """
-        self.client.table("production_schedules").insert(schedule_data).execute()
+        ids = sorted(set(equipment_ids))
+        if not ids:
+            return {}
+
+        rows = fetch_all_pages(
+            lambda: (
+                self.client.table(SupabaseTableName.EQUIPMENT_DOWNTIMES.value)
+                .select("id, equipment_id, start_datetime, end_datetime")
+                .in_("equipment_id", ids)
+                .gt("end_datetime", since.isoformat())
+                .order("id")
+            )
+        )
+        return group_intervals_by_equipment(ids, rows)
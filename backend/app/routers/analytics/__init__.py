@@ -0,0 +1,4 @@
+# backend/app/routers/analytics/__init__.py
+from .equipment_load import analytics_router
+
+__all__ = ["analytics_router"]
@@ -0,0 +1,51 @@
+# routers/analytics/equipment_load.py
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Query
+
+from app.dependencies import (
+    get_current_tenant_id,
+    get_equipment_repo,
+    get_schedule_repo,
+    get_tenant_calendar,
+)
+from app.repositories.supa_infra.master.equipment_repo import EquipmentRepository
+from app.repositories.supa_infra.transaction.schedule_repo import ScheduleRepository
+from app.utils.calendar import WorkCalendar
+from app.utils.equipment_load import LoadBucket, equipment_load_report
+from app.utils.logger import get_logger
+
+analytics_router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+logger = get_logger(__name__)
+
+# 集計できる期間の上限（日）
+MAX_HORIZON_DAYS = 366
+
+
+@analytics_router.get("/equipment-load")
+def get_equipment_load(
+    start_time: datetime | None = Query(
+        default=None, description="集計期間の開始日時（指定なしの場合は今日の0時）"
+    ),
+    horizon_days: int = Query(default=28, ge=1, le=MAX_HORIZON_DAYS),
+    bucket: LoadBucket = Query(default="day", description="集計の単位（day / week）"),
+    tenant_id: str = Depends(get_current_tenant_id),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    equipment_repo: EquipmentRepository = Depends(get_equipment_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+):
+    """設備ごと・設備グループごとの作業時間・稼働可能時間・稼働率を日・週ごとに集計する"""
+    start = start_time or datetime.now().astimezone().replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    logger.info(f"Aggregating equipment load from {start} for {horizon_days} days")
+    return equipment_load_report(
+        schedule_repo,
+        equipment_repo,
+        tenant_id,
+        start,
+        start + timedelta(days=horizon_days),
+        bucket,
+        calendar,
+    )
@@ -1,4 +1,5 @@
 # backend/app/routers/master/__init__.py
+from .calendars import calendar_router
 from .equipment_groups import equipment_group_router
 from .equipments import equipment_router
 from .process_routings import process_routing_router
@@ -9,4 +10,5 @@ __all__ = [
     "equipment_router",
     "equipment_group_router",
     "process_routing_router",
+    "calendar_router",
 ]
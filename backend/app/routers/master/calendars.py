@@ -0,0 +1,158 @@
+# routers/master/calendars.py
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.dependencies import get_async_calendar_repo, get_current_tenant_id
+from app.models.master import (
+    CalendarHolidayCreate,
+    CalendarShiftCreate,
+    CalendarShiftUpdate,
+    PlantShutdownCreate,
+)
+from app.repositories.supa_async.master.calendar_repo import AsyncCalendarRepository
+from app.utils.logger import get_logger
+from app.utils.tenant_calendar import invalidate_tenant_calendar
+
+calendar_router = APIRouter(prefix="/calendars", tags=["Master (Calendars)"])
+
+logger = get_logger(__name__)
+
+# 更新系のエンドポイントでは、スケジューラが古いカレンダーを使わないよう
+# テナントのコンパイル済みカレンダーをキャッシュから破棄する。
+
+
+# --- Calendar Shifts ---
+
+
+@calendar_router.get("/shifts")
+async def get_shifts(
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """稼働シフトを全件取得"""
+    logger.info("Fetching calendar shifts")
+    return await repo.get_shifts(tenant_id)
+
+
+@calendar_router.post("/shifts")
+async def create_shift(
+    shift_data: CalendarShiftCreate,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """稼働シフトを新規作成"""
+    logger.info(f"Creating calendar shift {shift_data}")
+    result = await repo.create(shift_data.with_tenant_id(tenant_id))
+    invalidate_tenant_calendar(tenant_id)
+    return result
+
+
+@calendar_router.patch("/shifts/{shift_id}")
+async def update_shift(
+    shift_id: int,
+    shift_data: CalendarShiftUpdate,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """稼働シフトを更新"""
+    logger.info(f"Updating calendar shift {shift_id}")
+    result = await repo.update_shift(
+        tenant_id, shift_id, shift_data.model_dump(mode="json", exclude_unset=True)
+    )
+    if not result:
+        raise HTTPException(status_code=404, detail="Not found")
+    invalidate_tenant_calendar(tenant_id)
+    return result
+
+
+@calendar_router.delete("/shifts/{shift_id}")
+async def delete_shift(
+    shift_id: int,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """稼働シフトを削除"""
+    logger.info(f"Deleting calendar shift {shift_id}")
+    if not await repo.delete_shift(tenant_id, shift_id):
+        raise HTTPException(status_code=404, detail="Not found")
+    invalidate_tenant_calendar(tenant_id)
+    return {"status": "deleted"}
+
+
+# --- Calendar Holidays ---
+
+
+@calendar_router.get("/holidays")
+async def get_holidays(
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """休日を全件取得"""
+    logger.info("Fetching calendar holidays")
+    return await repo.get_holidays(tenant_id)
+
+
+@calendar_router.post("/holidays")
+async def create_holiday(
+    holiday_data: CalendarHolidayCreate,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """休日を新規作成"""
+    logger.info(f"Creating calendar holiday {holiday_data}")
+    result = await repo.create_holiday(holiday_data.with_tenant_id(tenant_id))
+    invalidate_tenant_calendar(tenant_id)
+    return result
+
+
+@calendar_router.delete("/holidays/{holiday_id}")
+async def delete_holiday(
+    holiday_id: int,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """休日を削除"""
+    logger.info(f"Deleting calendar holiday {holiday_id}")
+    if not await repo.delete_holiday(tenant_id, holiday_id):
+        raise HTTPException(status_code=404, detail="Not found")
+    invalidate_tenant_calendar(tenant_id)
+    return {"status": "deleted"}
+
+
+# --- Plant Shutdowns ---
+
+
+@calendar_router.get("/shutdowns")
+async def get_shutdowns(
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """工場停止期間を全件取得"""
+    logger.info("Fetching plant shutdowns")
+    return await repo.get_shutdowns(tenant_id)
+
+
+@calendar_router.post("/shutdowns")
+async def create_shutdown(
+    shutdown_data: PlantShutdownCreate,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """工場停止期間を新規作成"""
+    logger.info(f"Creating plant shutdown {shutdown_data}")
+    result = await repo.create_shutdown(shutdown_data.with_tenant_id(tenant_id))
+    invalidate_tenant_calendar(tenant_id)
+    return result
+
+
+@calendar_router.delete("/shutdowns/{shutdown_id}")
+async def delete_shutdown(
+    shutdown_id: int,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncCalendarRepository = Depends(get_async_calendar_repo),
+):
+    """工場停止期間を削除"""
+    logger.info(f"Deleting plant shutdown {shutdown_id}")
+    if not await repo.delete_shutdown(tenant_id, shutdown_id):
+        raise HTTPException(status_code=404, detail="Not found")
+    invalidate_tenant_calendar(tenant_id)
+    return {"status": "deleted"}
@@ -1,13 +1,16 @@
 # routers/master/equipments.py
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.dependencies import get_current_tenant_id, get_equipment_repo
+from app.dependencies import get_async_equipment_repo, get_current_tenant_id
 from app.models.master.equipment_schemas import (
     EquipmentCreate,
+    EquipmentDowntimeCreate,
     EquipmentUpdate,
 )
-from app.repositories.supa_infra.master.equipment_repo import EquipmentRepository
+from app.repositories.supa_async.master.equipment_repo import AsyncEquipmentRepository
+from app.utils.availability_cache import invalidate_machine_availability
 from app.utils.logger import get_logger
+from app.utils.master_data_cache import invalidate_equipment
 
 equipment_router = APIRouter(prefix="/equipments", tags=["Master (Equipments)"])
 
@@ -15,56 +18,109 @@ logger = get_logger(__name__)
 
 
 @equipment_router.post("/")
-def create_equipment(
+async def create_equipment(
     equipment_data: EquipmentCreate,
     tenant_id: str = Depends(get_current_tenant_id),
-    repo: EquipmentRepository = Depends(get_equipment_repo),
+    repo: AsyncEquipmentRepository = Depends(get_async_equipment_repo),
 ):
     """設備を新規作成"""
     logger.info(f"Creating equipment {equipment_data}")
-    return repo.create(equipment_data.with_tenant_id(tenant_id))
+    return await repo.create(equipment_data.with_tenant_id(tenant_id))
 
 
 @equipment_router.get("/")
-def get_equipments(repo: EquipmentRepository = Depends(get_equipment_repo)):
+async def get_equipments(
+    repo: AsyncEquipmentRepository = Depends(get_async_equipment_repo),
+):
     """設備を全件取得"""
     logger.info("Fetching all equipments")
-    return repo.get_all()
+    return await repo.get_all()
 
 
 @equipment_router.get("/{equipment_id}")
-def get_equipment(
-    equipment_id: int, repo: EquipmentRepository = Depends(get_equipment_repo)
+async def get_equipment(
+    equipment_id: int,
+    repo: AsyncEquipmentRepository = Depends(get_async_equipment_repo),
 ):
     """設備を1件取得"""
     logger.info(f"Fetching equipment {equipment_id}")
-    result = repo.get_by_id(equipment_id)
+    result = await repo.get_by_id(equipment_id)
     if not result:
         raise HTTPException(status_code=404, detail="Not found")
     return result
 
 
 @equipment_router.patch("/{equipment_id}")
-def update_equipment(
+async def update_equipment(
     equipment_id: int,
     equipment_data: EquipmentUpdate,
-    repo: EquipmentRepository = Depends(get_equipment_repo),
+    repo: AsyncEquipmentRepository = Depends(get_async_equipment_repo),
 ):
     """設備を更新"""
     logger.info(f"Updating equipment {equipment_id}")
-    result = repo.update(equipment_id, equipment_data.model_dump(exclude_unset=True))
+    result = await repo.update(
+        equipment_id, equipment_data.model_dump(exclude_unset=True)
+    )
     if not result:
         raise HTTPException(status_code=404, detail="Not found")
     return result
 
 
 @equipment_router.delete("/{equipment_id}")
-def delete_equipment(
-    equipment_id: int, repo: EquipmentRepository = Depends(get_equipment_repo)
+async def delete_equipment(
+    equipment_id: int,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncEquipmentRepository = Depends(get_async_equipment_repo),
 ):
     """設備を削除"""
     logger.info(f"Deleting equipment {equipment_id}")
-    success = repo.delete(equipment_id)
+    success = await repo.delete(equipment_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Not found")
+    invalidate_equipment(tenant_id, equipment_id)
+    return {"status": "deleted"}
+
+
+# --- Equipment Downtimes (設備停止期間) ---
+
+
+@equipment_router.get("/{equipment_id}/downtime")
+async def get_equipment_downtimes(
+    equipment_id: int,
+    repo: AsyncEquipmentRepository = Depends(get_async_equipment_repo),
+):
+    """設備の停止期間（保全・メンテナンス）を取得"""
+    logger.info(f"Fetching downtimes of equipment {equipment_id}")
+    return await repo.get_downtimes(equipment_id)
+
+
+@equipment_router.post("/{equipment_id}/downtime")
+async def create_equipment_downtime(
+    equipment_id: int,
+    downtime_data: EquipmentDowntimeCreate,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncEquipmentRepository = Depends(get_async_equipment_repo),
+):
+    """設備の停止期間を登録"""
+    logger.info(f"Creating downtime of equipment {equipment_id}: {downtime_data}")
+    data = downtime_data.with_tenant_id(tenant_id)
+    data["equipment_id"] = equipment_id
+    result = await repo.create_downtime(data)
+    invalidate_machine_availability(tenant_id)
+    return result
+
+
+@equipment_router.delete("/{equipment_id}/downtime/{downtime_id}")
+async def delete_equipment_downtime(
+    equipment_id: int,
+    downtime_id: int,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncEquipmentRepository = Depends(get_async_equipment_repo),
+):
+    """設備の停止期間を削除"""
+    logger.info(f"Deleting downtime {downtime_id} of equipment {equipment_id}")
+    success = await repo.delete_downtime(equipment_id, downtime_id)
     if not success:
         raise HTTPException(status_code=404, detail="Not found")
+    invalidate_machine_availability(tenant_id)
     return {"status": "deleted"}
@@ -1,10 +1,11 @@
 # routers/master/process_routings.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.dependencies import get_current_tenant_id, get_product_repo
-from app.models.master import RoutingCreate, RoutingUpdate
-from app.repositories.supa_infra.master.product_repo import ProductRepository
+from app.dependencies import get_async_product_repo, get_current_tenant_id
+from app.models.master import RoutingCreate, RoutingUpdate, SetupChangeoverCreate
+from app.repositories.supa_async.master.product_repo import AsyncProductRepository
 from app.utils.logger import get_logger
+from app.utils.master_data_cache import invalidate_products, invalidate_routing
 
 process_routing_router = APIRouter(
     prefix="/process-routings", tags=["Master (Process Routings)"]
@@ -14,61 +15,105 @@ logger = get_logger(__name__)
 
 
 @process_routing_router.post("/")
-def create_process_routing(
+async def create_process_routing(
     routing_data: RoutingCreate,
     tenant_id: str = Depends(get_current_tenant_id),
-    repo: ProductRepository = Depends(get_product_repo),
+    repo: AsyncProductRepository = Depends(get_async_product_repo),
 ):
     """工程順序を新規作成"""
     logger.info(f"Creating process routing {routing_data}")
-    return repo.create_routing(routing_data.with_tenant_id(tenant_id))
+    result = await repo.create_routing(routing_data.with_tenant_id(tenant_id))
+    invalidate_products(tenant_id, [routing_data.product_id])
+    return result
 
 
 @process_routing_router.get("/")
-def get_process_routings(
+async def get_process_routings(
     product_id: int = Query(..., description="製品ID"),
-    repo: ProductRepository = Depends(get_product_repo),
+    repo: AsyncProductRepository = Depends(get_async_product_repo),
 ):
     """製品IDに紐づく工程順序を取得"""
     logger.info(f"Fetching process routings for product {product_id}")
-    return repo.get_routings_by_product(product_id)
+    return await repo.get_routings_by_product(product_id)
+
+
+# --- 段取り替え行列（/{routing_id} より先に定義する） ---
+
+
+@process_routing_router.get("/setup-changeovers")
+async def get_setup_changeovers(
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncProductRepository = Depends(get_async_product_repo),
+):
+    """段取り替え時間（段取り方法の切替ごとの段取り時間）の一覧を取得"""
+    logger.info("Fetching setup changeovers")
+    return await repo.list_setup_changeovers(tenant_id)
+
+
+@process_routing_router.put("/setup-changeovers")
+async def put_setup_changeover(
+    changeover_data: SetupChangeoverCreate,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncProductRepository = Depends(get_async_product_repo),
+):
+    """段取り替え時間を登録（同じ段取り方法の組み合わせが登録済みの場合は更新）"""
+    logger.info(f"Upserting setup changeover {changeover_data}")
+    return await repo.upsert_setup_changeover(changeover_data.with_tenant_id(tenant_id))
+
+
+@process_routing_router.delete("/setup-changeovers/{changeover_id}")
+async def delete_setup_changeover(
+    changeover_id: int,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncProductRepository = Depends(get_async_product_repo),
+):
+    """段取り替え時間を削除"""
+    logger.info(f"Deleting setup changeover {changeover_id}")
+    if not await repo.delete_setup_changeover(tenant_id, changeover_id):
+        raise HTTPException(status_code=404, detail="Not found")
+    return {"status": "deleted"}
 
 
 @process_routing_router.get("/{routing_id}")
-def get_process_routing(
-    routing_id: int, repo: ProductRepository = Depends(get_product_repo)
+async def get_process_routing(
+    routing_id: int, repo: AsyncProductRepository = Depends(get_async_product_repo)
 ):
     """工程順序を1件取得"""
     logger.info(f"Fetching process routing {routing_id}")
-    result = repo.get_routing_by_id(routing_id)
+    result = await repo.get_routing_by_id(routing_id)
     if not result:
         raise HTTPException(status_code=404, detail="Not found")
     return result
 
 
 @process_routing_router.patch("/{routing_id}")
-def update_process_routing(
+async def update_process_routing(
     routing_id: int,
     routing_data: RoutingUpdate,
-    repo: ProductRepository = Depends(get_product_repo),
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncProductRepository = Depends(get_async_product_repo),
 ):
     """工程順序を更新"""
     logger.info(f"Updating process routing {routing_id}")
-    result = repo.update_routing(
+    result = await repo.update_routing(
         routing_id, routing_data.model_dump(exclude_unset=True)
     )
     if not result:
         raise HTTPException(status_code=404, detail="Not found")
+    invalidate_routing(tenant_id, routing_id)
     return result
 
 
 @process_routing_router.delete("/{routing_id}")
-def delete_process_routing(
-    routing_id: int, repo: ProductRepository = Depends(get_product_repo)
+async def delete_process_routing(
+    routing_id: int,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: AsyncProductRepository = Depends(get_async_product_repo),
 ):
     """工程順序を削除"""
     logger.info(f"Deleting process routing {routing_id}")
-    success = repo.delete_routing(routing_id)
+    success = await repo.delete_routing(routing_id)
     if not success:
         raise HTTPException(status_code=404, detail="Not found")
+    invalidate_routing(tenant_id, routing_id)
     return {"status": "deleted"}
@@ -1,9 +1,11 @@
 # backend/app/routers/transaction/__init__.py
 from .orders import orders_router
+from .production_schedules import production_schedule_router
 
 # TODO: Initialize master-related routers here
 
 
 __all__ = [
     "orders_router",
+    "production_schedule_router",
 ]
@@ -1,42 +1,87 @@
 # routers/transaction/orders.py
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.dependencies import get_current_tenant_id, get_order_repo
+from app.dependencies import (
+    get_async_order_repo,
+    get_current_tenant_id,
+    get_order_repo,
+    get_product_repo,
+    get_schedule_repo,
+    get_tenant_calendar,
+)
 from app.models.transaction.order_schema import (
     OrderCreate,
+    OrderPromiseRequest,
     OrderUpdate,
 )
+from app.repositories.supa_async.transaction.order_repo import AsyncOrderRepository
+from app.repositories.supa_infra.master.product_repo import ProductRepository
 from app.repositories.supa_infra.transaction.order_repo import OrderRepository
+from app.repositories.supa_infra.transaction.schedule_repo import ScheduleRepository
+from app.scheduler_logic import (
+    apply_schedule_changes,
+    promise_orders,
+    reschedule_order,
+)
+from app.utils.availability_cache import invalidate_machine_availability
+from app.utils.calendar import WorkCalendar
+from app.utils.job_queue import tenant_lock
 from app.utils.logger import get_logger
 
 orders_router = APIRouter(prefix="/orders", tags=["Transaction (Orders)"])
 
 logger = get_logger(__name__)
 
+# 注文の読み書きだけを行うエンドポイントは非同期リポジトリを使う。
+# スケジュールの計画を伴うエンドポイント（回答・更新・削除）は、同期のスケジューラを
+# 呼ぶため同期のまま（スレッドプールで実行）とする。
+
 
 @orders_router.post("/")
-def create_order(
+async def create_order(
     order_data: OrderCreate,
     tenant_id: str = Depends(get_current_tenant_id),
-    repo: OrderRepository = Depends(get_order_repo),
+    repo: AsyncOrderRepository = Depends(get_async_order_repo),
 ):
     """注文を新規作成"""
     logger.info(f"Creating order {order_data}")
-    return repo.create(order_data.with_tenant_id(tenant_id))
+    return await repo.create(order_data.with_tenant_id(tenant_id))
+
+
+@orders_router.post("/promise")
+def promise_order(
+    request: OrderPromiseRequest,
+    tenant_id: str = Depends(get_current_tenant_id),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+):
+    """注文明細ごとの最短完了日時と使用する設備を回答（スケジュールは書き込まない）"""
+    logger.info(f"Promising {len(request.lines)} order lines")
+    return promise_orders(
+        lines=[line.model_dump() for line in request.lines],
+        product_repo=product_repo,
+        schedule_repo=schedule_repo,
+        tenant_id=tenant_id,
+        start_time=request.start_time,
+        calendar=calendar,
+    )
 
 
 @orders_router.get("/")
-def get_orders(repo: OrderRepository = Depends(get_order_repo)):
+async def get_orders(repo: AsyncOrderRepository = Depends(get_async_order_repo)):
     """注文を全件取得"""
     logger.info("Fetching all orders")
-    return repo.get_all()
+    return await repo.get_all()
 
 
 @orders_router.get("/{order_id}")
-def get_order(order_id: int, repo: OrderRepository = Depends(get_order_repo)):
+async def get_order(
+    order_id: int, repo: AsyncOrderRepository = Depends(get_async_order_repo)
+):
     """注文を1件取得"""
     logger.info(f"Fetching order {order_id}")
-    result = repo.get_by_id(order_id)
+    result = await repo.get_by_id(order_id)
     if not result:
         raise HTTPException(status_code=404, detail="Not found")
     return result
@@ -46,21 +91,98 @@ def get_order(order_id: int, repo: OrderRepository = Depends(get_order_repo)):
 def update_order(
     order_id: int,
     order_data: OrderUpdate,
+    tenant_id: str = Depends(get_current_tenant_id),
     repo: OrderRepository = Depends(get_order_repo),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
 ):
-    """注文を更新"""
+    """
+    注文を更新（数量・製品の変更はスケジュールにも反映する）
+
+    スケジュールを計画し直して保存してから注文を保存する。計画し直せない場合や
+    スケジュールの保存に失敗した場合は、注文を変更しない。
+    """
     logger.info(f"Updating order {order_id}")
-    result = repo.update(order_id, order_data.model_dump(exclude_unset=True))
-    if not result:
-        raise HTTPException(status_code=404, detail="Not found")
+    data = order_data.model_dump(exclude_unset=True)
+    if data.get("product_id") is None and data.get("quantity") is None:
+        result = repo.update(order_id, data)
+        if not result:
+            raise HTTPException(status_code=404, detail="Not found")
+        return result
+
+    # 同じテナントのスケジュールを書き込むジョブ・リクエストとは同時に実行しない
+    with tenant_lock(tenant_id):
+        if not repo.get_by_id(order_id):
+            raise HTTPException(status_code=404, detail="Not found")
+
+        try:
+            if data.get("product_id") is not None:
+                # 工程が変わるため、スケジュールを取り除いて未スケジュールに戻す
+                changes = reschedule_order(
+                    product_repo,
+                    schedule_repo,
+                    tenant_id,
+                    order_id,
+                    remove=True,
+                    calendar=calendar,
+                )
+                if changes["removed_schedule_ids"]:
+                    data["is_scheduled"] = False
+            else:
+                changes = reschedule_order(
+                    product_repo,
+                    schedule_repo,
+                    tenant_id,
+                    order_id,
+                    quantity=data["quantity"],
+                    calendar=calendar,
+                )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        apply_schedule_changes(schedule_repo, changes)
+        invalidate_machine_availability(tenant_id)
+
+        result = repo.update(order_id, data)
+        if not result:
+            raise HTTPException(status_code=404, detail="Not found")
+    logger.info(
+        f"Rescheduled order {order_id}: "
+        f"{len(changes['removed_schedule_ids'])} removed, "
+        f"{len(changes['updated_schedules'])} shifted"
+    )
     return result
 
 
 @orders_router.delete("/{order_id}")
-def delete_order(order_id: int, repo: OrderRepository = Depends(get_order_repo)):
-    """注文を削除"""
+def delete_order(
+    order_id: int,
+    tenant_id: str = Depends(get_current_tenant_id),
+    repo: OrderRepository = Depends(get_order_repo),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+):
+    """注文を削除（後続のスケジュールは空いた時間に前詰めする）"""
     logger.info(f"Deleting order {order_id}")
-    success = repo.delete(order_id)
-    if not success:
-        raise HTTPException(status_code=404, detail="Not found")
+    with tenant_lock(tenant_id):
+        # 削除するとスケジュールも消える（on delete cascade）ため、先に計画し直しておく
+        changes = reschedule_order(
+            product_repo,
+            schedule_repo,
+            tenant_id,
+            order_id,
+            remove=True,
+            calendar=calendar,
+        )
+        success = repo.delete(order_id)
+        if not success:
+            raise HTTPException(status_code=404, detail="Not found")
+
+        apply_schedule_changes(schedule_repo, {**changes, "removed_schedule_ids": []})
+        invalidate_machine_availability(tenant_id)
+    logger.info(
+        f"Shifted {len(changes['updated_schedules'])} schedules after deleting "
+        f"order {order_id}"
+    )
     return {"status": "deleted"}
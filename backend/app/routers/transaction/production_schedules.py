@@ -1,2 +1,419 @@
 # routers/transaction/production_schedules.py
-# TODO: Implement production schedule-related routes using TransactionRepository
+from contextlib import nullcontext
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.dependencies import (
+    get_async_order_repo,
+    get_async_product_repo,
+    get_async_schedule_repo,
+    get_current_tenant_id,
+    get_equipment_repo,
+    get_job_queue,
+    get_order_repo,
+    get_product_repo,
+    get_schedule_repo,
+    get_tenant_calendar,
+)
+from app.models.transaction import (
+    BatchScheduleRequest,
+    OptimizeScheduleRequest,
+    ScheduleRequest,
+    SimulateScheduleRequest,
+)
+from app.repositories.supa_async import (
+    AsyncOrderRepository,
+    AsyncProductRepository,
+    AsyncScheduleRepository,
+)
+from app.repositories.supa_infra.common import parse_datetime
+from app.repositories.supa_infra.master.equipment_repo import EquipmentRepository
+from app.repositories.supa_infra.master.product_repo import ProductRepository
+from app.repositories.supa_infra.transaction.order_repo import OrderRepository
+from app.repositories.supa_infra.transaction.schedule_repo import ScheduleRepository
+from app.scheduler_logic import (
+    check_capacity,
+    optimize_schedules,
+    schedule_order_async,
+    schedule_orders,
+    simulate_orders,
+)
+from app.utils.availability_cache import invalidate_machine_availability
+from app.utils.calendar import WorkCalendar
+from app.utils.job_queue import Job, JobQueue, tenant_lock, tenant_lock_async
+from app.utils.logger import get_logger
+from app.utils.pagination import decode_cursor, encode_cursor
+
+production_schedule_router = APIRouter(
+    prefix="/production-schedules", tags=["Transaction (Production Schedules)"]
+)
+
+logger = get_logger(__name__)
+
+
+@production_schedule_router.get("/")
+def get_production_schedules(
+    start: datetime = Query(..., description="表示期間の開始日時"),
+    end: datetime = Query(..., description="表示期間の終了日時"),
+    equipment_id: int | None = Query(default=None, description="設備ID"),
+    equipment_group_id: int | None = Query(default=None, description="設備グループID"),
+    order_id: int | None = Query(default=None, description="注文ID"),
+    cursor: str | None = Query(
+        default=None, description="次のページを読み込む場合は前のページの next_cursor"
+    ),
+    limit: int = Query(default=500, ge=1, le=1000, description="1ページの件数"),
+    tenant_id: str = Depends(get_current_tenant_id),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    equipment_repo: EquipmentRepository = Depends(get_equipment_repo),
+):
+    """
+    期間と重なるスケジュールを開始日時順に取得する（ガントチャート用）
+
+    (start_datetime, id) のキーセットページングで、次のページがある場合は next_cursor を返す。
+    """
+    logger.info(f"Fetching production schedules between {start} and {end}")
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    try:
+        after = _decode_timeline_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+    equipment_ids = _resolve_equipment_filter(
+        equipment_repo, equipment_id, equipment_group_id
+    )
+    if equipment_ids is not None and not equipment_ids:
+        return {"items": [], "next_cursor": None}
+
+    items = schedule_repo.get_timeline_page(
+        tenant_id,
+        start,
+        end,
+        limit,
+        equipment_ids=equipment_ids,
+        order_id=order_id,
+        after=after,
+    )
+    last = items[-1] if len(items) == limit else None
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(last["start_datetime"], last["id"])
+        if last
+        else None,
+    }
+
+
+def _decode_timeline_cursor(cursor: str) -> tuple[str, int]:
+    """カーソルを (start_datetime, id) に復号する。形式が正しくない場合は ValueError。"""
+    start, id = decode_cursor(cursor, 2)
+    if not isinstance(start, str) or not isinstance(id, int):
+        raise ValueError("カーソルの形式が正しくありません")
+    # フィルタに埋め込むため、日時として解釈できる値だけを受け付ける
+    return parse_datetime(start).isoformat(), id
+
+
+def _resolve_equipment_filter(
+    equipment_repo: EquipmentRepository,
+    equipment_id: int | None,
+    equipment_group_id: int | None,
+) -> set[int] | None:
+    """設備・設備グループの絞り込み条件を設備IDの集合にする（条件がない場合はNone）。"""
+    equipment_ids = {equipment_id} if equipment_id is not None else None
+    if equipment_group_id is not None:
+        members = {
+            member["equipment_id"]
+            for member in equipment_repo.get_members_by_group_id(equipment_group_id)
+        }
+        equipment_ids = members if equipment_ids is None else equipment_ids & members
+    return equipment_ids
+
+
+@production_schedule_router.post("/")
+async def schedule_single_order(
+    request: ScheduleRequest,
+    tenant_id: str = Depends(get_current_tenant_id),
+    order_repo: AsyncOrderRepository = Depends(get_async_order_repo),
+    product_repo: AsyncProductRepository = Depends(get_async_product_repo),
+    schedule_repo: AsyncScheduleRepository = Depends(get_async_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+):
+    """
+    注文を1件スケジュール（DBへの読み込みは並行に発行する）
+
+    同じテナントのスケジュールを書き込むジョブ・リクエストとは同時に実行しない。
+    """
+    logger.info(f"Scheduling order {request.order_id}")
+    async with tenant_lock_async(tenant_id):
+        order = await order_repo.get_by_id(request.order_id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        if order.get("is_scheduled"):
+            raise HTTPException(status_code=409, detail="Order already scheduled")
+
+        try:
+            schedules = await schedule_order_async(
+                order_id=order["id"],
+                product_id=order["product_id"],
+                quantity=order["quantity"],
+                product_repo=product_repo,
+                schedule_repo=schedule_repo,
+                tenant_id=tenant_id,
+                start_time=request.start_time,
+                mode=request.mode,
+                calendar=calendar,
+                policy=request.policy,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+        await order_repo.mark_as_scheduled(order["id"])
+        invalidate_machine_availability(tenant_id)
+    logger.info(f"Scheduled order {order['id']} ({len(schedules)} schedules)")
+    return {
+        "scheduled_order_ids": [order["id"]],
+        "failed_orders": [],
+        "schedule_count": len(schedules),
+    }
+
+
+@production_schedule_router.post("/batch")
+def schedule_unscheduled_orders(
+    request: BatchScheduleRequest | None = None,
+    tenant_id: str = Depends(get_current_tenant_id),
+    order_repo: OrderRepository = Depends(get_order_repo),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+):
+    """
+    未スケジュールの注文をまとめてスケジュール
+
+    同じテナントのスケジュールを書き込むジョブ・リクエストとは同時に実行しない。
+    """
+    with tenant_lock(tenant_id):
+        return _run_batch(
+            request or BatchScheduleRequest(),
+            tenant_id,
+            order_repo,
+            product_repo,
+            schedule_repo,
+            calendar,
+        )
+
+
+@production_schedule_router.post("/batch/jobs", status_code=202)
+def enqueue_batch_schedule(
+    request: BatchScheduleRequest | None = None,
+    tenant_id: str = Depends(get_current_tenant_id),
+    order_repo: OrderRepository = Depends(get_order_repo),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    """未スケジュールの注文の一括スケジュールをジョブとして登録し、すぐに返す"""
+    request = request or BatchScheduleRequest()
+    job = jobs.submit(
+        tenant_id,
+        "batch",
+        lambda job: _run_batch(
+            request,
+            tenant_id,
+            order_repo,
+            product_repo,
+            schedule_repo,
+            calendar,
+            job,
+        ),
+    )
+    logger.info(f"Enqueued batch job {job.id}")
+    return job.to_dict()
+
+
+@production_schedule_router.get("/jobs/{job_id}")
+def get_schedule_job(
+    job_id: str,
+    tenant_id: str = Depends(get_current_tenant_id),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    """スケジューリングジョブの状態・進捗・結果を取得"""
+    job = jobs.get(job_id, tenant_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+def _run_batch(
+    request: BatchScheduleRequest,
+    tenant_id: str,
+    order_repo: OrderRepository,
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    calendar: WorkCalendar,
+    job: Job | None = None,
+) -> dict:
+    """一括スケジュールを実行する（ジョブから実行する場合は進捗を記録する）"""
+    logger.info("Scheduling all unscheduled orders")
+    result = schedule_orders(
+        order_repo=order_repo,
+        product_repo=product_repo,
+        schedule_repo=schedule_repo,
+        tenant_id=tenant_id,
+        start_time=request.start_time,
+        mode=request.mode,
+        policy=request.policy,
+        calendar=calendar,
+        rule=request.rule,
+        progress=job.report_progress if job else None,
+        workers=0 if request.parallel else 1,
+        setup_window=request.setup_window,
+    )
+    if result["schedule_count"]:
+        invalidate_machine_availability(tenant_id)
+    logger.info(
+        f"Scheduled {len(result['scheduled_order_ids'])} orders "
+        f"({result['schedule_count']} schedules), "
+        f"{len(result['failed_orders'])} failed"
+    )
+    # 作成したスケジュール本体は件数が多くなるため、レスポンスには含めない
+    return {
+        "scheduled_order_ids": result["scheduled_order_ids"],
+        "failed_orders": result["failed_orders"],
+        "schedule_count": result["schedule_count"],
+        "tardiness": result["tardiness"],
+    }
+
+
+@production_schedule_router.get("/capacity")
+def get_capacity(
+    start_time: datetime | None = None,
+    horizon_days: int = Query(default=14, ge=1, le=365),
+    order_repo: OrderRepository = Depends(get_order_repo),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+):
+    """未スケジュールの注文の負荷を設備グループごとの稼働可能時間と比べる（負荷山積み）"""
+    logger.info(f"Checking rough-cut capacity for {horizon_days} days")
+    return check_capacity(
+        order_repo=order_repo,
+        product_repo=product_repo,
+        start_time=start_time,
+        horizon_days=horizon_days,
+        calendar=calendar,
+    )
+
+
+@production_schedule_router.post("/simulate")
+def simulate_production_schedules(
+    request: SimulateScheduleRequest,
+    tenant_id: str = Depends(get_current_tenant_id),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+):
+    """仮の注文をDBに書き込まずにスケジュールしてみる（見積もり・比較用）"""
+    logger.info(f"Simulating {len(request.orders)} orders")
+    result = simulate_orders(
+        orders=[
+            {
+                "product_id": order.product_id,
+                "quantity": order.quantity,
+                "deadline_date": (
+                    order.deadline_date.isoformat() if order.deadline_date else None
+                ),
+            }
+            for order in request.orders
+        ],
+        product_repo=product_repo,
+        schedule_repo=schedule_repo,
+        tenant_id=tenant_id,
+        start_time=request.start_time,
+        mode=request.mode,
+        calendar=calendar,
+        policy=request.policy,
+        cumulative=request.cumulative,
+    )
+    logger.info(
+        f"Simulated {len(result['results'])} orders, "
+        f"{len(result['failed_orders'])} failed"
+    )
+    return result
+
+
+@production_schedule_router.post("/optimize")
+def optimize_production_schedules(
+    request: OptimizeScheduleRequest | None = None,
+    tenant_id: str = Depends(get_current_tenant_id),
+    order_repo: OrderRepository = Depends(get_order_repo),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+):
+    """
+    保存済みのスケジュールを局所探索で改善
+
+    改善したスケジュールを保存する場合は、同じテナントのスケジュールを書き込む
+    ジョブ・リクエストとは同時に実行しない。
+    """
+    request = request or OptimizeScheduleRequest()
+    with tenant_lock(tenant_id) if request.apply else nullcontext():
+        return _run_optimize(
+            request, tenant_id, order_repo, product_repo, schedule_repo, calendar
+        )
+
+
+@production_schedule_router.post("/optimize/jobs", status_code=202)
+def enqueue_optimize_schedule(
+    request: OptimizeScheduleRequest | None = None,
+    tenant_id: str = Depends(get_current_tenant_id),
+    order_repo: OrderRepository = Depends(get_order_repo),
+    product_repo: ProductRepository = Depends(get_product_repo),
+    schedule_repo: ScheduleRepository = Depends(get_schedule_repo),
+    calendar: WorkCalendar = Depends(get_tenant_calendar),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    """スケジュールの改善をジョブとして登録し、すぐに返す"""
+    request = request or OptimizeScheduleRequest()
+    job = jobs.submit(
+        tenant_id,
+        "optimize",
+        lambda _job: _run_optimize(
+            request, tenant_id, order_repo, product_repo, schedule_repo, calendar
+        ),
+    )
+    logger.info(f"Enqueued optimize job {job.id}")
+    return job.to_dict()
+
+
+def _run_optimize(
+    request: OptimizeScheduleRequest,
+    tenant_id: str,
+    order_repo: OrderRepository,
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    calendar: WorkCalendar,
+) -> dict:
+    """保存済みのスケジュールの改善を実行する"""
+    logger.info(
+        f"Optimizing schedules ({request.objective}, {request.time_limit_seconds}s)"
+    )
+    result = optimize_schedules(
+        order_repo=order_repo,
+        product_repo=product_repo,
+        schedule_repo=schedule_repo,
+        tenant_id=tenant_id,
+        objective=request.objective,
+        time_limit_seconds=request.time_limit_seconds,
+        calendar=calendar,
+        workers=0 if request.parallel else 1,
+        apply=request.apply,
+        seed=request.seed,
+    )
+    if result["applied"]:
+        invalidate_machine_availability(tenant_id)
+    logger.info(
+        f"Optimized schedules: {result['before']} -> {result['after']} "
+        f"({len(result['changed_schedules'])} changed, applied={result['applied']})"
+    )
+    return result
@@ -2,15 +2,67 @@
 スケジューリングロジックモジュール
 
 注文に対して、製品の工程順序に基づいて生産スケジュールを作成する。
-カレンダーユーティリティを使用して稼働時間（平日 9:00 - 17:00）内でスケジュールを割り当てる。
+稼働カレンダー（既定は平日 9:00 - 17:00）を使用して稼働時間内でスケジュールを割り当てる。
 """
 
-from datetime import datetime
+import asyncio
+import itertools
+import os
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
 from typing import Any
 
+from app.repositories.supa_async.master import AsyncProductRepository
+from app.repositories.supa_async.transaction import AsyncScheduleRepository
+from app.repositories.supa_infra.common import fetch_all_pages, parse_datetime
+from app.repositories.supa_infra.common.base_repo import IN_FILTER_CHUNK_SIZE
 from app.repositories.supa_infra.master.product_repo import ProductRepository
+from app.repositories.supa_infra.transaction.order_repo import OrderRepository
 from app.repositories.supa_infra.transaction.schedule_repo import ScheduleRepository
-from app.utils.calendar import calculate_end_time, get_next_available_start_time
+from app.utils.availability_cache import load_machine_availability
+from app.utils.calendar import DEFAULT_CALENDAR, WorkCalendar
+from app.utils.dispatching import (
+    DispatchRule,
+    due_datetime,
+    projected_tardiness,
+    rank_orders,
+)
+from app.utils.equipment_timeline import EquipmentTimelineIndex
+from app.utils.local_search import (
+    Objective,
+    Operation,
+    OptimizationProblem,
+    ScheduleState,
+    optimize,
+)
+from app.utils.machine_availability import (
+    MachineAvailability,
+    MachineBookings,
+    SchedulingMode,
+)
+from app.utils.machine_selector import MachineSelector, SelectionPolicy
+from app.utils.master_data_cache import (
+    load_machine_ids_by_groups,
+    load_machine_ids_by_groups_async,
+    load_routings_by_products,
+    load_routings_by_products_async,
+)
+from app.utils.partition import partition_orders
+from app.utils.process_pool import get_process_pool
+from app.utils.setup_times import (
+    SetupTimes,
+    batch_by_setup,
+    default_setup_minutes,
+    uses_setup_methods,
+)
+from app.utils.workload import (
+    OperationTable,
+    build_operation_table,
+    rough_cut_capacity,
+)
 
 
 def schedule_order(
@@ -21,6 +73,9 @@ def schedule_order(
     schedule_repo: ScheduleRepository,
     tenant_id: str,
     start_time: datetime | None = None,
+    mode: SchedulingMode = "append",
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+    policy: SelectionPolicy = "earliest_start",
 ) -> list[dict[str, Any]]:
     """
     注文に対してスケジュールを作成する。
@@ -33,111 +88,1374 @@ def schedule_order(
         schedule_repo: スケジュールリポジトリ
         tenant_id: テナントID
         start_time: スケジュール開始基準時刻（指定なしの場合は現在時刻）
+        mode: "append" は設備の最終終了時刻の後ろに追加し、
+            "insertion" はタイムライン途中の空き時間帯にも挿入する
+        calendar: 開始・終了時刻の計算に使う稼働カレンダー
+        policy: 設備の選定方針（earliest_start / earliest_finish / least_loaded）
 
     Returns:
         作成されたスケジュールのリスト
 
     Raises:
-        ValueError: 工程が取得できない場合、または設備グループにメンバーが存在しない場合
+        ValueError: 工程が取得できない場合、設備グループにメンバーが存在しない場合、
+            または分割しない工程が1回の稼働時間に収まらない場合
     """
-    # 製品の工程順序を取得（sequence_order順にソート済み）
-    routings = product_repo.get_routings_by_product(product_id)
+    # 製品の工程順序を取得（sequence_order順にソート済み、キャッシュにない場合のみ読み込む）
+    routings = load_routings_by_products(
+        tenant_id,
+        [product_id],
+        lambda ids: {id: product_repo.get_routings_by_product(id) for id in ids},
+    )[product_id]
 
-    if not routings:
-        raise ValueError(f"製品ID {product_id} に対する工程が見つかりません")
+    # 全工程の設備グループに属する設備をまとめて取得
+    group_ids = {routing["equipment_group_id"] for routing in routings}
+    machine_ids_by_group = _cached_equipment_ids_by_groups(
+        product_repo, tenant_id, group_ids
+    )
+
+    _validate_routings(product_id, routings, machine_ids_by_group)
+    _validate_operation_lengths(routings, quantity, calendar)
 
-    created_schedules = []
     # 最初の工程の開始基準時間（指定がない場合は現在時刻）
-    current_process_start = start_time if start_time else datetime.now().astimezone()
+    process_start = start_time if start_time else datetime.now().astimezone()
 
-    for routing in routings:
-        # 工程の情報を取得
-        equipment_group_id = routing["equipment_group_id"]
-        setup_time_sec = routing.get("setup_time_seconds", 0) or 0
-        unit_time_sec = float(routing["unit_time_seconds"])
+    # 対象設備の空き状況を1回のクエリで取得し、以降はメモリ上で更新する
+    availability = _load_bookings(
+        schedule_repo,
+        _collect_machine_ids(machine_ids_by_group),
+        mode,
+        process_start,
+        calendar,
+    )
+    setups = _load_setups(
+        product_repo,
+        schedule_repo,
+        tenant_id,
+        _collect_machine_ids(machine_ids_by_group),
+        mode,
+        routings,
+    )
 
-        # 所要時間を計算（段取り時間 + 単位時間 × 数量）
-        total_duration_sec = setup_time_sec + (unit_time_sec * quantity)
-        total_duration_min = total_duration_sec / 60
+    created_schedules = _plan_order(
+        order_id=order_id,
+        quantity=quantity,
+        routings=routings,
+        selector=MachineSelector(availability, machine_ids_by_group, policy),
+        tenant_id=tenant_id,
+        start_time=process_start,
+        setups=setups,
+    )
 
-        # 設備グループに属する設備IDを取得
-        machine_ids = _get_equipment_ids_by_group(product_repo, equipment_group_id)
+    # 全工程のスケジュールを1回の一括INSERTで保存
+    result = schedule_repo.create_many(created_schedules)
+    if not result.succeeded:
+        # 一部だけ保存された工程を取り消し、注文単位で失敗させる
+        schedule_repo.delete_many([id for id in result.ids if id is not None])
+        raise RuntimeError(
+            f"注文ID {order_id} のスケジュール保存に失敗しました: "
+            f"{'; '.join(error.message for error in result.errors)}"
+        )
 
-        if not machine_ids:
-            raise ValueError(
-                f"設備グループID {equipment_group_id} に設備が見つかりません"
+    return created_schedules
+
+
+async def schedule_order_async(
+    order_id: int,
+    product_id: int,
+    quantity: int,
+    product_repo: AsyncProductRepository,
+    schedule_repo: AsyncScheduleRepository,
+    tenant_id: str,
+    start_time: datetime | None = None,
+    mode: SchedulingMode = "append",
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+    policy: SelectionPolicy = "earliest_start",
+) -> list[dict[str, Any]]:
+    """
+    非同期クライアントで注文に対してスケジュールを作成する。
+
+    引数・戻り値・例外は schedule_order と同じ。互いに依存しない読み込み
+    （設備グループのメンバー、設備の最終終了時刻・予約済み区間、設備停止期間）を
+    並行に発行し、DBとの往復回数分の待ち時間を短縮する。
+    """
+
+    async def load_routings(ids: set[int]) -> dict[int, list[dict[str, Any]]]:
+        return {id: await product_repo.get_routings_by_product(id) for id in ids}
+
+    routings = (
+        await load_routings_by_products_async(tenant_id, [product_id], load_routings)
+    )[product_id]
+
+    group_ids = {routing["equipment_group_id"] for routing in routings}
+    machine_ids_by_group = await load_machine_ids_by_groups_async(
+        tenant_id, group_ids, product_repo.get_equipment_ids_by_groups
+    )
+
+    _validate_routings(product_id, routings, machine_ids_by_group)
+    _validate_operation_lengths(routings, quantity, calendar)
+
+    process_start = start_time if start_time else datetime.now().astimezone()
+
+    machine_ids = _collect_machine_ids(machine_ids_by_group)
+    availability, setups = await asyncio.gather(
+        _load_bookings_async(schedule_repo, machine_ids, mode, process_start, calendar),
+        _load_setups_async(
+            product_repo, schedule_repo, tenant_id, machine_ids, mode, routings
+        ),
+    )
+
+    created_schedules = _plan_order(
+        order_id=order_id,
+        quantity=quantity,
+        routings=routings,
+        selector=MachineSelector(availability, machine_ids_by_group, policy),
+        tenant_id=tenant_id,
+        start_time=process_start,
+        setups=setups,
+    )
+
+    result = await schedule_repo.create_many(created_schedules)
+    if not result.succeeded:
+        await schedule_repo.delete_many([id for id in result.ids if id is not None])
+        raise RuntimeError(
+            f"注文ID {order_id} のスケジュール保存に失敗しました: "
+            f"{'; '.join(error.message for error in result.errors)}"
+        )
+
+    return created_schedules
+
+
+def schedule_orders(
+    order_repo: OrderRepository,
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    tenant_id: str,
+    start_time: datetime | None = None,
+    mode: SchedulingMode = "append",
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+    policy: SelectionPolicy = "earliest_start",
+    rule: DispatchRule = "fifo",
+    progress: Callable[[int, int], None] | None = None,
+    workers: int = 1,
+    setup_window: int = 0,
+) -> dict[str, Any]:
+    """
+    未スケジュールの注文（is_scheduled = false）をまとめてスケジュールする。
+
+    注文・工程・設備グループメンバー・設備の最終終了時刻を一括で読み込み、
+    すべての注文をメモリ上のタイムラインに対して計画した後、
+    スケジュールの一括INSERTと注文の一括更新でまとめて保存する。
+
+    注文は設備を取り合う可能性のある注文どうしの連結成分に分け、成分ごとに計画する。
+    workers が1より大きい（または0の）場合は、成分ごとに別プロセスで並行に計画する。
+
+    追加モードでは、設備の直前の作業と段取り方法が同じ工程の段取り時間を省く（setup_times 参照）。
+    setup_window を指定した場合は、段取り方法が同じ注文を続けて割り当てるよう並べ替える。
+
+    Args:
+        order_repo: 注文リポジトリ
+        product_repo: 製品リポジトリ
+        schedule_repo: スケジュールリポジトリ
+        tenant_id: テナントID
+        start_time: スケジュール開始基準時刻（指定なしの場合は現在時刻）
+        mode: "append" は設備の最終終了時刻の後ろに追加し、
+            "insertion" はタイムライン途中の空き時間帯にも挿入する
+        calendar: 開始・終了時刻の計算に使う稼働カレンダー
+        policy: 設備の選定方針（earliest_start / earliest_finish / least_loaded）
+        rule: 注文を割り当てる順序のルール（fifo / edd / spt / cr）
+        progress: 注文を計画するごとに (計画済みの件数, 全体の件数) で呼び出す関数
+        workers: 同時に計画する成分の数（0 の場合はCPUのコア数）。プロセスはアプリ全体で
+            共有するプールから使う
+        setup_window: 段取り方法が同じ注文を引き寄せる範囲（後ろの注文の件数、0 の場合は並べ替えない）
+
+    Returns:
+        以下のキーを持つ辞書
+            - scheduled_order_ids: スケジュールされた注文IDのリスト
+            - failed_orders: スケジュールできなかった注文（order_id, reason）のリスト
+            - schedule_count: 作成されたスケジュールの件数
+            - tardiness: 納期のある注文ごとの完了予定日時と納期遅れ（分）
+            - schedules: 作成されたスケジュールのリスト
+    """
+    orders = order_repo.get_unscheduled()
+
+    # 工程・設備グループメンバー・設備の空き状況をそれぞれ1回のクエリで取得
+    routings_by_product = _cached_routings_by_products(
+        product_repo, tenant_id, {order["product_id"] for order in orders}
+    )
+    group_ids = {
+        routing["equipment_group_id"]
+        for routings in routings_by_product.values()
+        for routing in routings
+    }
+    machine_ids_by_group = _cached_equipment_ids_by_groups(
+        product_repo, tenant_id, group_ids
+    )
+
+    process_start = start_time if start_time else datetime.now().astimezone()
+    availability = _load_bookings(
+        schedule_repo,
+        _collect_machine_ids(machine_ids_by_group),
+        mode,
+        process_start,
+        calendar,
+    )
+
+    # 割り当てる順序をルールで決める（fifo の場合は受注日時順のまま）
+    orders = rank_orders(orders, routings_by_product, rule, process_start, calendar)
+    if setup_window:
+        # 段取り替えを減らすため、段取り方法が同じ注文を近くに集める
+        orders = batch_by_setup(orders, routings_by_product, setup_window)
+
+    valid_orders: list[dict[str, Any]] = []
+    failed_orders: list[dict[str, Any]] = []
+    for order in orders:
+        try:
+            routings = routings_by_product.get(order["product_id"], [])
+            _validate_routings(order["product_id"], routings, machine_ids_by_group)
+            _validate_operation_lengths(routings, order["quantity"], calendar)
+        except ValueError as e:
+            failed_orders.append({"order_id": order["id"], "reason": str(e)})
+            continue
+        valid_orders.append(order)
+
+    planned, planning_failures = _plan_components(
+        partition_orders(valid_orders, routings_by_product, machine_ids_by_group),
+        _PlanningContext(
+            routings_by_product,
+            machine_ids_by_group,
+            # 全注文 × 工程の所要時間は、計画の前に配列演算でまとめて計算しておく
+            build_operation_table(valid_orders, routings_by_product),
+            availability,
+            _load_setups(
+                product_repo,
+                schedule_repo,
+                tenant_id,
+                _collect_machine_ids(machine_ids_by_group),
+                mode,
+                [r for routings in routings_by_product.values() for r in routings],
+            ),
+            policy,
+            tenant_id,
+            process_start,
+        ),
+        workers,
+        _offset_progress(progress, len(failed_orders), len(orders)),
+    )
+    failed_orders.extend(planning_failures)
+    # 成分ごとの計画結果を、並べ替えた注文の順にまとめる
+    planned_orders = [order for order in valid_orders if order["id"] in planned]
+    schedules = [s for order in planned_orders for s in planned[order["id"]]]
+    scheduled_order_ids = [order["id"] for order in planned_orders]
+
+    # 計画結果をまとめて保存
+    if schedules:
+        write_failures = _save_schedules(schedule_repo, schedules)
+        if write_failures:
+            failed_orders.extend(write_failures)
+            failed_ids = {failure["order_id"] for failure in write_failures}
+            scheduled_order_ids = [
+                id for id in scheduled_order_ids if id not in failed_ids
+            ]
+            schedules = [s for s in schedules if s["order_id"] not in failed_ids]
+    if scheduled_order_ids:
+        order_repo.mark_many_as_scheduled(scheduled_order_ids)
+
+    scheduled = set(scheduled_order_ids)
+    return {
+        "scheduled_order_ids": scheduled_order_ids,
+        "failed_orders": failed_orders,
+        "schedule_count": len(schedules),
+        "tardiness": projected_tardiness(
+            [order for order in orders if order["id"] in scheduled],
+            schedules,
+            process_start.tzinfo,
+        ),
+        "schedules": schedules,
+    }
+
+
+@dataclass(frozen=True)
+class _PlanningContext:
+    """連結成分の計画に共通する入力（別プロセスに渡すため pickle できる）"""
+
+    routings_by_product: dict[int, list[dict[str, Any]]]
+    machine_ids_by_group: dict[int, list[int]]
+    operations: OperationTable
+    bookings: MachineBookings
+    setups: SetupTimes | None
+    policy: SelectionPolicy
+    tenant_id: str
+    start_time: datetime
+
+    def for_component(self, orders: list[dict[str, Any]]) -> "_PlanningContext":
+        """
+        連結成分の注文の計画に必要な分だけを持つ入力を返す（別プロセスに渡す量を減らす）。
+
+        工程・設備グループは成分の注文の製品で使うもの、設備の空き状況・段取り方法は
+        その設備グループに所属する設備のものだけを残す。
+
+        Args:
+            orders: 連結成分の注文のリスト
+
+        Returns:
+            _PlanningContext: 成分の注文の計画に必要な分だけを持つ入力
+        """
+        routings_by_product = {
+            product_id: self.routings_by_product[product_id]
+            for product_id in {order["product_id"] for order in orders}
+        }
+        machine_ids_by_group = {
+            group_id: self.machine_ids_by_group[group_id]
+            for group_id in {
+                routing["equipment_group_id"]
+                for routings in routings_by_product.values()
+                for routing in routings
+            }
+        }
+        machine_ids = _collect_machine_ids(machine_ids_by_group)
+        return _PlanningContext(
+            routings_by_product,
+            machine_ids_by_group,
+            self.operations.take([order["id"] for order in orders]),
+            self.bookings.restrict(machine_ids),
+            self.setups.restrict(machine_ids) if self.setups else None,
+            self.policy,
+            self.tenant_id,
+            self.start_time,
+        )
+
+
+def _plan_component(
+    orders: list[dict[str, Any]],
+    context: _PlanningContext,
+    on_planned: Callable[[], None] | None = None,
+) -> tuple[dict[int, list[dict[str, Any]]], list[dict[str, Any]]]:
+    """
+    1つの連結成分の注文を、同じタイムライン上に並べた順に計画する。
+
+    計画できない注文（段取り替えを含めると分割しない工程が稼働区間に収まらない場合など）は、
+    成分全体を中断せずに失敗として記録し、残りの注文の計画を続ける。その注文の前工程に
+    割り当てた時間帯は保存しないが、後続の注文の計画では使用済みとして扱う。
+
+    Args:
+        orders: 連結成分の注文のリスト
+        context: 計画に共通する入力
+        on_planned: 注文を1件計画するごとに呼び出す関数
+
+    Returns:
+        注文IDをキーとした計画されたスケジュールのリストと、
+        計画できなかった注文（order_id, reason）のリスト
+    """
+    # 設備選定用のヒープは成分内の全注文で使い回す
+    selector = MachineSelector(
+        context.bookings, context.machine_ids_by_group, context.policy
+    )
+    planned: dict[int, list[dict[str, Any]]] = {}
+    failed: list[dict[str, Any]] = []
+    for order in orders:
+        try:
+            planned[order["id"]] = _plan_order(
+                order_id=order["id"],
+                quantity=order["quantity"],
+                routings=context.routings_by_product[order["product_id"]],
+                selector=selector,
+                tenant_id=context.tenant_id,
+                start_time=context.start_time,
+                durations=context.operations.minutes_for(order["id"]),
+                setups=context.setups,
+            )
+        except ValueError as e:
+            failed.append({"order_id": order["id"], "reason": str(e)})
+        if on_planned:
+            on_planned()
+    return planned, failed
+
+
+def _plan_components(
+    components: list[list[dict[str, Any]]],
+    context: _PlanningContext,
+    workers: int,
+    progress: Callable[[int], None],
+) -> tuple[dict[int, list[dict[str, Any]]], list[dict[str, Any]]]:
+    """
+    連結成分ごとに注文を計画する。成分が複数あり workers が1でない場合は別プロセスで並行に計画する。
+
+    成分どうしは設備を共有しないため、各プロセスに渡した設備空き状況の複製を
+    それぞれ更新しても、結果は1つのタイムラインで計画した場合と同じになる。
+    各プロセスには、その成分の設備の空き状況など計画に必要な分だけを渡す。
+
+    Args:
+        components: 連結成分ごとの注文のリスト
+        context: 計画に共通する入力
+        workers: 同時に計画する成分の数（0 の場合はCPUのコア数）。プロセスはアプリ全体で
+            共有するプールから使う
+        progress: 計画済み（計画できなかった注文を含む）の注文の件数で呼び出す関数
+
+    Returns:
+        注文IDをキーとした計画されたスケジュールのリストと、
+        計画できなかった注文（order_id, reason）のリスト
+    """
+    planned: dict[int, list[dict[str, Any]]] = {}
+    failed: list[dict[str, Any]] = []
+    progress(0)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(components) < 2:
+        counter = itertools.count(1)
+        for component in components:
+            component_planned, component_failed = _plan_component(
+                component, context, lambda: progress(next(counter))
             )
+            planned.update(component_planned)
+            failed.extend(component_failed)
+        return planned, failed
 
-        # 各設備について、開始可能な時刻を計算
-        candidates = []
-        for machine_id in machine_ids:
-            # 設備の最終終了時刻を取得
-            last_end = schedule_repo.get_last_end_time(machine_id)
+    pool = get_process_pool()
 
-            # 設備が空く時間（最終終了時刻がない場合は開始基準時刻）
-            machine_free_at = last_end if last_end else current_process_start
+    def submit(component: list[dict[str, Any]]) -> Future:
+        return pool.submit(_plan_component, component, context.for_component(component))
+
+    # 同時に計画する成分を workers 件までに抑え、終わった成分の分だけ次の成分を渡す
+    pending = iter(components)
+    running = {submit(component) for component in itertools.islice(pending, workers)}
+    while running:
+        done, running = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            component_planned, component_failed = future.result()
+            planned.update(component_planned)
+            failed.extend(component_failed)
+            progress(len(planned) + len(failed))
+            component = next(pending, None)
+            if component is not None:
+                running.add(submit(component))
+    return planned, failed
+
+
+def _offset_progress(
+    progress: Callable[[int, int], None] | None, offset: int, total: int
+) -> Callable[[int], None]:
+    """計画済みの件数に offset（計画せずに終わった注文の件数）を加えて進捗を報告する関数を返す。"""
+    if progress is None:
+        return lambda _planned: None
+    return lambda planned: progress(offset + planned, total)
+
+
+def check_capacity(
+    order_repo: OrderRepository,
+    product_repo: ProductRepository,
+    start_time: datetime | None = None,
+    horizon_days: int = 14,
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+) -> dict[str, Any]:
+    """
+    未スケジュールの注文の負荷を、設備グループごとの期間内の稼働可能時間と比べる（負荷山積み）。
+
+    注文 × 工程を列指向テーブルに展開し、負荷の集計は配列演算で行う。DBへの書き込みは行わない。
+
+    Args:
+        order_repo: 注文リポジトリ
+        product_repo: 製品リポジトリ
+        start_time: 期間の開始日時（指定なしの場合は現在時刻）
+        horizon_days: 期間の日数
+        calendar: 稼働可能時間の計算に使う稼働カレンダー
+
+    Returns:
+        以下のキーを持つ辞書
+            - start_datetime: 期間の開始日時
+            - end_datetime: 期間の終了日時
+            - order_count: 対象の注文の件数
+            - groups: 設備グループごとの負荷と稼働可能時間（rough_cut_capacity の戻り値）
+    """
+    orders = order_repo.get_unscheduled()
+    routings_by_product = product_repo.get_routings_by_products(
+        {order["product_id"] for order in orders}
+    )
+    table = build_operation_table(orders, routings_by_product)
+    machine_ids_by_group = _get_equipment_ids_by_groups(
+        product_repo, set(table.group_ids.tolist())
+    )
 
-            # 前工程が終わった時間と設備が空く時間の遅い方を基準とする
-            base_start = max(machine_free_at, current_process_start)
+    start = start_time if start_time else datetime.now().astimezone()
+    end = start + timedelta(days=horizon_days)
+    return {
+        "start_datetime": start.isoformat(),
+        "end_datetime": end.isoformat(),
+        "order_count": len(orders),
+        "groups": rough_cut_capacity(table, machine_ids_by_group, start, end, calendar),
+    }
 
-            # カレンダーロジックを適用して実際の開始時刻を決定
-            actual_start = get_next_available_start_time(base_start, total_duration_min)
 
-            candidates.append(
-                {
-                    "machine_id": machine_id,
-                    "start": actual_start,
-                    "duration_sec": total_duration_sec,
-                }
+def simulate_orders(
+    orders: list[dict[str, Any]],
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    tenant_id: str,
+    start_time: datetime | None = None,
+    mode: SchedulingMode = "append",
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+    policy: SelectionPolicy = "earliest_start",
+    cumulative: bool = False,
+) -> dict[str, Any]:
+    """
+    仮の注文を、DBに書き込まずにスケジュールしてみる（what-if シミュレーション）。
+
+    工程・設備グループメンバー・設備の空き状況は最初に1回だけ読み込み、以降は
+    読み込んだ空き状況の複製（コピーオンライト）に対して計画する。計画した結果は
+    保存せずに破棄するため、何度試しても保存済みのスケジュールは変わらない。
+
+    Args:
+        orders: 仮の注文（product_id, quantity, deadline_date）のリスト
+        product_repo: 製品リポジトリ
+        schedule_repo: スケジュールリポジトリ
+        tenant_id: テナントID
+        start_time: スケジュール開始基準時刻（指定なしの場合は現在時刻）
+        mode: "append" は設備の最終終了時刻の後ろに追加し、
+            "insertion" はタイムライン途中の空き時間帯にも挿入する
+        calendar: 開始・終了時刻の計算に使う稼働カレンダー
+        policy: 設備の選定方針（earliest_start / earliest_finish / least_loaded）
+        cumulative: False の場合は各注文を現在のスケジュールに対して個別に計画し
+            （見積もりの比較用）、True の場合は注文を順に積み上げて計画する
+
+    Returns:
+        以下のキーを持つ辞書
+            - results: 計画できた注文ごとの index（リクエスト内の位置）、
+              schedules、completion_datetime、lead_time_minutes（開始基準時刻から
+              完了までの分数）、tardiness_minutes（納期のない注文はNone）
+            - failed_orders: 計画できなかった注文（index, reason）のリスト
+    """
+    routings_by_product = _cached_routings_by_products(
+        product_repo, tenant_id, {order["product_id"] for order in orders}
+    )
+    group_ids = {
+        routing["equipment_group_id"]
+        for routings in routings_by_product.values()
+        for routing in routings
+    }
+    machine_ids_by_group = _cached_equipment_ids_by_groups(
+        product_repo, tenant_id, group_ids
+    )
+
+    process_start = start_time if start_time else datetime.now().astimezone()
+    base = _load_bookings(
+        schedule_repo,
+        _collect_machine_ids(machine_ids_by_group),
+        mode,
+        process_start,
+        calendar,
+    )
+
+    scenario = base.fork()
+    results: list[dict[str, Any]] = []
+    failed_orders: list[dict[str, Any]] = []
+    for index, order in enumerate(orders):
+        routings = routings_by_product.get(order["product_id"], [])
+        if not cumulative:
+            # 毎回、読み込んだ時点の空き状況から計画する
+            scenario = base.fork()
+        try:
+            _validate_routings(order["product_id"], routings, machine_ids_by_group)
+            _validate_operation_lengths(routings, order["quantity"], calendar)
+            schedules = _plan_order(
+                order_id=None,
+                quantity=order["quantity"],
+                routings=routings,
+                selector=MachineSelector(scenario, machine_ids_by_group, policy),
+                tenant_id=tenant_id,
+                start_time=process_start,
             )
+        except ValueError as e:
+            failed_orders.append({"index": index, "reason": str(e)})
+            continue
+        results.append(
+            {"index": index, **_simulation_summary(order, schedules, process_start)}
+        )
 
-        # 最も早く開始できる設備を選定
-        best = min(candidates, key=lambda x: x["start"])  # type: ignore
-        start_time = best["start"]  # type: ignore
-
-        if start_time is None:
-            raise ValueError("開始時刻が取得できません")
-        elif type(start_time) is not datetime:
-            raise ValueError("開始時刻の型が正しくありません")
-
-        # 終了時刻を計算
-        end_time = calculate_end_time(start_time, total_duration_min)
-
-        # スケジュールを保存
-        schedule_data = {
-            "tenant_id": tenant_id,
-            "order_id": order_id,
-            "process_routing_id": routing["id"],
-            "equipment_id": best["machine_id"],
-            "start_datetime": start_time.isoformat(),
-            "end_datetime": end_time.isoformat(),
-        }
-        schedule_repo.create(schedule_data)
-        created_schedules.append(schedule_data)
+    return {"results": results, "failed_orders": failed_orders}
+
+
+def promise_orders(
+    lines: list[dict[str, Any]],
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    tenant_id: str,
+    start_time: datetime | None = None,
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+) -> dict[str, Any]:
+    """
+    注文明細ごとに、最も早く完了できる日時と使用する設備を回答する（capable-to-promise）。
+
+    設備の空き状況はテナントごとのキャッシュの複製を使い、スケジュールは書き込まない。
+    明細は指定された順に同じ複製へ積み上げる（同じ注文の明細どうしでも設備を取り合う）。
+    各工程は最も早く終了できる設備に割り当てる。
+
+    Args:
+        lines: 注文明細（product_id, quantity）のリスト
+        product_repo: 製品リポジトリ
+        schedule_repo: スケジュールリポジトリ
+        tenant_id: テナントID
+        start_time: 基準時刻（指定なしの場合は現在時刻）
+        calendar: 開始・終了時刻の計算に使う稼働カレンダー
+
+    Returns:
+        以下のキーを持つ辞書
+            - lines: 回答できた明細ごとの index（リクエスト内の位置）、product_id、
+              quantity、completion_datetime、equipment_ids（工程順の設備ID）
+            - failed_lines: 回答できなかった明細（index, reason）のリスト
+            - completion_datetime: すべての明細が完了する日時（回答できた明細がない場合はNone）
+    """
+    routings_by_product = _cached_routings_by_products(
+        product_repo, tenant_id, {line["product_id"] for line in lines}
+    )
+    group_ids = {
+        routing["equipment_group_id"]
+        for routings in routings_by_product.values()
+        for routing in routings
+    }
+    machine_ids_by_group = _cached_equipment_ids_by_groups(
+        product_repo, tenant_id, group_ids
+    )
+    availability = load_machine_availability(
+        tenant_id, schedule_repo, _collect_machine_ids(machine_ids_by_group), calendar
+    )
+    selector = MachineSelector(availability, machine_ids_by_group, "earliest_finish")
+
+    process_start = start_time if start_time else datetime.now().astimezone()
+    promised: list[dict[str, Any]] = []
+    failed_lines: list[dict[str, Any]] = []
+    for index, line in enumerate(lines):
+        routings = routings_by_product.get(line["product_id"], [])
+        try:
+            _validate_routings(line["product_id"], routings, machine_ids_by_group)
+            _validate_operation_lengths(routings, line["quantity"], calendar)
+            schedules = _plan_order(
+                order_id=None,
+                quantity=line["quantity"],
+                routings=routings,
+                selector=selector,
+                tenant_id=tenant_id,
+                start_time=process_start,
+            )
+        except ValueError as e:
+            failed_lines.append({"index": index, "reason": str(e)})
+            continue
+        promised.append(
+            {
+                "index": index,
+                "product_id": line["product_id"],
+                "quantity": line["quantity"],
+                # 最後の工程の終了時刻が明細の完了日時
+                "completion_datetime": schedules[-1]["end_datetime"],
+                "equipment_ids": [s["equipment_id"] for s in schedules],
+            }
+        )
+
+    return {
+        "lines": promised,
+        "failed_lines": failed_lines,
+        "completion_datetime": max(
+            (line["completion_datetime"] for line in promised),
+            key=parse_datetime,
+            default=None,
+        ),
+    }
+
+
+def _simulation_summary(
+    order: dict[str, Any], schedules: list[dict[str, Any]], start_time: datetime
+) -> dict[str, Any]:
+    """シミュレーションした注文の完了予定日時・リードタイム・納期遅れをまとめる。"""
+    completion = max(parse_datetime(s["end_datetime"]) for s in schedules)
+    tardiness = None
+    if order.get("deadline_date"):
+        due = due_datetime(order["deadline_date"], start_time.tzinfo)
+        tardiness = max((completion - due).total_seconds() / 60, 0.0)
+    return {
+        "schedules": schedules,
+        "completion_datetime": completion.isoformat(),
+        "lead_time_minutes": (completion - start_time).total_seconds() / 60,
+        "tardiness_minutes": tardiness,
+    }
+
+
+def optimize_schedules(
+    order_repo: OrderRepository,
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    tenant_id: str,
+    objective: Objective = "makespan",
+    time_limit_seconds: float = 5.0,
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+    since: datetime | None = None,
+    workers: int = 1,
+    apply: bool = False,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """
+    保存済みのスケジュールを局所探索（焼きなまし法）で改善する。
+
+    基準時刻以降に開始するスケジュールを対象に、設備上の並び順と、設備グループ内での
+    設備の割り当てを入れ替える。基準時刻の時点で実行中のスケジュールは動かさない。
+
+    Args:
+        order_repo: 注文リポジトリ
+        product_repo: 製品リポジトリ
+        schedule_repo: スケジュールリポジトリ
+        tenant_id: テナントID
+        objective: 最小化する目的関数（makespan / total_tardiness）
+        time_limit_seconds: 探索に使う最大の経過時間（秒）
+        calendar: 開始・終了時刻の計算に使う稼働カレンダー
+        since: 基準時刻（指定なしの場合は現在時刻）
+        workers: 探索するプロセス数（0 の場合はCPUのコア数）
+        apply: True の場合、改善したスケジュールを保存する
+        seed: 乱数の種
+
+    Returns:
+        以下のキーを持つ辞書
+            - objective: 目的関数
+            - before: 現在のスケジュールの目的関数の値（分）
+            - after: 改善後の目的関数の値（分）
+            - delta: after - before（改善した場合は負の値）
+            - iterations: 近傍操作の回数
+            - changed_schedules: 設備・開始・終了時刻が変わったスケジュールの行
+            - applied: 変更を保存したかどうか
+    """
+    since = since or datetime.now().astimezone()
+    rows = schedule_repo.get_tenant_schedules(tenant_id, since)
+    movable = [row for row in rows if parse_datetime(row["start_datetime"]) >= since]
+
+    deadlines = order_repo.get_deadlines({row["order_id"] for row in movable})
+    due = {
+        order_id: due_datetime(deadline, since.tzinfo)
+        for order_id, deadline in deadlines.items()
+        if deadline
+    }
+    before = _schedule_objective(objective, movable, due, since)
+    result: dict[str, Any] = {
+        "objective": objective,
+        "before": before,
+        "after": before,
+        "delta": 0.0,
+        "iterations": 0,
+        "changed_schedules": [],
+        "applied": False,
+    }
+    if not movable:
+        return result
+
+    problem, _ = _load_schedule_problem(
+        product_repo, schedule_repo, rows, movable, calendar, since
+    )
+    problem.due = due
+
+    optimized = optimize(problem, objective, time_limit_seconds, seed, workers)
+    result["iterations"] = optimized.iterations
+    if optimized.best_value >= before:
+        # 改善できなかった場合は現在のスケジュールのまま
+        return result
+
+    changed = [
+        _with_assignment(row, machine_id, start, end)
+        for row, (machine_id, start, end) in zip(
+            movable, optimized.assignments, strict=True
+        )
+        if machine_id != row["equipment_id"]
+        or start != parse_datetime(row["start_datetime"])
+        or end != parse_datetime(row["end_datetime"])
+    ]
+    if apply and changed:
+        write = schedule_repo.upsert_many(changed)
+        if not write.succeeded:
+            raise RuntimeError(
+                "改善したスケジュールの保存に失敗しました: "
+                f"{'; '.join(error.message for error in write.errors)}"
+            )
+
+    result.update(
+        after=optimized.best_value,
+        delta=optimized.best_value - before,
+        changed_schedules=changed,
+        applied=apply and bool(changed),
+    )
+    return result
+
+
+def reschedule_order(
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    tenant_id: str,
+    order_id: int,
+    quantity: int | None = None,
+    remove: bool = False,
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+    since: datetime | None = None,
+) -> dict[str, Any]:
+    """
+    注文の数量変更・削除に合わせて、影響を受けるスケジュールだけを計画し直す。
+
+    設備の割り当てと並び順は変えず、注文の工程を取り除く（または所要時間を変える）。
+    そのうえで、同じ設備の後続の作業と、その注文内の後工程だけを前に詰める、
+    または後ろにずらす。テナント全体を計画し直すことはない。保存は
+    apply_schedule_changes で行う。
+
+    Args:
+        product_repo: 製品リポジトリ
+        schedule_repo: スケジュールリポジトリ
+        tenant_id: テナントID
+        order_id: 変更・削除された注文のID
+        quantity: 変更後の数量（remove が False の場合に使用）
+        remove: True の場合、注文のスケジュールを取り除く
+        calendar: 開始・終了時刻の計算に使う稼働カレンダー
+        since: 基準時刻（これ以降に開始するスケジュールのみを動かす）
+
+    Returns:
+        以下のキーを持つ辞書
+            - removed_schedule_ids: 取り除くスケジュールのID
+            - updated_schedules: 開始・終了時刻が変わったスケジュールの行
+    """
+    since = since or datetime.now().astimezone()
+    rows = schedule_repo.get_tenant_schedules(tenant_id, since)
+    movable = [row for row in rows if parse_datetime(row["start_datetime"]) >= since]
+    if not any(row["order_id"] == order_id for row in movable):
+        return {"removed_schedule_ids": [], "updated_schedules": []}
+
+    problem, routings = _load_schedule_problem(
+        product_repo, schedule_repo, rows, movable, calendar, since
+    )
+    state = ScheduleState(
+        problem,
+        "makespan",
+        initial_times=[
+            (parse_datetime(row["start_datetime"]), parse_datetime(row["end_datetime"]))
+            for row in movable
+        ],
+    )
+    targets = [i for i, row in enumerate(movable) if row["order_id"] == order_id]
+    if remove:
+        changed = state.replan(removed=targets)
+    else:
+        changed = state.replan(
+            durations={
+                i: _operation_minutes(
+                    routings[movable[i]["process_routing_id"]], quantity or 0
+                )
+                for i in targets
+                if movable[i]["process_routing_id"] in routings
+            }
+        )
+
+    return {
+        "removed_schedule_ids": [movable[i]["id"] for i in targets] if remove else [],
+        "updated_schedules": [
+            _with_assignment(
+                movable[i], state.machine_of[i], state.start[i], state.end[i]
+            )
+            for i in sorted(changed)
+            if i not in state.removed
+        ],
+    }
+
+
+def apply_schedule_changes(
+    schedule_repo: ScheduleRepository, changes: dict[str, Any]
+) -> None:
+    """
+    reschedule_order の結果を保存する。変わった行だけを書き込む。
+
+    Args:
+        schedule_repo: スケジュールリポジトリ
+        changes: reschedule_order の戻り値
+
+    Raises:
+        RuntimeError: スケジュールの保存に失敗した場合
+    """
+    if changes["removed_schedule_ids"]:
+        schedule_repo.delete_many(changes["removed_schedule_ids"])
+    if changes["updated_schedules"]:
+        result = schedule_repo.upsert_many(changes["updated_schedules"])
+        if not result.succeeded:
+            raise RuntimeError(
+                "スケジュールの保存に失敗しました: "
+                f"{'; '.join(error.message for error in result.errors)}"
+            )
+
+
+def _with_assignment(
+    row: dict[str, Any], machine_id: int, start: datetime, end: datetime
+) -> dict[str, Any]:
+    """スケジュールの行の設備・開始・終了時刻を置き換えた行を返す。"""
+    return {
+        **row,
+        "equipment_id": machine_id,
+        "start_datetime": start.isoformat(),
+        "end_datetime": end.isoformat(),
+    }
+
+
+def _load_schedule_problem(
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    rows: list[dict[str, Any]],
+    movable: list[dict[str, Any]],
+    calendar: WorkCalendar,
+    since: datetime,
+) -> tuple[OptimizationProblem, dict[int, dict[str, Any]]]:
+    """
+    スケジュールの行に工程・設備グループ・設備停止期間を合わせて局所探索の入力を作る。
+
+    movable は注文ごとの工程順に並べ替える（OptimizationProblem.operations と同じ順序）。
+
+    Returns:
+        局所探索の入力と、工程順序IDをキーとした工程
+    """
+    routings = product_repo.get_routings_by_ids(
+        {row["process_routing_id"] for row in movable if row["process_routing_id"]}
+    )
+    machine_ids_by_group = _get_equipment_ids_by_groups(
+        product_repo, {routing["equipment_group_id"] for routing in routings.values()}
+    )
+    movable.sort(
+        key=lambda row: (
+            row["order_id"],
+            routings.get(row["process_routing_id"], {}).get("sequence_order", 0),
+            row["start_datetime"],
+            row["id"],
+        )
+    )
+    problem = _build_optimization_problem(
+        rows, movable, routings, machine_ids_by_group, calendar, since
+    )
+    problem.downtimes = schedule_repo.get_downtime_intervals(
+        {machine_id for op in problem.operations for machine_id in op.machine_ids},
+        since,
+    )
+    return problem, routings
+
+
+def _build_optimization_problem(
+    rows: list[dict[str, Any]],
+    movable: list[dict[str, Any]],
+    routings: dict[int, dict[str, Any]],
+    machine_ids_by_group: dict[int, list[int]],
+    calendar: WorkCalendar,
+    since: datetime,
+) -> OptimizationProblem:
+    """
+    スケジュールの行から局所探索の入力を作成する。
+
+    movable は注文ごとに工程順に並べておくこと。実行中のスケジュール（movable 以外の行）は、
+    設備が空く時刻と、同じ注文の後工程を開始できる時刻の制約として扱う。
+    """
+    movable_ids = {row["id"] for row in movable}
+    machine_free_at: dict[int, datetime] = {}
+    order_ready_at: dict[int, datetime] = {}
+    for row in rows:
+        if row["id"] in movable_ids:
+            continue
+        end = parse_datetime(row["end_datetime"])
+        machine_id = row["equipment_id"]
+        machine_free_at[machine_id] = max(machine_free_at.get(machine_id, end), end)
+        order_ready_at[row["order_id"]] = max(
+            order_ready_at.get(row["order_id"], end), end
+        )
+
+    operations: list[Operation] = []
+    sequences: dict[int, list[int]] = {}
+    for row in movable:
+        routing = routings.get(row["process_routing_id"], {})
+        members = machine_ids_by_group.get(routing.get("equipment_group_id"), [])
+        machine_id = row["equipment_id"]
+        operations.append(
+            Operation(
+                schedule_id=row["id"],
+                order_id=row["order_id"],
+                duration_minutes=calendar.working_minutes_between(
+                    parse_datetime(row["start_datetime"]),
+                    parse_datetime(row["end_datetime"]),
+                ),
+                machine_ids=(machine_id, *(m for m in members if m != machine_id)),
+                release=max(order_ready_at.get(row["order_id"], since), since),
+                # 工程が削除されている場合は、保存済みの配置のまま動かせるよう分割を許す
+                allow_split=routing.get("allow_split", False) if routing else True,
+            )
+        )
+        sequences.setdefault(machine_id, []).append(len(operations) - 1)
+
+    # 設備ごとの並び順は現在の開始時刻順
+    for seq in sequences.values():
+        seq.sort(key=lambda i: movable[i]["start_datetime"])
+
+    return OptimizationProblem(
+        operations=operations,
+        sequences=sequences,
+        calendar=calendar,
+        machine_free_at=machine_free_at,
+        origin=since,
+    )
+
+
+def _schedule_objective(
+    objective: Objective,
+    rows: list[dict[str, Any]],
+    due: dict[int, datetime],
+    since: datetime,
+) -> float:
+    """保存済みのスケジュールの目的関数の値（分）を計算する。"""
+    completion: dict[int, datetime] = {}
+    for row in rows:
+        end = parse_datetime(row["end_datetime"])
+        completion[row["order_id"]] = max(completion.get(row["order_id"], end), end)
+
+    if objective == "makespan":
+        latest = max(completion.values(), default=since)
+        return max((latest - since).total_seconds() / 60, 0.0)
+    return sum(
+        max((end - due[order_id]).total_seconds() / 60, 0.0)
+        for order_id, end in completion.items()
+        if order_id in due
+    )
+
+
+def _plan_order(
+    order_id: int | None,
+    quantity: int,
+    routings: list[dict[str, Any]],
+    selector: MachineSelector,
+    tenant_id: str,
+    start_time: datetime,
+    durations: Sequence[float] | None = None,
+    setups: SetupTimes | None = None,
+) -> list[dict[str, Any]]:
+    """
+    1件の注文の全工程を、メモリ上の設備空き状況に対して計画する。
+
+    DBへのアクセスは行わず、割り当てた設備の空き時刻は selector の設備空き状況上で更新する。
+
+    Args:
+        order_id: 注文ID（シミュレーションの仮の注文ではNone）
+        quantity: 数量
+        routings: 工程のリスト（sequence_order順）
+        selector: 設備選定（設備空き状況と稼働カレンダーを含む）
+        tenant_id: テナントID
+        start_time: 最初の工程の開始基準時刻
+        durations: 計算済みの工程ごとの所要時間（分）。指定なしの場合は工程ごとに計算する
+        setups: 設備ごとの段取り時間。指定した場合は工程の段取り時間の代わりに、
+            設備の直前の作業の段取り方法に応じた段取り時間を使う
+
+    Returns:
+        計画されたスケジュールのリスト
+    """
+    planned_schedules = []
+    current_process_start = start_time
+
+    for i, routing in enumerate(routings):
+        # 工程の情報を取得
+        equipment_group_id = routing["equipment_group_id"]
+        # 稼働時間の区切り（終業・休日）をまたいで作業を分割できるか（既定は分割しない）
+        allow_split = routing.get("allow_split", False)
+        total_duration_min = (
+            durations[i]
+            if durations is not None
+            else _operation_minutes(routing, quantity)
+        )
+
+        # 設備グループの中から、選定方針に従って設備と開始・終了時刻を決定
+        if setups is None:
+            choice = selector.select(
+                equipment_group_id,
+                current_process_start,
+                total_duration_min,
+                allow_split,
+            )
+        else:
+            # 段取り時間は設備ごとに異なるため、段取りを除いた時間と設備ごとの段取り時間で選ぶ
+            choice = selector.select(
+                equipment_group_id,
+                current_process_start,
+                total_duration_min - default_setup_minutes(routing),
+                allow_split,
+                partial(setups.setup_minutes, routing=routing),
+            )
+        operation_start = choice.start
+        end_time = choice.end
+
+        planned_schedules.append(
+            {
+                "tenant_id": tenant_id,
+                "order_id": order_id,
+                "process_routing_id": routing["id"],
+                "equipment_id": choice.machine_id,
+                "start_datetime": operation_start.isoformat(),
+                "end_datetime": end_time.isoformat(),
+            }
+        )
+
+        # 同じ設備を後続工程で使う場合に備え、設備の空き状況と選定用のヒープを更新
+        selector.book(choice.machine_id, operation_start, end_time)
+        if setups is not None:
+            setups.record(choice.machine_id, routing)
 
         # 次工程の開始基準時間は、今回の終了時刻
         current_process_start = end_time
 
-    return created_schedules
+    return planned_schedules
+
+
+def _operation_minutes(routing: dict[str, Any], quantity: int) -> float:
+    """工程の所要時間（段取り時間 + 単位時間 × 数量、分）を計算する。"""
+    setup_time_sec = routing.get("setup_time_seconds", 0) or 0
+    unit_time_sec = float(routing["unit_time_seconds"])
+    return (setup_time_sec + unit_time_sec * quantity) / 60
+
+
+def _load_bookings(
+    schedule_repo: ScheduleRepository,
+    machine_ids: set[int],
+    mode: SchedulingMode,
+    since: datetime,
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+) -> MachineBookings:
+    """
+    スケジューリングモードに応じて、設備の空き状況を1回の一括クエリで読み込む。
+
+    Args:
+        schedule_repo: スケジュールリポジトリ
+        machine_ids: 対象となる設備IDの集合
+        mode: スケジューリングモード
+        since: スケジュール開始基準時刻（これより後に終わる予約・設備停止期間のみ読み込む）
+        calendar: 稼働カレンダー
+
+    Returns:
+        MachineBookings: 設備の空き状況
+    """
+    if mode == "insertion":
+        return EquipmentTimelineIndex.load(schedule_repo, machine_ids, since, calendar)
+    return MachineAvailability.load(schedule_repo, machine_ids, calendar, since)
 
 
-def _get_equipment_ids_by_group(
-    product_repo: ProductRepository, group_id: int
-) -> list[int]:
+async def _load_bookings_async(
+    schedule_repo: AsyncScheduleRepository,
+    machine_ids: set[int],
+    mode: SchedulingMode,
+    since: datetime,
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+) -> MachineBookings:
     """
-    設備グループIDから、所属する設備IDのリストを取得する。
+    _load_bookings の非同期版。予約状況と設備停止期間の2つのクエリを並行に発行する。
+    """
+    if mode == "insertion":
+        intervals, downtimes = await asyncio.gather(
+            schedule_repo.get_booked_intervals(machine_ids, since),
+            schedule_repo.get_downtime_intervals(machine_ids, since),
+        )
+        return EquipmentTimelineIndex(intervals, calendar, downtimes)
+
+    last_end_times, downtimes = await asyncio.gather(
+        schedule_repo.get_last_end_times(machine_ids),
+        schedule_repo.get_downtime_intervals(machine_ids, since),
+    )
+    return MachineAvailability(last_end_times, calendar, downtimes)
+
+
+def _load_setups(
+    product_repo: ProductRepository,
+    schedule_repo: ScheduleRepository,
+    tenant_id: str,
+    machine_ids: set[int],
+    mode: SchedulingMode,
+    routings: Sequence[dict[str, Any]],
+) -> SetupTimes | None:
+    """
+    設備ごとの最後の段取り方法と段取り替え行列を読み込む。
+
+    挿入モードの場合、または段取り方法が設定された工程がない場合は読み込まずにNoneを返す
+    （工程の段取り時間をすべて見込む）。
 
     Args:
-        product_repo: 製品リポジトリ（equipment_group_membersテーブルへのアクセスに使用）
-        group_id: 設備グループID
+        product_repo: 製品リポジトリ
+        schedule_repo: スケジュールリポジトリ
+        tenant_id: テナントID
+        machine_ids: 対象となる設備IDの集合
+        mode: スケジューリングモード
+        routings: 計画する工程
 
     Returns:
-        設備IDのリスト
+        SetupTimes | None: 設備ごとの段取り時間
     """
-    res = (
-        product_repo.client.table("equipment_group_members")
-        .select("equipment_id")
-        .eq("equipment_group_id", group_id)
-        .execute()
+    if mode == "insertion" or not uses_setup_methods(routings):
+        return None
+    return SetupTimes(
+        schedule_repo.get_last_setup_methods(machine_ids),
+        product_repo.get_setup_changeovers(tenant_id),
     )
-    return [row["equipment_id"] for row in res.data] if res.data else []  # type: ignore
+
+
+async def _load_setups_async(
+    product_repo: AsyncProductRepository,
+    schedule_repo: AsyncScheduleRepository,
+    tenant_id: str,
+    machine_ids: set[int],
+    mode: SchedulingMode,
+    routings: Sequence[dict[str, Any]],
+) -> SetupTimes | None:
+    """
+    _load_setups の非同期版。最後の段取り方法と段取り替え行列の2つのクエリを並行に発行する。
+    """
+    if mode == "insertion" or not uses_setup_methods(routings):
+        return None
+    last_methods, changeovers = await asyncio.gather(
+        schedule_repo.get_last_setup_methods(machine_ids),
+        product_repo.get_setup_changeovers(tenant_id),
+    )
+    return SetupTimes(last_methods, changeovers)
+
+
+def _save_schedules(
+    schedule_repo: ScheduleRepository, schedules: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    スケジュールを一括INSERTし、保存に失敗した注文を返す。
+
+    チャンク単位で失敗した行を含む注文は、保存済みの他の工程も取り消して
+    注文単位で未スケジュールのまま残す。
+
+    Args:
+        schedule_repo: スケジュールリポジトリ
+        schedules: 保存するスケジュールのリスト
+
+    Returns:
+        保存に失敗した注文（order_id, reason）のリスト
+    """
+    result = schedule_repo.create_many(schedules)
+    if result.succeeded:
+        return []
+
+    reasons: dict[int, str] = {}
+    for error in result.errors:
+        for index in error.indexes:
+            reasons.setdefault(
+                schedules[index]["order_id"],
+                f"スケジュールの保存に失敗しました: {error.message}",
+            )
+
+    # 失敗した注文のうち、保存済みの工程を取り消す
+    rollback_ids = [
+        id
+        for schedule, id in zip(schedules, result.ids, strict=True)
+        if id is not None and schedule["order_id"] in reasons
+    ]
+    if rollback_ids:
+        schedule_repo.delete_many(rollback_ids)
+
+    return [
+        {"order_id": order_id, "reason": reason} for order_id, reason in reasons.items()
+    ]
+
+
+def _validate_routings(
+    product_id: int,
+    routings: list[dict[str, Any]],
+    machine_ids_by_group: dict[int, list[int]],
+) -> None:
+    """
+    工程が存在し、すべての工程の設備グループに設備が所属していることを確認する。
+
+    Args:
+        product_id: 製品ID
+        routings: 工程のリスト
+        machine_ids_by_group: 設備グループIDをキーとした設備IDのリスト
+
+    Raises:
+        ValueError: 工程が存在しない場合、または設備グループにメンバーが存在しない場合
+    """
+    if not routings:
+        raise ValueError(f"製品ID {product_id} に対する工程が見つかりません")
+
+    for routing in routings:
+        group_id = routing["equipment_group_id"]
+        if not machine_ids_by_group.get(group_id):
+            raise ValueError(f"設備グループID {group_id} に設備が見つかりません")
+
+
+def _validate_operation_lengths(
+    routings: list[dict[str, Any]], quantity: int, calendar: WorkCalendar
+) -> None:
+    """
+    分割しない工程の所要時間が、稼働カレンダーの1回の稼働時間に収まることを確認する。
+
+    Args:
+        routings: 工程のリスト
+        quantity: 数量
+        calendar: 稼働カレンダー
+
+    Raises:
+        ValueError: 分割しない工程の所要時間が最長の稼働区間（シフト）を超える場合
+    """
+    for routing in routings:
+        if routing.get("allow_split", False):
+            continue
+        minutes = _operation_minutes(routing, quantity)
+        if minutes > calendar.max_period_minutes:
+            raise ValueError(
+                f"工程ID {routing['id']} の所要時間（{minutes:g}分）が"
+                f"1回の稼働時間（{calendar.max_period_minutes / 60:g}時間）を超えています"
+            )
+
+
+def _collect_machine_ids(machine_ids_by_group: dict[int, list[int]]) -> set[int]:
+    """設備グループごとの設備IDリストから、重複のない設備IDの集合を作成する。"""
+    return {
+        machine_id
+        for machine_ids in machine_ids_by_group.values()
+        for machine_id in machine_ids
+    }
+
+
+def _cached_routings_by_products(
+    product_repo: ProductRepository, tenant_id: str, product_ids: Iterable[int]
+) -> dict[int, list[dict[str, Any]]]:
+    """製品ごとの工程順序を返す（キャッシュにない製品の分だけ1回のクエリで読み込む）。"""
+    return load_routings_by_products(
+        tenant_id, product_ids, product_repo.get_routings_by_products
+    )
+
+
+def _cached_equipment_ids_by_groups(
+    product_repo: ProductRepository, tenant_id: str, group_ids: Iterable[int]
+) -> dict[int, list[int]]:
+    """設備グループごとの所属設備IDを返す（キャッシュにないグループの分だけ読み込む）。"""
+    return load_machine_ids_by_groups(
+        tenant_id,
+        group_ids,
+        lambda ids: _get_equipment_ids_by_groups(product_repo, ids),
+    )
+
+
+def _get_equipment_ids_by_groups(
+    product_repo: ProductRepository, group_ids: Iterable[int]
+) -> dict[int, list[int]]:
+    """
+    複数の設備グループIDから、所属する設備IDのリストを in_() フィルタの上限ごとにまとめて取得する。
+
+    Args:
+        product_repo: 製品リポジトリ（equipment_group_membersテーブルへのアクセスに使用）
+        group_ids: 設備グループIDの一覧
+
+    Returns:
+        設備グループIDをキーとした設備IDのリスト
+    """
+    ids = sorted(set(group_ids))
+    machine_ids_by_group: dict[int, list[int]] = {group_id: [] for group_id in ids}
+    for offset in range(0, len(ids), IN_FILTER_CHUNK_SIZE):
+        chunk = ids[offset : offset + IN_FILTER_CHUNK_SIZE]
+        rows = fetch_all_pages(
+            lambda chunk=chunk: (
+                product_repo.client.table("equipment_group_members")
+                .select("equipment_group_id, equipment_id")
+                .in_("equipment_group_id", chunk)
+                .order("id")
+            )
+        )
+        for row in rows:
+            machine_ids_by_group.setdefault(row["equipment_group_id"], []).append(  # type: ignore
+                row["equipment_id"]  # type: ignore
+            )
+    return machine_ids_by_group
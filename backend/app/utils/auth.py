@@ -0,0 +1,149 @@
+"""
+JWTの検証とテナント所属のキャッシュモジュール
+
+アクセストークン（Supabase Auth が発行したJWT）は、Supabaseに問い合わせずにローカルで検証する。
+- HS256 のトークン: プロジェクトの JWT シークレット（環境変数 SUPABASE_JWT_SECRET）で検証
+- 非対称鍵（RS256 / ES256）のトークン: プロジェクトの JWKS
+  （{SUPABASE_URL}/auth/v1/.well-known/jwks.json、鍵は一定時間キャッシュ）で検証
+
+ユーザーがテナントに所属しているかどうか（organization_members）は (ユーザーID, テナントID) ごとに
+1回だけ問い合わせ、所属している場合はトークンの有効期限までキャッシュする。
+所属していない場合はキャッシュしない（所属の追加がすぐに反映されるように）。
+"""
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import jwt
+from cachetools import TLRUCache
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Supabase Auth が発行するログインユーザーのトークンの aud
+JWT_AUDIENCE = "authenticated"
+
+# JWKS で検証する署名アルゴリズム
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+# JWKS の鍵をキャッシュする秒数
+JWKS_CACHE_SECONDS = 600
+
+# キャッシュする (ユーザーID, テナントID) の組み合わせ数の上限
+MEMBERSHIP_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """検証済みのアクセストークンのクレーム"""
+
+    # ユーザーID（sub）
+    user_id: str
+    # 有効期限（exp、UNIX時間の秒）
+    expires_at: float
+    # データベースのロール（role、通常は authenticated）
+    role: str | None = None
+
+
+_jwks_clients: dict[str, jwt.PyJWKClient] = {}
+_lock = threading.Lock()
+# (ユーザーID, テナントID) をキーとした、所属を確認したトークンの有効期限
+_memberships: TLRUCache[tuple[str, str], float] = TLRUCache(
+    maxsize=MEMBERSHIP_CACHE_SIZE,
+    ttu=lambda _key, expires_at, _now: expires_at,
+    timer=time.time,
+)
+
+
+def _jwks_client() -> jwt.PyJWKClient:
+    """プロジェクトの JWKS から署名鍵を取得するクライアントを返す（URLごとに1つ）。"""
+    sb_url = os.environ.get("SUPABASE_URL")
+    if not sb_url:
+        raise ValueError("Supabase environment variables are not set.")
+    jwks_url = f"{sb_url.rstrip('/')}/auth/v1/.well-known/jwks.json"
+    with _lock:
+        client = _jwks_clients.get(jwks_url)
+        if client is None:
+            client = jwt.PyJWKClient(jwks_url, lifespan=JWKS_CACHE_SECONDS)
+            _jwks_clients[jwks_url] = client
+        return client
+
+
+def _signing_key(token: str, algorithm: str | None) -> object:
+    """トークンの署名アルゴリズムに応じた検証用の鍵を返す。"""
+    if algorithm == "HS256":
+        secret = os.environ.get("SUPABASE_JWT_SECRET")
+        if not secret:
+            raise jwt.InvalidAlgorithmError("HS256 tokens are not accepted")
+        return secret
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        return _jwks_client().get_signing_key_from_jwt(token).key
+    raise jwt.InvalidAlgorithmError(f"Unsupported algorithm: {algorithm}")
+
+
+def verify_token(token: str) -> TokenClaims:
+    """
+    アクセストークンの署名・有効期限・aud を検証し、クレームを返す。
+
+    Args:
+        token: アクセストークン（JWT）
+
+    Returns:
+        TokenClaims: 検証済みのクレーム
+
+    Raises:
+        jwt.PyJWTError: トークンが不正な場合（署名・有効期限・aud の不一致、JWKS の取得失敗など）
+        ValueError: JWKS の取得に必要な環境変数が設定されていない場合
+    """
+    algorithm = jwt.get_unverified_header(token).get("alg")
+    payload = jwt.decode(
+        token,
+        _signing_key(token, algorithm),  # type: ignore[arg-type]
+        algorithms=[algorithm],
+        audience=JWT_AUDIENCE,
+        options={"require": ["exp", "sub"]},
+    )
+    return TokenClaims(
+        user_id=payload["sub"],
+        expires_at=float(payload["exp"]),
+        role=payload.get("role"),
+    )
+
+
+def resolve_membership(
+    claims: TokenClaims, tenant_id: str, loader: Callable[[], bool]
+) -> bool:
+    """
+    ユーザーがテナントに所属しているかどうかを返す。キャッシュにない場合は loader で確認する。
+
+    Args:
+        claims: 検証済みのクレーム
+        tenant_id: テナントID
+        loader: ユーザーがテナントに所属しているかどうかを問い合わせる関数
+
+    Returns:
+        所属している場合はTrue
+    """
+    key = (claims.user_id, tenant_id)
+    with _lock:
+        if key in _memberships:
+            return True
+
+    if not loader():
+        logger.info(f"User {claims.user_id} is not a member of tenant {tenant_id}")
+        return False
+
+    with _lock:
+        # 有効期限の長いトークンで確認した結果を残す
+        _memberships[key] = max(_memberships.get(key, 0.0), claims.expires_at)
+    return True
+
+
+def clear_memberships() -> None:
+    """テナント所属のキャッシュを破棄する。"""
+    with _lock:
+        _memberships.clear()
@@ -0,0 +1,142 @@
+"""
+設備空き状況スナップショットのキャッシュモジュール
+
+納期回答（capable-to-promise）のように、スケジュールを書き込まずに何度も計画を試す処理のため、
+テナントごとの設備の最終終了時刻・設備停止期間をプロセス内の上限付きキャッシュに保持する。
+呼び出し側には空き状況の複製を返すため、割り当てを試してもキャッシュの内容は変わらない。
+
+キャッシュにない設備だけをDBから読み込んで追加する。追加してもキャッシュの有効期限は
+最初に読み込んだ時刻から数えるため、古い内容が TTL を超えて残ることはない。
+
+スケジュール・設備停止期間を書き込んだときは invalidate_machine_availability でキャッシュを破棄する。
+他プロセスでの書き込みは TTL 経過後に反映される。
+"""
+
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from cachetools import TLRUCache
+
+from app.repositories.supa_infra.transaction.schedule_repo import ScheduleRepository
+from app.utils.calendar import DEFAULT_CALENDAR, WorkCalendar
+from app.utils.logger import get_logger
+from app.utils.machine_availability import MachineAvailability
+
+logger = get_logger(__name__)
+
+# キャッシュするテナント数の上限（超えた場合は最も使われていないものから破棄）
+MACHINE_AVAILABILITY_CACHE_SIZE = 256
+
+# 他プロセスでの書き込みを反映するまでの最大秒数
+MACHINE_AVAILABILITY_TTL_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """テナントの設備空き状況のスナップショット"""
+
+    last_end_times: dict[int, datetime | None]
+    downtimes: dict[int, list[tuple[datetime, datetime]]]
+    availability: MachineAvailability
+    expires_at: float  # 有効期限（time.monotonic の値）
+
+
+_cache: TLRUCache[str, _Snapshot] = TLRUCache(
+    maxsize=MACHINE_AVAILABILITY_CACHE_SIZE,
+    ttu=lambda _key, snapshot, _now: snapshot.expires_at,
+    timer=time.monotonic,
+)
+_lock = threading.Lock()
+# 破棄のたびに進める世代番号。読み込み中に破棄された場合、古い内容をキャッシュしない
+_generation = 0
+
+
+def load_machine_availability(
+    tenant_id: str,
+    schedule_repo: ScheduleRepository,
+    equipment_ids: Iterable[int],
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+) -> MachineAvailability:
+    """
+    テナントの設備空き状況の複製を返す。キャッシュにない設備の分だけDBから読み込む。
+
+    Args:
+        tenant_id: テナントID
+        schedule_repo: スケジュールリポジトリ（ログインユーザーの権限で接続したもの）
+        equipment_ids: 対象となる設備IDの一覧
+        calendar: 稼働カレンダー
+
+    Returns:
+        MachineAvailability: 設備空き状況の複製（割り当てを試してもキャッシュは変わらない）
+    """
+    equipment_ids = set(equipment_ids)
+    with _lock:
+        snapshot = _cache.get(tenant_id)
+        generation = _generation
+
+    if snapshot is None:
+        snapshot = _Snapshot(
+            {}, {}, MachineAvailability({}, calendar), _expires_at_from_now()
+        )
+    missing = equipment_ids - snapshot.last_end_times.keys()
+    if not missing and snapshot.availability.calendar is calendar:
+        return snapshot.availability.fork()
+
+    snapshot = _extend(snapshot, schedule_repo, missing, calendar)
+    with _lock:
+        if generation == _generation:
+            _cache[tenant_id] = snapshot
+    return snapshot.availability.fork()
+
+
+def _extend(
+    snapshot: _Snapshot,
+    schedule_repo: ScheduleRepository,
+    missing: set[int],
+    calendar: WorkCalendar,
+) -> _Snapshot:
+    """キャッシュにない設備を読み込み、スナップショットを作り直す。"""
+    last_end_times = dict(snapshot.last_end_times)
+    downtimes = dict(snapshot.downtimes)
+    if missing:
+        logger.info(f"Loading availability of {len(missing)} machines")
+        last_end_times.update(dict.fromkeys(missing))
+        last_end_times.update(schedule_repo.get_last_end_times(missing))
+        downtimes.update(
+            schedule_repo.get_downtime_intervals(missing, datetime.now().astimezone())
+        )
+    return _Snapshot(
+        last_end_times,
+        downtimes,
+        MachineAvailability(last_end_times, calendar, downtimes),
+        snapshot.expires_at,
+    )
+
+
+def _expires_at_from_now() -> float:
+    """今から TTL 経過後の有効期限を返す。"""
+    return time.monotonic() + MACHINE_AVAILABILITY_TTL_SECONDS
+
+
+def invalidate_machine_availability(tenant_id: str) -> None:
+    """
+    テナントの設備空き状況をキャッシュから破棄する。
+
+    Args:
+        tenant_id: テナントID
+    """
+    global _generation
+    with _lock:
+        _cache.pop(tenant_id, None)
+        _generation += 1
+
+
+def clear_machine_availability() -> None:
+    """すべてのテナントの設備空き状況をキャッシュから破棄する。"""
+    global _generation
+    with _lock:
+        _cache.clear()
+        _generation += 1
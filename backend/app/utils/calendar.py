@@ -2,9 +2,18 @@
 稼働カレンダーユーティリティモジュール
 
 工場の稼働時間（平日 9:00 - 17:00）に基づき、作業の開始・終了時刻を計算する。
+
+モジュールレベルの関数は既定の稼働時間（平日 9:00 - 17:00）を前提とした簡易版。
+スケジューラからは、シフト・休日を任意に定義でき、稼働区間の累積稼働分を事前計算して
+二分探索で時刻計算を行う WorkCalendar（コンパイル済みカレンダー）を使用する。
 """
 
-from datetime import datetime, time, timedelta
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, tzinfo
 
 # 定数定義
 WORK_START_HOUR = 9
@@ -39,16 +48,13 @@ def get_next_work_start(dt: datetime) -> datetime:
     if is_workday(dt) and dt.time() < time(WORK_START_HOUR, 0):
         return dt.replace(hour=WORK_START_HOUR, minute=0, second=0, microsecond=0)
 
-    # それ以外は翌日以降の平日9:00を探す
-    next_dt = dt + timedelta(days=1)
-    next_dt = next_dt.replace(hour=WORK_START_HOUR, minute=0, second=0, microsecond=0)
-    while not is_workday(next_dt):
-        next_dt += timedelta(days=1)
-    return next_dt
+    # それ以外は翌日以降の平日9:00を、コンパイル済みカレンダーの二分探索で求める
+    next_day = datetime.combine(dt.date() + timedelta(days=1), time(0), dt.tzinfo)
+    return DEFAULT_CALENDAR.next_working_instant(next_day)
 
 
 def get_next_available_start_time(
-    current_dt: datetime, duration_minutes: float
+    current_dt: datetime, duration_minutes: float, allow_split: bool = False
 ) -> datetime:
     """
     現在時刻と所要時間から、開始可能な日時を判定する。
@@ -57,13 +63,18 @@ def get_next_available_start_time(
     Args:
         current_dt: 現在の日時
         duration_minutes: 作業の所要時間（分）
+        allow_split: Trueの場合、作業を複数日に分割できるものとして
+            次の稼働時刻をそのまま返す（所要時間の上限もない）
 
     Returns:
         datetime: 作業を開始可能な日時
 
     Raises:
-        ValueError: 所要時間が1日の稼働時間（8時間）を超える場合
+        ValueError: 分割しない作業の所要時間が1日の稼働時間（8時間）を超える場合
     """
+    if allow_split:
+        return DEFAULT_CALENDAR.next_working_instant(current_dt)
+
     # MVPでは日をまたぐ作業（所要時間 > 8時間）は考慮しない
     if duration_minutes > MAX_DAILY_WORK_HOURS * 60:
         raise ValueError(
@@ -96,19 +107,23 @@ def get_next_available_start_time(
     return start_dt
 
 
-def calculate_end_time(start_dt: datetime, duration_minutes: float) -> datetime:
+def calculate_end_time(
+    start_dt: datetime, duration_minutes: float, allow_split: bool = False
+) -> datetime:
     """
     開始日時と所要時間から終了日時を算出する。
 
     Args:
         start_dt: 作業開始日時
         duration_minutes: 作業の所要時間（分）
+        allow_split: Trueの場合、17:00を超える分を翌営業日以降の稼働時間に繰り越す
 
     Returns:
         datetime: 作業終了日時
 
     Raises:
-        ValueError: 開始時刻が稼働時間外の場合、または終了時刻が17:00を超える場合
+        ValueError: 開始時刻が稼働時間外の場合、
+            または分割しない作業の終了時刻が17:00を超える場合
     """
     # 開始時刻が稼働日かつ稼働時間内であることを確認
     if not is_workday(start_dt):
@@ -122,6 +137,10 @@ def calculate_end_time(start_dt: datetime, duration_minutes: float) -> datetime:
             f"{start_dt.time()}"
         )
 
+    if allow_split:
+        # 稼働時間だけを数えて終了時刻を求める（夜間・週末は読み飛ばす）
+        return DEFAULT_CALENDAR.add_working_minutes(start_dt, duration_minutes)
+
     # 終了時刻を計算
     end_dt = start_dt + timedelta(minutes=duration_minutes)
 
@@ -137,3 +156,454 @@ def calculate_end_time(start_dt: datetime, duration_minutes: float) -> datetime:
         )
 
     return end_dt
+
+
+# --- コンパイル済み稼働カレンダー ---
+
+# 稼働区間を分単位の数値で表すための基準日時（壁時計時刻として扱う）
+_EPOCH = datetime(2000, 1, 1)
+
+# 1回のコンパイルで事前計算する日数
+DEFAULT_HORIZON_DAYS = 366
+
+# 稼働区間が見つからない場合に探索を打ち切る日数（シフト未定義などの誤設定対策）
+MAX_SEARCH_DAYS = 366 * 5
+
+
+@dataclass(frozen=True)
+class Shift:
+    """
+    稼働シフトの定義
+
+    end が start 以前の場合は、翌日の end まで続く夜勤シフトとして扱う。
+    """
+
+    weekdays: frozenset[int]  # 稼働する曜日（0=月曜日 ... 6=日曜日）
+    start: time  # シフト開始時刻
+    end: time  # シフト終了時刻
+
+
+def _to_minutes(dt: datetime) -> float:
+    """日時を基準日時からの経過分（壁時計時刻）に変換する。"""
+    return (dt.replace(tzinfo=None) - _EPOCH).total_seconds() / 60
+
+
+def _from_minutes(minutes: float, tz: tzinfo | None) -> datetime:
+    """基準日時からの経過分を日時に変換する。"""
+    return (_EPOCH + timedelta(minutes=minutes)).replace(tzinfo=tz)
+
+
+def _merge_intervals(
+    intervals: Iterable[tuple[float, float]],
+) -> list[tuple[float, float]]:
+    """区間を開始順に並べ、重なる・隣接する区間を結合する。"""
+    merged: list[tuple[float, float]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass(frozen=True)
+class _CompiledRange:
+    """
+    コンパイル済みの稼働区間（分単位）と累積稼働分
+
+    作成後は変更しない（配列もタプル）。再コンパイルでは新しいインスタンスを作成して
+    まとめて差し替えるため、差し替え前に取得したインスタンスを使っている計算は、
+    別スレッドが再コンパイルしても一貫した配列で計算を終えられる。
+    """
+
+    first_day: date
+    last_day: date  # この日までの稼働区間を含む
+    starts: tuple[float, ...]  # 各稼働区間の開始
+    ends: tuple[float, ...]  # 各稼働区間の終了
+    cum_starts: tuple[float, ...]  # 各稼働区間の開始時点での累積稼働分
+    cum_ends: tuple[float, ...]  # 各稼働区間の終了時点での累積稼働分
+
+    def covers(self, day: date) -> bool:
+        return self.first_day <= day <= self.last_day
+
+    def working_offset(self, minutes: float) -> float:
+        """コンパイル範囲の先頭から minutes までの累積稼働分を返す。"""
+        i = bisect_right(self.starts, minutes) - 1
+        if i < 0:
+            return 0.0
+        return self.cum_starts[i] + min(minutes, self.ends[i]) - self.starts[i]
+
+
+class WorkCalendar:
+    """
+    コンパイル済み稼働カレンダー
+
+    シフト・休日・工場停止期間の定義から、一定期間（horizon）分の稼働区間と
+    累積稼働分を事前計算する。
+    「次の稼働時刻」「開始時刻 + N 稼働分」などの計算は、ループではなく
+    事前計算した配列に対する二分探索（O(log n)）で行う。
+    事前計算の範囲外の日時が指定された場合は、範囲を広げて再コンパイルする。
+
+    日時は壁時計時刻として扱い、タイムゾーン付きの日時は同じタイムゾーンで結果を返す。
+    """
+
+    def __init__(
+        self,
+        shifts: Iterable[Shift],
+        holidays: Iterable[date] = (),
+        shutdowns: Iterable[tuple[datetime, datetime]] = (),
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+    ):
+        """
+        Args:
+            shifts: 稼働シフトの定義
+            holidays: 休日（稼働しない日）の一覧
+            shutdowns: 工場停止期間 (開始, 終了) の一覧（壁時計時刻）
+            horizon_days: 1回のコンパイルで事前計算する日数
+        """
+        self.shifts = tuple(shifts)
+        self.holidays = frozenset(holidays)
+        self.shutdowns = _merge_intervals(
+            (_to_minutes(start), _to_minutes(end))
+            for start, end in shutdowns
+            if end > start
+        )
+        self.horizon_days = horizon_days
+        self._compiled: _CompiledRange | None = None
+        self._lock = threading.Lock()
+
+        # 分割しない作業を収められる最長の時間。隣接・重なるシフトは1つの稼働区間に
+        # まとめるため、シフト1回分ではなく結合後の稼働区間の長さで決める
+        self.max_period_minutes = self._longest_period_minutes()
+
+    def __getstate__(self) -> dict:
+        """プロセス間で受け渡せるよう、ロックとコンパイル結果を除いて pickle する。"""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_compiled"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _shift_minutes(shift: Shift) -> float:
+        """シフト1回分の稼働分を返す。"""
+        start = shift.start.hour * 60 + shift.start.minute + shift.start.second / 60
+        end = shift.end.hour * 60 + shift.end.minute + shift.end.second / 60
+        return end - start if end > start else end - start + 24 * 60
+
+    def _longest_period_minutes(self) -> float:
+        """
+        シフトを結合した稼働区間の最長の長さ（分）を返す。
+
+        休日・工場停止期間は稼働区間を短くするだけのため考慮しない。シフトは曜日ごとの
+        定義で1週間ごとに繰り返すため、3週間分を結合すれば週をまたぐ区間も含まれる。
+        1週間より長い区間は途切れずに続く（24時間稼働）ため、上限なし（inf）とする。
+        """
+        first_day = _EPOCH.date() + timedelta(days=7 - _EPOCH.weekday())  # 月曜日
+        periods = _merge_intervals(
+            self._shift_periods(first_day, first_day + timedelta(days=20))
+        )
+        longest = max((end - start for start, end in periods), default=0.0)
+        return math.inf if longest > 7 * 24 * 60 else longest
+
+    # --- コンパイル ---
+
+    def _shift_periods(
+        self, first_day: date, last_day: date, holidays: frozenset[date] = frozenset()
+    ) -> list[tuple[float, float]]:
+        """指定期間のシフトの稼働区間（分単位、結合前）を列挙する。"""
+        raw: list[tuple[float, float]] = []
+        day = first_day
+        while day <= last_day:
+            if day not in holidays:
+                for shift in self.shifts:
+                    if day.weekday() not in shift.weekdays:
+                        continue
+                    start = _to_minutes(datetime.combine(day, shift.start))
+                    raw.append((start, start + self._shift_minutes(shift)))
+            day += timedelta(days=1)
+        return raw
+
+    def _compile(self, first_day: date, last_day: date) -> _CompiledRange:
+        """指定期間の稼働区間を列挙し、重なり・隣接を結合して累積稼働分を計算する。"""
+        # 重なる・隣接する区間は1つの連続した稼働区間にまとめる
+        merged = _merge_intervals(
+            self._shift_periods(first_day, last_day, self.holidays)
+        )
+        if self.shutdowns:
+            merged = self._subtract_shutdowns(merged)
+        starts = [start for start, _ in merged]
+        ends = [end for _, end in merged]
+
+        cum_starts: list[float] = []
+        cum_ends: list[float] = []
+        total = 0.0
+        for start, end in zip(starts, ends, strict=True):
+            cum_starts.append(total)
+            total += end - start
+            cum_ends.append(total)
+
+        return _CompiledRange(
+            first_day,
+            last_day,
+            tuple(starts),
+            tuple(ends),
+            tuple(cum_starts),
+            tuple(cum_ends),
+        )
+
+    def _subtract_shutdowns(
+        self, intervals: list[tuple[float, float]]
+    ) -> list[tuple[float, float]]:
+        """稼働区間から工場停止期間と重なる部分を取り除く。"""
+        result: list[tuple[float, float]] = []
+        for start, end in intervals:
+            # 停止期間は結合済みのため、start 以前に始まる最後の停止期間から調べればよい
+            i = max(bisect_right(self.shutdowns, (start, float("inf"))) - 1, 0)
+            cursor = start
+            while i < len(self.shutdowns) and self.shutdowns[i][0] < end:
+                stop_start, stop_end = self.shutdowns[i]
+                if stop_end > cursor:
+                    if stop_start > cursor:
+                        result.append((cursor, stop_start))
+                    cursor = stop_end
+                i += 1
+            if cursor < end:
+                result.append((cursor, end))
+        return result
+
+    def _range_for(self, *days: date) -> _CompiledRange:
+        """
+        指定日を含むコンパイル済み範囲を返す（範囲外なら広げて再コンパイルする）。
+
+        再コンパイルはロックを取得して1スレッドだけが行い、完成した範囲を1回の代入で
+        公開する。呼び出し側は返された範囲だけを使い、self._compiled を読み直さない。
+        """
+        compiled = self._compiled
+        if compiled is not None and all(compiled.covers(day) for day in days):
+            return compiled
+
+        with self._lock:
+            compiled = self._compiled
+            if compiled is not None and all(compiled.covers(day) for day in days):
+                return compiled
+
+            # 前日の夜勤シフトが当日にかかる場合に備えて1日前から計算する
+            first_day = min(days) - timedelta(days=1)
+            last_day = max(days) + timedelta(days=self.horizon_days)
+            if compiled is not None:
+                first_day = min(first_day, compiled.first_day)
+                last_day = max(last_day, compiled.last_day)
+
+            compiled = self._compile(first_day, last_day)
+            self._compiled = compiled
+            return compiled
+
+    def _range_with_interval_after(self, minutes: float) -> _CompiledRange:
+        """minutes より後に終わる稼働区間を含むコンパイル済み範囲を返す。"""
+        day = _from_minutes(minutes, None).date()
+        compiled = self._range_for(day)
+        while bisect_right(compiled.ends, minutes) >= len(compiled.ends):
+            if (compiled.last_day - day).days > MAX_SEARCH_DAYS:
+                raise ValueError(
+                    f"{MAX_SEARCH_DAYS}日以内に稼働時間が見つかりません: "
+                    f"{_from_minutes(minutes, None)}"
+                )
+            compiled = self._range_for(
+                compiled.last_day + timedelta(days=self.horizon_days)
+            )
+        return compiled
+
+    # --- 時刻計算 ---
+
+    def is_working_time(self, dt: datetime) -> bool:
+        """
+        指定日時が稼働時間内かどうかを判定する。
+
+        Args:
+            dt: 判定対象の日時
+
+        Returns:
+            bool: 稼働区間 [開始, 終了) に含まれる場合True
+        """
+        minutes = _to_minutes(dt)
+        compiled = self._range_for(dt.date())
+        i = bisect_right(compiled.starts, minutes) - 1
+        return i >= 0 and minutes < compiled.ends[i]
+
+    def next_working_instant(self, dt: datetime) -> datetime:
+        """
+        指定日時以降で、最初に稼働している時刻を返す（稼働時間内ならそのまま返す）。
+
+        Args:
+            dt: 基準となる日時
+
+        Returns:
+            datetime: 次の稼働時刻
+        """
+        minutes = _to_minutes(dt)
+        compiled = self._range_with_interval_after(minutes)
+        i = bisect_right(compiled.ends, minutes)
+        if compiled.starts[i] <= minutes:
+            return dt
+        return _from_minutes(compiled.starts[i], dt.tzinfo)
+
+    def next_fitting_start(self, dt: datetime, duration_minutes: float) -> datetime:
+        """
+        指定日時以降で、作業を1つの連続した稼働区間内に収められる最初の開始時刻を返す。
+
+        Args:
+            dt: 基準となる日時
+            duration_minutes: 作業の所要時間（分）
+
+        Returns:
+            datetime: 作業を開始可能な日時
+
+        Raises:
+            ValueError: 所要時間が最長の稼働区間（結合したシフト）を超える場合、
+                または MAX_SEARCH_DAYS 日以内に作業が収まる稼働区間がない場合
+        """
+        if duration_minutes > self.max_period_minutes:
+            raise ValueError(
+                f"所要時間が1回の稼働時間（{self.max_period_minutes / 60:g}時間）を"
+                f"超えています: {duration_minutes}分"
+            )
+
+        minutes = _to_minutes(dt)
+        compiled = self._range_with_interval_after(minutes)
+        i = bisect_right(compiled.ends, minutes)
+        start = max(minutes, compiled.starts[i])
+        while start + duration_minutes > compiled.ends[i]:
+            # 収まらない場合は、作業が収まる長さの次の稼働区間の開始時刻にする
+            # （休日・工場停止期間で区間が短くなり、いつまでも収まらない場合は打ち切る）
+            if start - minutes > MAX_SEARCH_DAYS * 24 * 60:
+                raise ValueError(
+                    f"{MAX_SEARCH_DAYS}日以内に作業が収まる稼働時間が見つかりません: "
+                    f"{dt}（{duration_minutes}分）"
+                )
+            i += 1
+            if i >= len(compiled.starts):
+                # 範囲の最後の稼働区間より後の区間を含むように範囲を広げる
+                last_end = compiled.ends[-1]
+                compiled = self._range_with_interval_after(last_end)
+                i = bisect_right(compiled.ends, last_end)
+            start = compiled.starts[i]
+
+        return dt if start == minutes else _from_minutes(start, dt.tzinfo)
+
+    def next_start(
+        self, dt: datetime, duration_minutes: float, allow_split: bool
+    ) -> datetime:
+        """
+        作業を分割できるかどうかに応じて、指定日時以降の開始可能時刻を返す。
+
+        Args:
+            dt: 基準となる日時
+            duration_minutes: 作業の所要時間（分）
+            allow_split: Trueの場合は次の稼働時刻、Falseの場合は
+                作業が1つの稼働区間に収まる最初の開始時刻を返す
+
+        Returns:
+            datetime: 作業を開始可能な日時
+        """
+        if allow_split:
+            return self.next_working_instant(dt)
+        return self.next_fitting_start(dt, duration_minutes)
+
+    def add_working_minutes(self, dt: datetime, duration_minutes: float) -> datetime:
+        """
+        開始日時から稼働時間だけを数えて duration_minutes 分進めた日時を返す。
+
+        非稼働時間（夜間・休日）は読み飛ばすため、作業は複数の稼働区間にまたがりうる。
+
+        Args:
+            dt: 開始日時
+            duration_minutes: 進める稼働時間（分）
+
+        Returns:
+            datetime: 終了日時
+        """
+        if duration_minutes <= 0:
+            return dt
+
+        minutes = _to_minutes(dt)
+        compiled = self._range_with_interval_after(minutes)
+        target = compiled.working_offset(minutes) + duration_minutes
+        while target > compiled.cum_ends[-1]:
+            compiled = self._range_for(
+                dt.date(), compiled.last_day + timedelta(days=self.horizon_days)
+            )
+            # 累積稼働分は範囲の先頭からの値のため、別スレッドの再コンパイルで範囲の先頭が
+            # 早まっていても合うように、広げた範囲で数え直す
+            target = compiled.working_offset(minutes) + duration_minutes
+
+        j = bisect_left(compiled.cum_ends, target)
+        if compiled.starts[j] <= minutes < compiled.ends[j]:
+            # 同じ稼働区間内で終わる場合は、丸め誤差を避けるため開始日時から直接計算する
+            return dt + timedelta(minutes=duration_minutes)
+        return _from_minutes(compiled.starts[j], dt.tzinfo) + timedelta(
+            minutes=target - compiled.cum_starts[j]
+        )
+
+    def working_periods(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, datetime]]:
+        """
+        2つの日時の間の稼働区間を開始順に返す。
+
+        Args:
+            start: 開始日時
+            end: 終了日時
+
+        Returns:
+            list[tuple[datetime, datetime]]: start から end までに切り詰めた
+                (稼働区間の開始, 終了) のリスト（start と同じタイムゾーン）
+        """
+        if end <= start:
+            return []
+        compiled = self._range_for(start.date(), end.date())
+        lower, upper = _to_minutes(start), _to_minutes(end)
+        periods: list[tuple[datetime, datetime]] = []
+        i = bisect_right(compiled.ends, lower)
+        while i < len(compiled.starts) and compiled.starts[i] < upper:
+            periods.append(
+                (
+                    _from_minutes(max(compiled.starts[i], lower), start.tzinfo),
+                    _from_minutes(min(compiled.ends[i], upper), start.tzinfo),
+                )
+            )
+            i += 1
+        return periods
+
+    def working_minutes_between(self, start: datetime, end: datetime) -> float:
+        """
+        2つの日時の間に含まれる稼働時間（分）を返す。
+
+        Args:
+            start: 開始日時
+            end: 終了日時
+
+        Returns:
+            float: start から end までの稼働時間（分）。end が start 以前の場合は0
+        """
+        if end <= start:
+            return 0.0
+        compiled = self._range_for(start.date(), end.date())
+        return compiled.working_offset(_to_minutes(end)) - compiled.working_offset(
+            _to_minutes(start)
+        )
+
+
+# 既定の稼働カレンダー（平日 9:00 - 17:00）
+DEFAULT_CALENDAR = WorkCalendar(
+    shifts=[
+        Shift(
+            weekdays=frozenset(range(5)),
+            start=time(WORK_START_HOUR, 0),
+            end=time(WORK_END_HOUR, 0),
+        )
+    ]
+)
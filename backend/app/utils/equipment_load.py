@@ -0,0 +1,272 @@
+"""
+設備負荷（稼働率）の集計モジュール
+
+期間を日・週のバケットに区切り、設備ごと・設備グループごとに、バケット内の
+作業時間（稼働カレンダー上の稼働時間だけを数える）と稼働可能時間を集計する。
+
+スケジュールの行ごと・バケットごとにループせず、次の配列演算で集計する。
+1. 稼働カレンダーの稼働区間から「期間の開始からの累積稼働分」W(t) を作り、
+   作業の開始・終了とバケットの境界をすべて W の値に変換する（夜間・休日は進まない）
+2. 設備 m の境界 x までの作業時間 Σ max(0, min(x, e) - s) を、
+   Σ_{s < x} (x - s) - Σ_{e < x} (x - e) として、(設備, W) でソートした配列の
+   累積和と二分探索で全設備・全境界についてまとめて求める
+3. 隣り合う境界の差がバケットごとの作業時間になる
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any, Literal
+
+import numpy as np
+
+from app.repositories.supa_infra.common import parse_datetime
+from app.repositories.supa_infra.master.equipment_repo import EquipmentRepository
+from app.repositories.supa_infra.transaction.schedule_repo import ScheduleRepository
+from app.utils.calendar import DEFAULT_CALENDAR, WorkCalendar
+
+# 集計の単位
+LoadBucket = Literal["day", "week"]
+
+_BUCKET_DAYS = {"day": 1, "week": 7}
+
+
+def bucket_bounds(start: datetime, end: datetime, bucket: LoadBucket) -> list[datetime]:
+    """
+    期間をバケットに区切る境界を返す。
+
+    Args:
+        start: 期間の開始日時（最初のバケットの開始）
+        end: 期間の終了日時（最後のバケットはここで打ち切る）
+        bucket: 集計の単位（day: 1日 / week: 7日）
+
+    Returns:
+        先頭が start、末尾が end の境界のリスト
+    """
+    step = timedelta(days=_BUCKET_DAYS[bucket])
+    bounds = [start]
+    while bounds[-1] + step < end:
+        bounds.append(bounds[-1] + step)
+    bounds.append(end)
+    return bounds
+
+
+def _working_clock(
+    periods: Sequence[tuple[datetime, datetime]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """稼働区間の開始・終了（UNIX秒）と、各区間の開始時点での累積稼働分を返す。"""
+    starts = np.array([start.timestamp() for start, _ in periods], dtype=float)
+    ends = np.array([end.timestamp() for _, end in periods], dtype=float)
+    cumulative = np.concatenate(([0.0], np.cumsum(ends - starts) / 60))
+    return starts, ends, cumulative
+
+
+def _working_offsets(
+    instants: np.ndarray, clock: tuple[np.ndarray, np.ndarray, np.ndarray]
+) -> np.ndarray:
+    """UNIX秒の配列を、期間の開始からの累積稼働分 W(t) に変換する。"""
+    starts, ends, cumulative = clock
+    if len(starts) == 0:
+        return np.zeros(len(instants))
+    i = np.searchsorted(starts, instants, side="right") - 1
+    k = np.maximum(i, 0)
+    within = np.clip(instants - starts[k], 0, ends[k] - starts[k]) / 60
+    return np.where(i < 0, 0.0, cumulative[k] + within)
+
+
+def _busy_before(
+    machines: np.ndarray,
+    offsets: np.ndarray,
+    machine_count: int,
+    bounds: np.ndarray,
+    span: float,
+) -> np.ndarray:
+    """
+    設備ごと・境界ごとに Σ_{offset < 境界} (境界 - offset) を求める。
+
+    (設備, offset) を machine * span + offset の1つのキーにしてソートし、
+    各設備の範囲と境界の位置を二分探索で求める。
+
+    Returns:
+        (設備数, 境界数) の配列
+    """
+    keys = machines * span + offsets
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    cumulative = np.concatenate(([0.0], np.cumsum(offsets[order])))
+
+    rows = np.arange(machine_count, dtype=float)[:, None] * span
+    first = np.searchsorted(sorted_keys, rows, side="left")
+    upto = np.searchsorted(sorted_keys, rows + bounds[None, :], side="left")
+    return (upto - first) * bounds[None, :] - (cumulative[upto] - cumulative[first])
+
+
+def equipment_load(
+    equipment_ids: Sequence[int],
+    intervals: Sequence[dict[str, Any]],
+    bounds: Sequence[datetime],
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    設備ごと・バケットごとの作業時間と、バケットごとの稼働可能時間を計算する。
+
+    作業時間は稼働カレンダー上の稼働時間だけを数える（夜間・休日をまたぐ作業でも、
+    止まっている時間は含めない）。equipment_ids にない設備の作業は無視する。
+
+    Args:
+        equipment_ids: 集計する設備IDのリスト（結果の行の順序）
+        intervals: equipment_id と start / end（datetime）を持つ作業のリスト
+        bounds: バケットの境界（bucket_bounds の結果）
+        calendar: 稼働カレンダー
+
+    Returns:
+        (設備数, バケット数) の作業時間（分）と、(バケット数,) の設備1台あたりの稼働可能時間（分）
+    """
+    clock = _working_clock(calendar.working_periods(bounds[0], bounds[-1]))
+    bound_offsets = _working_offsets(np.array([b.timestamp() for b in bounds]), clock)
+    available = np.diff(bound_offsets)
+
+    ids = np.array(sorted(equipment_ids), dtype=np.int64)
+    rows = np.argsort(np.array(equipment_ids, dtype=np.int64), kind="stable")
+    interval_machines = np.fromiter(
+        (interval["equipment_id"] for interval in intervals),
+        dtype=np.int64,
+        count=len(intervals),
+    )
+    positions = np.searchsorted(ids, interval_machines)
+    known = positions < len(ids)
+    known[known] = ids[positions[known]] == interval_machines[known]
+    # 結果の行は equipment_ids の並び順
+    machines = rows[positions[known]].astype(float)
+
+    starts = np.fromiter(
+        (interval["start"].timestamp() for interval in intervals),
+        dtype=float,
+        count=len(intervals),
+    )[known]
+    ends = np.fromiter(
+        (interval["end"].timestamp() for interval in intervals),
+        dtype=float,
+        count=len(intervals),
+    )[known]
+
+    span = float(bound_offsets[-1]) + 1
+    busy_before = _busy_before(
+        machines, _working_offsets(starts, clock), len(ids), bound_offsets, span
+    ) - _busy_before(
+        machines, _working_offsets(ends, clock), len(ids), bound_offsets, span
+    )
+    return np.diff(busy_before, axis=1), available
+
+
+def utilization_percent(busy: np.ndarray, available: np.ndarray) -> list[float | None]:
+    """作業時間 / 稼働可能時間（%、小数第1位まで）。稼働可能時間がない場合はNone。"""
+    return [
+        round(float(b) / float(a) * 100, 1) if a > 0 else None
+        for b, a in zip(busy, available, strict=True)
+    ]
+
+
+def summarize_load(
+    equipment_ids: Sequence[int],
+    machine_ids_by_group: dict[int, list[int]],
+    busy: np.ndarray,
+    available: np.ndarray,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    設備ごと・設備グループごとの作業時間・稼働可能時間・稼働率をまとめる。
+
+    設備グループの稼働可能時間は、所属する（集計対象の）設備の台数 × 1台あたりの稼働可能時間とする。
+
+    Args:
+        equipment_ids: 集計した設備IDのリスト（busy の行の順序）
+        machine_ids_by_group: 設備グループIDをキーとした設備IDのリスト
+        busy: (設備数, バケット数) の作業時間（分）
+        available: (バケット数,) の設備1台あたりの稼働可能時間（分）
+
+    Returns:
+        equipments / groups をキーとし、バケットごとの busy_minutes・available_minutes・
+        utilization_percent のリストを持つ辞書
+    """
+    row_of = {equipment_id: i for i, equipment_id in enumerate(equipment_ids)}
+    equipments = [
+        {
+            "equipment_id": equipment_id,
+            "busy_minutes": busy[i].tolist(),
+            "available_minutes": available.tolist(),
+            "utilization_percent": utilization_percent(busy[i], available),
+        }
+        for equipment_id, i in row_of.items()
+    ]
+
+    groups = []
+    for group_id, machine_ids in sorted(machine_ids_by_group.items()):
+        members = [row_of[m] for m in dict.fromkeys(machine_ids) if m in row_of]
+        group_busy = busy[members].sum(axis=0)
+        group_available = available * len(members)
+        groups.append(
+            {
+                "equipment_group_id": group_id,
+                "machine_count": len(members),
+                "busy_minutes": group_busy.tolist(),
+                "available_minutes": group_available.tolist(),
+                "utilization_percent": utilization_percent(group_busy, group_available),
+            }
+        )
+    return {"equipments": equipments, "groups": groups}
+
+
+def equipment_load_report(
+    schedule_repo: ScheduleRepository,
+    equipment_repo: EquipmentRepository,
+    tenant_id: str,
+    start: datetime,
+    end: datetime,
+    bucket: LoadBucket = "day",
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+) -> dict[str, Any]:
+    """
+    期間内の設備ごと・設備グループごとの負荷をバケットごとに集計する。
+
+    スケジュールは期間と重なる行の設備・開始・終了日時だけを読み込み、
+    集計はすべてサーバー側で行う。
+
+    Args:
+        schedule_repo: スケジュールリポジトリ
+        equipment_repo: 設備リポジトリ
+        tenant_id: テナントID
+        start: 期間の開始日時
+        end: 期間の終了日時
+        bucket: 集計の単位（day / week）
+        calendar: 稼働カレンダー
+
+    Returns:
+        以下のキーを持つ辞書
+            - start_datetime / end_datetime / bucket: 集計条件
+            - buckets: バケットごとの start_datetime / end_datetime
+            - equipments: 設備ごとのバケットごとの busy_minutes / available_minutes /
+              utilization_percent
+            - groups: 設備グループごとの同じ値（machine_count を含む）
+    """
+    equipment_ids = equipment_repo.get_tenant_equipment_ids(tenant_id)
+    machine_ids_by_group = equipment_repo.get_tenant_group_members(tenant_id)
+    intervals = [
+        {
+            "equipment_id": row["equipment_id"],
+            "start": parse_datetime(row["start_datetime"]),
+            "end": parse_datetime(row["end_datetime"]),
+        }
+        for row in schedule_repo.get_window_intervals(tenant_id, start, end)
+    ]
+
+    bounds = bucket_bounds(start, end, bucket)
+    busy, available = equipment_load(equipment_ids, intervals, bounds, calendar)
+    return {
+        "start_datetime": start.isoformat(),
+        "end_datetime": end.isoformat(),
+        "bucket": bucket,
+        "buckets": [
+            {"start_datetime": lower.isoformat(), "end_datetime": upper.isoformat()}
+            for lower, upper in zip(bounds, bounds[1:], strict=False)
+        ],
+        **summarize_load(equipment_ids, machine_ids_by_group, busy, available),
+    }
@@ -0,0 +1,279 @@
+"""
+設備タイムライン（区間インデックス）モジュール
+
+設備ごとに予約済みの区間を開始時刻順のソート済みリストで保持し、
+二分探索で「指定時刻以降で、作業が収まる最初の空き時間帯」を探す。
+最終終了時刻だけを見る通常モードと異なり、タイムラインの途中に残った空き時間帯も再利用できる。
+
+設備停止期間（保全・メンテナンス）も同じ区間インデックスで保持し、作業と重ならないようにする。
+
+シミュレーション用に、区間リストを共有したままインデックスを複製できる（コピーオンライト）。
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+
+from app.repositories.supa_infra.transaction.schedule_repo import ScheduleRepository
+from app.utils.calendar import DEFAULT_CALENDAR, WorkCalendar
+
+
+class SortedIntervals:
+    """
+    重ならない半開区間 [start, end) を開始時刻順に保持するコンテナ。
+
+    追加時に重なる・隣接する区間は1つに結合するため、開始時刻・終了時刻の
+    どちらのリストも常に昇順となり、検索は bisect による O(log n) で行える。
+    """
+
+    def __init__(self) -> None:
+        self._starts: list[datetime] = []
+        self._ends: list[datetime] = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[tuple[datetime, datetime]]:
+        return iter(zip(self._starts, self._ends, strict=True))
+
+    def copy(self) -> "SortedIntervals":
+        """同じ区間を持つ複製を返す。"""
+        clone = SortedIntervals()
+        clone._starts = list(self._starts)
+        clone._ends = list(self._ends)
+        return clone
+
+    def add(self, start: datetime, end: datetime) -> None:
+        """
+        区間を追加する。既存の区間と重なる・隣接する場合は結合する。
+
+        Args:
+            start: 区間の開始時刻
+            end: 区間の終了時刻
+        """
+        if end <= start:
+            return
+
+        # start 以上で終わる最初の区間から、end 以下で始まる最後の区間までが結合対象
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def first_overlap(
+        self, start: datetime, end: datetime
+    ) -> tuple[datetime, datetime] | None:
+        """
+        区間 [start, end) と重なる最初の区間を返す。
+
+        Args:
+            start: 判定する区間の開始時刻
+            end: 判定する区間の終了時刻
+
+        Returns:
+            重なる最初の区間 (開始, 終了)。重ならない場合はNone
+        """
+        # start より後に終わる最初の区間が、重なりうる唯一の候補
+        i = bisect_right(self._ends, start)
+        if i < len(self._starts) and self._starts[i] < end:
+            return self._starts[i], self._ends[i]
+        return None
+
+
+def earliest_free_start(
+    calendar: WorkCalendar,
+    busy: SortedIntervals | None,
+    ready_at: datetime,
+    duration_minutes: float,
+    allow_split: bool = False,
+) -> datetime:
+    """
+    ready_at 以降で、稼働カレンダー上有効かつ busy のどの区間とも重ならない最初の開始時刻を返す。
+
+    候補の開始時刻ごとに重なる区間を二分探索し、重なった場合はその区間の終了時刻から
+    探索を再開する。1回の判定は O(log n) で、隣接する区間は結合済みのため、
+    判定回数は作業が収まらなかった空き時間帯の数で抑えられる。
+
+    Args:
+        calendar: 稼働カレンダー
+        busy: 作業を割り当てられない区間（予約済み・設備停止期間）。Noneの場合は制約なし
+        ready_at: 前工程の終了などにより作業を開始できる最も早い時刻
+        duration_minutes: 作業の所要時間（分）
+        allow_split: 作業を複数の稼働区間に分割できるかどうか
+
+    Returns:
+        datetime: 作業を開始できる最も早い時刻
+    """
+    candidate = ready_at
+    while True:
+        start = calendar.next_start(candidate, duration_minutes, allow_split)
+        if not busy:
+            return start
+
+        end = calendar.add_working_minutes(start, duration_minutes)
+        overlap = busy.first_overlap(start, end)
+        if overlap is None:
+            return start
+
+        # 重なった区間の終了時刻から次の空き時間帯を探す
+        candidate = overlap[1]
+
+
+class EquipmentTimelineIndex:
+    """
+    設備ごとの予約済み区間インデックス（挿入モード用）
+
+    MachineAvailability と同じ earliest_start / book のインターフェースを持ち、
+    スケジューラからはどちらも同じように扱える。
+    """
+
+    def __init__(
+        self,
+        intervals: dict[int, list[tuple[datetime, datetime]]] | None = None,
+        calendar: WorkCalendar = DEFAULT_CALENDAR,
+        downtimes: dict[int, list[tuple[datetime, datetime]]] | None = None,
+    ):
+        """
+        Args:
+            intervals: 設備IDをキーとした予約済み区間 (開始, 終了) のリスト
+            calendar: 稼働カレンダー
+            downtimes: 設備IDをキーとした設備停止期間 (開始, 終了) のリスト。
+                予約済みの区間と同様に扱う
+        """
+        self.calendar = calendar
+        self._timelines: dict[int, SortedIntervals] = {}
+        # そのまま更新してよい（他のインデックスと共有していない）区間リストの設備ID
+        self._owned: set[int] = set()
+        for source in (intervals or {}, downtimes or {}):
+            for machine_id, machine_intervals in source.items():
+                for start, end in machine_intervals:
+                    self.book(machine_id, start, end)
+
+    @classmethod
+    def load(
+        cls,
+        schedule_repo: ScheduleRepository,
+        equipment_ids: Iterable[int],
+        since: datetime,
+        calendar: WorkCalendar = DEFAULT_CALENDAR,
+    ) -> "EquipmentTimelineIndex":
+        """
+        指定時刻以降に終わる予約済み区間と設備停止期間をそれぞれ1回の一括クエリで読み込み、
+        インデックスを作成する。設備停止期間は予約済みの区間として扱う。
+
+        Args:
+            schedule_repo: スケジュールリポジトリ
+            equipment_ids: 対象となる設備IDの一覧
+            since: この時刻より後に終わる区間のみを読み込む
+            calendar: 稼働カレンダー
+
+        Returns:
+            EquipmentTimelineIndex: 読み込んだインデックス
+        """
+        equipment_ids = list(equipment_ids)
+        return cls(
+            schedule_repo.get_booked_intervals(equipment_ids, since),
+            calendar,
+            schedule_repo.get_downtime_intervals(equipment_ids, since),
+        )
+
+    def start_lower_bound(self, machine_id: int) -> datetime | None:
+        """
+        作業を開始できる時刻の下限を返す。
+
+        タイムライン途中の空き時間帯にも挿入できるため、下限はない（常にNone）。
+
+        Args:
+            machine_id: 設備ID
+
+        Returns:
+            None
+        """
+        return None
+
+    def earliest_start(
+        self,
+        machine_id: int,
+        ready_at: datetime,
+        duration_minutes: float,
+        allow_split: bool = False,
+    ) -> datetime:
+        """
+        ready_at 以降で、稼働カレンダー上有効かつ既存の予約と重ならない最初の開始時刻を返す。
+
+        Args:
+            machine_id: 設備ID
+            ready_at: 前工程の終了などにより作業を開始できる最も早い時刻
+            duration_minutes: 作業の所要時間（分）
+            allow_split: 作業を複数の稼働区間に分割できるかどうか
+
+        Returns:
+            datetime: 作業を開始できる最も早い時刻
+        """
+        return earliest_free_start(
+            self.calendar,
+            self._timelines.get(machine_id),
+            ready_at,
+            duration_minutes,
+            allow_split,
+        )
+
+    def book(self, machine_id: int, start: datetime, end: datetime) -> None:
+        """
+        設備に区間 [start, end) を予約する。
+
+        区間リストを他のインデックスと共有している場合は、複製してから更新する。
+
+        Args:
+            machine_id: 設備ID
+            start: 予約の開始時刻
+            end: 予約の終了時刻
+        """
+        timeline = self._timelines.get(machine_id)
+        if timeline is None:
+            timeline = SortedIntervals()
+        elif machine_id not in self._owned:
+            timeline = timeline.copy()
+        self._timelines[machine_id] = timeline
+        self._owned.add(machine_id)
+        timeline.add(start, end)
+
+    def fork(self) -> "EquipmentTimelineIndex":
+        """
+        予約状況を共有する複製を作成する（コピーオンライト）。
+
+        設備ごとの区間リストは複製せずに共有し、元・複製のどちらかで予約したときに
+        その設備の区間リストだけを複製する。複製で予約しても元のインデックスは変わらない。
+
+        Returns:
+            EquipmentTimelineIndex: 複製したインデックス
+        """
+        clone = EquipmentTimelineIndex(calendar=self.calendar)
+        clone._timelines = dict(self._timelines)
+        # 区間リストを共有したため、元のインデックスも次の予約時に複製する
+        self._owned.clear()
+        return clone
+
+    def restrict(self, machine_ids: Iterable[int]) -> "EquipmentTimelineIndex":
+        """
+        指定した設備の予約状況だけを持つ複製を作成する（コピーオンライト）。
+
+        別プロセスで計画する場合に、計画に使う設備の分だけを渡すために使う。
+
+        Args:
+            machine_ids: 複製に含める設備ID
+
+        Returns:
+            EquipmentTimelineIndex: 複製したインデックス
+        """
+        machine_ids = set(machine_ids)
+        clone = EquipmentTimelineIndex(calendar=self.calendar)
+        clone._timelines = {
+            m: timeline for m, timeline in self._timelines.items() if m in machine_ids
+        }
+        self._owned -= machine_ids
+        return clone
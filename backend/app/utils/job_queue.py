@@ -0,0 +1,246 @@
+"""
+スケジューリングジョブキューモジュール
+
+一括スケジューリング・スケジュール改善のような時間のかかる処理を、リクエストの処理とは
+別のワーカースレッドで実行する。リクエストはジョブを登録してジョブIDをすぐに返し、
+進捗と結果はジョブIDで問い合わせる。
+
+同じテナントのジョブは登録順に1件ずつ実行し、同じ設備を二重に予約しないようにする。
+順番を待つジョブはスレッドを占有せず、前のジョブが終わったときに実行を始める。
+ジョブを経由せずにスケジュールを書き込む処理（単一注文のスケジュール、注文の変更・削除に
+伴う再計画など）も tenant_lock / tenant_lock_async で同じテナント単位のロックを取得し、
+ジョブと同時に書き込まないようにする。
+
+ジョブはプロセス内に保持するため、複数のワーカープロセスで動かす場合は、
+ジョブを登録したプロセスに問い合わせが届くようにする必要がある。
+終了したジョブは JOB_RETENTION_SECONDS 経過後に破棄する。
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Literal
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ジョブを実行するワーカースレッド数
+JOB_WORKERS = 4
+
+# 終了したジョブを保持する秒数
+JOB_RETENTION_SECONDS = 3600
+
+# 非同期の処理がテナントのロックの解放を待つ間隔（秒）
+LOCK_POLL_SECONDS = 0.05
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+_tenant_locks: dict[str, threading.Lock] = {}
+_tenant_locks_guard = threading.Lock()
+
+
+def _lock_for(tenant_id: str) -> threading.Lock:
+    """テナントのスケジュール書き込み用のロックを返す（初回に作成する）。"""
+    with _tenant_locks_guard:
+        return _tenant_locks.setdefault(tenant_id, threading.Lock())
+
+
+@contextmanager
+def tenant_lock(tenant_id: str) -> Iterator[None]:
+    """
+    テナントのスケジュールを読み込んで書き込むまでの間、同じテナントの他の書き込みを待たせる。
+
+    Args:
+        tenant_id: テナントID
+    """
+    with _lock_for(tenant_id):
+        yield
+
+
+@asynccontextmanager
+async def tenant_lock_async(tenant_id: str) -> AsyncIterator[None]:
+    """
+    tenant_lock の非同期版。ロックが空くまでイベントループを止めずに待つ。
+
+    スレッドで待つとリクエストの取り消し後にロックを取得したまま残るおそれがあるため、
+    ロックの取得を一定間隔で試みる。
+
+    Args:
+        tenant_id: テナントID
+    """
+    lock = _lock_for(tenant_id)
+    while not lock.acquire(blocking=False):
+        await asyncio.sleep(LOCK_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+@dataclass
+class Job:
+    """スケジューリングジョブ"""
+
+    id: str
+    tenant_id: str
+    kind: str
+    status: JobStatus = "queued"
+    created_at: datetime = field(default_factory=lambda: datetime.now().astimezone())
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    # 処理済みの件数と全体の件数（進捗を報告しない処理ではNone）
+    progress: dict[str, int] | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    # 終了した時刻（time.monotonic の値）。保持期間の判定に使う
+    _finished_clock: float | None = field(default=None, repr=False)
+
+    def report_progress(self, done: int, total: int) -> None:
+        """
+        進捗を記録する。ジョブの処理から呼び出す。
+
+        Args:
+            done: 処理済みの件数
+            total: 全体の件数
+        """
+        self.progress = {"done": done, "total": total}
+
+    def to_dict(self) -> dict[str, Any]:
+        """レスポンス用の辞書に変換する。"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": (self.finished_at.isoformat() if self.finished_at else None),
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """テナントごとに直列化するジョブキュー"""
+
+    def __init__(
+        self,
+        max_workers: int = JOB_WORKERS,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+    ):
+        """
+        Args:
+            max_workers: ジョブを実行するワーカースレッド数
+            retention_seconds: 終了したジョブを保持する秒数
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="scheduling-job"
+        )
+        self._retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._tasks: dict[str, Callable[[Job], dict[str, Any]]] = {}
+        # テナントごとの順番待ちのジョブと、ジョブを実行中のテナント
+        self._waiting: dict[str, deque[Job]] = {}
+        self._running: set[str] = set()
+
+    def submit(
+        self, tenant_id: str, kind: str, task: Callable[[Job], dict[str, Any]]
+    ) -> Job:
+        """
+        ジョブを登録する。同じテナントのジョブを実行中の場合は、その終了後に実行する。
+
+        Args:
+            tenant_id: テナントID
+            kind: ジョブの種類（batch / optimize など）
+            task: ジョブの処理。ジョブを受け取り、結果の辞書を返す
+
+        Returns:
+            Job: 登録したジョブ
+        """
+        job = Job(id=str(uuid.uuid4()), tenant_id=tenant_id, kind=kind)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            self._tasks[job.id] = task
+            if tenant_id in self._running:
+                self._waiting.setdefault(tenant_id, deque()).append(job)
+                return job
+            self._running.add(tenant_id)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str, tenant_id: str) -> Job | None:
+        """
+        ジョブを取得する。
+
+        Args:
+            job_id: ジョブID
+            tenant_id: テナントID（他のテナントのジョブは返さない）
+
+        Returns:
+            Job | None: ジョブ。存在しない場合、または他のテナントのジョブの場合はNone
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.tenant_id != tenant_id:
+            return None
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        ワーカースレッドを停止する。
+
+        Args:
+            wait: 実行中のジョブの終了を待つかどうか
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, job: Job) -> None:
+        """ジョブを実行し、終了後に同じテナントの次のジョブを実行する。"""
+        with self._lock:
+            task = self._tasks.pop(job.id)
+        job.status = "running"
+        job.started_at = datetime.now().astimezone()
+        logger.info(f"Running {job.kind} job {job.id} for tenant {job.tenant_id}")
+        try:
+            with tenant_lock(job.tenant_id):
+                job.result = task(job)
+            job.status = "succeeded"
+        except Exception as e:
+            logger.exception(f"{job.kind} job {job.id} failed")
+            job.error = str(e)
+            job.status = "failed"
+        job.finished_at = datetime.now().astimezone()
+        job._finished_clock = time.monotonic()
+
+        with self._lock:
+            waiting = self._waiting.get(job.tenant_id)
+            if not waiting:
+                self._waiting.pop(job.tenant_id, None)
+                self._running.discard(job.tenant_id)
+                return
+            next_job = waiting.popleft()
+        self._executor.submit(self._run, next_job)
+
+    def _prune(self) -> None:
+        """保持期間を過ぎた終了済みのジョブを破棄する。ロックを取得した状態で呼び出す。"""
+        expired_before = time.monotonic() - self._retention_seconds
+        for job_id in [
+            job.id
+            for job in self._jobs.values()
+            if job._finished_clock is not None and job._finished_clock < expired_before
+        ]:
+            del self._jobs[job_id]
+
+
+# アプリ全体で共有するジョブキュー
+scheduling_jobs = JobQueue()
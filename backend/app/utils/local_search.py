@@ -0,0 +1,569 @@
+"""
+スケジュール改善（局所探索）モジュール
+
+保存済みのスケジュールを、設備ごとの作業の並び順として表現し、
+焼きなまし法（Simulated Annealing）で並び順を入れ替えながら目的関数を改善する。
+
+- 近傍操作
+  - swap: 同じ設備上の2つの作業の順序を入れ替える
+  - insert: 作業を（同じ設備グループ内の別の設備を含む）別の位置に移す
+- 目的関数
+  - makespan: 基準時刻から最後の作業が終わるまでの時間（分）
+  - total_tardiness: 注文ごとの納期遅れ（分）の合計
+
+各作業の開始時刻は「設備上の前の作業」と「注文内の前工程」の終了後、稼働カレンダー上で
+最初に開始できる時刻とする（左詰め）。近傍操作の後は、並び順が変わった作業とその後続の
+作業だけを再計算するため、1回の評価にかかる時間は影響を受ける作業の数に比例する。
+
+複数のプロセスで乱数の種を変えた探索を並行に実行し、最も良い結果を採用することもできる。
+"""
+
+import heapq
+import math
+import os
+import random
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Literal
+
+from app.utils.calendar import WorkCalendar
+from app.utils.equipment_timeline import SortedIntervals, earliest_free_start
+from app.utils.process_pool import PROCESS_POOL_SIZE, get_process_pool
+
+# 最小化する目的関数
+Objective = Literal["makespan", "total_tardiness"]
+
+# 焼きなまし法の終了時の温度（初期温度に対する比率）
+FINAL_TEMPERATURE_RATIO = 1e-3
+
+
+@dataclass(frozen=True)
+class Operation:
+    """並び替えの対象となる作業（1件のスケジュール）"""
+
+    schedule_id: int
+    order_id: int
+    duration_minutes: float  # 所要時間（稼働分）
+    machine_ids: tuple[int, ...]  # 割り当てられる設備
+    release: datetime  # 開始できる最も早い時刻
+    allow_split: bool = False
+
+
+@dataclass
+class OptimizationProblem:
+    """
+    スケジュール改善の入力
+
+    operations は注文ごとに工程順に並んでいる必要がある（同じ注文の作業は、
+    リスト上で前にあるものを前工程とみなす）。
+    """
+
+    operations: list[Operation]
+    # 設備ごとの作業の並び順（operations の添字）
+    sequences: dict[int, list[int]]
+    calendar: WorkCalendar
+    # 設備ごとの、対象外の作業（実行中など）が終わる時刻
+    machine_free_at: dict[int, datetime] = field(default_factory=dict)
+    # 設備ごとの設備停止期間
+    downtimes: dict[int, list[tuple[datetime, datetime]]] = field(default_factory=dict)
+    # 注文ごとの納期
+    due: dict[int, datetime] = field(default_factory=dict)
+    # 目的関数の基準時刻（makespan の起点）
+    origin: datetime | None = None
+
+
+@dataclass(frozen=True)
+class OptimizationResult:
+    """スケジュール改善の結果"""
+
+    objective: Objective
+    initial_value: float  # 並び順を変えずに左詰めしたときの目的関数の値
+    best_value: float
+    iterations: int
+    # 作業ごとの (設備ID, 開始時刻, 終了時刻)
+    assignments: list[tuple[int, datetime, datetime]]
+
+
+def _minutes(delta) -> float:
+    return delta.total_seconds() / 60
+
+
+class ScheduleState:
+    """
+    作業の並び順と開始・終了時刻を保持し、近傍操作と差分評価を行う。
+
+    近傍操作の後は、並び順が変わった作業から後続をたどって影響を受ける作業を集め、
+    その範囲だけを工程順（トポロジカル順）に再計算する。設備と工程の順序関係が
+    循環する近傍操作は実行不可能として取り消す。
+    """
+
+    def __init__(
+        self,
+        problem: OptimizationProblem,
+        objective: Objective,
+        initial_times: list[tuple[datetime, datetime]] | None = None,
+    ):
+        """
+        Args:
+            problem: スケジュール改善の入力
+            objective: 最小化する目的関数
+            initial_times: 作業ごとの現在の (開始時刻, 終了時刻)。指定した場合は
+                左詰めで計算し直さず、この時刻から差分で更新する
+        """
+        ops = problem.operations
+        self.problem = problem
+        self.objective = objective
+        self.origin = problem.origin or min(op.release for op in ops)
+        self.sequences = {m: list(seq) for m, seq in problem.sequences.items()}
+        self.busy: dict[int, SortedIntervals] = {}
+        self.removed: set[int] = set()
+        for machine_id, intervals in problem.downtimes.items():
+            busy = self.busy.setdefault(machine_id, SortedIntervals())
+            for start, end in intervals:
+                busy.add(start, end)
+
+        # 注文内の前工程・後工程
+        self.job_prev: list[int | None] = [None] * len(ops)
+        self.job_next: list[int | None] = [None] * len(ops)
+        last_of_order: dict[int, int] = {}
+        for i, op in enumerate(ops):
+            prev = last_of_order.get(op.order_id)
+            if prev is not None:
+                self.job_prev[i] = prev
+                self.job_next[prev] = i
+            last_of_order[op.order_id] = i
+        self.last_of_order = last_of_order
+
+        self.machine_of = [0] * len(ops)
+        self.position = [0] * len(ops)
+        for machine_id in self.sequences:
+            self._reindex(machine_id, 0)
+
+        self.durations = [op.duration_minutes for op in ops]
+        self._undo_times: list[tuple[int, datetime, datetime]] = []
+        self._undo_sequences: dict[int, list[int]] = {}
+        if initial_times is not None:
+            self.start = [start for start, _ in initial_times]
+            self.end = [end for _, end in initial_times]
+        else:
+            self.start = [self.origin] * len(ops)
+            self.end = [self.origin] * len(ops)
+            if not self._recompute(range(len(ops))):
+                raise ValueError("作業の並び順が工程順と矛盾しています")
+
+        self._reset_objective()
+
+    # --- 並び順 ---
+
+    def _reindex(self, machine_id: int, lo: int) -> None:
+        """設備の並び順の lo 番目以降について、作業の設備と位置を更新する。"""
+        seq = self.sequences[machine_id]
+        for p in range(lo, len(seq)):
+            self.machine_of[seq[p]] = machine_id
+            self.position[seq[p]] = p
+
+    def _machine_prev(self, op: int) -> int | None:
+        p = self.position[op]
+        return self.sequences[self.machine_of[op]][p - 1] if p > 0 else None
+
+    def _machine_next(self, op: int) -> int | None:
+        seq = self.sequences[self.machine_of[op]]
+        p = self.position[op] + 1
+        return seq[p] if p < len(seq) else None
+
+    # --- 時刻の計算 ---
+
+    def _compute(self, op: int) -> tuple[datetime, datetime]:
+        """前の作業・前工程の終了時刻から、作業の開始・終了時刻を計算する。"""
+        operation = self.problem.operations[op]
+        machine_id = self.machine_of[op]
+        ready = operation.release
+        machine_prev = self._machine_prev(op)
+        if machine_prev is not None:
+            ready = max(ready, self.end[machine_prev])
+        else:
+            ready = max(ready, self.problem.machine_free_at.get(machine_id, ready))
+        job_prev = self.job_prev[op]
+        if job_prev is not None:
+            ready = max(ready, self.end[job_prev])
+
+        calendar = self.problem.calendar
+        start = earliest_free_start(
+            calendar,
+            self.busy.get(machine_id),
+            ready,
+            self.durations[op],
+            operation.allow_split,
+        )
+        return start, calendar.add_working_minutes(start, self.durations[op])
+
+    def _successors(self, op: int) -> tuple[int | None, int | None]:
+        return self._machine_next(op), self.job_next[op]
+
+    def _predecessors(self, op: int) -> tuple[int | None, int | None]:
+        return self._machine_prev(op), self.job_prev[op]
+
+    def _affected(self, seeds: Iterable[int]) -> list[int] | None:
+        """
+        seeds とその後続の作業を工程順に並べて返す。順序関係が循環する場合はNone。
+        """
+        affected: set[int] = set()
+        stack = list(seeds)
+        while stack:
+            op = stack.pop()
+            if op not in affected:
+                affected.add(op)
+                stack.extend(s for s in self._successors(op) if s is not None)
+
+        # 影響範囲内での入次数を数え、Kahn法で並べる
+        indegree = {
+            op: sum(p in affected for p in self._predecessors(op)) for op in affected
+        }
+        ready = [op for op, degree in indegree.items() if degree == 0]
+        ordered: list[int] = []
+        while ready:
+            op = ready.pop()
+            ordered.append(op)
+            for succ in self._successors(op):
+                if succ in indegree:
+                    indegree[succ] -= 1
+                    if indegree[succ] == 0:
+                        ready.append(succ)
+        return ordered if len(ordered) == len(affected) else None
+
+    def _recompute(self, seeds: Iterable[int]) -> bool:
+        """影響を受ける作業の時刻を再計算する。順序関係が循環する場合は False。"""
+        seeds = set(seeds)
+        ordered = self._affected(seeds)
+        if ordered is None:
+            return False
+
+        changed: set[int] = set()
+        for op in ordered:
+            preds = self._predecessors(op)
+            if op not in seeds and not any(p in changed for p in preds):
+                # 前の作業の時刻が変わっていなければ、この作業の時刻も変わらない
+                continue
+            start, end = self._compute(op)
+            if start != self.start[op] or end != self.end[op]:
+                self._undo_times.append((op, self.start[op], self.end[op]))
+                self.start[op], self.end[op] = start, end
+                changed.add(op)
+        return True
+
+    # --- 目的関数 ---
+
+    def _tardiness_at(self, order_id: int, completion: datetime) -> float:
+        due = self.problem.due.get(order_id)
+        if due is None:
+            return 0.0
+        return max(_minutes(completion - due), 0.0)
+
+    def _reset_objective(self) -> None:
+        """目的関数の集計値を全注文から計算し直す。"""
+        self.total_tardiness = sum(
+            self._tardiness_at(order_id, self.end[last])
+            for order_id, last in self.last_of_order.items()
+        )
+        self._saved_tardiness = self.total_tardiness
+        self._completion_heap: list[tuple[float, int, int]] = []
+        self._versions: dict[int, int] = {}
+        for order_id in self.last_of_order:
+            self._push_completion(order_id)
+
+    def _push_completion(self, order_id: int) -> None:
+        """注文の完了時刻をヒープに追加する（古いエントリは版で見分けて破棄する）。"""
+        version = self._versions.get(order_id, 0) + 1
+        self._versions[order_id] = version
+        completion = self.end[self.last_of_order[order_id]]
+        # 最大値を取り出すため、基準時刻からの分の負の値で保持する
+        heapq.heappush(
+            self._completion_heap,
+            (-_minutes(completion - self.origin), order_id, version),
+        )
+
+    def _makespan(self) -> float:
+        heap = self._completion_heap
+        while heap and heap[0][2] != self._versions[heap[0][1]]:
+            heapq.heappop(heap)
+        return -heap[0][0] if heap else 0.0
+
+    def value(self) -> float:
+        """現在の目的関数の値"""
+        if self.objective == "makespan":
+            return self._makespan()
+        return self.total_tardiness
+
+    def _update_objective(self) -> None:
+        """時刻が変わった作業のうち、注文の最終工程の分だけ集計値を更新する。"""
+        for op, _, old_end in self._undo_times:
+            order_id = self.problem.operations[op].order_id
+            if op != self.last_of_order[order_id]:
+                continue
+            self.total_tardiness += self._tardiness_at(
+                order_id, self.end[op]
+            ) - self._tardiness_at(order_id, old_end)
+            self._push_completion(order_id)
+
+    # --- 近傍操作 ---
+
+    def _begin(self) -> None:
+        """近傍操作の開始。取り消し用の情報をリセットする。"""
+        self._undo_times = []
+        self._undo_sequences = {}
+        self._saved_tardiness = self.total_tardiness
+
+    def _apply(self, seeds: set[int], reindex: dict[int, int]) -> bool:
+        """並び順の変更後に時刻と目的関数を更新する。循環する場合は元に戻す。"""
+        for machine_id, lo in reindex.items():
+            self._reindex(machine_id, lo)
+        if not self._recompute(seeds):
+            self.undo()
+            return False
+        self._update_objective()
+        return True
+
+    def swap(self, machine_id: int, i: int, j: int) -> bool:
+        """
+        設備の i 番目と j 番目の作業を入れ替える。
+
+        入れ替えた2つの作業と、設備上の前の作業が変わるそれぞれの直後の作業を再計算の起点にする
+        （前の作業の時刻が変わらなくても、前の作業そのものが変わるため）。
+
+        Returns:
+            bool: 実行できた場合は True。工程順と矛盾する場合は取り消して False
+        """
+        self._begin()
+        seq = self.sequences[machine_id]
+        self._undo_sequences[machine_id] = list(seq)
+        seq[i], seq[j] = seq[j], seq[i]
+        seeds = {seq[p] for p in (i, j, i + 1, j + 1) if p < len(seq)}
+        return self._apply(seeds, {machine_id: min(i, j)})
+
+    def insert(self, op: int, machine_id: int, index: int) -> bool:
+        """
+        作業を設備 machine_id の並び順の index 番目に移す。
+
+        Returns:
+            bool: 実行できた場合は True。工程順と矛盾する場合は取り消して False
+        """
+        self._begin()
+        source = self.machine_of[op]
+        source_seq = self.sequences[source]
+        self._undo_sequences[source] = list(source_seq)
+        p = self.position[op]
+        del source_seq[p]
+        seeds = {op}
+        if p < len(source_seq):
+            seeds.add(source_seq[p])
+
+        target_seq = self.sequences.setdefault(machine_id, [])
+        self._undo_sequences.setdefault(machine_id, list(target_seq))
+        target_seq.insert(index, op)
+        if index + 1 < len(target_seq):
+            seeds.add(target_seq[index + 1])
+
+        reindex = {source: p}
+        reindex[machine_id] = min(reindex.get(machine_id, index), index)
+        return self._apply(seeds, reindex)
+
+    def _remove(self, op: int) -> set[int]:
+        """作業を設備の並び順と注文の工程から外し、前の作業が変わる作業を返す。"""
+        seq = self.sequences[self.machine_of[op]]
+        p = self.position[op]
+        del seq[p]
+        self._reindex(self.machine_of[op], p)
+        seeds = {seq[p]} if p < len(seq) else set()
+
+        prev, nxt = self.job_prev[op], self.job_next[op]
+        if prev is not None:
+            self.job_next[prev] = nxt
+        if nxt is not None:
+            self.job_prev[nxt] = prev
+            seeds.add(nxt)
+        order_id = self.problem.operations[op].order_id
+        if self.last_of_order.get(order_id) == op:
+            if prev is None:
+                del self.last_of_order[order_id]
+            else:
+                self.last_of_order[order_id] = prev
+        self.job_prev[op] = self.job_next[op] = None
+        self.removed.add(op)
+        return seeds
+
+    def replan(
+        self,
+        removed: Iterable[int] = (),
+        durations: dict[int, float] | None = None,
+    ) -> set[int]:
+        """
+        作業の削除・所要時間の変更を反映し、影響を受ける後続の作業だけを再計算する。
+
+        並び順は変えず、前の作業が早く終われば前に詰め（左シフト）、遅く終われば
+        後ろにずらす（右シフト）。
+
+        Args:
+            removed: 取り除く作業
+            durations: 作業ごとの新しい所要時間（分）
+
+        Returns:
+            開始・終了時刻が変わった作業
+        """
+        self._begin()
+        seeds: set[int] = set()
+        for op in removed:
+            seeds |= self._remove(op)
+        for op, minutes in (durations or {}).items():
+            self.durations[op] = minutes
+            seeds.add(op)
+
+        self._recompute(seeds - self.removed)
+        self._reset_objective()
+        return {op for op, *_ in self._undo_times}
+
+    def undo(self) -> None:
+        """直前の近傍操作を取り消す。"""
+        for machine_id, seq in self._undo_sequences.items():
+            self.sequences[machine_id] = seq
+            self._reindex(machine_id, 0)
+        for op, start, end in reversed(self._undo_times):
+            self.start[op], self.end[op] = start, end
+            order_id = self.problem.operations[op].order_id
+            if op == self.last_of_order[order_id]:
+                self._push_completion(order_id)
+        self.total_tardiness = self._saved_tardiness
+        self._undo_times = []
+        self._undo_sequences = {}
+
+    def assignments(self) -> list[tuple[int, datetime, datetime]]:
+        """作業ごとの (設備ID, 開始時刻, 終了時刻)"""
+        return list(zip(self.machine_of, self.start, self.end, strict=True))
+
+
+def _random_move(state: ScheduleState, rng: random.Random) -> bool:
+    """ランダムな近傍操作（swap / insert）を1回実行する。"""
+    ops = state.problem.operations
+    op = rng.randrange(len(ops))
+    machine_id = state.machine_of[op]
+    seq = state.sequences[machine_id]
+
+    if rng.random() < 0.5 and len(seq) > 1:
+        i = state.position[op]
+        # 隣接する作業との入れ替えを優先し、ときどき離れた作業とも入れ替える
+        j = i + rng.choice((-1, 1)) if rng.random() < 0.7 else rng.randrange(len(seq))
+        j = min(max(j, 0), len(seq) - 1)
+        if i == j:
+            return False
+        return state.swap(machine_id, i, j)
+
+    target = rng.choice(ops[op].machine_ids)
+    size = len(state.sequences.get(target, []))
+    if target == machine_id:
+        size -= 1
+    return state.insert(op, target, rng.randint(0, size))
+
+
+def anneal(
+    problem: OptimizationProblem,
+    objective: Objective,
+    time_limit_seconds: float,
+    seed: int | None = None,
+    max_iterations: int | None = None,
+) -> OptimizationResult:
+    """
+    焼きなまし法で作業の並び順を改善する。
+
+    Args:
+        problem: スケジュール改善の入力
+        objective: 最小化する目的関数
+        time_limit_seconds: 探索に使う最大の経過時間（秒）
+        seed: 乱数の種
+        max_iterations: 近傍操作の最大回数（指定なしの場合は時間まで続ける）
+
+    Returns:
+        OptimizationResult: 探索中に見つかった最も良い並び順の結果
+    """
+    rng = random.Random(seed)
+    state = ScheduleState(problem, objective)
+    current = initial = state.value()
+    best, best_assignments = current, state.assignments()
+
+    # 初期温度は目的関数の値の5%（値が0の場合も探索できるよう最低1分）
+    initial_temperature = max(initial * 0.05, 1.0)
+    started = time.monotonic()
+    iterations = 0
+    while max_iterations is None or iterations < max_iterations:
+        elapsed = (time.monotonic() - started) / time_limit_seconds
+        if elapsed >= 1 or not problem.operations:
+            break
+        iterations += 1
+        if not _random_move(state, rng):
+            continue
+
+        value = state.value()
+        temperature = initial_temperature * FINAL_TEMPERATURE_RATIO**elapsed
+        delta = value - current
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            current = value
+            if current < best:
+                best, best_assignments = current, state.assignments()
+        else:
+            state.undo()
+
+    return OptimizationResult(
+        objective=objective,
+        initial_value=initial,
+        best_value=best,
+        iterations=iterations,
+        assignments=best_assignments,
+    )
+
+
+def optimize(
+    problem: OptimizationProblem,
+    objective: Objective,
+    time_limit_seconds: float,
+    seed: int | None = None,
+    workers: int = 1,
+) -> OptimizationResult:
+    """
+    焼きなまし法を workers 個のプロセスで並行に実行し、最も良い結果を返す。
+
+    各プロセスは乱数の種を変えて同じ時間だけ探索する。
+
+    Args:
+        problem: スケジュール改善の入力
+        objective: 最小化する目的関数
+        time_limit_seconds: 探索に使う最大の経過時間（秒）
+        seed: 乱数の種（プロセスごとに seed, seed + 1, ... を使う）
+        workers: 探索するプロセス数。0 の場合はCPUのコア数（共有のプロセスプールの
+            プロセス数が上限）
+
+    Returns:
+        OptimizationResult: 最も良い結果（探索回数は全プロセスの合計）
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return anneal(problem, objective, time_limit_seconds, seed)
+
+    # プロセスはアプリ全体で共有するプールから使う。プールのプロセス数を超えると
+    # 探索が順番待ちになり制限時間を超えるため、同時に実行できる数までに抑える
+    workers = min(workers, PROCESS_POOL_SIZE)
+    base_seed = seed if seed is not None else random.randrange(2**32)
+    pool = get_process_pool()
+    futures = [
+        pool.submit(anneal, problem, objective, time_limit_seconds, base_seed + i)
+        for i in range(workers)
+    ]
+    results = [future.result() for future in futures]
+
+    best = min(results, key=lambda result: result.best_value)
+    return OptimizationResult(
+        objective=objective,
+        initial_value=best.initial_value,
+        best_value=best.best_value,
+        iterations=sum(result.iterations for result in results),
+        assignments=best.assignments,
+    )
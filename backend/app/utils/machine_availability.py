@@ -0,0 +1,210 @@
+"""
+設備空き状況スナップショットモジュール
+
+スケジューリング1回分の呼び出しの間、設備ごとの空き時刻をメモリ上に保持する。
+最終終了時刻は呼び出し開始時に一括で読み込み、以降は割り当てのたびにメモリ上で更新するため、
+設備台数や工程数に関わらずDBへの問い合わせは1回で済む。
+設備停止期間（保全・メンテナンス）も同時に読み込み、設備ごとの区間インデックスで判定する。
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Literal, Protocol
+
+from app.repositories.supa_infra.transaction.schedule_repo import ScheduleRepository
+from app.utils.calendar import DEFAULT_CALENDAR, WorkCalendar
+from app.utils.equipment_timeline import SortedIntervals, earliest_free_start
+
+# スケジューリングモード
+# - append: 設備の最終終了時刻の後ろに追加する（既定）
+# - insertion: タイムライン途中の空き時間帯にも挿入する
+SchedulingMode = Literal["append", "insertion"]
+
+
+class MachineBookings(Protocol):
+    """スケジューラが設備の空き状況を参照・更新するためのインターフェース"""
+
+    calendar: WorkCalendar  # 開始・終了時刻の計算に使う稼働カレンダー
+
+    def earliest_start(
+        self,
+        machine_id: int,
+        ready_at: datetime,
+        duration_minutes: float,
+        allow_split: bool = False,
+    ) -> datetime:
+        """ready_at 以降で作業を開始できる最も早い時刻を返す。"""
+        ...
+
+    def start_lower_bound(self, machine_id: int) -> datetime | None:
+        """設備で作業を開始できる時刻の下限を返す（下限がない場合はNone）。"""
+        ...
+
+    def book(self, machine_id: int, start: datetime, end: datetime) -> None:
+        """設備に区間 [start, end) の作業を割り当てる。"""
+        ...
+
+    def fork(self) -> "MachineBookings":
+        """元に影響を与えずに割り当てを試せる複製を作成する。"""
+        ...
+
+    def restrict(self, machine_ids: Iterable[int]) -> "MachineBookings":
+        """指定した設備の空き状況だけを持つ複製を作成する。"""
+        ...
+
+
+class MachineAvailability:
+    """設備ごとの空き時刻（最終終了時刻）のスナップショット"""
+
+    def __init__(
+        self,
+        last_end_times: dict[int, datetime | None],
+        calendar: WorkCalendar = DEFAULT_CALENDAR,
+        downtimes: dict[int, list[tuple[datetime, datetime]]] | None = None,
+    ):
+        """
+        Args:
+            last_end_times: 設備IDをキーとした最終終了時刻（予定がない設備はNone）
+            calendar: 稼働カレンダー
+            downtimes: 設備IDをキーとした設備停止期間 (開始, 終了) のリスト
+        """
+        self._free_at: dict[int, datetime | None] = dict(last_end_times)
+        self.calendar = calendar
+        self._downtimes: dict[int, SortedIntervals] = {}
+        for machine_id, machine_downtimes in (downtimes or {}).items():
+            for start, end in machine_downtimes:
+                self._downtimes.setdefault(machine_id, SortedIntervals()).add(
+                    start, end
+                )
+
+    @classmethod
+    def load(
+        cls,
+        schedule_repo: ScheduleRepository,
+        equipment_ids: Iterable[int],
+        calendar: WorkCalendar = DEFAULT_CALENDAR,
+        since: datetime | None = None,
+    ) -> "MachineAvailability":
+        """
+        指定された設備群の最終終了時刻と設備停止期間をそれぞれ1回のクエリで読み込み、
+        スナップショットを作成する。
+
+        Args:
+            schedule_repo: スケジュールリポジトリ
+            equipment_ids: 対象となる設備IDの一覧
+            calendar: 稼働カレンダー
+            since: この時刻より後に終わる設備停止期間のみを読み込む（指定なしの場合は現在時刻）
+
+        Returns:
+            MachineAvailability: 読み込んだスナップショット
+        """
+        equipment_ids = list(equipment_ids)
+        since = since or datetime.now().astimezone()
+        return cls(
+            schedule_repo.get_last_end_times(equipment_ids),
+            calendar,
+            schedule_repo.get_downtime_intervals(equipment_ids, since),
+        )
+
+    def free_at(self, machine_id: int, default: datetime) -> datetime:
+        """
+        設備が空く時刻を返す。予定がない設備の場合は default を返す。
+
+        Args:
+            machine_id: 設備ID
+            default: 予定がない場合に返す時刻
+
+        Returns:
+            datetime: 設備が空く時刻
+        """
+        last_end = self._free_at.get(machine_id)
+        return last_end if last_end else default
+
+    def start_lower_bound(self, machine_id: int) -> datetime | None:
+        """
+        設備で作業を開始できる時刻の下限（最終終了時刻）を返す。
+
+        Args:
+            machine_id: 設備ID
+
+        Returns:
+            datetime | None: 最終終了時刻。予定がない設備の場合はNone
+        """
+        return self._free_at.get(machine_id)
+
+    def earliest_start(
+        self,
+        machine_id: int,
+        ready_at: datetime,
+        duration_minutes: float,
+        allow_split: bool = False,
+    ) -> datetime:
+        """
+        設備の最終終了時刻と ready_at の遅い方を基準に、稼働カレンダー上の開始時刻を返す。
+
+        Args:
+            machine_id: 設備ID
+            ready_at: 前工程の終了などにより作業を開始できる最も早い時刻
+            duration_minutes: 作業の所要時間（分）
+            allow_split: 作業を複数の稼働区間に分割できるかどうか
+
+        Returns:
+            datetime: 作業を開始できる最も早い時刻
+        """
+        # 前工程が終わった時間と設備が空く時間の遅い方を基準とし、停止期間を避ける
+        base_start = max(self.free_at(machine_id, ready_at), ready_at)
+        return earliest_free_start(
+            self.calendar,
+            self._downtimes.get(machine_id),
+            base_start,
+            duration_minutes,
+            allow_split,
+        )
+
+    def book(self, machine_id: int, start: datetime, end: datetime) -> None:
+        """
+        設備に作業を割り当て、空き時刻を作業の終了時刻まで進める。
+
+        Args:
+            machine_id: 設備ID
+            start: 割り当てた作業の開始時刻
+            end: 割り当てた作業の終了時刻
+        """
+        last_end = self._free_at.get(machine_id)
+        if last_end is None or end > last_end:
+            self._free_at[machine_id] = end
+
+    def fork(self) -> "MachineAvailability":
+        """
+        空き状況の複製を作成する。複製で割り当てても元のスナップショットは変わらない。
+
+        空き時刻は設備ごとに1つだけのため複製し、設備停止期間は読み取り専用として共有する。
+
+        Returns:
+            MachineAvailability: 複製したスナップショット
+        """
+        clone = MachineAvailability(self._free_at, self.calendar)
+        clone._downtimes = self._downtimes
+        return clone
+
+    def restrict(self, machine_ids: Iterable[int]) -> "MachineAvailability":
+        """
+        指定した設備の空き時刻と設備停止期間だけを持つ複製を作成する。
+
+        別プロセスで計画する場合に、計画に使う設備の分だけを渡すために使う。
+
+        Args:
+            machine_ids: 複製に含める設備ID
+
+        Returns:
+            MachineAvailability: 複製したスナップショット
+        """
+        machine_ids = set(machine_ids)
+        clone = MachineAvailability(
+            {m: end for m, end in self._free_at.items() if m in machine_ids},
+            self.calendar,
+        )
+        clone._downtimes = {
+            m: downtimes for m, downtimes in self._downtimes.items() if m in machine_ids
+        }
+        return clone
@@ -0,0 +1,202 @@
+"""
+設備選定モジュール
+
+設備グループごとに設備の優先度付きキュー（ヒープ）を保持し、工程ごとに割り当てる設備を選ぶ。
+ヒープはスケジューリング1回分（一括スケジューリングでは全注文）を通して使い回すため、
+工程ごとに候補リストを作り直して全設備を走査する必要はない。
+
+ヒープのキーは選定方針ごとの「開始時刻・負荷の下限」で、取り出した設備の実際の開始時刻が
+残りの設備の下限以下になった時点で探索を打ち切る。設備の割り当てでキーが変わった場合は
+新しいエントリを追加し、古いエントリは取り出したときに破棄する（遅延削除）。
+"""
+
+import heapq
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Literal
+
+from app.utils.machine_availability import MachineBookings
+
+# 設備の選定方針
+# - earliest_start: 最も早く開始できる設備（既定）
+# - earliest_finish: 最も早く終了できる設備
+# - least_loaded: 今回のスケジューリングで割り当てた稼働時間が最も少ない設備
+#   （同じ負荷の設備の中では最も早く開始できる設備）
+SelectionPolicy = Literal["earliest_start", "earliest_finish", "least_loaded"]
+
+
+@dataclass(frozen=True)
+class MachineChoice:
+    """選定された設備と作業の開始・終了時刻"""
+
+    machine_id: int
+    start: datetime
+    end: datetime
+
+
+class MachineSelector:
+    """
+    設備グループごとのヒープで、工程を割り当てる設備を選ぶ。
+
+    同じ評価値の設備が複数ある場合は、ヒープから先に取り出された設備
+    （earliest_start / earliest_finish では先に空いた設備、least_loaded では
+    開始時刻の早い設備。それも同じ場合は設備グループ内の並び順）を選ぶ。
+    """
+
+    def __init__(
+        self,
+        bookings: MachineBookings,
+        machine_ids_by_group: dict[int, list[int]],
+        policy: SelectionPolicy = "earliest_start",
+    ):
+        """
+        Args:
+            bookings: 設備の空き状況（スナップショットまたはタイムラインインデックス）
+            machine_ids_by_group: 設備グループIDをキーとした設備IDのリスト
+            policy: 設備の選定方針
+        """
+        self.bookings = bookings
+        self.policy = policy
+        self._machine_ids_by_group = machine_ids_by_group
+        self._heaps: dict[int, list[tuple]] = {}
+        # 設備ごとの最新のエントリの版。版が異なるエントリは古いものとして破棄する
+        self._versions: dict[int, int] = {}
+        # 設備ごとの今回割り当てた稼働時間（分）
+        self._loads: dict[int, float] = {}
+        # 設備が属する設備グループと、グループ内での並び順
+        self._positions: dict[int, list[tuple[int, int]]] = {}
+
+    def _entry(self, machine_id: int, position: int) -> tuple:
+        """ヒープのエントリを作成する。先頭の要素ほど優先度が高い。"""
+        version = self._versions.get(machine_id, 0)
+        if self.policy == "least_loaded":
+            return (self._loads.get(machine_id, 0.0), position, version, machine_id)
+
+        bound = self.bookings.start_lower_bound(machine_id)
+        if bound is None:
+            # 下限がない（いつでも開始できる）設備を先に並べる
+            return (0, position, version, machine_id)
+        return (1, bound, position, version, machine_id)
+
+    def _heap(self, group_id: int) -> list[tuple]:
+        """設備グループのヒープを返す（初回のみ作成する）。"""
+        heap = self._heaps.get(group_id)
+        if heap is None:
+            heap = []
+            for position, machine_id in enumerate(self._machine_ids_by_group[group_id]):
+                self._positions.setdefault(machine_id, []).append((group_id, position))
+                heap.append(self._entry(machine_id, position))
+            heapq.heapify(heap)
+            self._heaps[group_id] = heap
+        return heap
+
+    def _can_prune(
+        self,
+        entry: tuple,
+        best: tuple,
+        ready_at: datetime,
+        duration_minutes: float,
+    ) -> bool:
+        """
+        エントリの設備が、これまでの最良の候補より良くなりえないかどうかを判定する。
+
+        ヒープは優先度順に取り出されるため、以降のエントリも同様に打ち切れる。
+        """
+        if self.policy == "least_loaded":
+            # 負荷が同じ設備は開始時刻で比べるため、負荷が大きい場合のみ打ち切る
+            return entry[0] > best[0]
+
+        # 開始時刻の下限（設備が空く時刻と ready_at の遅い方）
+        lower_bound = ready_at if entry[0] == 0 else max(entry[1], ready_at)
+        if self.policy == "earliest_finish":
+            # 稼働時間は経過時間を超えないため、終了時刻は下限 + 所要時間以降になる
+            return lower_bound + timedelta(minutes=duration_minutes) >= best[0]
+        return lower_bound >= best[0]
+
+    def select(
+        self,
+        group_id: int,
+        ready_at: datetime,
+        duration_minutes: float,
+        allow_split: bool = False,
+        setup_minutes: Callable[[int], float] | None = None,
+    ) -> MachineChoice:
+        """
+        設備グループの中から、選定方針に従って作業を割り当てる設備を選ぶ。
+
+        Args:
+            group_id: 設備グループID
+            ready_at: 前工程の終了などにより作業を開始できる最も早い時刻
+            duration_minutes: 作業の所要時間（分）。setup_minutes を指定した場合は段取りを除く時間
+            allow_split: 作業を複数の稼働区間に分割できるかどうか
+            setup_minutes: 設備IDを受け取り、その設備での段取り時間（分）を返す関数。
+                段取り時間は0以上のため、探索の打ち切りには duration_minutes を下限として使う
+
+        Returns:
+            MachineChoice: 選定された設備と作業の開始・終了時刻
+        """
+        heap = self._heap(group_id)
+        calendar = self.bookings.calendar
+        best: tuple | None = None
+        choice: MachineChoice | None = None
+        evaluated: list[tuple] = []
+
+        try:
+            while heap:
+                entry = heap[0]
+                machine_id = entry[-1]
+                if entry[-2] != self._versions.get(machine_id, 0):
+                    # 割り当てにより古くなったエントリは破棄する
+                    heapq.heappop(heap)
+                    continue
+                if best is not None and self._can_prune(
+                    entry, best, ready_at, duration_minutes
+                ):
+                    break
+
+                evaluated.append(heapq.heappop(heap))
+                minutes = duration_minutes
+                if setup_minutes is not None:
+                    minutes += setup_minutes(machine_id)
+                start = self.bookings.earliest_start(
+                    machine_id, ready_at, minutes, allow_split
+                )
+                end = calendar.add_working_minutes(start, minutes)
+                if self.policy == "least_loaded":
+                    key: tuple = (self._loads.get(machine_id, 0.0), start)
+                elif self.policy == "earliest_finish":
+                    key = (end, start)
+                else:
+                    key = (start,)
+
+                if best is None or key < best:
+                    best = key
+                    choice = MachineChoice(machine_id, start, end)
+        finally:
+            # 評価のために取り出したエントリを戻す（所要時間が稼働区間に収まらないなどで
+            # 例外になった場合も、後続の工程の選定に使えるようにする）
+            for entry in evaluated:
+                heapq.heappush(heap, entry)
+
+        if choice is None:
+            raise ValueError(f"設備グループID {group_id} に設備が見つかりません")
+        return choice
+
+    def book(self, machine_id: int, start: datetime, end: datetime) -> None:
+        """
+        設備に作業を割り当て、設備が属するすべてのグループのヒープを更新する。
+
+        Args:
+            machine_id: 設備ID
+            start: 割り当てた作業の開始時刻
+            end: 割り当てた作業の終了時刻
+        """
+        self.bookings.book(machine_id, start, end)
+        self._loads[machine_id] = self._loads.get(
+            machine_id, 0.0
+        ) + self.bookings.calendar.working_minutes_between(start, end)
+        self._versions[machine_id] = self._versions.get(machine_id, 0) + 1
+
+        for group_id, position in self._positions.get(machine_id, []):
+            heapq.heappush(self._heaps[group_id], self._entry(machine_id, position))
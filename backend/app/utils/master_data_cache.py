@@ -0,0 +1,232 @@
+"""
+マスタデータ（工程順序・設備グループのメンバー）のキャッシュモジュール
+
+スケジューリングのたびに読み込んでいた、製品ごとの工程順序と設備グループごとの所属設備を、
+(種類, テナントID, 製品ID / 設備グループID) をキーとしたプロセス内の上限付きキャッシュに保持する。
+キャッシュにない製品・設備グループの分だけを読み込むため、同じ製品の注文を繰り返し
+スケジュールする場合はマスタデータの読み込みが発生しない。
+
+マスタデータを更新したときは、更新した行に関係するエントリだけを破棄する。
+- 工程順序の作成: 製品の工程順序（invalidate_products）
+- 工程順序の更新・削除: その工程順序を含む製品の工程順序（invalidate_routing）
+- 製品の削除: 製品の工程順序（invalidate_products）
+- 設備グループへの設備の追加・削除、設備グループの削除: 設備グループ（invalidate_groups）
+- 設備の削除: その設備が所属する設備グループ（invalidate_equipment）
+他プロセスでの更新は TTL 経過後に反映される。
+
+キャッシュした値は呼び出し側で共有するため、変更しないこと。
+"""
+
+import threading
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, Literal
+
+from cachetools import TTLCache
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# キャッシュするエントリ数の上限（製品・設備グループごとに1エントリ）
+MASTER_DATA_CACHE_SIZE = 8192
+
+# 他プロセスでの更新を反映するまでの最大秒数
+MASTER_DATA_TTL_SECONDS = 300
+
+_Kind = Literal["routings", "members"]
+
+_cache: TTLCache[tuple[_Kind, str, int], list[Any]] = TTLCache(
+    maxsize=MASTER_DATA_CACHE_SIZE, ttl=MASTER_DATA_TTL_SECONDS
+)
+_lock = threading.Lock()
+# 破棄のたびに進める世代番号。読み込み中に破棄された場合、古い内容をキャッシュしない
+_generation = 0
+
+
+def _lookup(
+    kind: _Kind, tenant_id: str, ids: Iterable[int]
+) -> tuple[dict[int, list[Any]], set[int], int]:
+    """キャッシュにある値と、キャッシュにないID、現在の世代番号を返す。"""
+    found: dict[int, list[Any]] = {}
+    missing: set[int] = set()
+    with _lock:
+        for id in set(ids):
+            value = _cache.get((kind, tenant_id, id))
+            if value is None:
+                missing.add(id)
+            else:
+                found[id] = value
+        return found, missing, _generation
+
+
+def _store(
+    kind: _Kind, tenant_id: str, loaded: dict[int, list[Any]], generation: int
+) -> None:
+    """読み込んだ値をキャッシュする（読み込み中に破棄があった場合はキャッシュしない）。"""
+    with _lock:
+        if generation != _generation:
+            return
+        for id, value in loaded.items():
+            _cache[(kind, tenant_id, id)] = value
+
+
+def _own_routings(
+    tenant_id: str, routings_by_product: dict[int, list[dict[str, Any]]]
+) -> dict[int, list[dict[str, Any]]]:
+    """他テナントの行がキャッシュに混ざらないよう、テナントの工程順序だけを残す。"""
+    return {
+        product_id: [r for r in routings if r.get("tenant_id", tenant_id) == tenant_id]
+        for product_id, routings in routings_by_product.items()
+    }
+
+
+def load_routings_by_products(
+    tenant_id: str,
+    product_ids: Iterable[int],
+    loader: Callable[[set[int]], dict[int, list[dict[str, Any]]]],
+) -> dict[int, list[dict[str, Any]]]:
+    """
+    製品ごとの工程順序を返す。キャッシュにない製品の分だけ loader で読み込む。
+
+    Args:
+        tenant_id: テナントID
+        product_ids: 製品IDの一覧
+        loader: 製品IDの集合を受け取り、製品IDをキーとした工程順序（sequence_order順）を返す関数
+
+    Returns:
+        製品IDをキーとした工程順序のリスト
+    """
+    found, missing, generation = _lookup("routings", tenant_id, product_ids)
+    if missing:
+        logger.info(f"Loading routings of {len(missing)} products")
+        loaded = _own_routings(tenant_id, loader(missing))
+        _store("routings", tenant_id, loaded, generation)
+        found.update(loaded)
+    return found
+
+
+async def load_routings_by_products_async(
+    tenant_id: str,
+    product_ids: Iterable[int],
+    loader: Callable[[set[int]], Awaitable[dict[int, list[dict[str, Any]]]]],
+) -> dict[int, list[dict[str, Any]]]:
+    """load_routings_by_products の非同期版（loader は非同期関数）。"""
+    found, missing, generation = _lookup("routings", tenant_id, product_ids)
+    if missing:
+        logger.info(f"Loading routings of {len(missing)} products")
+        loaded = _own_routings(tenant_id, await loader(missing))
+        _store("routings", tenant_id, loaded, generation)
+        found.update(loaded)
+    return found
+
+
+def load_machine_ids_by_groups(
+    tenant_id: str,
+    group_ids: Iterable[int],
+    loader: Callable[[set[int]], dict[int, list[int]]],
+) -> dict[int, list[int]]:
+    """
+    設備グループごとの所属設備IDを返す。キャッシュにない設備グループの分だけ loader で読み込む。
+
+    Args:
+        tenant_id: テナントID
+        group_ids: 設備グループIDの一覧
+        loader: 設備グループIDの集合を受け取り、設備グループIDをキーとした設備IDのリストを返す関数
+
+    Returns:
+        設備グループIDをキーとした設備IDのリスト
+    """
+    found, missing, generation = _lookup("members", tenant_id, group_ids)
+    if missing:
+        logger.info(f"Loading members of {len(missing)} equipment groups")
+        loaded = loader(missing)
+        _store("members", tenant_id, loaded, generation)
+        found.update(loaded)
+    return found
+
+
+async def load_machine_ids_by_groups_async(
+    tenant_id: str,
+    group_ids: Iterable[int],
+    loader: Callable[[set[int]], Awaitable[dict[int, list[int]]]],
+) -> dict[int, list[int]]:
+    """load_machine_ids_by_groups の非同期版（loader は非同期関数）。"""
+    found, missing, generation = _lookup("members", tenant_id, group_ids)
+    if missing:
+        logger.info(f"Loading members of {len(missing)} equipment groups")
+        loaded = await loader(missing)
+        _store("members", tenant_id, loaded, generation)
+        found.update(loaded)
+    return found
+
+
+def _invalidate(
+    kind: _Kind, tenant_id: str, matches: Callable[[int, list[Any]], bool]
+) -> None:
+    """テナントのエントリのうち、matches(ID, 値) が真のものを破棄する。"""
+    global _generation
+    with _lock:
+        for key, value in list(_cache.items()):
+            if key[0] == kind and key[1] == tenant_id and matches(key[2], value):
+                del _cache[key]
+        _generation += 1
+
+
+def invalidate_products(tenant_id: str, product_ids: Iterable[int]) -> None:
+    """
+    製品の工程順序をキャッシュから破棄する。
+
+    Args:
+        tenant_id: テナントID
+        product_ids: 製品IDの一覧
+    """
+    ids = set(product_ids)
+    _invalidate("routings", tenant_id, lambda product_id, _: product_id in ids)
+
+
+def invalidate_routing(tenant_id: str, routing_id: int) -> None:
+    """
+    工程順序を含む製品の工程順序をキャッシュから破棄する。
+
+    Args:
+        tenant_id: テナントID
+        routing_id: 工程順序ID
+    """
+    _invalidate(
+        "routings",
+        tenant_id,
+        lambda _, routings: any(r["id"] == routing_id for r in routings),
+    )
+
+
+def invalidate_groups(tenant_id: str, group_ids: Iterable[int]) -> None:
+    """
+    設備グループの所属設備をキャッシュから破棄する。
+
+    Args:
+        tenant_id: テナントID
+        group_ids: 設備グループIDの一覧
+    """
+    ids = set(group_ids)
+    _invalidate("members", tenant_id, lambda group_id, _: group_id in ids)
+
+
+def invalidate_equipment(tenant_id: str, equipment_id: int) -> None:
+    """
+    設備が所属する設備グループの所属設備をキャッシュから破棄する。
+
+    Args:
+        tenant_id: テナントID
+        equipment_id: 設備ID
+    """
+    _invalidate(
+        "members", tenant_id, lambda _, machine_ids: equipment_id in machine_ids
+    )
+
+
+def clear_master_data() -> None:
+    """すべてのテナントのマスタデータをキャッシュから破棄する。"""
+    global _generation
+    with _lock:
+        _cache.clear()
+        _generation += 1
@@ -0,0 +1,52 @@
+"""
+キーセットページングのカーソルモジュール
+
+一覧を (start_datetime, id) のように一意な並び順で読み込み、次のページは最後の行のキーより
+後ろから読む。オフセットによるページングと違い、読み飛ばす行を DB が数える必要がないため、
+何ページ目でも読み込みの速さは変わらない。
+
+カーソルは最後の行のキーを JSON にして URL-safe な base64 で符号化した文字列で、
+クライアントは中身を解釈せずにそのまま次のリクエストに渡す。
+"""
+
+import base64
+import json
+from typing import Any
+
+
+def encode_cursor(*key: Any) -> str:
+    """
+    行のキーをカーソル文字列に符号化する。
+
+    Args:
+        key: 並び順のキー（JSON に変換できる値）
+
+    Returns:
+        カーソル文字列
+    """
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """
+    カーソル文字列を行のキーに復号する。
+
+    Args:
+        cursor: encode_cursor で符号化したカーソル文字列
+        size: キーの要素数
+
+    Returns:
+        並び順のキー
+
+    Raises:
+        ValueError: カーソルの形式が正しくない場合
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except ValueError as e:
+        raise ValueError("カーソルの形式が正しくありません") from e
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError("カーソルの形式が正しくありません")
+    return key
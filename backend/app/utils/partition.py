@@ -0,0 +1,96 @@
+"""
+スケジューリング問題の分割モジュール
+
+工程で使う設備グループを通じて設備を取り合う可能性のある注文どうしを、
+素集合データ構造（Union-Find）で1つの連結成分にまとめる。
+異なる連結成分の注文は設備を共有しないため、成分ごとに独立に（別プロセスで並行に）
+計画しても、すべての注文をまとめて計画した結果と変わらない。
+
+1台の設備が複数の設備グループに属する場合は、それらの設備グループも同じ成分とする。
+"""
+
+from collections.abc import Hashable, Sequence
+from typing import Any
+
+
+class UnionFind:
+    """素集合データ構造（経路圧縮・サイズによる併合）"""
+
+    def __init__(self) -> None:
+        self._parent: dict[Hashable, Hashable] = {}
+        self._size: dict[Hashable, int] = {}
+
+    def find(self, x: Hashable) -> Hashable:
+        """
+        x が属する集合の代表元を返す。初めて現れた要素は単独の集合とする。
+
+        Args:
+            x: 要素
+
+        Returns:
+            代表元
+        """
+        if x not in self._parent:
+            self._parent[x] = x
+            self._size[x] = 1
+            return x
+        root = x
+        while self._parent[root] != root:
+            root = self._parent[root]
+        # 経路圧縮
+        while self._parent[x] != root:
+            self._parent[x], x = root, self._parent[x]
+        return root
+
+    def union(self, a: Hashable, b: Hashable) -> None:
+        """
+        a と b が属する集合を併合する。
+
+        Args:
+            a: 要素
+            b: 要素
+        """
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+
+
+def partition_orders(
+    orders: Sequence[dict[str, Any]],
+    routings_by_product: dict[int, list[dict[str, Any]]],
+    machine_ids_by_group: dict[int, list[int]],
+) -> list[list[dict[str, Any]]]:
+    """
+    注文を、設備を取り合う可能性のある注文どうしの連結成分に分割する。
+
+    各成分の中では元の注文の順序を保ち、成分は最初の注文の位置順に並べる。
+
+    Args:
+        orders: 注文のリスト（工程が存在する注文のみ）
+        routings_by_product: 製品IDをキーとした工程のリスト
+        machine_ids_by_group: 設備グループIDをキーとした設備IDのリスト
+
+    Returns:
+        連結成分ごとの注文のリスト
+    """
+    components = UnionFind()
+    for group_id, machine_ids in machine_ids_by_group.items():
+        for machine_id in machine_ids:
+            components.union(("group", group_id), ("machine", machine_id))
+    for product_id in {order["product_id"] for order in orders}:
+        routings = routings_by_product[product_id]
+        for routing in routings[1:]:
+            components.union(
+                ("group", routings[0]["equipment_group_id"]),
+                ("group", routing["equipment_group_id"]),
+            )
+
+    partitions: dict[Hashable, list[dict[str, Any]]] = {}
+    for order in orders:
+        first_group = routings_by_product[order["product_id"]][0]["equipment_group_id"]
+        partitions.setdefault(components.find(("group", first_group)), []).append(order)
+    return list(partitions.values())
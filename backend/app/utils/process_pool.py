@@ -0,0 +1,42 @@
+"""
+計算用プロセスプールモジュール
+
+一括スケジューリングの連結成分ごとの計画・スケジュール改善の探索のように、CPUを使う処理を
+別プロセスで並行に実行するためのプロセスプールを、アプリ全体で1つだけ作成して共有する。
+
+リクエストはワーカースレッドから処理され、共有のHTTP接続やジョブキューのスレッドも
+動いているため、スレッドを持つプロセスを複製する fork ではなく、新しいインタプリタを
+起動する spawn でプロセスを作成する。プロセスは使い回すため、起動の費用は初回だけかかる。
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# 共有するプロセスプールのプロセス数
+PROCESS_POOL_SIZE = os.cpu_count() or 1
+
+_pool: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """共有のプロセスプールを返す（初回に作成する）。"""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PROCESS_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """共有のプロセスプールを停止する（アプリの終了時に呼び出す）。"""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,183 @@
+"""
+Supabaseクライアントのプールモジュール
+
+リクエストごとに create_client を呼ぶと、PostgREST・Auth・Storage のクライアントと
+HTTPコネクションプールを毎回作り直し、TLSハンドシェイクが毎回発生する。
+
+このモジュールでは、HTTP/2・keep-alive を有効にした httpx のクライアントをプロセス全体で
+1つだけ作成し、すべてのトークンで共有する。APIが使うのは PostgREST（table / rpc）だけのため、
+トークンごとのクライアントは Supabase クライアント全体ではなく、共有の httpx クライアントに
+紐づけた PostgREST クライアントとする。URL・公開キー・共通のヘッダーは (URL, 公開キー) ごとに
+1回だけ組み立て、トークンごとには Authorization ヘッダーだけを差し替える。
+最近使われたトークンの分だけを上限付きのキャッシュに保持する。
+
+トークンの有効期限はキャッシュでは確認しない（期限切れのトークンは PostgREST が拒否する）。
+"""
+
+import os
+import threading
+
+import httpx
+from cachetools import TTLCache
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from supabase.lib.client_options import DEFAULT_HEADERS  # type: ignore
+
+# 保持するトークンごとのクライアント数の上限
+SUPABASE_CLIENT_CACHE_SIZE = 256
+
+# トークンごとのクライアントを保持する最大秒数
+SUPABASE_CLIENT_TTL_SECONDS = 300
+
+# 共有するHTTPコネクションプールの設定
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30
+)
+
+# 共有するHTTPクライアントのタイムアウト（PostgRESTクライアントの既定値に合わせる）
+HTTP_TIMEOUT = httpx.Timeout(120, connect=10)
+
+_lock = threading.Lock()
+_http_client: httpx.Client | None = None
+_async_http_client: httpx.AsyncClient | None = None
+# (URL, 公開キー) をキーとした、PostgREST のURLとトークン以外の共通のヘッダー
+_bases: dict[tuple[str, str], tuple[str, dict[str, str]]] = {}
+_clients: TTLCache[tuple[str, str, str], SyncPostgrestClient] = TTLCache(
+    maxsize=SUPABASE_CLIENT_CACHE_SIZE, ttl=SUPABASE_CLIENT_TTL_SECONDS
+)
+_async_clients: TTLCache[tuple[str, str, str], AsyncPostgrestClient] = TTLCache(
+    maxsize=SUPABASE_CLIENT_CACHE_SIZE, ttl=SUPABASE_CLIENT_TTL_SECONDS
+)
+
+
+def _supabase_settings() -> tuple[str, str]:
+    """SupabaseのURLと公開キー(anon key)を環境変数から取得する。"""
+    sb_url = os.environ.get("SUPABASE_URL")
+    # 公開キー(anon key)を使用(service_role keyは絶対に使わない)
+    sb_anon_key = os.environ.get("SUPABASE_ANON_KEY")
+
+    if not sb_url or not sb_anon_key:
+        raise ValueError("Supabase environment variables are not set.")
+    return sb_url, sb_anon_key
+
+
+def _base(sb_url: str, sb_anon_key: str) -> tuple[str, dict[str, str]]:
+    """PostgREST のURLと、トークン以外の共通のヘッダーを返す（初回に組み立てる）。"""
+    key = (sb_url, sb_anon_key)
+    with _lock:
+        base = _bases.get(key)
+        if base is None:
+            base = (
+                f"{sb_url.rstrip('/')}/rest/v1",
+                {
+                    **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                    **DEFAULT_HEADERS,
+                    "apikey": sb_anon_key,
+                },
+            )
+            _bases[key] = base
+        return base
+
+
+def _auth_headers(base_headers: dict[str, str], token: str) -> dict[str, str]:
+    """共通のヘッダーに、ユーザーとして振る舞うための Authorization ヘッダーを加える"""
+    return {**base_headers, "Authorization": f"Bearer {token}"}
+
+
+def shared_http_client() -> httpx.Client:
+    """プロセス全体で共有する httpx クライアントを返す（初回に作成する）。"""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(
+                http2=True,
+                limits=HTTP_LIMITS,
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True,
+            )
+        return _http_client
+
+
+def shared_async_http_client() -> httpx.AsyncClient:
+    """プロセス全体で共有する非同期の httpx クライアントを返す（初回に作成する）。"""
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None or _async_http_client.is_closed:
+            _async_http_client = httpx.AsyncClient(
+                http2=True,
+                limits=HTTP_LIMITS,
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True,
+            )
+        return _async_http_client
+
+
+def get_client(token: str) -> SyncPostgrestClient:
+    """
+    トークンの PostgREST クライアントを返す。キャッシュにない場合は共有の接続で作成する。
+
+    Args:
+        token: ユーザーのアクセストークン（JWT）
+
+    Returns:
+        SyncPostgrestClient: Authorization ヘッダーにトークンをセットしたクライアント
+    """
+    sb_url, sb_anon_key = _supabase_settings()
+    key = (sb_url, sb_anon_key, token)
+    with _lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+
+    rest_url, base_headers = _base(sb_url, sb_anon_key)
+    client = SyncPostgrestClient(
+        rest_url,
+        headers=_auth_headers(base_headers, token),
+        http_client=shared_http_client(),
+    )
+    with _lock:
+        _clients[key] = client
+    return client
+
+
+async def get_async_client(token: str) -> AsyncPostgrestClient:
+    """
+    トークンの非同期 PostgREST クライアントを返す。キャッシュの扱いは get_client と同じ。
+
+    Args:
+        token: ユーザーのアクセストークン（JWT）
+
+    Returns:
+        AsyncPostgrestClient: Authorization ヘッダーにトークンをセットしたクライアント
+    """
+    sb_url, sb_anon_key = _supabase_settings()
+    key = (sb_url, sb_anon_key, token)
+    with _lock:
+        client = _async_clients.get(key)
+    if client is not None:
+        return client
+
+    rest_url, base_headers = _base(sb_url, sb_anon_key)
+    client = AsyncPostgrestClient(
+        rest_url,
+        headers=_auth_headers(base_headers, token),
+        http_client=shared_async_http_client(),
+    )
+    with _lock:
+        _async_clients[key] = client
+    return client
+
+
+async def close_clients() -> None:
+    """キャッシュしたクライアントを破棄し、共有のHTTPコネクションを閉じる。"""
+    global _http_client, _async_http_client
+    with _lock:
+        _bases.clear()
+        _clients.clear()
+        _async_clients.clear()
+        http_client, _http_client = _http_client, None
+        async_http_client, _async_http_client = _async_http_client, None
+    if http_client is not None:
+        http_client.close()
+    if async_http_client is not None:
+        await async_http_client.aclose()
@@ -0,0 +1,133 @@
+"""
+テナント別稼働カレンダーのキャッシュモジュール
+
+テナントのシフト・休日・工場停止期間からコンパイルした WorkCalendar を、
+プロセス内の上限付きLRUキャッシュに保持する。スケジューリングのたびに
+カレンダーのマスタを読み直したり、稼働区間を再計算したりする必要はない。
+
+カレンダーのマスタを更新したときは invalidate_tenant_calendar でキャッシュを破棄する。
+複数のワーカープロセスで動かす場合に備え、他プロセスでの更新も TTL 経過後には反映される。
+"""
+
+import threading
+from collections.abc import Iterable
+from datetime import date, datetime, time
+from typing import Any
+
+from cachetools import TTLCache
+
+from app.repositories.supa_infra.master.calendar_repo import CalendarRepository
+from app.utils.calendar import DEFAULT_CALENDAR, Shift, WorkCalendar
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# キャッシュするテナント数の上限（超えた場合は最も使われていないものから破棄）
+TENANT_CALENDAR_CACHE_SIZE = 256
+
+# 他プロセスでの更新を反映するまでの最大秒数
+TENANT_CALENDAR_TTL_SECONDS = 600
+
+_cache: TTLCache[str, WorkCalendar] = TTLCache(
+    maxsize=TENANT_CALENDAR_CACHE_SIZE, ttl=TENANT_CALENDAR_TTL_SECONDS
+)
+_lock = threading.Lock()
+# 破棄のたびに進める世代番号。読み込み中に破棄された場合、古い内容をキャッシュしない
+_generation = 0
+
+
+def build_work_calendar(
+    shifts: Iterable[dict[str, Any]],
+    holidays: Iterable[dict[str, Any]] = (),
+    shutdowns: Iterable[dict[str, Any]] = (),
+) -> WorkCalendar:
+    """
+    カレンダーマスタの行から WorkCalendar をコンパイルする。
+
+    シフトが1件もない場合は、既定の稼働時間（平日 9:00 - 17:00）のシフトを使用する。
+
+    Args:
+        shifts: calendar_shifts の行
+        holidays: calendar_holidays の行
+        shutdowns: plant_shutdowns の行
+
+    Returns:
+        WorkCalendar: コンパイル済みの稼働カレンダー
+    """
+    shift_defs = [
+        Shift(
+            weekdays=frozenset(row["weekdays"]),
+            start=time.fromisoformat(row["start_time"]),
+            end=time.fromisoformat(row["end_time"]),
+        )
+        for row in shifts
+    ]
+    return WorkCalendar(
+        shifts=shift_defs or DEFAULT_CALENDAR.shifts,
+        holidays=[date.fromisoformat(row["holiday_date"]) for row in holidays],
+        shutdowns=[
+            (
+                datetime.fromisoformat(row["start_datetime"]),
+                datetime.fromisoformat(row["end_datetime"]),
+            )
+            for row in shutdowns
+        ],
+    )
+
+
+def load_tenant_calendar(
+    tenant_id: str, repo: CalendarRepository
+) -> WorkCalendar | None:
+    """
+    テナントのコンパイル済み稼働カレンダーを返す。キャッシュにない場合のみDBから読み込む。
+
+    他テナントのIDを指定された場合に、空のカレンダー（既定の稼働時間）がキャッシュに
+    残らないよう、読み込む前にユーザーがテナントを参照できることを確認する。
+
+    Args:
+        tenant_id: テナントID
+        repo: カレンダーリポジトリ（ログインユーザーの権限で接続したもの）
+
+    Returns:
+        WorkCalendar | None: 稼働カレンダー。ユーザーがテナントを参照できない場合はNone
+    """
+    with _lock:
+        calendar = _cache.get(tenant_id)
+        generation = _generation
+    if calendar is not None:
+        return calendar
+
+    if not repo.is_tenant_visible(tenant_id):
+        return None
+
+    logger.info(f"Compiling work calendar for tenant {tenant_id}")
+    calendar = build_work_calendar(
+        repo.get_shifts(tenant_id),
+        repo.get_holidays(tenant_id),
+        repo.get_shutdowns(tenant_id),
+    )
+    with _lock:
+        if generation == _generation:
+            _cache[tenant_id] = calendar
+    return calendar
+
+
+def invalidate_tenant_calendar(tenant_id: str) -> None:
+    """
+    テナントの稼働カレンダーをキャッシュから破棄する。
+
+    Args:
+        tenant_id: テナントID
+    """
+    global _generation
+    with _lock:
+        _cache.pop(tenant_id, None)
+        _generation += 1
+
+
+def clear_tenant_calendars() -> None:
+    """すべてのテナントの稼働カレンダーをキャッシュから破棄する。"""
+    global _generation
+    with _lock:
+        _cache.clear()
+        _generation += 1
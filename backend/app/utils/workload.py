@@ -0,0 +1,229 @@
+"""
+工程負荷の列指向計算モジュール
+
+注文 × 工程の組み合わせを、注文ID・工程ID・設備グループID・所要時間（秒）の
+numpy 配列（列）に展開する。所要時間・設備グループごとの負荷・負荷山積み
+（rough-cut capacity）はすべて配列演算で計算し、工程ごとに Python の辞書を作ることはない。
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+from app.utils.calendar import DEFAULT_CALENDAR, WorkCalendar
+
+
+@dataclass(frozen=True)
+class OperationTable:
+    """
+    注文 × 工程の列指向テーブル
+
+    1行が1つの注文の1工程で、同じ注文の工程は sequence_order 順に連続して並ぶ。
+    """
+
+    order_ids: np.ndarray
+    routing_ids: np.ndarray
+    group_ids: np.ndarray
+    duration_seconds: np.ndarray
+    # 注文ごとの先頭の行（注文の位置 i の工程は order_starts[i]:order_starts[i + 1]）
+    order_starts: np.ndarray
+    # 注文IDをキーとした注文の位置
+    order_positions: dict[int, int]
+
+    def __len__(self) -> int:
+        return len(self.order_ids)
+
+    def minutes_for(self, order_id: int) -> list[float]:
+        """
+        注文の工程ごとの所要時間（分）を sequence_order 順に返す。
+
+        Args:
+            order_id: 注文ID
+
+        Returns:
+            工程ごとの所要時間（分）のリスト
+        """
+        i = self.order_positions[order_id]
+        start, end = self.order_starts[i], self.order_starts[i + 1]
+        return (self.duration_seconds[start:end] / 60).tolist()
+
+    def take(self, order_ids: Sequence[int]) -> "OperationTable":
+        """
+        指定した注文の行だけを、指定した注文の順に並べたテーブルを返す。
+
+        Args:
+            order_ids: 注文IDのリスト
+
+        Returns:
+            OperationTable: 指定した注文のテーブル
+        """
+        positions = np.fromiter(
+            (self.order_positions[id] for id in order_ids),
+            dtype=np.int64,
+            count=len(order_ids),
+        )
+        starts = self.order_starts[positions]
+        counts = self.order_starts[positions + 1] - starts
+        order_starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        # 新しいテーブルの各行に対応する元のテーブルの行
+        rows = np.repeat(starts - order_starts[:-1], counts) + np.arange(
+            order_starts[-1]
+        )
+        return OperationTable(
+            order_ids=self.order_ids[rows],
+            routing_ids=self.routing_ids[rows],
+            group_ids=self.group_ids[rows],
+            duration_seconds=self.duration_seconds[rows],
+            order_starts=order_starts,
+            order_positions={id: i for i, id in enumerate(order_ids)},
+        )
+
+
+def build_operation_table(
+    orders: Sequence[dict[str, Any]],
+    routings_by_product: dict[int, list[dict[str, Any]]],
+) -> OperationTable:
+    """
+    注文 × 工程を列指向テーブルに展開し、所要時間（段取り時間 + 数量 × 単位時間）を計算する。
+
+    工程の属性は製品ごとに1回だけ配列にし、注文への展開と所要時間の計算は
+    np.repeat と配列演算で行う。工程のない製品の注文は行を持たない。
+
+    Args:
+        orders: 注文のリスト
+        routings_by_product: 製品IDをキーとした工程のリスト（sequence_order順）
+
+    Returns:
+        OperationTable: 注文の順に並べたテーブル
+    """
+    product_ids = sorted({order["product_id"] for order in orders})
+    product_index = {product_id: i for i, product_id in enumerate(product_ids)}
+    routings = [
+        routing for p in product_ids for routing in routings_by_product.get(p, [])
+    ]
+    routing_ids = np.array([r["id"] for r in routings], dtype=np.int64)
+    group_ids = np.array([r["equipment_group_id"] for r in routings], dtype=np.int64)
+    setup_seconds = np.array(
+        [r.get("setup_time_seconds", 0) or 0 for r in routings], dtype=float
+    )
+    unit_seconds = np.array([r["unit_time_seconds"] for r in routings], dtype=float)
+    routing_counts = np.array(
+        [len(routings_by_product.get(p, [])) for p in product_ids], dtype=np.int64
+    )
+    routing_offsets = np.concatenate(([0], np.cumsum(routing_counts)[:-1])).astype(
+        np.int64
+    )
+
+    # 注文ごとの製品の位置・数量・工程数
+    order_products = np.fromiter(
+        (product_index[order["product_id"]] for order in orders),
+        dtype=np.int64,
+        count=len(orders),
+    )
+    quantities = np.fromiter(
+        (order["quantity"] for order in orders), dtype=float, count=len(orders)
+    )
+    counts = routing_counts[order_products]
+    order_starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    # 各行の注文の位置と、その注文の中での工程の位置
+    rows = np.repeat(np.arange(len(orders)), counts)
+    steps = np.arange(order_starts[-1]) - order_starts[rows]
+    routing_rows = routing_offsets[order_products[rows]] + steps
+
+    return OperationTable(
+        order_ids=np.array([order["id"] for order in orders], dtype=np.int64)[rows],
+        routing_ids=routing_ids[routing_rows],
+        group_ids=group_ids[routing_rows],
+        duration_seconds=setup_seconds[routing_rows]
+        + unit_seconds[routing_rows] * quantities[rows],
+        order_starts=order_starts,
+        order_positions={order["id"]: i for i, order in enumerate(orders)},
+    )
+
+
+def workload_by_group(table: OperationTable) -> dict[int, float]:
+    """
+    設備グループごとの負荷（所要時間の合計、分）を計算する。
+
+    Args:
+        table: 注文 × 工程のテーブル
+
+    Returns:
+        設備グループIDをキーとした負荷（分）
+    """
+    groups, inverse = np.unique(table.group_ids, return_inverse=True)
+    minutes = np.bincount(inverse, weights=table.duration_seconds) / 60
+    return dict(zip(groups.tolist(), minutes.tolist(), strict=True))
+
+
+def workload_by_order(table: OperationTable) -> np.ndarray:
+    """
+    注文ごとの総所要時間（全工程の所要時間の合計、分）を計算する。
+
+    Args:
+        table: 注文 × 工程のテーブル
+
+    Returns:
+        テーブルの注文と同じ順序の総所要時間（分）の配列（工程のない注文は0）
+    """
+    order_count = len(table.order_starts) - 1
+    rows = np.repeat(np.arange(order_count), np.diff(table.order_starts))
+    return np.bincount(rows, weights=table.duration_seconds, minlength=order_count) / 60
+
+
+def rough_cut_capacity(
+    table: OperationTable,
+    machine_ids_by_group: dict[int, list[int]],
+    start: datetime,
+    end: datetime,
+    calendar: WorkCalendar = DEFAULT_CALENDAR,
+) -> list[dict[str, Any]]:
+    """
+    設備グループごとに、期間内の負荷と稼働可能時間を比べる（負荷山積み）。
+
+    稼働可能時間は、設備グループに属する設備の台数 × 期間内の稼働カレンダー上の稼働時間とする。
+    複数の設備グループに属する設備は、それぞれのグループの稼働可能時間に数える。
+
+    Args:
+        table: 注文 × 工程のテーブル
+        machine_ids_by_group: 設備グループIDをキーとした設備IDのリスト
+        start: 期間の開始日時
+        end: 期間の終了日時
+        calendar: 稼働カレンダー
+
+    Returns:
+        負荷率の高い順の、設備グループごとの equipment_group_id、machine_count、
+        required_minutes、available_minutes、utilization（負荷 / 稼働可能時間）、
+        overloaded（負荷が稼働可能時間を超えるかどうか）を持つ辞書のリスト
+    """
+    workload = workload_by_group(table)
+    if not workload:
+        return []
+
+    groups = np.array(list(workload), dtype=np.int64)
+    required = np.array(list(workload.values()))
+    machines = np.array(
+        [len(machine_ids_by_group.get(g, [])) for g in groups.tolist()], dtype=float
+    )
+    available = machines * calendar.working_minutes_between(start, end)
+    utilization = np.divide(
+        required, available, out=np.full(len(groups), np.inf), where=available > 0
+    )
+
+    return [
+        {
+            "equipment_group_id": int(groups[i]),
+            "machine_count": int(machines[i]),
+            "required_minutes": float(required[i]),
+            "available_minutes": float(available[i]),
+            "utilization": float(utilization[i])
+            if np.isfinite(utilization[i])
+            else None,
+            "overloaded": bool(required[i] > available[i]),
+        }
+        for i in np.argsort(-utilization, kind="stable")
+    ]
@@ -0,0 +1,29 @@
+-- ==========================================
+-- 設備ごとの最終終了時刻を一括取得する RPC
+-- ==========================================
+-- スケジューラが設備1台ごとに production_schedules を問い合わせていたため、
+-- 指定された設備ID群の最終終了時刻を1回のクエリでまとめて返す。
+-- SECURITY INVOKER (デフォルト) のため、呼び出しユーザーの RLS がそのまま適用される。
+-- 設備IDだけで絞り込むため、tenant_id が先頭の idx_schedules_tenant_equip_end は使えない。
+-- (equipment_id, end_datetime desc) のインデックスを追加し、LATERAL + LIMIT 1 で
+-- 設備ごとにその先頭行だけを読む（設備はテナントに属するため、設備IDで絞れば十分）。
+create index if not exists idx_schedules_equip_end
+  on production_schedules (equipment_id, end_datetime desc);
+
+create or replace function get_equipment_last_end_times(_equipment_ids bigint[])
+returns table (equipment_id bigint, last_end_datetime timestamptz)
+language sql
+stable
+as $$
+  select e.id as equipment_id, last_row.end_datetime as last_end_datetime
+  from unnest(_equipment_ids) as e(id)
+  cross join lateral (
+    select ps.end_datetime
+    from production_schedules ps
+    where ps.equipment_id = e.id
+    order by ps.end_datetime desc
+    limit 1
+  ) as last_row;
+$$;
+
+grant execute on function get_equipment_last_end_times(bigint[]) to authenticated;
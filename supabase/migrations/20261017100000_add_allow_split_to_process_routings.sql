@@ -0,0 +1,8 @@
+-- ==========================================
+-- 工程ごとの作業分割可否
+-- ==========================================
+-- true の場合、作業を終業時刻・休日をまたいで複数の稼働時間帯に分割して割り当てる。
+-- false の場合は従来どおり、1つの稼働時間帯に収まる開始時刻まで後ろ倒しする。
+-- 既存の工程の配置が変わらないよう、既定は false（分割する工程は明示的に true にする）。
+alter table process_routings
+  add column allow_split boolean not null default false;
@@ -0,0 +1,63 @@
+-- ==========================================
+-- テナントごとの稼働カレンダー
+-- ==========================================
+-- シフト・休日・工場停止期間をテナント単位で管理する。
+-- 時刻はすべて工場の現地時刻（壁時計時刻）として扱うため、
+-- 工場停止期間もタイムゾーンなしの timestamp で保持する。
+-- シフトが1件も登録されていないテナントは、既定の稼働時間（平日 9:00 - 17:00）で計算する。
+
+-- 1. Calendar Shifts (稼働シフト)
+create table calendar_shifts (
+  id bigint generated by default as identity primary key,
+  tenant_id uuid references tenants(id) not null,
+  name text,
+  weekdays smallint[] not null,  -- 稼働する曜日（0=月曜日 ... 6=日曜日）
+  start_time time not null,
+  end_time time not null,        -- start_time 以前の場合は翌日の end_time まで（夜勤）
+  check (weekdays <@ array[0, 1, 2, 3, 4, 5, 6]::smallint[])
+);
+
+-- 2. Calendar Holidays (休日)
+create table calendar_holidays (
+  id bigint generated by default as identity primary key,
+  tenant_id uuid references tenants(id) not null,
+  holiday_date date not null,
+  name text,
+  unique (tenant_id, holiday_date)
+);
+
+-- 3. Plant Shutdowns (工場停止期間)
+create table plant_shutdowns (
+  id bigint generated by default as identity primary key,
+  tenant_id uuid references tenants(id) not null,
+  start_datetime timestamp not null,
+  end_datetime timestamp not null,
+  reason text,
+  check (end_datetime > start_datetime)
+);
+
+create index idx_calendar_shifts_tenant on calendar_shifts (tenant_id);
+create index idx_plant_shutdowns_tenant on plant_shutdowns (tenant_id, start_datetime);
+
+-- RLS
+alter table calendar_shifts enable row level security;
+alter table calendar_holidays enable row level security;
+alter table plant_shutdowns enable row level security;
+
+create policy "Tenant isolation for calendar_shifts"
+  on calendar_shifts
+  for all
+  using ( is_tenant_member(tenant_id) )
+  with check ( is_tenant_member(tenant_id) );
+
+create policy "Tenant isolation for calendar_holidays"
+  on calendar_holidays
+  for all
+  using ( is_tenant_member(tenant_id) )
+  with check ( is_tenant_member(tenant_id) );
+
+create policy "Tenant isolation for plant_shutdowns"
+  on plant_shutdowns
+  for all
+  using ( is_tenant_member(tenant_id) )
+  with check ( is_tenant_member(tenant_id) );
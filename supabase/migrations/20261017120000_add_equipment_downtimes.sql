@@ -0,0 +1,26 @@
+-- ==========================================
+-- 設備停止期間（保全・メンテナンス）
+-- ==========================================
+-- 設備ごとの計画停止期間。スケジューラはこの期間と重なる時間帯に作業を割り当てない。
+-- スケジューラは「指定時刻より後に終わる停止期間」を設備ID群でまとめて読み込むため、
+-- (equipment_id, end_datetime) のインデックスを用意する。
+create table equipment_downtimes (
+  id bigint generated by default as identity primary key,
+  tenant_id uuid references tenants(id) not null,
+  equipment_id bigint references equipments(id) on delete cascade not null,
+  start_datetime timestamptz not null,
+  end_datetime timestamptz not null,
+  reason text,
+  check (end_datetime > start_datetime)
+);
+
+create index idx_equipment_downtimes_equip_end
+  on equipment_downtimes (equipment_id, end_datetime);
+
+alter table equipment_downtimes enable row level security;
+
+create policy "Tenant isolation for equipment_downtimes"
+  on equipment_downtimes
+  for all
+  using ( is_tenant_member(tenant_id) )
+  with check ( is_tenant_member(tenant_id) );
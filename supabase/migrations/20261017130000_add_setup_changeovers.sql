@@ -0,0 +1,50 @@
+-- ==========================================
+-- 段取り方法と段取り替え時間（順序依存の段取り）
+-- ==========================================
+-- 工程の段取り方法。同じ段取り方法の工程を同じ設備で続けて行う場合は段取りを省ける。
+alter table process_routings add column if not exists setup_method_id bigint;
+
+-- 段取り方法 A から B へ切り替えるときの段取り時間（段取り替え行列）。
+-- 行がない組み合わせは、後の工程の setup_time_seconds（同じ段取り方法どうしは 0）を使う。
+create table setup_changeovers (
+  id bigint generated by default as identity primary key,
+  tenant_id uuid references tenants(id) not null,
+  from_setup_method_id bigint not null,
+  to_setup_method_id bigint not null,
+  setup_time_seconds int not null check (setup_time_seconds >= 0),
+  unique (tenant_id, from_setup_method_id, to_setup_method_id)
+);
+
+alter table setup_changeovers enable row level security;
+
+create policy "Tenant isolation for setup_changeovers"
+  on setup_changeovers
+  for all
+  using ( is_tenant_member(tenant_id) )
+  with check ( is_tenant_member(tenant_id) );
+
+-- ==========================================
+-- 設備ごとの最後の段取り方法を一括取得する RPC
+-- ==========================================
+-- 追加モード（append）のスケジューリングでは、設備の最後のスケジュールの段取り方法から
+-- 最初の工程の段取り替え時間を決める。get_equipment_last_end_times と同様に設備IDだけで
+-- 絞り込み、LATERAL + LIMIT 1 で設備ごとに idx_schedules_equip_end
+-- （equipment_id, end_datetime desc）の先頭行だけを読む。
+create or replace function get_equipment_last_setup_methods(_equipment_ids bigint[])
+returns table (equipment_id bigint, setup_method_id bigint)
+language sql
+stable
+as $$
+  select e.id as equipment_id, pr.setup_method_id
+  from unnest(_equipment_ids) as e(id)
+  cross join lateral (
+    select ps.process_routing_id
+    from production_schedules ps
+    where ps.equipment_id = e.id
+    order by ps.end_datetime desc
+    limit 1
+  ) as last_row
+  join process_routings pr on pr.id = last_row.process_routing_id;
+$$;
+
+grant execute on function get_equipment_last_setup_methods(bigint[]) to authenticated;
@@ -0,0 +1,10 @@
+-- ==========================================
+-- ガントチャート（タイムライン）読み込み用インデックス
+-- ==========================================
+-- GET /production-schedules は期間と重なるスケジュールを (start_datetime, id) の
+-- キーセットページングで読み込む。設備・注文で絞り込まない場合でも、
+-- テナント内を開始日時順に範囲スキャンできるようにする。
+-- 設備での絞り込みは idx_schedules_tenant_equip_end、注文での絞り込みは
+-- idx_schedules_tenant_order を使う。
+create index if not exists idx_schedules_tenant_start_id
+  on production_schedules (tenant_id, start_datetime, id);